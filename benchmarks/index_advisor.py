@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN-driven index advisor for the SQL embedded in the Node app.
+
+SQL string literals are pulled out of models/, routes/ and services/, bound
+to sample values from a seeded benchmark dataset and run through
+``EXPLAIN FORMAT=JSON``. Full scans, filesorts and temporary tables are
+flagged and a composite index is proposed per offending table: equality
+columns first, then one range column, otherwise the ORDER BY columns.
+Each proposal is verified by timing its queries before and after creating
+the index; the index is dropped again unless --keep is given.
+
+    python -m benchmarks.index_advisor --scale 100k
+    python -m benchmarks.index_advisor --scale 100k --sql-out advised_indexes.sql
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from config.statements import code_text, iter_code_spans, leading_keyword
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SOURCE_DIRS = ('models', 'routes', 'services')
+EXPLAINABLE = {'SELECT', 'UPDATE', 'DELETE', 'WITH'}
+MAX_INDEX_COLUMNS = 4
+
+ExtractedQuery = namedtuple('ExtractedQuery', ['source', 'sql', 'dynamic'])
+PlanIssue = namedtuple('PlanIssue', ['kind', 'table', 'rows'])
+Predicates = namedtuple('Predicates', ['equality', 'ranges', 'joins', 'order_by', 'non_sargable'])
+IndexProposal = namedtuple('IndexProposal', ['table', 'columns'])
+
+
+# --- SQL extraction -------------------------------------------------------
+
+def _interpolation_stub(expression):
+    """Stand-in text for a ``${...}`` inside a SQL template literal"""
+    name = expression.lower()
+    if 'offset' in name:
+        return '0'
+    if 'limit' in name:
+        return '20'
+    return ''
+
+
+def iter_js_strings(source, stub=_interpolation_stub):
+    """Yield ``(line, text, dynamic)`` for every string literal in JS source.
+
+    Template literal interpolations are replaced by ``stub(expression)`` (by
+    default a number for LIMIT/OFFSET-like names, otherwise nothing) and
+    marked dynamic.
+    """
+    i = 0
+    n = len(source)
+    while i < n:
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        quote = source[i]
+        if quote not in ('"', "'", '`'):
+            i += 1
+            continue
+
+        line = source.count('\n', 0, i) + 1
+        parts = []
+        dynamic = False
+        i += 1
+        while i < n and source[i] != quote:
+            ch = source[i]
+            if ch == '\\':
+                parts.append(source[i + 1:i + 2])
+                i += 2
+            elif quote == '`' and source.startswith('${', i):
+                depth = 1
+                j = i + 2
+                while j < n and depth:
+                    depth += {'{': 1, '}': -1}.get(source[j], 0)
+                    j += 1
+                parts.append(stub(source[i + 2:j - 1]))
+                dynamic = True
+                i = j
+            elif ch == '\n' and quote != '`':
+                break  # unterminated; not a string we care about
+            else:
+                parts.append(ch)
+                i += 1
+        i += 1
+        yield line, ''.join(parts), dynamic
+
+
+def extract_queries(root=REPO_ROOT, directories=SOURCE_DIRS):
+    """SQL statements found in the app's JS sources, deduplicated by text"""
+    found = {}
+    for directory in directories:
+        for path in sorted((Path(root) / directory).glob('*.js')):
+            source = path.read_text(encoding='utf-8', errors='replace')
+            for line, text, dynamic in iter_js_strings(source):
+                if leading_keyword(text) not in EXPLAINABLE or len(text.split()) < 4:
+                    continue
+                key = ' '.join(text.split())
+                if key not in found:
+                    relative = path.relative_to(root).as_posix()
+                    found[key] = ExtractedQuery(f"{relative}:{line}", text.strip(), dynamic)
+    return list(found.values())
+
+
+# --- Statement analysis ---------------------------------------------------
+
+_CLAUSE_KEYWORDS = (
+    'ON', 'WHERE', 'SET', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'CROSS', 'GROUP',
+    'ORDER', 'LIMIT', 'HAVING', 'USING', 'UNION', 'AND', 'OR', 'FOR',
+)
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|UPDATE)\s+([\w$]+)(?:\s+(?:AS\s+)?([\w$]+))?', re.IGNORECASE)
+_COLUMN = r'((?:[\w$]+\.)?[\w$]+)'
+_PLACEHOLDER_BEFORE = [
+    (re.compile(_COLUMN + r'\s+BETWEEN\s+\?\s+AND\s*$', re.IGNORECASE), 'column'),
+    (re.compile(_COLUMN + r'\s*(?:<=>|<>|!=|>=|<=|=|<|>|\bNOT\s+LIKE|\bLIKE|\bBETWEEN)\s*$', re.IGNORECASE), 'column'),
+    (re.compile(_COLUMN + r'\s+(?:NOT\s+)?IN\s*\((?:\s*\?\s*,)*\s*$', re.IGNORECASE), 'column'),
+    (re.compile(r'\b(LIMIT|OFFSET)\s*$|\bLIMIT\s+\?\s*,\s*$', re.IGNORECASE), 'keyword'),
+]
+_CLAUSE_END = re.compile(r'\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|HAVING|FOR\s+UPDATE|UNION)\b', re.IGNORECASE)
+_EQUALITY = re.compile(_COLUMN + r'\s*(?:=|<=>)\s*(.+)$|' + _COLUMN + r'\s+(?:IS\s+NULL|IN\s*\()', re.IGNORECASE)
+_RANGE = re.compile(_COLUMN + r'\s*(?:>=|<=|<|>|\bBETWEEN\b|\bLIKE\b)', re.IGNORECASE)
+_FUNCTION_ON_COLUMN = re.compile(r'^\s*\w+\s*\(\s*' + _COLUMN + r'\s*\)', re.IGNORECASE)
+_COLUMN_ONLY = re.compile(r'^\s*' + _COLUMN + r'\s*$')
+_ORDER_ITEM = re.compile(r'^\s*' + _COLUMN + r'(?:\s+(?:ASC|DESC))?\s*$', re.IGNORECASE)
+
+
+def table_aliases(sql):
+    """Map of alias (and table name) to table for FROM/JOIN/UPDATE references"""
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(code_text(sql)):
+        aliases[table] = table
+        if alias and alias.upper() not in _CLAUSE_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def placeholder_targets(sql):
+    """What each ``?`` is compared with: ``('column', ref)``, ``('keyword', word)`` or None"""
+    targets = []
+    code = []
+    for start, end, is_code in iter_code_spans(sql):
+        chunk = sql[start:end]
+        if not is_code:
+            code.append("''" if chunk[0] in ("'", '"') else ' ')
+            continue
+        for ch in chunk:
+            if ch == '?':
+                before = ''.join(code)[-120:]
+                target = None
+                for pattern, kind in _PLACEHOLDER_BEFORE:
+                    match = pattern.search(before)
+                    if match:
+                        target = (kind, next(g for g in match.groups() if g))
+                        break
+                targets.append(target)
+            code.append(ch)
+    return targets
+
+
+def _split_top_level(text, separator):
+    """Split on a keyword/char outside parentheses"""
+    parts = []
+    depth = 0
+    start = 0
+    pattern = re.compile(separator, re.IGNORECASE)
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif depth == 0:
+            match = pattern.match(text, i)
+            if match and (i == 0 or not (text[i - 1].isalnum() or text[i - 1] == '_')):
+                parts.append(text[start:i])
+                i = start = match.end()
+                continue
+        i += 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _clause(text, keyword):
+    """Text of the first top-level clause starting with ``keyword``"""
+    match = re.search(r'\b' + keyword + r'\b', text, re.IGNORECASE)
+    if not match:
+        return ''
+    rest = text[match.end():]
+    end = _CLAUSE_END.search(rest)
+    return rest[:end.start()] if end else rest
+
+
+def analyze_predicates(sql):
+    """Equality, range, join and ORDER BY column references of a statement"""
+    text = ' '.join(code_text(sql).split())
+    # BETWEEN's AND is not a conjunction
+    where = re.sub(r'\bBETWEEN\s+(\S+)\s+AND\s+', r'BETWEEN \1 __AND__ ', _clause(text, 'WHERE'), flags=re.IGNORECASE)
+    equality, ranges, non_sargable = [], [], []
+    if where and len(_split_top_level(where, r'OR\b')) == 1:
+        for term in _split_top_level(where, r'AND\b'):
+            term = term.strip('() ')
+            function = _FUNCTION_ON_COLUMN.match(term)
+            if function:
+                non_sargable.append(function.group(1))
+                continue
+            match = _EQUALITY.match(term)
+            if match:
+                column = match.group(1) or match.group(3)
+                value = match.group(2)
+                if value and _COLUMN_ONLY.match(value) and '.' in value:
+                    continue  # a join condition written in WHERE
+                equality.append(column)
+                continue
+            match = _RANGE.match(term)
+            if match:
+                ranges.append(match.group(1))
+
+    joins = []
+    for condition in re.findall(r'\bON\s+(.+?)(?=\b(?:LEFT|RIGHT|INNER|CROSS|JOIN|WHERE|GROUP|ORDER|LIMIT)\b|$)', text, re.IGNORECASE):
+        for term in _split_top_level(condition, r'AND\b'):
+            sides = [side.strip() for side in term.split('=')]
+            if len(sides) == 2 and all(_COLUMN_ONLY.match(side) for side in sides):
+                joins.append(tuple(sides))
+
+    order_by = []
+    match = re.search(r'\bORDER\s+BY\s+(.+?)(?=\bLIMIT\b|$)', text, re.IGNORECASE)
+    if match:
+        for item in _split_top_level(match.group(1), ','):
+            column = _ORDER_ITEM.match(item)
+            if not column:
+                order_by = []  # computed sort keys can't come from an index
+                break
+            order_by.append(column.group(1))
+    return Predicates(equality, ranges, joins, order_by, non_sargable)
+
+
+def _resolve(ref, aliases, columns):
+    """(table, column) for a possibly-qualified column reference"""
+    if '.' in ref:
+        alias, column = ref.split('.', 1)
+        table = aliases.get(alias)
+        return (table, column) if table else (None, column)
+    owners = [t for t in dict.fromkeys(aliases.values()) if ref in columns.get(t, ())]
+    return (owners[0], ref) if len(owners) == 1 else (None, ref)
+
+
+# --- Plans ----------------------------------------------------------------
+
+def plan_issues(plan):
+    """Full scans, filesorts and temporary tables in an EXPLAIN FORMAT=JSON plan"""
+    issues = []
+
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+            return
+        if not isinstance(node, dict):
+            return
+        table = node.get('table')
+        if isinstance(table, dict):
+            access = table.get('access_type')
+            if access in ('ALL', 'index'):
+                kind = 'full_scan' if access == 'ALL' else 'full_index_scan'
+                issues.append(PlanIssue(kind, table.get('table_name'), table.get('rows_examined_per_scan')))
+        if node.get('using_filesort'):
+            issues.append(PlanIssue('filesort', None, None))
+        if node.get('using_temporary_table'):
+            issues.append(PlanIssue('temporary_table', None, None))
+        for value in node.values():
+            walk(value)
+
+    walk(plan)
+    return issues
+
+
+def propose_indexes(sql, issues, aliases, columns, existing):
+    """Composite indexes that could remove the issues found in a plan.
+
+    ``columns`` maps table -> set of column names; ``existing`` maps
+    table -> list of index column tuples.
+    """
+    predicates = analyze_predicates(sql)
+
+    def resolved(refs):
+        return [_resolve(ref, aliases, columns) for ref in refs]
+
+    equality = resolved(predicates.equality)
+    ranges = resolved(predicates.ranges)
+    order_by = resolved(predicates.order_by)
+    join_columns = resolved([side for pair in predicates.joins for side in pair])
+
+    tables = []
+    for issue in issues:
+        if issue.kind in ('full_scan', 'full_index_scan') and issue.table:
+            tables.append(aliases.get(issue.table, issue.table))
+        elif issue.kind == 'filesort' and order_by and len({t for t, _ in order_by}) == 1:
+            tables.append(order_by[0][0])
+
+    proposals = []
+    for table in dict.fromkeys(t for t in tables if t):
+        own = lambda refs: [c for t, c in refs if t == table]
+        index = own(equality)
+        if not index:
+            index = own(join_columns)[:1]
+        table_ranges = own(ranges)
+        if table_ranges:
+            index.append(table_ranges[0])
+        elif order_by and all(t == table for t, _ in order_by):
+            index.extend(c for _, c in order_by)
+        index = list(dict.fromkeys(index))[:MAX_INDEX_COLUMNS]
+        if not index:
+            continue
+        covered = any(tuple(cols[:len(index)]) == tuple(index) for cols in existing.get(table, ()))
+        if not covered:
+            proposals.append(IndexProposal(table, tuple(index)))
+    return proposals
+
+
+def index_name(proposal):
+    return f"idx_{proposal.table}_{'_'.join(proposal.columns)}"[:64]
+
+
+def create_index_sql(proposal):
+    columns = ', '.join(f"`{c}`" for c in proposal.columns)
+    return f"CREATE INDEX `{index_name(proposal)}` ON `{proposal.table}` ({columns})"
+
+
+# --- Database side --------------------------------------------------------
+
+class IndexAdvisor:
+    """Explains, advises and verifies against one TestDatabase"""
+
+    def __init__(self, db, runs=15):
+        self.db = db
+        self.runs = runs
+        self._samples = {}
+        self.columns = {}
+        self.existing = {}
+        self._load_schema()
+
+    def _load_schema(self):
+        rows = self.db.query(
+            "SELECT table_name AS t, column_name AS c, data_type AS d FROM information_schema.columns "
+            "WHERE table_schema = DATABASE()"
+        )
+        self.types = {}
+        for row in rows:
+            self.columns.setdefault(row['t'], set()).add(row['c'])
+            self.types[(row['t'], row['c'])] = row['d']
+        self.refresh_indexes()
+
+    def refresh_indexes(self):
+        rows = self.db.query(
+            "SELECT table_name AS t, index_name AS i, column_name AS c FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() ORDER BY table_name, index_name, seq_in_index"
+        )
+        indexes = {}
+        for row in rows:
+            indexes.setdefault((row['t'], row['i']), []).append(row['c'])
+        self.existing = {}
+        for (table, _), cols in indexes.items():
+            self.existing.setdefault(table, []).append(tuple(cols))
+
+    def sample_value(self, table, column):
+        """A real value of a column, so the optimizer sees realistic selectivity"""
+        key = (table, column)
+        if key not in self._samples:
+            value = None
+            if table and column in self.columns.get(table, ()):
+                row = self.db.query_one(
+                    f"SELECT `{column}` AS v FROM `{table}` WHERE `{column}` IS NOT NULL LIMIT 1"
+                )
+                value = row['v'] if row else None
+            if value is None:
+                data_type = self.types.get(key, '')
+                if 'int' in data_type or data_type in ('decimal', 'float', 'double'):
+                    value = 1
+                elif 'date' in data_type or 'time' in data_type:
+                    value = datetime.now().replace(microsecond=0)
+                else:
+                    value = 'x'
+            self._samples[key] = value
+        return self._samples[key]
+
+    def bind(self, sql, aliases):
+        """Sample parameters for every placeholder in a statement"""
+        params = []
+        for target in placeholder_targets(sql):
+            if target is None:
+                params.append(1)
+            elif target[0] == 'keyword':
+                params.append(0 if target[1].upper() == 'OFFSET' else 20)
+            else:
+                table, column = _resolve(target[1], aliases, self.columns)
+                params.append(self.sample_value(table, column))
+        return params
+
+    def explain(self, sql, params):
+        row = self.db.query_one("EXPLAIN FORMAT=JSON " + sql, params)
+        return json.loads(next(iter(row.values())))
+
+    def time_query(self, sql, params):
+        """Median wall time in ms; writes are measured inside a rolled-back transaction"""
+        keyword = leading_keyword(sql)
+        samples = []
+        for _ in range(self.runs):
+            started = time.perf_counter()
+            self.db.query(sql, params)
+            samples.append((time.perf_counter() - started) * 1000)
+            if keyword not in ('SELECT', 'WITH'):
+                self.db.connection.rollback()
+        return statistics.median(samples)
+
+    def analyze(self, queries):
+        """EXPLAIN every query; returns one result dict per query"""
+        results = []
+        for query in queries:
+            result = {'query': query, 'issues': [], 'proposals': [], 'error': None}
+            results.append(result)
+            try:
+                aliases = table_aliases(query.sql)
+                params = self.bind(query.sql, aliases)
+                result['params'] = params
+                result['issues'] = plan_issues(self.explain(query.sql, params))
+                result['proposals'] = propose_indexes(
+                    query.sql, result['issues'], aliases, self.columns, self.existing
+                )
+            except Exception as e:
+                self.db.connection.rollback()
+                result['error'] = str(e).splitlines()[0]
+        return results
+
+    def verify(self, results):
+        """Time each proposal's queries before and after creating the index"""
+        by_proposal = {}
+        for result in results:
+            for proposal in result['proposals']:
+                by_proposal.setdefault(proposal, []).append(result)
+
+        verdicts = []
+        for proposal, affected in by_proposal.items():
+            before = [self.time_query(r['query'].sql, r['params']) for r in affected]
+            self.db.query(create_index_sql(proposal))
+            self.db.query(f"ANALYZE TABLE `{proposal.table}`")
+            try:
+                after = [self.time_query(r['query'].sql, r['params']) for r in affected]
+                remaining = [plan_issues(self.explain(r['query'].sql, r['params'])) for r in affected]
+            finally:
+                self.db.query(f"DROP INDEX `{index_name(proposal)}` ON `{proposal.table}`")
+            verdicts.append({
+                'proposal': proposal,
+                'queries': [
+                    {
+                        'source': r['query'].source,
+                        'before_ms': b,
+                        'after_ms': a,
+                        'issues_before': len(r['issues']),
+                        'issues_after': len(left),
+                    }
+                    for r, b, a, left in zip(affected, before, after, remaining)
+                ],
+                'speedup': sum(before) / max(sum(after), 1e-9),
+            })
+        return sorted(verdicts, key=lambda v: v['speedup'], reverse=True)
+
+
+def print_analysis(results):
+    print("\n🔎 Plan issues")
+    for result in results:
+        query = result['query']
+        if result['error']:
+            note = ' (dynamic SQL)' if query.dynamic else ''
+            print(f"  ❌ {query.source}{note}: {result['error']}")
+            continue
+        if not result['issues']:
+            continue
+        issues = ', '.join(
+            f"{i.kind}({i.table}, ~{i.rows} rows)" if i.table else i.kind for i in result['issues']
+        )
+        print(f"  ⚠️ {query.source}: {issues}")
+        for proposal in result['proposals']:
+            print(f"      -> {create_index_sql(proposal)}")
+        non_sargable = analyze_predicates(query.sql).non_sargable
+        if non_sargable:
+            print(f"      (function applied to {', '.join(non_sargable)}; rewrite as a range to use an index)")
+
+
+def print_verdicts(verdicts, min_speedup):
+    print("\n📊 Verified proposals")
+    for verdict in verdicts:
+        status = "✅" if verdict['speedup'] >= min_speedup else "➖"
+        print(f"  {status} {create_index_sql(verdict['proposal'])}  ({verdict['speedup']:.2f}x)")
+        for q in verdict['queries']:
+            print(
+                f"      {q['source']}: {q['before_ms']:.2f} -> {q['after_ms']:.2f} ms, "
+                f"plan issues {q['issues_before']} -> {q['issues_after']}"
+            )
+
+
+def main(argv=None):
+    from benchmarks.query_benchmarks import SCALES, prepare_dataset
+
+    parser = argparse.ArgumentParser(description="Propose and verify indexes for the app's SQL")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='100k')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--runs', type=int, default=15, help="timed runs per query and index state")
+    parser.add_argument('--min-speedup', type=float, default=1.2)
+    parser.add_argument('--no-verify', action='store_true', help="only EXPLAIN and propose")
+    parser.add_argument('--keep', action='store_true', help="keep indexes that met --min-speedup")
+    parser.add_argument('--sql-out', help="write CREATE INDEX statements for accepted proposals here")
+    args = parser.parse_args(argv)
+
+    queries = extract_queries()
+    print(f"✅ Extracted {len(queries)} statements from {', '.join(SOURCE_DIRS)}")
+    db, _, _ = prepare_dataset(args.scale, args.seed)
+    try:
+        advisor = IndexAdvisor(db, runs=args.runs)
+        results = advisor.analyze(queries)
+        print_analysis(results)
+        if args.no_verify:
+            return 0
+
+        verdicts = advisor.verify(results)
+        print_verdicts(verdicts, args.min_speedup)
+        accepted = [v['proposal'] for v in verdicts if v['speedup'] >= args.min_speedup]
+        if args.keep:
+            for proposal in accepted:
+                db.query(create_index_sql(proposal))
+        if args.sql_out:
+            Path(args.sql_out).write_text(''.join(create_index_sql(p) + ';\n' for p in accepted))
+            print(f"✅ Wrote {len(accepted)} index statements to {args.sql_out}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Keyset versus OFFSET pagination of the photo gallery.
+
+Runs models/photoModel.js itself under Node (benchmarks/photo_model_bridge.js):
+getPublicPhotos / getPhotosByHealthStatus for OFFSET pages and their *Keyset
+counterparts for cursor pages. The model's queries are executed here on the
+benchmark database, so the harness checks the model's own SQL, cursors and
+keyset conditions. It checks that both modes return photos in the same order,
+page after page and at deep pages reached through a cursor, then times a page
+fetch at increasing depths in each mode. Timings replay the statements the
+model issued for the page, so they leave out the Node round trips.
+
+    python -m benchmarks.keyset_pagination --photos 10k
+    python -m benchmarks.keyset_pagination --photos 5m --depth 1 --depth 1000 --depth 100000
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import time
+
+from benchmarks.photo_model_bridge import PhotoModel
+from benchmarks.query_benchmarks import handler_reads, prepare_dataset
+from benchmarks.stats import summarize
+
+PHOTO_SCALES = {'10k': 10000, '500k': 500000, '5m': 5000000}
+PHOTOS_PER_USER = 100
+HEALTH_STATUSES = ['healthy', 'needs_vaccination', 'underweight', 'overweight', 'recent_vet_visit']
+
+
+# Gallery queries ------------------------------------------------------
+
+class GalleryQueries:
+    """Both pagination modes for one gallery listing (public or health status)"""
+
+    def __init__(self, model, sort, tag=None, user_id=None, health_status=None):
+        self.model = model
+        self.sort = sort
+        self.user_id = user_id
+        self.health_status = health_status
+        self.filters = {'tag': tag, 'user_id': user_id} if health_status is None else None
+
+    def offset_page(self, page, limit):
+        """Rows of getPublicPhotos / getPhotosByHealthStatus for a 1-based page"""
+        if self.health_status is not None:
+            return self.model.call(
+                'getPhotosByHealthStatus', self.user_id, self.health_status, page, limit, self.sort
+            )
+        return self.model.call('getPublicPhotos', page, limit, self.filters, self.sort)
+
+    def keyset_page(self, cursor, limit):
+        """(rows, next_cursor) of the *Keyset model method for a cursor"""
+        if self.health_status is not None:
+            page = self.model.call(
+                'getPhotosByHealthStatusKeyset', self.user_id, self.health_status, cursor, limit, self.sort
+            )
+        else:
+            page = self.model.call('getPublicPhotosKeyset', cursor, limit, self.filters, self.sort)
+        return page['photos'], page['nextCursor']
+
+    def cursor_at(self, position):
+        """Cursor naming the row at a 0-based position, as the page before it would hand out"""
+        rows = self.offset_page(position + 1, 1)
+        if not rows:
+            return None
+        keys = self.model.call('KEYSET_SORTS')[self.sort]
+        columns = ', '.join(f"{key.get('select') or key['expr']} AS k{i}" for i, key in enumerate(keys))
+        row = self.model.db.query_one(
+            f"SELECT {columns} FROM photos p WHERE p.photo_id = ?", [rows[0]['photo_id']]
+        )
+        return self.model.call('encodeCursor', self.sort, [row[f"k{i}"] for i in range(len(keys))])
+
+
+# Checks and timings ---------------------------------------------------
+
+def photo_order(rows):
+    """Photo ids in row order, one entry per photo (health rows repeat a photo)"""
+    order = []
+    for row in rows:
+        if not order or order[-1] != row['photo_id']:
+            order.append(row['photo_id'])
+    return order
+
+
+def first_difference(expected, actual):
+    """Index of the first differing position, or None if the sequences match"""
+    for index, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            return index
+    if len(expected) != len(actual):
+        return min(len(expected), len(actual))
+    return None
+
+
+def walk_pages(queries, limit, max_pages):
+    """Page through both modes from the start; returns (offset ids, keyset ids)"""
+    offset_rows = []
+    for page in range(1, max_pages + 1):
+        rows = queries.offset_page(page, limit)
+        offset_rows.extend(rows)
+        if len(rows) < limit:
+            break
+
+    keyset_rows = []
+    cursor = None
+    for _ in range(max_pages):
+        rows, cursor = queries.keyset_page(cursor, limit)
+        keyset_rows.extend(rows)
+        if cursor is None:
+            break
+
+    # Health OFFSET pages count rows while keyset pages count photos, so the
+    # keyset walk can reach further; compare the stretch both modes covered
+    offset_ids = photo_order(offset_rows)
+    return offset_ids, photo_order(keyset_rows)[:len(offset_ids)]
+
+
+def check_depth(queries, page, limit):
+    """Compare OFFSET page `page` with the keyset page reached from the previous page's last row"""
+    expected = photo_order(queries.offset_page(page, limit))
+    cursor = queries.cursor_at((page - 1) * limit - 1) if page > 1 else None
+    rows, _ = queries.keyset_page(cursor, limit)
+    return expected, photo_order(rows)
+
+
+def time_depth(db, queries, page, limit, iterations, overhead):
+    """Latency (ms) and rows examined for one page at a depth, in both modes"""
+    cursor = queries.cursor_at((page - 1) * limit - 1) if page > 1 else None
+    modes = {
+        'offset': lambda: queries.offset_page(page, limit),
+        'keyset': lambda: queries.keyset_page(cursor, limit),
+    }
+    result = {}
+    for mode, fetch in modes.items():
+        fetch()  # warm the buffer pool for this depth, and record the model's statements
+        statements = list(queries.model.statements)
+        samples = []
+        examined = []
+        for _ in range(iterations):
+            before = handler_reads(db)
+            started = time.perf_counter()
+            for sql, params in statements:
+                db.query(sql, params)
+            samples.append((time.perf_counter() - started) * 1000)
+            examined.append(handler_reads(db) - before - overhead)
+        result[mode] = {'latency_ms': summarize(samples), 'rows_examined': sum(examined) / len(examined)}
+    return result
+
+
+def busiest_health_user(db):
+    """User with the most public photos of pets that have health records"""
+    row = db.query_one(
+        "SELECT p.user_id, COUNT(*) AS photos FROM photos p "
+        "WHERE p.is_public = 1 AND EXISTS (SELECT 1 FROM health_tracker ht WHERE ht.pet_id = p.pet_id) "
+        "GROUP BY p.user_id ORDER BY photos DESC LIMIT 1"
+    )
+    return row['user_id'] if row else None
+
+
+def main(argv=None):
+    if shutil.which('node') is None:
+        print("❌ Node.js is required: the benchmark runs models/photoModel.js")
+        return 1
+    model = PhotoModel()
+    try:
+        return run(model, argv)
+    finally:
+        model.close()
+
+
+def run(model, argv):
+    sorts = list(model.call('KEYSET_SORTS'))
+    parser = argparse.ArgumentParser(description="Compare keyset and OFFSET pagination of the photo gallery")
+    parser.add_argument('--photos', choices=sorted(PHOTO_SCALES), default='10k', help="dataset size")
+    parser.add_argument('--sort', action='append', choices=sorted(sorts), help="repeatable; default all")
+    parser.add_argument('--tag', help="also check the public gallery filtered by this tag")
+    parser.add_argument('--limit', type=int, default=12, help="photos per page, as in galleryRoutes")
+    parser.add_argument('--walk-pages', type=int, default=50, help="pages to walk from the start in both modes")
+    parser.add_argument('--depth', action='append', type=int, help="page numbers to check and time; repeatable")
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the timings to a JSON file")
+    args = parser.parse_args(argv)
+
+    photos = PHOTO_SCALES[args.photos]
+    db, _counts, _generated_at = prepare_dataset(
+        args.photos, args.seed, purpose='keyset',
+        users=max(photos // PHOTOS_PER_USER, 10), tables={'photos': photos}
+    )
+    model.db = db
+    try:
+        overhead = -handler_reads(db) + handler_reads(db)
+        total = db.query_one("SELECT COUNT(*) AS n FROM photos WHERE is_public = 1")['n']
+        last_page = max(1, -(-total // args.limit))
+        depths = sorted({d for d in (args.depth or [1, 10, 100, 1000, 10000, 100000]) if 1 <= d <= last_page})
+        health_user = busiest_health_user(db)
+
+        listings = []
+        for sort in args.sort or sorts:
+            listings.append((f"public/{sort}", GalleryQueries(model, sort)))
+            if args.tag:
+                listings.append((f"public/{sort}/tag={args.tag}", GalleryQueries(model, sort, tag=args.tag)))
+            if health_user is not None:
+                for status in HEALTH_STATUSES:
+                    listings.append((
+                        f"health/{status}/{sort}",
+                        GalleryQueries(model, sort, user_id=health_user, health_status=status)
+                    ))
+
+        failed = False
+        print(f"\n🔍 Ordering: {args.walk_pages} pages from the start, then pages {depths}")
+        for name, queries in listings:
+            offset_ids, keyset_ids = walk_pages(queries, args.limit, args.walk_pages)
+            problem = None
+            index = first_difference(offset_ids, keyset_ids)
+            if index is not None:
+                problem = (f"photo #{index + 1} differs "
+                           f"(offset {offset_ids[index:index + 3]} vs keyset {keyset_ids[index:index + 3]})")
+            elif queries.health_status is None:
+                for page in depths:
+                    expected, actual = check_depth(queries, page, args.limit)
+                    if first_difference(expected, actual) is not None:
+                        problem = f"page {page} differs (offset {expected[:3]} vs keyset {actual[:3]})"
+                        break
+            if problem:
+                failed = True
+                print(f"❌ {name}: {problem}")
+            else:
+                print(f"✅ {name}: {len(offset_ids)} photos in the same order")
+
+        report = {}
+        print(f"\n📊 Page latency by depth ({total:,} public photos, {args.limit} per page)")
+        print(f"{'listing':24} {'page':>7} {'offset p50':>11} {'keyset p50':>11} "
+              f"{'offset rows':>12} {'keyset rows':>12}")
+        for sort in args.sort or sorts:
+            queries = GalleryQueries(model, sort)
+            for page in depths:
+                timing = time_depth(db, queries, page, args.limit, args.iterations, overhead)
+                report.setdefault(sort, {})[page] = timing
+                print(
+                    f"{'public/' + sort:24} {page:7d} "
+                    f"{timing['offset']['latency_ms']['p50']:9.2f}ms {timing['keyset']['latency_ms']['p50']:9.2f}ms "
+                    f"{timing['offset']['rows_examined']:12.0f} {timing['keyset']['rows_examined']:12.0f}"
+                )
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+        return 1 if failed else 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
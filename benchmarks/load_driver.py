@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+"""
+Concurrent-user load driver for the data layer.
+
+Virtual users run weighted mixes of user journeys (dashboard, gallery
+browsing, task scheduling, notification polling) as asyncio tasks. Like
+config/database.js, every statement checks a connection out of a small
+pool, optionally sets the session time zone, runs and releases it, so pool
+size and queue limit behave as they do in the app. Stages ramp the number
+of virtual users and report throughput, tail latency, pool waits, InnoDB
+row-lock waits and deadlocks per stage.
+
+Statements run natively on asyncio with ``mysql.connector.aio`` when it is
+available, otherwise on a thread pool over TestDatabase's connection pool.
+They are copies of the app's; statement_drift() checks them against the
+models and routes they came from, and the driver warns before a run.
+
+    python -m benchmarks.load_driver --scale 100k --users 1,2,4,8,16,32 --duration 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from benchmarks.query_catalog import REPO_ROOT, QuerySpec, catalog_drift
+from benchmarks.stats import percentile
+
+# MySQL errors worth counting separately
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_LOCK_DEADLOCK = 1213
+
+# Mirrors config/database.js
+DEFAULT_POOL_SIZE = 3
+DEFAULT_QUEUE_LIMIT = 10
+SESSION_SETUP = "SET time_zone = '-05:00'"
+
+
+class QueueLimitError(Exception):
+    """Raised when more statements wait for a connection than the queue allows"""
+
+
+class StageMetrics:
+    """Latencies and counters collected during one load stage"""
+
+    def __init__(self):
+        self.journeys = {}
+        self.statements = 0
+        self.pool_waits = []
+        self.errors = {}
+
+    def journey(self, name, elapsed_ms):
+        self.journeys.setdefault(name, []).append(elapsed_ms)
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def summary(self, users, seconds, lock_delta):
+        latencies = [ms for samples in self.journeys.values() for ms in samples]
+        completed = len(latencies)
+
+        def pct(samples, q):
+            return percentile(samples, q) if samples else 0.0
+
+        return {
+            'users': users,
+            'seconds': seconds,
+            'journeys': completed,
+            'journeys_per_s': completed / seconds if seconds else 0.0,
+            'statements_per_s': self.statements / seconds if seconds else 0.0,
+            'p50_ms': pct(latencies, 50),
+            'p95_ms': pct(latencies, 95),
+            'p99_ms': pct(latencies, 99),
+            'pool_wait_p95_ms': pct(self.pool_waits, 95),
+            'row_lock_waits': lock_delta.get('Innodb_row_lock_waits', 0),
+            'row_lock_ms': lock_delta.get('Innodb_row_lock_time', 0),
+            'deadlocks': self.errors.get(ER_LOCK_DEADLOCK, 0),
+            'lock_timeouts': self.errors.get(ER_LOCK_WAIT_TIMEOUT, 0),
+            'errors': {str(k): v for k, v in self.errors.items()},
+            'by_journey': {
+                name: {'count': len(samples), 'p95_ms': pct(samples, 95)}
+                for name, samples in sorted(self.journeys.items())
+            },
+        }
+
+
+# --- Backends -------------------------------------------------------------
+
+class ThreadBackend:
+    """Runs blocking mysql.connector calls on a thread pool over TestDatabase's pool"""
+
+    name = 'thread'
+
+    def __init__(self, db, workers):
+        self.db = db
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='load-user')
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def acquire(self):
+        connection = await self._run(self.db.pool.acquire)
+        if not connection.autocommit:
+            connection.autocommit = True  # mysql2's default, so statements commit on their own
+        return connection
+
+    async def release(self, connection, discard=False):
+        self.db.pool.release(connection, discard=discard)
+
+    async def execute(self, connection, sql, params):
+        return await self._run(self._execute, connection, sql, params)
+
+    @staticmethod
+    def _execute(connection, sql, params):
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(sql, params or None)
+            if cursor.with_rows:
+                return cursor.fetchall()
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    async def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class AioBackend:
+    """Native asyncio connections from mysql.connector.aio in an asyncio.Queue pool"""
+
+    name = 'aio'
+
+    def __init__(self, params, pool_size):
+        self.params = params
+        self.pool_size = pool_size
+        self._idle = asyncio.Queue()
+        self._connections = []
+        self._opening = 0
+
+    async def _open_connection(self):
+        from mysql.connector import aio
+
+        return await aio.connect(**self.params, autocommit=True)
+
+    async def _connect(self):
+        self._opening += 1
+        try:
+            connection = await self._open_connection()
+        finally:
+            self._opening -= 1
+        self._connections.append(connection)
+        return connection
+
+    async def start(self):
+        for _ in range(self.pool_size):
+            self._idle.put_nowait(await self._connect())
+
+    async def acquire(self):
+        # Refill a slot whose replacement could not be opened when it was discarded
+        if self._idle.empty() and len(self._connections) + self._opening < self.pool_size:
+            return await self._connect()
+        return await self._idle.get()
+
+    async def release(self, connection, discard=False):
+        """Return a connection; a discarded one is closed and replaced, like TestDatabase's pool"""
+        if not discard:
+            self._idle.put_nowait(connection)
+            return
+        self._connections.remove(connection)
+        try:
+            await connection.close()
+        except Exception:
+            pass
+        try:
+            self._idle.put_nowait(await self._connect())
+        except Exception:
+            pass  # acquire() opens it once the server takes connections again
+
+    async def execute(self, connection, sql, params):
+        cursor = await connection.cursor(dictionary=True)
+        try:
+            await cursor.execute(sql, params or None)
+            if cursor.with_rows:
+                return await cursor.fetchall()
+            return cursor.rowcount
+        finally:
+            await cursor.close()
+
+    async def close(self):
+        for connection in self._connections:
+            await connection.close()
+
+
+# --- Sessions and journeys ------------------------------------------------
+
+class Session:
+    """One virtual user's view of the app: a user id and a pooled query()"""
+
+    def __init__(self, driver, rng, user_id):
+        self.driver = driver
+        self.rng = rng
+        self.user_id = user_id
+
+    @property
+    def now(self):
+        return self.driver.now
+
+    async def query(self, sql, params=()):
+        """Check out a connection, run one statement and release it, like config/database.js"""
+        return await self.driver.run_statement(sql, params)
+
+
+# Statements the journeys run, copied from the app with ? placeholders. SOURCES
+# names the definition each comes from; statement_drift() checks they are still there.
+
+PET_PAGE_SQL = "SELECT * FROM pets WHERE user_id = ? ORDER BY name LIMIT 5 OFFSET 0"  # LIMIT from queryPaginated
+PET_COUNT_SQL = "SELECT COUNT(*) as count FROM pets WHERE user_id = ?"
+FUTURE_TASKS_SQL = """
+    SELECT t.*, p.name as pet_name
+    FROM tasks t
+    JOIN pets p ON t.pet_id = p.pet_id
+    WHERE t.user_id = ?
+    AND t.completed = false
+    AND t.start_time > ?
+    ORDER BY t.start_time ASC
+  """
+
+# The first page of the newest public photos, as getPublicPhotosKeyset runs it
+GALLERY_PAGE_IDS_SQL = """
+        SELECT DATE_FORMAT(p.created_at, '%Y-%m-%d %T') AS k0, p.photo_id AS k1
+        FROM photos p
+        WHERE p.is_public = 1
+        ORDER BY p.created_at DESC, p.photo_id DESC
+        LIMIT 13
+    """
+
+
+def gallery_photos_sql(count):
+    placeholders = ', '.join('?' for _ in range(count))
+    return f"""
+            SELECT
+                p.*,
+                u.username,
+                u.profile_picture_url,
+                p.tag_names as tags
+            FROM photos p
+            LEFT JOIN users u ON p.user_id = u.user_id
+            WHERE p.photo_id IN ({placeholders})
+            ORDER BY p.created_at DESC, p.photo_id DESC
+        """
+
+
+def favorited_sql(count):
+    placeholders = ', '.join('?' for _ in range(count))
+    return f"SELECT photo_id FROM photo_favorites WHERE user_id = ? AND photo_id IN ({placeholders})"
+
+
+FAVORITE_EXISTS_SQL = 'SELECT favorite_id FROM photo_favorites WHERE photo_id = ? AND user_id = ?'
+FAVORITE_DELETE_SQL = 'DELETE FROM photo_favorites WHERE photo_id = ? AND user_id = ?'
+FAVORITE_INSERT_SQL = 'INSERT INTO photo_favorites (photo_id, user_id) VALUES (?, ?)'
+FAVORITE_DECREMENT_SQL = 'UPDATE photos SET favorite_count = favorite_count - 1 WHERE photo_id = ?'
+FAVORITE_INCREMENT_SQL = 'UPDATE photos SET favorite_count = favorite_count + 1 WHERE photo_id = ?'
+FAVORITE_COUNT_SQL = 'SELECT favorite_count FROM photos WHERE photo_id = ?'
+
+# The driver's own way of picking one of the user's pets; not an app statement
+USER_PETS_SQL = "SELECT pet_id FROM pets WHERE user_id = ? ORDER BY name"
+CREATE_TASK_SQL = """
+    INSERT INTO tasks (user_id, pet_id, task_type, title, description, due_date, start_time, end_time, priority)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+  """
+# CREATE_TASK_SQL for schemas that predate tasks.start_time
+CREATE_TASK_WITHOUT_TIMES_SQL = """
+    INSERT INTO tasks (user_id, pet_id, task_type, title, description, due_date, priority)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+  """
+UPCOMING_TASKS_SQL = """
+    SELECT t.*, p.name as pet_name
+    FROM tasks t
+    JOIN pets p ON t.pet_id = p.pet_id
+    WHERE t.user_id = ?
+    AND t.completed = false
+    AND t.start_time BETWEEN ? AND ?
+    ORDER BY t.start_time ASC
+  """
+TASK_OWNER_SQL = 'SELECT task_id FROM tasks WHERE task_id = ? AND user_id = ?'
+COMPLETE_TASK_SQL = """
+    UPDATE tasks
+    SET completed = true, completed_at = NOW()
+    WHERE task_id = ? AND user_id = ?
+  """
+
+UNREAD_COUNT_SQL = "SELECT COUNT(*) as count FROM notifications WHERE user_id = ? AND is_read = false"
+NOTIFICATIONS_SQL = "SELECT * FROM notifications WHERE user_id = ? ORDER BY created_at DESC LIMIT 50"
+MARK_ALL_READ_SQL = "UPDATE notifications SET is_read = true WHERE user_id = ? AND is_read = false"
+
+SOURCES = [
+    QuerySpec('PET_PAGE_SQL', 'routes/dashboardRoutes.js:/', PET_PAGE_SQL, None,
+              excerpt="SELECT * FROM pets WHERE user_id = ? ORDER BY name"),
+    QuerySpec('PET_COUNT_SQL', 'routes/dashboardRoutes.js:/', PET_COUNT_SQL, None),
+    QuerySpec('FUTURE_TASKS_SQL', 'models/taskModel.js:getFutureTasks', FUTURE_TASKS_SQL, None),
+    QuerySpec('GALLERY_PAGE_IDS_SQL', 'models/photoModel.js:keysetPageIds', GALLERY_PAGE_IDS_SQL, None),
+    QuerySpec('gallery_photos_sql', 'models/photoModel.js:getPublicPhotosKeyset', gallery_photos_sql(2), None),
+    QuerySpec('favorited_sql', 'models/photoModel.js:markFavorited', favorited_sql(2), None),
+    QuerySpec('FAVORITE_EXISTS_SQL', 'models/photoModel.js:toggleFavorite', FAVORITE_EXISTS_SQL, None),
+    QuerySpec('FAVORITE_DELETE_SQL', 'models/photoModel.js:toggleFavorite', FAVORITE_DELETE_SQL, None),
+    QuerySpec('FAVORITE_INSERT_SQL', 'models/photoModel.js:toggleFavorite', FAVORITE_INSERT_SQL, None),
+    QuerySpec('FAVORITE_DECREMENT_SQL', 'models/photoModel.js:toggleFavorite', FAVORITE_DECREMENT_SQL, None),
+    QuerySpec('FAVORITE_INCREMENT_SQL', 'models/photoModel.js:toggleFavorite', FAVORITE_INCREMENT_SQL, None),
+    QuerySpec('FAVORITE_COUNT_SQL', 'models/photoModel.js:storedFavoriteCount', FAVORITE_COUNT_SQL, None),
+    QuerySpec('CREATE_TASK_SQL', 'models/taskModel.js:createTask', CREATE_TASK_SQL, None),
+    QuerySpec('UPCOMING_TASKS_SQL', 'models/taskModel.js:getUpcomingTasks', UPCOMING_TASKS_SQL, None),
+    QuerySpec('TASK_OWNER_SQL', 'models/taskModel.js:completeTask', TASK_OWNER_SQL, None),
+    QuerySpec('COMPLETE_TASK_SQL', 'models/taskModel.js:completeTask', COMPLETE_TASK_SQL, None),
+    QuerySpec('UNREAD_COUNT_SQL', 'models/notificationModel.js:getUnreadCount', UNREAD_COUNT_SQL, None),
+    QuerySpec('NOTIFICATIONS_SQL', 'models/notificationModel.js:getNotificationsByUser', NOTIFICATIONS_SQL, None),
+    QuerySpec('MARK_ALL_READ_SQL', 'models/notificationModel.js:markAllAsRead', MARK_ALL_READ_SQL, None),
+]
+
+
+def statement_drift(root=REPO_ROOT):
+    """(name, reason) for each copied statement no longer in the app; see query_catalog.catalog_drift"""
+    return catalog_drift(root, SOURCES)
+
+
+async def dashboard(session):
+    """routes/dashboardRoutes.js GET /dashboard"""
+    await session.query(PET_PAGE_SQL, [session.user_id])
+    await session.query(PET_COUNT_SQL, [session.user_id])
+    await session.query(FUTURE_TASKS_SQL, [session.user_id, session.now])
+
+
+async def gallery(session):
+    """First gallery page as galleryRoutes serves it (keyset), sometimes a toggleFavorite"""
+    page = await session.query(GALLERY_PAGE_IDS_SQL)
+    ids = [row['k1'] for row in page[:12]]
+    if not ids:
+        return
+    photos = await session.query(gallery_photos_sql(len(ids)), ids)
+    await session.query(favorited_sql(len(ids)), [session.user_id, *ids])
+    if photos and session.rng.random() < 0.2:
+        photo_id = session.rng.choice(photos)['photo_id']
+        existing = await session.query(FAVORITE_EXISTS_SQL, [photo_id, session.user_id])
+        if existing:
+            await session.query(FAVORITE_DELETE_SQL, [photo_id, session.user_id])
+            await session.query(FAVORITE_DECREMENT_SQL, [photo_id])
+        else:
+            await session.query(FAVORITE_INSERT_SQL, [photo_id, session.user_id])
+            await session.query(FAVORITE_INCREMENT_SQL, [photo_id])
+        await session.query(FAVORITE_COUNT_SQL, [photo_id])
+
+
+async def schedule_task(session):
+    """taskModel.createTask, getUpcomingTasks and completeTask for one of the user's pets"""
+    pets = await session.query(USER_PETS_SQL, [session.user_id])
+    if not pets:
+        return
+    due = session.now + timedelta(hours=session.rng.randint(1, 72))
+    pet_id = session.rng.choice(pets)['pet_id']
+    if session.driver.has_start_time:
+        await session.query(
+            CREATE_TASK_SQL,
+            [session.user_id, pet_id, 'feeding', 'Load test feeding', None,
+             due, due, due + timedelta(minutes=30), 'medium'],
+        )
+    else:
+        await session.query(
+            CREATE_TASK_WITHOUT_TIMES_SQL,
+            [session.user_id, pet_id, 'feeding', 'Load test feeding', None, due, 'medium'],
+        )
+    upcoming = await session.query(
+        UPCOMING_TASKS_SQL, [session.user_id, session.now, session.now + timedelta(days=3)]
+    )
+    if upcoming:
+        task_id = session.rng.choice(upcoming)['task_id']
+        await session.query(TASK_OWNER_SQL, [task_id, session.user_id])
+        await session.query(COMPLETE_TASK_SQL, [task_id, session.user_id])
+
+
+async def notification_poll(session):
+    """notificationModel.getUnreadCount / getNotificationsByUser, sometimes markAllAsRead"""
+    await session.query(UNREAD_COUNT_SQL, [session.user_id])
+    await session.query(NOTIFICATIONS_SQL, [session.user_id])
+    if session.rng.random() < 0.2:
+        await session.query(MARK_ALL_READ_SQL, [session.user_id])
+
+
+JOURNEYS = {
+    'dashboard': dashboard,
+    'gallery': gallery,
+    'schedule_task': schedule_task,
+    'notification_poll': notification_poll,
+}
+DEFAULT_MIX = {'dashboard': 4, 'gallery': 3, 'schedule_task': 2, 'notification_poll': 3}
+
+
+def parse_mix(text):
+    """``dashboard=4,gallery=3`` -> {'dashboard': 4.0, 'gallery': 3.0}"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in JOURNEYS:
+            raise ValueError(f"Unknown journey: {name} (choose from {', '.join(JOURNEYS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def adapt_sql(sql, has_start_time):
+    """Fall back to due_date where the schema predates tasks.start_time"""
+    return sql if has_start_time else sql.replace('t.start_time', 't.due_date')
+
+
+def scaling_limit(stages, min_gain=1.1, max_latency_growth=1.5):
+    """Virtual users of the last stage before throughput flattened while p95 grew"""
+    for previous, current in zip(stages, stages[1:]):
+        flat = current['journeys_per_s'] < previous['journeys_per_s'] * min_gain
+        slower = current['p95_ms'] > previous['p95_ms'] * max_latency_growth
+        if flat and slower:
+            return previous['users']
+    return None
+
+
+class LoadDriver:
+    """Runs load stages against one backend"""
+
+    def __init__(self, backend, users_total, now, mix=None, session_setup=True,
+                 queue_limit=DEFAULT_QUEUE_LIMIT, think_ms=0.0, seed=0, task_columns=()):
+        self.backend = backend
+        self.users_total = users_total
+        self.now = now
+        self.mix = mix or DEFAULT_MIX
+        self.session_setup = session_setup
+        self.queue_limit = queue_limit
+        self.think_ms = think_ms
+        self.seed = seed
+        self.has_start_time = 'start_time' in task_columns
+        self.metrics = StageMetrics()
+        self._waiting = 0
+        self._sql_cache = {}
+
+    def _sql(self, sql):
+        compiled = self._sql_cache.get(sql)
+        if compiled is None:
+            from config.statements import compile_statement
+            compiled = self._sql_cache[sql] = compile_statement(adapt_sql(sql, self.has_start_time)).sql
+        return compiled
+
+    async def run_statement(self, sql, params):
+        if self.queue_limit is not None and self._waiting >= self.queue_limit:
+            self.metrics.error('queue_limit')
+            raise QueueLimitError("Queue limit reached")
+        self._waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = await self.backend.acquire()
+        finally:
+            self._waiting -= 1
+        self.metrics.pool_waits.append((time.perf_counter() - started) * 1000)
+
+        discard = False
+        try:
+            if self.session_setup:
+                await self.backend.execute(connection, SESSION_SETUP, None)
+                self.metrics.statements += 1
+            result = await self.backend.execute(connection, self._sql(sql), params)
+            self.metrics.statements += 1
+            return result
+        except Exception as e:
+            discard = getattr(e, 'errno', None) is None
+            raise
+        finally:
+            await self.backend.release(connection, discard=discard)
+
+    async def _virtual_user(self, number, deadline):
+        rng = random.Random(self.seed * 100003 + number)
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        loop = asyncio.get_running_loop()
+        while loop.time() < deadline:
+            name = rng.choices(names, weights)[0]
+            session = Session(self, rng, rng.randint(1, self.users_total))
+            started = time.perf_counter()
+            try:
+                await JOURNEYS[name](session)
+                self.metrics.journey(name, (time.perf_counter() - started) * 1000)
+            except QueueLimitError:
+                pass
+            except Exception as e:
+                errno = getattr(e, 'errno', None)
+                self.metrics.error(errno if errno is not None else type(e).__name__)
+            if self.think_ms:
+                await asyncio.sleep(rng.expovariate(1000 / self.think_ms))
+            else:
+                await asyncio.sleep(0)
+
+    async def _lock_counters(self):
+        connection = await self.backend.acquire()
+        try:
+            rows = await self.backend.execute(
+                connection,
+                "SHOW GLOBAL STATUS WHERE Variable_name IN ('Innodb_row_lock_waits', 'Innodb_row_lock_time')",
+                None,
+            )
+            return {row['Variable_name']: int(row['Value']) for row in rows}
+        finally:
+            await self.backend.release(connection)
+
+    async def run_stage(self, users, duration):
+        self.metrics = StageMetrics()
+        before = await self._lock_counters()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + duration
+        await asyncio.gather(*(self._virtual_user(i, deadline) for i in range(users)))
+        elapsed = loop.time() - started
+        after = await self._lock_counters()
+        delta = {key: after.get(key, 0) - before.get(key, 0) for key in after}
+        return self.metrics.summary(users, elapsed, delta)
+
+
+def print_stage(stage):
+    errors = ', '.join(f"{k}:{v}" for k, v in stage['errors'].items()) or '-'
+    print(
+        f"{stage['users']:>5} {stage['journeys_per_s']:>9.1f} {stage['statements_per_s']:>9.1f} "
+        f"{stage['p50_ms']:>8.1f} {stage['p95_ms']:>8.1f} {stage['p99_ms']:>8.1f} "
+        f"{stage['pool_wait_p95_ms']:>9.1f} {stage['row_lock_waits']:>6} {stage['deadlocks']:>5}  {errors}"
+    )
+
+
+async def run(args):
+    from benchmarks.query_benchmarks import prepare_dataset
+
+    pool_size = args.pool_size
+    db, counts, now = prepare_dataset(args.scale, args.seed, purpose='load', pool_size=pool_size)
+    task_columns = {
+        row['c'] for row in db.query(
+            "SELECT column_name AS c FROM information_schema.columns "
+            "WHERE table_schema = DATABASE() AND table_name = 'tasks'"
+        )
+    }
+    if 'start_time' not in task_columns:
+        print("⚠️ tasks.start_time is missing from this schema; task journeys use due_date instead")
+    # The pool's connections all belong to the virtual users from here on
+    db.release_connection()
+
+    backend = None
+    if args.backend in ('auto', 'aio'):
+        try:
+            params = dict(db._connection_params(), database=db.test_db_name)
+            params.pop('allow_local_infile', None)
+            backend = AioBackend(params, pool_size)
+            await backend.start()
+        except ImportError:
+            if args.backend == 'aio':
+                raise
+            backend = None
+    if backend is None:
+        user_counts = [int(u) for u in args.users.split(',')]
+        backend = ThreadBackend(db, workers=max(user_counts) + pool_size + 1)
+    print(f"🚀 Load driver using the {backend.name} backend, pool size {pool_size}")
+
+    driver = LoadDriver(
+        backend, counts['users'], now, mix=parse_mix(args.mix) if args.mix else None,
+        session_setup=not args.no_session_setup, queue_limit=args.queue_limit or None,
+        think_ms=args.think_ms, seed=args.seed, task_columns=task_columns,
+    )
+    stages = []
+    print(f"{'users':>5} {'journ/s':>9} {'stmt/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'wait p95':>9} {'locks':>6} {'dlock':>5}  errors")
+    try:
+        for users in (int(u) for u in args.users.split(',')):
+            stage = await driver.run_stage(users, args.duration)
+            stages.append(stage)
+            print_stage(stage)
+    finally:
+        await backend.close()
+        db.close()
+
+    limit = scaling_limit(stages)
+    if limit:
+        print(f"\n📈 Throughput stops scaling after {limit} virtual users with pool size {pool_size}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'pool_size': pool_size, 'backend': backend.name, 'stages': stages}, f, indent=2)
+    return stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent users against the data layer")
+    parser.add_argument('--scale', default='1k', help="benchmark dataset scale (1k, 100k, 10m)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--users', default='1,2,4,8,16,32', help="comma-separated virtual user counts per stage")
+    parser.add_argument('--duration', type=float, default=15, help="seconds per stage")
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE)
+    parser.add_argument('--queue-limit', type=int, default=DEFAULT_QUEUE_LIMIT, help="0 for unlimited")
+    parser.add_argument('--no-session-setup', action='store_true', help="skip the per-statement SET time_zone")
+    parser.add_argument('--think-ms', type=float, default=0, help="mean think time between journeys")
+    parser.add_argument('--mix', help="journey weights, e.g. dashboard=4,gallery=3,schedule_task=2")
+    parser.add_argument('--backend', choices=('auto', 'aio', 'thread'), default='auto')
+    parser.add_argument('--json', help="write stage results to this file")
+    args = parser.parse_args(argv)
+
+    for name, reason in statement_drift():
+        print(f"⚠️ {name} no longer matches the app: {reason}; update benchmarks/load_driver.py")
+
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
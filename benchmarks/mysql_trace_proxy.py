@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+"""
+Tracing TCP proxy for the MySQL client/server protocol.
+
+Point the Node app (DB_HOST/DB_PORT) at the proxy and it forwards traffic to
+the real server unchanged while recording every command: SQL text (including
+prepared statements), connection ID, latency, response size and how many
+other connections were busy at the time. Statements are grouped per request:
+explicitly with ``TraceProxy.span()`` from a test, or by idle gaps when the
+proxy is run by hand.
+
+    python -m benchmarks.mysql_trace_proxy --listen 3307 --upstream localhost:3306
+    DB_PORT=3307 npm start
+
+The CLIENT_SSL flag is cleared from the server greeting so clients that only
+prefer TLS talk plain text through the proxy (disable with --keep-tls). TLS
+and compressed sessions are forwarded but can't be decoded; they are
+reported as opaque connections.
+"""
+
+import argparse
+import asyncio
+import re
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# Command bytes (first byte of a client packet with sequence id 0)
+COMMANDS = {
+    0x01: 'QUIT', 0x02: 'INIT_DB', 0x03: 'QUERY', 0x0e: 'PING', 0x11: 'CHANGE_USER',
+    0x16: 'STMT_PREPARE', 0x17: 'STMT_EXECUTE', 0x18: 'STMT_SEND_LONG_DATA',
+    0x19: 'STMT_CLOSE', 0x1a: 'STMT_RESET', 0x1f: 'RESET_CONNECTION',
+}
+NO_RESPONSE = {'QUIT', 'STMT_CLOSE', 'STMT_SEND_LONG_DATA'}
+
+CLIENT_COMPRESS = 0x00000020
+CLIENT_SSL = 0x00000800
+CLIENT_QUERY_ATTRIBUTES = 0x08000000
+CLIENT_DEPRECATE_EOF = 0x01000000
+SERVER_MORE_RESULTS_EXISTS = 0x0008
+MAX_PACKET = 0xffffff
+
+Span = namedtuple('Span', ['label', 'started', 'ended'])
+
+
+class TracedStatement:
+    """One client command and the server's response to it"""
+
+    __slots__ = (
+        'connection_id', 'command', 'sql', 'issued', 'finished', 'response_bytes',
+        'error', 'in_flight', 'idle_before', 'spans',
+    )
+
+    def __init__(self, connection_id, command, sql, issued, in_flight, idle_before, spans):
+        self.connection_id = connection_id
+        self.command = command
+        self.sql = sql
+        self.issued = issued
+        self.finished = None
+        self.response_bytes = 0
+        self.error = False
+        self.in_flight = in_flight
+        self.idle_before = idle_before
+        self.spans = spans
+
+    @property
+    def round_trip(self):
+        return self.command not in NO_RESPONSE
+
+    @property
+    def latency_ms(self):
+        return ((self.finished or self.issued) - self.issued) * 1000
+
+    def __repr__(self):
+        return f"<TracedStatement conn={self.connection_id} {self.command} {self.sql!r} {self.latency_ms:.2f}ms>"
+
+
+def read_lenenc(payload, pos):
+    """Decode a length-encoded integer; returns (value, next position)"""
+    first = payload[pos]
+    if first < 0xfb:
+        return first, pos + 1
+    size = {0xfc: 2, 0xfd: 3, 0xfe: 8}.get(first)
+    if size is None:
+        return None, pos + 1
+    return int.from_bytes(payload[pos + 1:pos + 1 + size], 'little'), pos + 1 + size
+
+
+class PacketReader:
+    """Reassembles MySQL packets (and >16MB continuations) from a byte stream"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._partial = None
+
+    def feed(self, data):
+        """Add bytes; returns a list of complete ``(sequence_id, payload)``"""
+        self._buffer += data
+        packets = []
+        while len(self._buffer) >= 4:
+            length = int.from_bytes(self._buffer[:3], 'little')
+            if len(self._buffer) < 4 + length:
+                break
+            sequence = self._buffer[3]
+            payload = bytes(self._buffer[4:4 + length])
+            del self._buffer[:4 + length]
+            if self._partial is not None:
+                self._partial[1].extend(payload)
+                if length == MAX_PACKET:
+                    continue
+                sequence, payload = self._partial[0], bytes(self._partial[1])
+                self._partial = None
+            elif length == MAX_PACKET:
+                self._partial = [sequence, bytearray(payload)]
+                continue
+            packets.append((sequence, payload))
+        return packets
+
+
+class ResponseTracker:
+    """Decides when the server has finished answering a command"""
+
+    def __init__(self, command, deprecate_eof):
+        self.command = command
+        self.deprecate_eof = deprecate_eof
+        self.state = 'first'
+        self.remaining = 0
+        self.statement_id = None
+        self.error = False
+
+    def feed(self, payload):
+        """Consume one response packet; returns True when the response is complete"""
+        header = payload[0] if payload else 0
+        if self.state == 'first':
+            if header == 0xff:
+                self.error = True
+                return True
+            if self.command == 'STMT_PREPARE':
+                if header != 0x00:
+                    return True
+                self.statement_id = int.from_bytes(payload[1:5], 'little')
+                columns, params = struct.unpack('<HH', payload[5:9])
+                eof = 0 if self.deprecate_eof else 1
+                self.remaining = params + (eof if params else 0) + columns + (eof if columns else 0)
+                self.state = 'definitions'
+                return self.remaining == 0
+            if self.command not in ('QUERY', 'STMT_EXECUTE'):
+                return True
+            if header == 0x00:
+                return not self._more_results_ok(payload)
+            if header == 0xfb:
+                self.state = 'infile'  # LOCAL INFILE: client streams the file, then server sends OK
+                return False
+            count, _ = read_lenenc(payload, 0)
+            self.remaining = count + (0 if self.deprecate_eof else 1)
+            self.state = 'columns'
+            return False
+        if self.state == 'definitions':
+            self.remaining -= 1
+            return self.remaining <= 0
+        if self.state == 'infile':
+            self.error = header == 0xff
+            return True
+        if self.state == 'columns':
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.state = 'rows'
+            return False
+        # rows
+        if header == 0xff:
+            self.error = True
+            return True
+        if header == 0xfe and len(payload) < (MAX_PACKET if self.deprecate_eof else 9):
+            if self.deprecate_eof:
+                more = self._more_results_ok(payload)
+            else:
+                more = len(payload) >= 5 and struct.unpack('<H', payload[3:5])[0] & SERVER_MORE_RESULTS_EXISTS
+            if more:
+                self.state = 'first'
+                return False
+            return True
+        return False
+
+    @staticmethod
+    def _more_results_ok(payload):
+        """SERVER_MORE_RESULTS_EXISTS flag of an OK packet"""
+        _, pos = read_lenenc(payload, 1)
+        _, pos = read_lenenc(payload, pos)
+        if len(payload) < pos + 2:
+            return False
+        return bool(struct.unpack('<H', payload[pos:pos + 2])[0] & SERVER_MORE_RESULTS_EXISTS)
+
+
+def _query_text(payload, query_attributes):
+    """SQL of a COM_QUERY payload"""
+    body = payload[1:]
+    if query_attributes:
+        count, pos = read_lenenc(body, 0)
+        _, pos = read_lenenc(body, pos)
+        if count:
+            # Attribute values precede the query; keep the readable tail
+            text = body[pos:].decode('utf-8', errors='replace')
+            match = re.search(r'(SELECT|INSERT|UPDATE|DELETE|SET|SHOW|CALL|WITH|START|COMMIT|ROLLBACK)\b.*', text, re.S | re.I)
+            return match.group(0) if match else text
+        body = body[pos:]
+    return body.decode('utf-8', errors='replace')
+
+
+class _ConnectionTrace:
+    """Protocol state for one proxied client connection"""
+
+    def __init__(self, proxy, number):
+        self.proxy = proxy
+        self.connection_id = f"proxy-{number}"
+        self.phase = 'greeting'
+        self.opaque = False
+        self.capabilities = 0
+        self.prepared = {}
+        self.current = None
+        self.tracker = None
+        self.last_finished = None
+        self.client = PacketReader()
+        self.server = PacketReader()
+
+    def client_data(self, data, now):
+        if self.opaque:
+            return
+        for sequence, payload in self.client.feed(data):
+            if self.phase == 'auth' and not self.capabilities and len(payload) >= 4:
+                self.capabilities = int.from_bytes(payload[:4], 'little')
+                if self.capabilities & (CLIENT_SSL | CLIENT_COMPRESS):
+                    self.opaque = True
+                    self.proxy._opaque_connections += 1
+                    return
+            elif self.phase == 'command' and sequence == 0 and payload:
+                self._start(payload, now)
+
+    def server_data(self, data, now):
+        """Observe server bytes; returns the (possibly rewritten) bytes to forward"""
+        if self.opaque:
+            return data
+        for sequence, payload in self.server.feed(data):
+            if self.phase == 'greeting':
+                if payload[:1] == b'\x0a':
+                    end = payload.index(b'\x00', 1)
+                    self.connection_id = int.from_bytes(payload[end + 1:end + 5], 'little')
+                    if self.proxy.strip_tls and len(data) == len(payload) + 4:
+                        data = self._without_tls(data, end)
+                self.phase = 'auth'
+            elif self.phase == 'auth':
+                if payload[:1] == b'\x00':
+                    self.phase = 'command'
+            elif self.current is not None and self.current.finished is None:
+                self.current.response_bytes += len(payload) + 4
+                if self.tracker.feed(payload):
+                    self._finish(now)
+        return data
+
+    @staticmethod
+    def _without_tls(greeting, version_end):
+        """Clear CLIENT_SSL in the server greeting so clients that merely prefer TLS stay in plain text"""
+        # header(4) + version + NUL, connection id(4), auth data(8), filler(1), capabilities(2)
+        offset = 4 + version_end + 1 + 4 + 8 + 1
+        flags = int.from_bytes(greeting[offset:offset + 2], 'little') & ~CLIENT_SSL
+        return greeting[:offset] + flags.to_bytes(2, 'little') + greeting[offset + 2:]
+
+    def _start(self, payload, now):
+        command = COMMANDS.get(payload[0], f"0x{payload[0]:02x}")
+        if command == 'QUERY':
+            sql = _query_text(payload, self.capabilities & CLIENT_QUERY_ATTRIBUTES)
+        elif command == 'STMT_PREPARE':
+            sql = payload[1:].decode('utf-8', errors='replace')
+        elif command in ('STMT_EXECUTE', 'STMT_CLOSE', 'STMT_RESET', 'STMT_SEND_LONG_DATA'):
+            statement_id = int.from_bytes(payload[1:5], 'little')
+            sql = self.prepared.get(statement_id, f"<statement {statement_id}>")
+            if command == 'STMT_CLOSE':
+                self.prepared.pop(statement_id, None)
+        elif command == 'INIT_DB':
+            sql = 'USE ' + payload[1:].decode('utf-8', errors='replace')
+        else:
+            sql = command
+
+        if self.current is not None and self.current.finished is None:
+            self._finish(now)  # client moved on without a response we recognised
+        idle = now - self.last_finished if self.last_finished is not None else None
+        self.current = self.proxy._record(self.connection_id, command, sql, now, idle)
+        self.tracker = ResponseTracker(command, self.capabilities & CLIENT_DEPRECATE_EOF)
+        if command in NO_RESPONSE:
+            self._finish(now)
+
+    def _finish(self, now):
+        statement = self.current
+        statement.finished = now
+        statement.error = self.tracker.error
+        if statement.command == 'STMT_PREPARE' and self.tracker.statement_id is not None:
+            self.prepared[self.tracker.statement_id] = statement.sql
+        self.last_finished = now
+        self.proxy._finished(statement)
+
+    def close(self, now):
+        if self.current is not None and self.current.finished is None:
+            self._finish(now)
+
+
+class TraceProxy:
+    """MySQL tracing proxy running on a background event loop.
+
+    Use as a context manager; ``port`` is the local port to connect to.
+    """
+
+    def __init__(self, upstream_host='localhost', upstream_port=3306, listen_host='127.0.0.1', listen_port=0,
+                 strip_tls=True):
+        self.upstream = (upstream_host, upstream_port)
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.strip_tls = strip_tls
+        self.port = None
+        self.statements = []
+        self.spans = []
+        self._open_spans = []
+        self._busy = set()
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._opaque_connections = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._server = self._loop.run_until_complete(
+                    asyncio.start_server(self._handle, self.listen_host, self.listen_port)
+                )
+                self.port = self._server.sockets[0].getsockname()[1]
+            except OSError as e:
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='mysql-trace-proxy', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        print(f"✅ MySQL trace proxy on {self.listen_host}:{self.port} -> {self.upstream[0]}:{self.upstream[1]}")
+
+    def stop(self):
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+        self._loop = None
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self.statements = []
+            self.spans = []
+
+    @contextmanager
+    def span(self, label):
+        """Attribute statements issued inside the block to ``label``"""
+        started = time.perf_counter()
+        with self._lock:
+            self._open_spans.append(label)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._open_spans.remove(label)
+                self.spans.append(Span(label, started, time.perf_counter()))
+
+    def wait_idle(self, timeout=5.0):
+        """Block until every traced command has been answered"""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            with self._lock:
+                if not self._busy:
+                    return True
+            time.sleep(0.005)
+        return False
+
+    def _record(self, connection_id, command, sql, now, idle):
+        with self._lock:
+            statement = TracedStatement(
+                connection_id, command, sql, now,
+                in_flight=len(self._busy - {connection_id}),
+                idle_before=idle,
+                spans=tuple(self._open_spans),
+            )
+            self.statements.append(statement)
+            self._busy.add(connection_id)
+        return statement
+
+    def _finished(self, statement):
+        with self._lock:
+            self._busy.discard(statement.connection_id)
+
+    async def _handle(self, client_reader, client_writer):
+        self._connections += 1
+        trace = _ConnectionTrace(self, self._connections)
+        try:
+            server_reader, server_writer = await asyncio.open_connection(*self.upstream)
+        except OSError:
+            client_writer.close()
+            return
+
+        async def pump(reader, writer, observe):
+            try:
+                while True:
+                    data = await reader.read(65536)
+                    if not data:
+                        break
+                    data = observe(data, time.perf_counter()) or data
+                    writer.write(data)
+                    await writer.drain()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                writer.close()
+
+        try:
+            await asyncio.gather(
+                pump(client_reader, server_writer, trace.client_data),
+                pump(server_reader, client_writer, trace.server_data),
+            )
+        finally:
+            trace.close(time.perf_counter())
+
+
+# --- Analysis -------------------------------------------------------------
+
+_SESSION_SET = re.compile(r'^\s*SET\s+(?:SESSION\s+|@@SESSION\.|@@)?(?!GLOBAL\b|PERSIST\b|@\w)', re.IGNORECASE)
+
+
+def is_session_state(statement):
+    """SET statements that change per-connection state (not user variables)"""
+    return statement.command in ('QUERY', 'STMT_EXECUTE') and bool(_SESSION_SET.match(statement.sql))
+
+
+def session_state_repeats(statements):
+    """``(connection_id, sql, count)`` for session SETs sent more than once on a connection"""
+    counts = {}
+    for statement in statements:
+        if is_session_state(statement):
+            key = (statement.connection_id, ' '.join(statement.sql.split()))
+            counts[key] = counts.get(key, 0) + 1
+    return [(conn, sql, count) for (conn, sql), count in counts.items() if count > 1]
+
+
+def avoidable_round_trips(statements):
+    """Round trips that repeat session state or re-prepare the same SQL on a connection"""
+    avoidable = 0
+    seen_state = set()
+    seen_prepared = set()
+    for statement in statements:
+        if not statement.round_trip:
+            continue
+        key = (statement.connection_id, ' '.join(statement.sql.split()))
+        if is_session_state(statement):
+            avoidable += key in seen_state
+            seen_state.add(key)
+        elif statement.command == 'STMT_PREPARE':
+            avoidable += key in seen_prepared
+            seen_prepared.add(key)
+    return avoidable
+
+
+def group_by_gap(statements, gap_ms=50):
+    """Split an unlabelled trace into requests separated by idle gaps"""
+    groups = []
+    last_end = None
+    for statement in sorted(statements, key=lambda s: s.issued):
+        if last_end is None or (statement.issued - last_end) * 1000 > gap_ms:
+            groups.append([])
+        groups[-1].append(statement)
+        end = statement.finished or statement.issued
+        last_end = end if last_end is None else max(last_end, end)
+    return {f"request {i + 1}": group for i, group in enumerate(groups)}
+
+
+def group_by_span(statements):
+    """Statements per span label (a statement counts for every open span)"""
+    groups = {}
+    for statement in statements:
+        for label in statement.spans or ('(no span)',):
+            groups.setdefault(label, []).append(statement)
+    return groups
+
+
+def summarize(statements, pool_limit=None):
+    """Counters for one group of statements"""
+    round_trips = [s for s in statements if s.round_trip]
+    summary = {
+        'statements': len(statements),
+        'round_trips': len(round_trips),
+        'time_ms': sum(s.latency_ms for s in statements),
+        'connections': len({s.connection_id for s in statements}),
+        'session_state': sum(1 for s in statements if is_session_state(s)),
+        'avoidable': avoidable_round_trips(statements),
+        'errors': sum(1 for s in statements if s.error),
+    }
+    if pool_limit:
+        # Issued while every other pool connection was busy: likely queued in the app first
+        summary['saturated'] = sum(1 for s in statements if s.in_flight >= pool_limit - 1)
+    return summary
+
+
+def _shape(sql, width=80):
+    text = re.sub(r"'[^']*'", '?', ' '.join(sql.split()))
+    text = re.sub(r'\b\d+\b', '?', text)
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+def flame_report(groups, width=40, pool_limit=None):
+    """Indented request -> connection -> statement-shape tree with time bars"""
+    lines = []
+    total = max((sum(s.latency_ms for s in group) for group in groups.values()), default=0) or 1
+    for label, group in groups.items():
+        summary = summarize(group, pool_limit)
+        lines.append(
+            f"{label}  {summary['time_ms']:.1f} ms, {summary['round_trips']} round trips "
+            f"({summary['avoidable']} avoidable), {summary['connections']} connection(s)"
+        )
+        by_connection = {}
+        for statement in group:
+            by_connection.setdefault(statement.connection_id, []).append(statement)
+        for connection_id, statements in by_connection.items():
+            conn_ms = sum(s.latency_ms for s in statements)
+            lines.append(f"  conn {connection_id}  {conn_ms:.1f} ms")
+            shapes = {}
+            for statement in statements:
+                entry = shapes.setdefault((statement.command, _shape(statement.sql)), [0, 0.0])
+                entry[0] += 1
+                entry[1] += statement.latency_ms
+            for (command, shape), (count, ms) in sorted(shapes.items(), key=lambda item: -item[1][1]):
+                bar = '█' * max(1, round(width * ms / total))
+                lines.append(f"    {bar} {ms:.2f} ms x{count} {command} {shape}")
+    return '\n'.join(lines)
+
+
+def collapsed_stacks(groups):
+    """Folded ``frame;frame;frame value`` lines (µs) for flamegraph.pl or speedscope"""
+    totals = {}
+    for label, group in groups.items():
+        for statement in group:
+            frames = [label, f"conn {statement.connection_id}", f"{statement.command} {_shape(statement.sql)}"]
+            key = ';'.join(frame.replace(';', ',') for frame in frames)
+            totals[key] = totals.get(key, 0) + int(statement.latency_ms * 1000)
+    return '\n'.join(f"{key} {value}" for key, value in totals.items())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trace MySQL traffic between the app and the server")
+    parser.add_argument('--listen', type=int, default=3307, help="local port for the app to connect to")
+    parser.add_argument('--upstream', default='localhost:3306', help="real MySQL server host:port")
+    parser.add_argument('--gap-ms', type=float, default=50, help="idle gap that separates requests")
+    parser.add_argument('--pool-limit', type=int, default=3, help="app pool connectionLimit")
+    parser.add_argument('--collapsed', help="write folded stacks for flamegraph.pl/speedscope here")
+    parser.add_argument('--keep-tls', action='store_true',
+                        help="let clients negotiate TLS (their traffic can then not be decoded)")
+    args = parser.parse_args(argv)
+
+    host, _, port = args.upstream.rpartition(':')
+    proxy = TraceProxy(host or 'localhost', int(port), listen_port=args.listen, strip_tls=not args.keep_tls)
+    proxy.start()
+    print("📊 Tracing; press Ctrl-C to stop and print the report")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    proxy.stop()
+
+    groups = group_by_gap(proxy.statements, args.gap_ms)
+    print(flame_report(groups, pool_limit=args.pool_limit))
+    overall = summarize(proxy.statements, args.pool_limit)
+    print(
+        f"\n{overall['round_trips']} round trips, {overall['avoidable']} avoidable, "
+        f"{overall['session_state']} session SETs, {overall.get('saturated', 0)} issued with the pool saturated"
+    )
+    for connection_id, sql, count in session_state_repeats(proxy.statements):
+        print(f"⚠️ conn {connection_id}: {sql!r} sent {count} times")
+    if proxy._opaque_connections:
+        print(f"⚠️ {proxy._opaque_connections} TLS/compressed connection(s) could not be decoded")
+    if args.collapsed:
+        with open(args.collapsed, 'w') as f:
+            f.write(collapsed_stacks(groups) + '\n')
+        print(f"✅ Folded stacks written to {args.collapsed}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Reference implementation and benchmark of the batched due-task sweep.
+
+Mirrors notificationService.checkDueTasks in both its forms: the original
+per-task loop (SELECT the due tasks, then one INSERT and one UPDATE per task)
+and the batched sweep (claim a chunk with one UPDATE ... LIMIT, write its
+notifications with one INSERT ... SELECT, mark it with one UPDATE ... IN).
+Statements commit one by one, as they do on the autocommit mysql2 pool.
+
+The harness arms a seeded dataset so that every task is due within the
+sweep window, checks that both forms write identical notifications, then
+times them; several concurrent sweepers must notify every task exactly once.
+The statements are copies of the service's; sweep_drift() checks them
+against it, and the benchmark warns before timing a drifted copy.
+
+    python -m benchmarks.notification_sweep --tasks 10k
+    python -m benchmarks.notification_sweep --tasks 1m --nodes 1 --nodes 4 --legacy-tasks 20000
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from benchmarks.query_benchmarks import TASKS_PER_USER, prepare_dataset
+from benchmarks.query_catalog import REPO_ROOT, QuerySpec, catalog_drift
+
+TASK_SCALES = {'10k': 10000, '100k': 100000, '1m': 1000000}
+
+# Same constants as services/notificationService.js
+SWEEP_CHUNK_SIZE = 1000
+CLAIM_TTL = timedelta(minutes=5)
+DUE_WINDOW = timedelta(hours=1)
+DUE_TIME_FORMAT = '%c/%e/%Y, %l:%i:%S %p'
+
+LEGACY_SELECT_SQL = """
+    SELECT t.*, p.name as pet_name, u.user_id, u.username
+    FROM tasks t
+    JOIN pets p ON t.pet_id = p.pet_id
+    JOIN users u ON t.user_id = u.user_id
+    WHERE t.completed = false
+    AND t.due_date BETWEEN ? AND ?
+    AND t.notification_sent = false
+"""
+
+LEGACY_INSERT_SQL = """
+    INSERT INTO notifications (user_id, type, title, message, related_id, is_read)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+CLAIMED_IDS_SQL = "SELECT task_id FROM tasks WHERE notification_claim = ?"
+
+
+def claim_sql(chunk_size):
+    """CLAIM_DUE_TASKS_SQL; takes [claim, now, now, window end, stale before]"""
+    return f"""
+        UPDATE tasks
+        SET notification_claim = ?, notification_claimed_at = ?
+        WHERE completed = false
+        AND notification_sent = false
+        AND due_date BETWEEN ? AND ?
+        AND (notification_claim IS NULL OR notification_claimed_at < ?)
+        ORDER BY due_date, task_id
+        LIMIT {int(chunk_size)}
+    """
+
+
+def due_notifications_sql(count):
+    """dueNotificationsSql; takes [now, *task_ids, claim]"""
+    placeholders = ', '.join(['?'] * count)
+    return f"""
+        INSERT INTO notifications (user_id, type, title, message, related_id, is_read)
+        SELECT d.user_id, 'task_due',
+          CASE
+            WHEN d.minutes <= 0 THEN CONCAT('🚨 Task Overdue: ', d.title)
+            WHEN d.minutes <= 15 THEN CONCAT('⚠️ Task Due Soon: ', d.title)
+            ELSE CONCAT('📅 Task Reminder: ', d.title)
+          END,
+          CASE
+            WHEN d.minutes <= 0 THEN CONCAT('The task "', d.title, '" for ', d.pet_name, ' is overdue! It was due at ', d.due_time, '.')
+            WHEN d.minutes <= 15 THEN CONCAT('The task "', d.title, '" for ', d.pet_name, ' is due in ', d.minutes, ' minutes (', d.due_time, ').')
+            ELSE CONCAT('Reminder: "', d.title, '" for ', d.pet_name, ' is due at ', d.due_time, '.')
+          END,
+          d.task_id, false
+        FROM (
+          SELECT t.task_id, t.user_id, t.title, p.name AS pet_name,
+            TIMESTAMPDIFF(MINUTE, ?, t.due_date) AS minutes,
+            DATE_FORMAT(t.due_date, '{DUE_TIME_FORMAT}') AS due_time
+          FROM tasks t
+          JOIN pets p ON t.pet_id = p.pet_id
+          JOIN users u ON t.user_id = u.user_id
+          WHERE t.task_id IN ({placeholders})
+          AND t.notification_claim = ?
+        ) d
+    """
+
+
+def mark_notified_sql(count):
+    """markNotifiedSql; takes [*task_ids, claim]"""
+    placeholders = ', '.join(['?'] * count)
+    return f"""
+        UPDATE tasks
+        SET notification_sent = true, notification_claim = NULL, notification_claimed_at = NULL
+        WHERE task_id IN ({placeholders})
+        AND notification_claim = ?
+    """
+
+
+# The copies above and where the app has them, for sweep_drift(). LEGACY_SELECT_SQL
+# is the per-task loop the batched sweep replaced, so it has no source any more.
+SERVICE = 'services/notificationService.js'
+SOURCES = [
+    QuerySpec('DUE_TIME_FORMAT', f"{SERVICE}:DUE_TIME_FORMAT", DUE_TIME_FORMAT, None),
+    QuerySpec('claim_sql', f"{SERVICE}:CLAIM_DUE_TASKS_SQL", claim_sql(SWEEP_CHUNK_SIZE), None),
+    QuerySpec('CLAIMED_IDS_SQL', f"{SERVICE}:checkDueTasks", CLAIMED_IDS_SQL, None),
+    QuerySpec('due_notifications_sql', f"{SERVICE}:dueNotificationsSql", due_notifications_sql(2), None),
+    QuerySpec('mark_notified_sql', f"{SERVICE}:markNotifiedSql", mark_notified_sql(2), None),
+    QuerySpec('LEGACY_INSERT_SQL', 'models/notificationModel.js:createNotification', LEGACY_INSERT_SQL, None),
+]
+
+
+def sweep_drift(root=REPO_ROOT):
+    """(name, reason) for each copied statement no longer in the app; see query_catalog.catalog_drift"""
+    return catalog_drift(root, SOURCES)
+
+
+def locale_string(value):
+    """A datetime as Date#toLocaleString() renders it in en-US"""
+    hour = value.hour % 12 or 12
+    suffix = 'PM' if value.hour >= 12 else 'AM'
+    return f"{value.month}/{value.day}/{value.year}, {hour}:{value.minute:02d}:{value.second:02d} {suffix}"
+
+
+def due_notification(task, now):
+    """(title, message) createTaskDueNotification writes for one task"""
+    minutes = math.floor((task['due_date'] - now).total_seconds() / 60)
+    due_time = locale_string(task['due_date'])
+    if minutes <= 0:
+        return (f"🚨 Task Overdue: {task['title']}",
+                f"The task \"{task['title']}\" for {task['pet_name']} is overdue! It was due at {due_time}.")
+    if minutes <= 15:
+        return (f"⚠️ Task Due Soon: {task['title']}",
+                f"The task \"{task['title']}\" for {task['pet_name']} is due in {minutes} minutes ({due_time}).")
+    return (f"📅 Task Reminder: {task['title']}",
+            f"Reminder: \"{task['title']}\" for {task['pet_name']} is due at {due_time}.")
+
+
+def autocommit(db, sql, params=None):
+    """Run one statement and commit it, as the mysql2 pool does"""
+    result = db.query(sql, params)
+    db.connection.commit()
+    return result
+
+
+def legacy_sweep(db, now):
+    """The original checkDueTasks: two statements per due task"""
+    tasks = autocommit(db, LEGACY_SELECT_SQL, [now, now + DUE_WINDOW])
+    for task in tasks:
+        title, message = due_notification(task, now)
+        autocommit(db, LEGACY_INSERT_SQL, [task['user_id'], 'task_due', title, message, task['task_id'], False])
+        autocommit(db, "UPDATE tasks SET notification_sent = true WHERE task_id = ?", [task['task_id']])
+    return len(tasks)
+
+
+class BatchedSweep:
+    """The batched checkDueTasks; one instance per sweeping node"""
+
+    def __init__(self, chunk_size=SWEEP_CHUNK_SIZE, claim=None):
+        self.chunk_size = chunk_size
+        self.claim = claim or str(uuid.uuid4())
+        self.chunks = 0
+
+    def run(self, db, now):
+        """Sweep until no claimable task is left; returns tasks notified"""
+        notified = 0
+        params = [self.claim, now, now, now + DUE_WINDOW, now - CLAIM_TTL]
+        while True:
+            claimed = autocommit(db, claim_sql(self.chunk_size), params)
+            if not claimed.rowcount:
+                break
+            task_ids = [row['task_id'] for row in autocommit(db, CLAIMED_IDS_SQL, [self.claim])]
+            if not task_ids:
+                break
+            autocommit(db, due_notifications_sql(len(task_ids)), [now, *task_ids, self.claim])
+            marked = autocommit(db, mark_notified_sql(len(task_ids)), [*task_ids, self.claim])
+            notified += marked.rowcount
+            self.chunks += 1
+        return notified
+
+
+def sweep_concurrently(db, now, nodes, chunk_size=SWEEP_CHUNK_SIZE):
+    """Run `nodes` batched sweeps at once, each on its own pooled connection"""
+    def node(_):
+        try:
+            return BatchedSweep(chunk_size).run(db, now)
+        finally:
+            db.release_connection()
+
+    with ThreadPoolExecutor(max_workers=nodes) as executor:
+        return list(executor.map(node, range(nodes)))
+
+
+def arm_tasks(db, now, pending):
+    """Make the first `pending` tasks due within the window and clear old notifications"""
+    autocommit(db, "TRUNCATE TABLE notifications")
+    autocommit(
+        db,
+        "UPDATE tasks SET completed = 0, notification_sent = IF(task_id <= ?, 0, 1), "
+        "notification_claim = NULL, notification_claimed_at = NULL, "
+        "due_date = ? + INTERVAL (task_id MOD 3600) SECOND",
+        [pending, now]
+    )
+
+
+def sent_notifications(db):
+    """Every task_due notification as comparable tuples"""
+    rows = db.query(
+        "SELECT user_id, related_id, title, message FROM notifications "
+        "WHERE type = 'task_due' ORDER BY related_id, notification_id"
+    )
+    return [(row['user_id'], row['related_id'], row['title'], row['message']) for row in rows]
+
+
+def sweep_problems(db, now, expected):
+    """Duplicate or missing notifications after sweeping `expected` tasks"""
+    problems = []
+    duplicates = db.query(
+        "SELECT related_id, COUNT(*) AS n FROM notifications WHERE type = 'task_due' "
+        "GROUP BY related_id HAVING COUNT(*) > 1 LIMIT 5"
+    )
+    if duplicates:
+        problems.append(f"tasks notified twice: {[row['related_id'] for row in duplicates]}")
+    written = db.query_one("SELECT COUNT(*) AS n FROM notifications WHERE type = 'task_due'")['n']
+    if written != expected:
+        problems.append(f"{written:,} notifications for {expected:,} due tasks")
+    left = db.query_one(
+        "SELECT COUNT(*) AS n FROM tasks WHERE notification_sent = false AND due_date BETWEEN ? AND ?",
+        [now, now + DUE_WINDOW]
+    )['n']
+    if left:
+        problems.append(f"{left:,} due tasks left unsent")
+    return problems
+
+
+class RoundTrips:
+    """TestDatabase observer counting statements sent to the server"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, sql, params, rows, elapsed, round_trips=1, statements=1):
+        self.count += round_trips
+
+
+def timed(db, sweep):
+    """(seconds, tasks notified, round trips) for one sweep"""
+    counter = RoundTrips()
+    db.observers.append(counter)
+    try:
+        started = time.perf_counter()
+        notified = sweep()
+        return time.perf_counter() - started, notified, counter.count
+    finally:
+        db.observers.remove(counter)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the batched due-task notification sweep")
+    parser.add_argument('--tasks', choices=sorted(TASK_SCALES), default='10k', help="pending tasks to sweep")
+    parser.add_argument('--chunk-size', type=int, default=SWEEP_CHUNK_SIZE)
+    parser.add_argument('--nodes', action='append', type=int, help="concurrent sweepers; repeatable, default 1 and 4")
+    parser.add_argument('--legacy-tasks', type=int, default=10000,
+                        help="pending tasks for the per-task loop, which is too slow for the full set")
+    parser.add_argument('--check-tasks', type=int, default=2000,
+                        help="tasks swept by both forms to compare their notifications")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the timings to a JSON file")
+    args = parser.parse_args(argv)
+
+    for name, reason in sweep_drift():
+        print(f"⚠️ {name} no longer matches the app: {reason}; update benchmarks/notification_sweep.py")
+
+    tasks = TASK_SCALES[args.tasks]
+    nodes = sorted(set(args.nodes or [1, 4]))
+    db, _counts, now = prepare_dataset(
+        args.tasks, args.seed, purpose='notifications', pool_size=max(nodes) + 1,
+        users=max(tasks // TASKS_PER_USER, 10), tables={'tasks': tasks}
+    )
+    try:
+        failed = False
+        check_tasks = min(args.check_tasks, tasks)
+        print(f"\n🔍 Comparing notifications for {check_tasks:,} tasks")
+        arm_tasks(db, now, check_tasks)
+        legacy_sweep(db, now)
+        expected = sent_notifications(db)
+        arm_tasks(db, now, check_tasks)
+        BatchedSweep(args.chunk_size).run(db, now)
+        actual = sent_notifications(db)
+        if expected == actual:
+            print(f"✅ Both sweeps wrote the same {len(actual):,} notifications")
+        else:
+            failed = True
+            mismatch = next((pair for pair in zip(expected, actual) if pair[0] != pair[1]), None)
+            print(f"❌ Notifications differ ({len(expected):,} vs {len(actual):,}): {mismatch}")
+
+        report = {}
+        print(f"\n📊 Sweep time ({tasks:,} tasks seeded, chunks of {args.chunk_size:,})")
+        print(f"{'sweep':18} {'tasks':>10} {'seconds':>9} {'tasks/s':>10} {'round trips':>12}")
+
+        legacy_tasks = min(args.legacy_tasks, tasks)
+        arm_tasks(db, now, legacy_tasks)
+        runs = [('legacy', legacy_tasks, lambda: legacy_sweep(db, now))]
+        for count in nodes:
+            runs.append((f"batched x{count}", tasks, lambda count=count: sum(sweep_concurrently(db, now, count, args.chunk_size))))
+
+        for index, (name, pending, sweep) in enumerate(runs):
+            if index:
+                arm_tasks(db, now, pending)
+            seconds, notified, round_trips = timed(db, sweep)
+            report[name] = {'tasks': notified, 'seconds': seconds, 'round_trips': round_trips}
+            print(f"{name:18} {notified:10,} {seconds:9.2f} {notified / seconds:10,.0f} {round_trips:12,}")
+            for problem in sweep_problems(db, now, pending):
+                failed = True
+                print(f"❌ {name}: {problem}")
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+        return 1 if failed else 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
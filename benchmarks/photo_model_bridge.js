@@ -0,0 +1,107 @@
+/**
+ * Runs models/photoModel.js for the Python harnesses (benchmarks/photo_model_bridge.py):
+ * benchmarks/keyset_pagination.py and config/photo_aggregates.py --fuzz.
+ *
+ * The model's config/database module is replaced by one that hands each
+ * statement to the Python harness and waits for its rows, so the harness
+ * exercises the model's own SQL, cursors and counter updates instead of a
+ * copy of them. Messages are JSON, one per line:
+ *
+ *   harness -> bridge   {"call": "getPublicPhotosKeyset", "args": [...]}
+ *   bridge -> harness   {"query": "SELECT ...", "params": [...]}
+ *   harness -> bridge   {"rows": [...]} or {"error": "...", "code": "ER_DUP_ENTRY", "errno": 1062}
+ *   bridge -> harness   {"result": ...} or {"error": "...", "code": ..., "errno": ...} once the call returns
+ *
+ * A failed statement throws with the code and errno mysql2 would set, so the
+ * model's error handling runs as it does against MySQL. A call naming a
+ * non-function property (KEYSET_SORTS) returns its value.
+ */
+const Module = require('module');
+const readline = require('readline');
+
+const waiting = [];
+const received = [];
+
+const lines = readline.createInterface({ input: process.stdin });
+lines.on('line', line => deliver(JSON.parse(line)));
+lines.on('close', () => deliver(null));
+
+function deliver(message) {
+    if (waiting.length > 0) {
+        waiting.shift()(message);
+    } else {
+        received.push(message);
+    }
+}
+
+/**
+ * Resolves with the harness's next message, or null once stdin is closed.
+ *
+ * @returns {Promise<Object|null>} Next message
+ */
+function nextMessage() {
+    return new Promise(resolve => {
+        if (received.length > 0) {
+            resolve(received.shift());
+        } else {
+            waiting.push(resolve);
+        }
+    });
+}
+
+function send(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+/**
+ * Stands in for config/database.query: the harness runs the statement.
+ *
+ * @param {string} sql - SQL query string
+ * @param {Array} params - Query parameters
+ * @returns {Promise<Array|Object>} Rows, or the write's result header
+ */
+async function query(sql, params = []) {
+    send({ query: sql, params });
+    const reply = await nextMessage();
+    if (reply === null) throw new Error('Harness closed the bridge mid-query');
+    if (reply.error) {
+        const error = new Error(reply.error);
+        error.code = reply.code || undefined;
+        error.errno = reply.errno || undefined;
+        throw error;
+    }
+    return reply.rows;
+}
+
+async function queryOne(sql, params) {
+    const rows = await query(sql, params);
+    return rows[0] || null;
+}
+
+const databasePath = require.resolve('../config/database');
+const database = new Module(databasePath);
+database.filename = databasePath;
+database.loaded = true;
+database.exports = { query, queryOne };
+require.cache[databasePath] = database;
+
+const photoModel = require('../models/photoModel');
+
+async function main() {
+    for (;;) {
+        const message = await nextMessage();
+        if (message === null) break;
+        try {
+            const target = photoModel[message.call];
+            if (target === undefined) throw new Error(`photoModel has no ${message.call}`);
+            const result = typeof target === 'function'
+                ? await target.apply(photoModel, message.args || [])
+                : target;
+            send({ result: result === undefined ? null : result });
+        } catch (error) {
+            send({ error: error.message, code: error.code || null, errno: error.errno || null });
+        }
+    }
+}
+
+main();
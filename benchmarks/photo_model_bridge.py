@@ -0,0 +1,75 @@
+"""
+Python side of benchmarks/photo_model_bridge.js.
+
+PhotoModel runs models/photoModel.js under Node and executes the statements
+the model issues on a harness database, so benchmarks and checks exercise
+the model's own SQL rather than a copy of it.
+"""
+
+import json
+import subprocess
+from pathlib import Path
+
+BRIDGE = Path(__file__).with_name('photo_model_bridge.js')
+
+# mysql2's error.code for the driver errnos the app's models check
+MYSQL_ERROR_CODES = {
+    1062: 'ER_DUP_ENTRY',
+    1146: 'ER_NO_SUCH_TABLE',
+    1451: 'ER_ROW_IS_REFERENCED_2',
+}
+
+
+class ModelError(RuntimeError):
+    """An error thrown by a model call, with the mysql2 code and errno it carried (if any)"""
+
+    def __init__(self, message, code=None, errno=None):
+        super().__init__(message)
+        self.code = code
+        self.errno = errno
+
+
+class PhotoModel:
+    """models/photoModel.js under Node, its queries run on a harness database"""
+
+    def __init__(self, db=None):
+        self.db = db
+        self.statements = []
+        self.process = subprocess.Popen(
+            ['node', str(BRIDGE)], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+
+    def _send(self, message):
+        self.process.stdin.write(json.dumps(message, default=str) + '\n')
+        self.process.stdin.flush()
+
+    def call(self, name, *args):
+        """Result of photoModel[name](...args); statements it ran are left in self.statements"""
+        self.statements = []
+        self._send({'call': name, 'args': list(args)})
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError(f"photo model bridge exited during {name}")
+            message = json.loads(line)
+            if 'query' in message:
+                self.statements.append((message['query'], message['params']))
+                try:
+                    result = self.db.query(message['query'], message['params'])
+                except Exception as e:
+                    errno = getattr(e, 'errno', None)
+                    self._send({'error': str(e), 'code': MYSQL_ERROR_CODES.get(errno), 'errno': errno})
+                    continue
+                if not isinstance(result, list):
+                    result = {'insertId': result.lastrowid, 'affectedRows': result.rowcount}
+                self._send({'rows': result})
+            elif 'error' in message:
+                raise ModelError(
+                    f"photoModel.{name}: {message['error']}", message.get('code'), message.get('errno')
+                )
+            else:
+                return message['result']
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
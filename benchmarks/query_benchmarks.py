@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Scaled benchmark of the production SQL in models/, routes/ and services/.
+
+Each scale gets its own database (<TEST_DB_NAME>_bench_<scale>), seeded once
+by config.data_factory and reused while the seed, size and schema
+fingerprint are unchanged. Every query in query_catalog.QUERIES is timed
+with fresh random parameters; rows examined come from the session's
+Handler_read_* counters.
+
+    python -m benchmarks.query_benchmarks --scale 1k --update-baseline
+    python -m benchmarks.query_benchmarks --scale 1k --scale 100k
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.query_catalog import QUERIES, BenchContext, catalog_drift
+from benchmarks.stats import is_regression, summarize
+
+# Target row count of the largest table (tasks) per scale
+SCALES = {'1k': 1000, '100k': 100000, '10m': 10000000}
+TASKS_PER_USER = 12
+BASELINE_DIR = Path(__file__).resolve().parent / 'baselines'
+BENCH_META_TABLE = '_bench_meta'
+
+
+def handler_reads(db):
+    """Sum of the session's Handler_read_* counters"""
+    rows = db.query("SHOW SESSION STATUS LIKE 'Handler_read%'")
+    return sum(int(row['Value']) for row in rows)
+
+
+def prepare_dataset(scale, seed, purpose='bench', users=None, tables=None, **db_options):
+    """Open (and if needed seed) the <TEST_DB_NAME>_<purpose>_<scale> database
+
+    users and tables (row counts per table) override the sizes derived from
+    SCALES, for harnesses that need one table much larger than the rest.
+    """
+    from config.data_factory import DataFactory, DatabaseSink
+    from config.photo_aggregates import rebuild
+    from config.test_database import TestDatabase, load_settings
+
+    load_settings()
+    base_name = os.getenv('TEST_DB_NAME', 'petcare_test')
+    db = TestDatabase(db_name=f"{base_name}_{purpose}_{scale}", **db_options)
+    db.initialize_schema()
+    users = users or max(SCALES[scale] // TASKS_PER_USER, 10)
+    tables = dict(tables or {})
+    key = f"seed={seed};users={users};schema={db._schema_fingerprint()}"
+    if tables:
+        key += ';' + ','.join(f"{table}={count}" for table, count in sorted(tables.items()))
+
+    db.query(
+        f"CREATE TABLE IF NOT EXISTS {BENCH_META_TABLE} "
+        "(dataset_key VARCHAR(255) PRIMARY KEY, generated_at DATETIME NOT NULL, counts JSON NOT NULL)"
+    )
+    existing = db.query_one(f"SELECT generated_at, counts FROM {BENCH_META_TABLE} WHERE dataset_key = ?", [key])
+    if existing:
+        print(f"✅ Reusing {scale} dataset ({key})")
+        return db, json.loads(existing['counts']), existing['generated_at']
+
+    print(f"🚀 Seeding {scale} dataset ({users:,} users)...")
+    started = time.perf_counter()
+    factory = DataFactory(users=users, seed=seed, **tables)
+    db.cleanup_database(full=True)
+    written = factory.write(DatabaseSink(db))
+    rebuild(db)
+    db.query(f"DELETE FROM {BENCH_META_TABLE}")
+    generated_at = factory.now.astype(datetime)
+    db.query(
+        f"INSERT INTO {BENCH_META_TABLE} (dataset_key, generated_at, counts) VALUES (?, ?, ?)",
+        [key, generated_at, json.dumps(factory.counts)]
+    )
+    db.query("ANALYZE TABLE " + ', '.join(written))
+    db.connection.commit()
+    print(f"✅ Seeded {sum(written.values()):,} rows in {time.perf_counter() - started:.1f}s")
+    return db, factory.counts, generated_at
+
+
+def run_query(db, spec, ctx, iterations, warmup, overhead):
+    """Time one catalog query; returns samples (ms) and rows examined per run"""
+    for _ in range(warmup):
+        db.query(spec.sql, spec.params(ctx))
+
+    latencies = []
+    examined = []
+    returned = 0
+    for _ in range(iterations):
+        params = spec.params(ctx)
+        before = handler_reads(db)
+        started = time.perf_counter()
+        rows = db.query(spec.sql, params)
+        latencies.append((time.perf_counter() - started) * 1000)
+        examined.append(handler_reads(db) - before - overhead)
+        returned += len(rows)
+    return {
+        'source': spec.source,
+        'samples_ms': latencies,
+        'latency_ms': summarize(latencies),
+        'rows_examined': sum(examined) / len(examined),
+        'rows_returned': returned / iterations,
+    }
+
+
+def run_scale(scale, seed, iterations, warmup, only=None):
+    db, counts, generated_at = prepare_dataset(scale, seed)
+    try:
+        ctx = BenchContext(random.Random(seed), counts, generated_at)
+        # SHOW STATUS itself bumps the counters a little; measure and subtract it
+        overhead = -handler_reads(db) + handler_reads(db)
+        results = {}
+        for spec in QUERIES:
+            if only and not any(pattern in spec.name for pattern in only):
+                continue
+            try:
+                results[spec.name] = run_query(db, spec, ctx, iterations, warmup, overhead)
+            except Exception as e:  # a stale query must not hide the others
+                db.connection.rollback()
+                results[spec.name] = {'source': spec.source, 'error': str(e)}
+        return results
+    finally:
+        db.close()
+
+
+def baseline_path(scale):
+    return BASELINE_DIR / f"{scale}.json"
+
+
+def compare(results, baseline, alpha, min_ratio):
+    """Names and reasons of queries that regressed against the baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('queries', {}).get(name)
+        if not previous or 'error' in current or 'error' in previous:
+            continue
+        if is_regression(current['samples_ms'], previous['samples_ms'], alpha, min_ratio):
+            ratio = current['latency_ms']['p50'] / previous['latency_ms']['p50']
+            regressions.append((name, f"p50 {ratio:.2f}x slower (p < {alpha})"))
+        if current['rows_examined'] > max(previous['rows_examined'] * 1.5, previous['rows_examined'] + 100):
+            regressions.append((
+                name,
+                f"rows examined {previous['rows_examined']:.0f} -> {current['rows_examined']:.0f}"
+            ))
+    return regressions
+
+
+def print_report(scale, results):
+    print(f"\n📊 {scale} dataset")
+    print(f"{'query':42} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'examined':>11} {'returned':>9}")
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name:42} ❌ {result['error']}")
+            continue
+        latency = result['latency_ms']
+        print(
+            f"{name:42} {latency['p50']:9.2f} {latency['p95']:9.2f} {latency['p99']:9.2f} "
+            f"{result['rows_examined']:11.0f} {result['rows_returned']:9.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark production queries at scale")
+    parser.add_argument('--scale', action='append', choices=sorted(SCALES), help="repeatable; default 1k")
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', action='append', help="run queries whose name contains this")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--alpha', type=float, default=0.01, help="significance level for regressions")
+    parser.add_argument('--min-slowdown', type=float, default=1.2, help="minimum p50 ratio to report")
+    parser.add_argument('--output', help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    for name, reason in catalog_drift():
+        print(f"⚠️ {name} no longer matches the app: {reason}; update benchmarks/query_catalog.py")
+
+    failed = False
+    report = {}
+    for scale in args.scale or ['1k']:
+        results = run_scale(scale, args.seed, args.iterations, args.warmup, args.only)
+        print_report(scale, results)
+        report[scale] = results
+
+        path = baseline_path(scale)
+        if args.update_baseline:
+            BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+            payload = {'recorded_at': datetime.now().isoformat(timespec='seconds'), 'queries': results}
+            path.write_text(json.dumps(payload, indent=2, default=str))
+            print(f"✅ Baseline written to {path}")
+        elif path.exists():
+            regressions = compare(results, json.loads(path.read_text()), args.alpha, args.min_slowdown)
+            for name, reason in regressions:
+                print(f"💥 REGRESSION {name}: {reason}")
+            failed = failed or bool(regressions)
+        else:
+            print(f"⚠️ No baseline for {scale}; run with --update-baseline to record one")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, default=str))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
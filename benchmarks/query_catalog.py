@@ -0,0 +1,230 @@
+"""
+Production SQL benchmarked by query_benchmarks.py.
+
+Statements are copied verbatim from the Node models/routes/services they
+come from (see ``source``), with ``?`` placeholders. ``params`` receives a
+BenchContext and returns one parameter list per execution, so every run
+hits a different user, page or time window. A statement adapted rather than
+copied names the ``excerpt`` it shares with its source.
+
+catalog_drift() checks every entry against its source: the SQL must be one
+a string literal of the named function, constant or route can produce, with
+each ``${...}`` standing for any text. tests/python/test_query_catalog.py runs it, and the benchmark
+warns before timing a drifted entry.
+"""
+
+import re
+from collections import namedtuple
+from datetime import timedelta
+from pathlib import Path
+
+from benchmarks.index_advisor import REPO_ROOT, iter_js_strings
+
+QuerySpec = namedtuple('QuerySpec', ['name', 'source', 'sql', 'params', 'excerpt'], defaults=[None])
+
+# Stands in for a ${...} interpolation while source literals are matched
+_HOLE = '\0'
+
+
+class BenchContext:
+    """Random inputs drawn from the seeded dataset's id ranges"""
+
+    def __init__(self, rng, counts, now):
+        self.rng = rng
+        self.counts = counts
+        self.now = now
+
+    def user_id(self):
+        return self.rng.randint(1, self.counts['users'])
+
+    def timestamp(self, offset=timedelta(0)):
+        return (self.now + offset).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _public_photos_sql(order_by, limit, offset):
+    # photoModel.getPublicPhotos with no filters
+    return f"""
+            SELECT
+                p.*,
+                u.username,
+                u.profile_picture_url,
+                p.tag_names as tags
+            FROM photos p
+            LEFT JOIN users u ON p.user_id = u.user_id
+            WHERE p.is_public = 1
+            {order_by}
+            LIMIT {limit} OFFSET {offset}
+        """
+
+
+QUERIES = [
+    QuerySpec(
+        'task.getUpcomingTasks',
+        'models/taskModel.js:getUpcomingTasks',
+        """
+    SELECT t.*, p.name as pet_name
+    FROM tasks t
+    JOIN pets p ON t.pet_id = p.pet_id
+    WHERE t.user_id = ?
+    AND t.completed = false
+    AND t.start_time BETWEEN ? AND ?
+    ORDER BY t.start_time ASC
+  """,
+        lambda ctx: [ctx.user_id(), ctx.timestamp(), ctx.timestamp(timedelta(days=3))],
+    ),
+    QuerySpec(
+        'task.getFutureTasks',
+        'models/taskModel.js:getFutureTasks',
+        """
+    SELECT t.*, p.name as pet_name
+    FROM tasks t
+    JOIN pets p ON t.pet_id = p.pet_id
+    WHERE t.user_id = ?
+    AND t.completed = false
+    AND t.start_time > ?
+    ORDER BY t.start_time ASC
+  """,
+        lambda ctx: [ctx.user_id(), ctx.timestamp()],
+    ),
+    QuerySpec(
+        'photo.getPublicPhotos.newest.page1',
+        'models/photoModel.js:getPublicPhotos',
+        _public_photos_sql('ORDER BY p.created_at DESC, p.photo_id DESC', 12, 0),
+        lambda ctx: [],
+    ),
+    QuerySpec(
+        'photo.getPublicPhotos.popular.page1',
+        'models/photoModel.js:getPublicPhotos',
+        _public_photos_sql('ORDER BY p.favorite_count DESC, p.created_at DESC, p.photo_id DESC', 12, 0),
+        lambda ctx: [],
+    ),
+    QuerySpec(
+        'photo.getPublicPhotos.newest.page50',
+        'models/photoModel.js:getPublicPhotos',
+        _public_photos_sql('ORDER BY p.created_at DESC, p.photo_id DESC', 12, 588),
+        lambda ctx: [],
+    ),
+    # Rows the sweep's claim UPDATE would lock; the catalog only reads
+    QuerySpec(
+        'notification.checkDueTasks.claim',
+        'services/notificationService.js:CLAIM_DUE_TASKS_SQL',
+        """
+        SELECT task_id FROM tasks
+        WHERE completed = false
+        AND notification_sent = false
+        AND due_date BETWEEN ? AND ?
+        AND (notification_claim IS NULL OR notification_claimed_at < ?)
+        ORDER BY due_date, task_id
+        LIMIT 1000
+      """,
+        lambda ctx: [ctx.timestamp(), ctx.timestamp(timedelta(hours=1)), ctx.timestamp(timedelta(minutes=-5))],
+        excerpt="""
+        WHERE completed = false
+        AND notification_sent = false
+        AND due_date BETWEEN ? AND ?
+        AND (notification_claim IS NULL OR notification_claimed_at < ?)
+        ORDER BY due_date, task_id
+      """,
+    ),
+    QuerySpec(
+        'notification.checkTomorrowTasks',
+        'services/notificationService.js:checkTomorrowTasks',
+        """
+        SELECT t.*, p.name as pet_name, u.user_id
+        FROM tasks t
+        JOIN pets p ON t.pet_id = p.pet_id
+        JOIN users u ON t.user_id = u.user_id
+        WHERE t.completed = false
+        AND DATE(t.due_date) = DATE(?)
+        AND t.due_date > NOW()
+      """,
+        lambda ctx: [ctx.timestamp(timedelta(days=1))],
+    ),
+    QuerySpec(
+        'admin.dashboard.counts',
+        'routes/adminRoutes.js:/dashboard',
+        'SELECT COUNT(*) as count FROM tasks',
+        lambda ctx: [],
+    ),
+    QuerySpec(
+        'admin.dashboard.userCount',
+        'routes/adminRoutes.js:/dashboard',
+        'SELECT COUNT(*) as count FROM users',
+        lambda ctx: [],
+    ),
+    QuerySpec(
+        'admin.dashboard.pendingPosts',
+        'routes/adminRoutes.js:/dashboard',
+        """
+      SELECT p.post_id, p.title, u.username, p.created_at
+      FROM community_posts p
+      JOIN users u ON p.user_id = u.user_id
+      WHERE p.is_approved = FALSE
+      ORDER BY p.created_at DESC
+    """,
+        lambda ctx: [],
+    ),
+]
+
+
+def _template_pattern(text):
+    """Regex for the SQL a string literal can produce; each interpolation matches any text"""
+    parts = [r'\s+'.join(map(re.escape, part.split())) for part in text.split(_HOLE)]
+    return re.compile(r'\s*' + r'\s*.*?\s*'.join(parts) + r'\s*', re.DOTALL)
+
+
+def definition_lines(source, symbol):
+    """(first, last) line of the function, method, constant or route named by symbol, or None.
+
+    The definition runs to the next non-blank line indented no deeper than
+    its first line, which is its closing brace or the end of its literal.
+    """
+    name = re.escape(symbol)
+    definition = re.compile(
+        rf"^(\s*)(?:(?:async\s+)?(?:function\s+)?{name}\s*\(|(?:const|let|var)\s+{name}\s*=|"
+        rf"router\.\w+\(\s*['\"]{name}['\"])"
+    )
+    lines = source.splitlines()
+    for number, line in enumerate(lines, 1):
+        match = definition.match(line)
+        if match is None:
+            continue
+        indent = len(match.group(1))
+        for end, following in enumerate(lines[number:], number + 1):
+            if following.strip() and len(following) - len(following.lstrip()) <= indent:
+                return number, end
+        return number, len(lines)
+    return None
+
+
+def catalog_drift(root=REPO_ROOT, queries=QUERIES):
+    """(name, reason) for each entry whose SQL is no longer in the definition it names"""
+    sources = {}
+    drifted = []
+    for spec in queries:
+        path, _, symbol = spec.source.partition(':')
+        if path not in sources:
+            try:
+                sources[path] = (Path(root) / path).read_text(encoding='utf-8', errors='replace')
+            except OSError:
+                sources[path] = None
+        source = sources[path]
+        if source is None:
+            drifted.append((spec.name, f"{path} is missing"))
+            continue
+        span = definition_lines(source, symbol)
+        if span is None:
+            drifted.append((spec.name, f"{symbol} is not defined in {path}"))
+            continue
+
+        texts = [
+            text for line, text, _dynamic in iter_js_strings(source, stub=lambda expression: _HOLE)
+            if span[0] <= line <= span[1]
+        ]
+        if spec.excerpt is not None:
+            excerpt = ' '.join(spec.excerpt.split())
+            if not any(excerpt in ' '.join(text.split()) for text in texts):
+                drifted.append((spec.name, f"its excerpt is not in {spec.source}"))
+        elif not any(_template_pattern(text).fullmatch(spec.sql) for text in texts):
+            drifted.append((spec.name, f"its SQL is not in {spec.source}"))
+    return drifted
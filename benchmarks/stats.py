@@ -0,0 +1,77 @@
+"""
+Latency statistics for the benchmark suites (no NumPy/SciPy required).
+"""
+
+import math
+
+
+def percentile(samples, q):
+    """Linear-interpolated percentile, q in [0, 100]"""
+    if not samples:
+        raise ValueError("percentile of empty sample")
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    """p50/p95/p99/mean/min/max of a latency sample"""
+    return {
+        'n': len(samples),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'mean': sum(samples) / len(samples),
+        'min': min(samples),
+        'max': max(samples),
+    }
+
+
+def _ranks(values):
+    """Average ranks (1-based) with ties sharing their mean rank"""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    tie_sizes = []
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        tie_sizes.append(j - i + 1)
+        i = j + 1
+    return ranks, tie_sizes
+
+
+def mann_whitney_greater(current, baseline):
+    """One-sided Mann-Whitney U test that ``current`` tends to be larger.
+
+    Returns the p-value from the tie-corrected normal approximation, which
+    is adequate for the 20+ samples per side the suites collect.
+    """
+    n1, n2 = len(current), len(baseline)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+    ranks, tie_sizes = _ranks(list(current) + list(baseline))
+    u1 = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    n = n1 + n2
+    tie_term = sum(t ** 3 - t for t in tie_sizes) / (n * (n - 1)) if n > 1 else 0
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term)
+    if variance <= 0:
+        return 1.0
+    z = (u1 - mean - 0.5) / math.sqrt(variance)  # continuity correction
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def is_regression(current, baseline, alpha=0.01, min_ratio=1.2):
+    """True when current latencies are significantly and materially slower"""
+    if len(current) < 5 or len(baseline) < 5:
+        return False
+    ratio = percentile(current, 50) / max(percentile(baseline, 50), 1e-9)
+    return ratio >= min_ratio and mann_whitney_greater(current, baseline) < alpha
@@ -0,0 +1,70 @@
+"""
+Connection to the application's own database, for scheduled maintenance jobs.
+
+Reads the same settings as config/database.js: JAWSDB_URL when it is set,
+otherwise DB_HOST, DB_PORT, DB_USER, DB_PASSWORD and DB_NAME. Jobs that
+maintain the tables the app serves (``python -m config.health_trends``,
+``python -m config.photo_aggregates``) open it instead of TestDatabase, so
+they never touch the test schema and never run the harness's cleanup or
+snapshot operations against live data.
+"""
+
+import os
+from urllib.parse import unquote, urlparse
+
+from config.test_database import TestDatabase, load_settings, mysql_connector
+
+# config/database.js sets the same session time zone
+APP_TIME_ZONE = '-05:00'
+
+
+def app_connection_params(environ=None):
+    """mysql.connector arguments for the app's database, as config/database.js builds them"""
+    env = os.environ if environ is None else environ
+    if env.get('JAWSDB_URL'):
+        url = urlparse(env['JAWSDB_URL'])
+        return {
+            'host': url.hostname,
+            'user': unquote(url.username or ''),
+            'password': unquote(url.password or ''),
+            'database': url.path.lstrip('/'),
+            'port': url.port or 3306,
+        }
+    return {
+        'host': env.get('DB_HOST'),
+        'user': env.get('DB_USER'),
+        'password': env.get('DB_PASSWORD'),
+        'database': env.get('DB_NAME'),
+        'port': int(env.get('DB_PORT') or 3306),
+    }
+
+
+class AppDatabase(TestDatabase):
+    """TestDatabase's query helpers on the app's database, without the test harness"""
+
+    def __init__(self):
+        load_settings()
+        self._app_params = app_connection_params()
+        if not self._app_params['database']:
+            raise ValueError("Set JAWSDB_URL or DB_NAME to the app's database")
+        super().__init__(pool_size=0, db_name=self._app_params['database'])
+
+    def _open_connection(self):
+        connection = mysql_connector().connect(**self._app_params, charset='utf8mb4', autocommit=False)
+        cursor = connection.cursor()
+        cursor.execute("SET time_zone = %s", (APP_TIME_ZONE,))
+        cursor.close()
+        return connection
+
+    def _connection_params(self):
+        return {key: value for key, value in self._app_params.items() if key != 'database'}
+
+    def connect(self):
+        self._connection = self._open_connection()
+        print(f"✅ Connected to app database '{self.test_db_name}'")
+
+    def _harness_only(self, *args, **kwargs):
+        raise RuntimeError("Test-harness operation refused on the app database")
+
+    initialize_schema = cleanup_database = clone_from = drop_database = _harness_only
+    snapshot = ensure_snapshot = create_snapshot = restore_snapshot = drop_snapshot = _harness_only
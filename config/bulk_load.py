@@ -0,0 +1,115 @@
+"""
+Helpers for building bulk INSERT / LOAD DATA payloads.
+
+Kept free of any driver import so the chunking rules can be unit tested
+without a MySQL server.
+"""
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+# Leave headroom under max_allowed_packet for the statement header and
+# for escaping that the estimate below does not account for exactly.
+PACKET_HEADROOM = 0.8
+
+# Rows below this count are never worth the LOAD DATA setup cost
+LOAD_DATA_MIN_ROWS = 10000
+
+
+def quote_identifier(name):
+    """Backtick-quote a table or column name"""
+    return '`' + str(name).replace('`', '``') + '`'
+
+
+def estimate_value_bytes(value):
+    """Approximate size of a value once rendered as a SQL literal"""
+    if value is None:
+        return 4
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        return len(str(value))
+    if isinstance(value, (bytes, bytearray)):
+        return 2 * len(value) + 3
+    if isinstance(value, (datetime, date, time, timedelta)):
+        return 28
+    # Strings: quotes plus a small allowance for escaped characters
+    text = str(value)
+    return len(text.encode('utf-8')) + 2 + text.count("'") + text.count('\\')
+
+
+def estimate_row_bytes(row):
+    """Approximate size of one ``(v1, v2, ...)`` tuple in a VALUES list"""
+    return sum(estimate_value_bytes(v) for v in row) + len(row) + 2
+
+
+def build_insert_sql(table, columns, row_count, ignore=False):
+    """Build a multi-row INSERT with ``%s`` placeholders"""
+    column_list = ', '.join(quote_identifier(c) for c in columns)
+    row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    verb = 'INSERT IGNORE' if ignore else 'INSERT'
+    return (
+        f"{verb} INTO {quote_identifier(table)} ({column_list}) VALUES "
+        + ', '.join([row_placeholder] * row_count)
+    )
+
+
+def chunk_rows(rows, max_bytes, header_bytes=0, max_rows=None):
+    """Split an iterable of rows into lists that fit in ``max_bytes``.
+
+    Consumes ``rows`` lazily so arbitrarily large generators can be
+    streamed. A single row larger than the budget is still yielded on its
+    own and left for the server to accept or reject.
+    """
+    budget = max_bytes * PACKET_HEADROOM - header_bytes
+    chunk = []
+    size = 0
+    for row in rows:
+        row = tuple(row)
+        row_bytes = estimate_row_bytes(row)
+        if chunk and (size + row_bytes > budget or (max_rows and len(chunk) >= max_rows)):
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append(row)
+        size += row_bytes
+    if chunk:
+        yield chunk
+
+
+def _tsv_field(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8')
+    text = str(value)
+    return (
+        text.replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+        .replace('\0', '\\0')
+    )
+
+
+def encode_tsv(rows):
+    """Encode rows in the default LOAD DATA format (tab/newline, ``\\`` escapes)"""
+    return ''.join('\t'.join(_tsv_field(v) for v in row) + '\n' for row in rows).encode('utf-8')
+
+
+def build_load_data_sql(path, table, columns, ignore=False):
+    """Build a LOAD DATA LOCAL INFILE statement matching ``encode_tsv``"""
+    column_list = ', '.join(quote_identifier(c) for c in columns)
+    path = str(path).replace('\\', '\\\\').replace("'", "\\'")
+    modifier = ' IGNORE' if ignore else ''
+    return (
+        f"LOAD DATA LOCAL INFILE '{path}'{modifier} INTO TABLE {quote_identifier(table)} "
+        "CHARACTER SET utf8mb4 "
+        "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+        "LINES TERMINATED BY '\\n' "
+        f"({column_list})"
+    )
@@ -0,0 +1,508 @@
+"""
+Synthetic, referentially consistent datasets for load testing.
+
+Every table is generated column-at-a-time with NumPy in fixed-size chunks.
+Each chunk draws from its own generator, seeded from (seed, table, chunk),
+so output is reproducible for a given seed and ``now`` however it is
+consumed. Chunks can be streamed into TestDatabase.bulk_insert or CSV.
+
+    python -m config.data_factory --users 100000 --csv seed-data/
+    python -m config.data_factory --users 100000 --db
+"""
+
+import argparse
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+
+# Tables in foreign-key order with the columns the factory fills
+TABLE_COLUMNS = {
+    'users': ['user_id', 'username', 'email', 'password_hash', 'role', 'is_verified', 'created_at'],
+    'pets': ['pet_id', 'user_id', 'name', 'breed', 'age', 'species', 'gender', 'weight', 'created_at'],
+    'tags': ['tag_id', 'tag_name', 'is_approved', 'created_by'],
+    'photos': ['photo_id', 'user_id', 'pet_id', 'photo_url', 'title', 'is_public', 'created_at'],
+    'photo_tags': ['photo_tag_id', 'photo_id', 'tag_id', 'added_by'],
+    'photo_favorites': ['favorite_id', 'user_id', 'photo_id'],
+    'community_posts': ['post_id', 'user_id', 'title', 'content', 'is_approved', 'created_at'],
+    'comments': ['comment_id', 'post_id', 'user_id', 'content', 'created_at'],
+    'tasks': [
+        'task_id', 'pet_id', 'user_id', 'task_type', 'title', 'description', 'due_date',
+        'completed', 'priority', 'notification_sent', 'completed_at', 'created_at'
+    ],
+    'health_tracker': [
+        'health_id', 'pet_id', 'weight', 'diet', 'medical_notes', 'vet_visit_date',
+        'vaccination_date', 'next_vaccination_date', 'date_recorded'
+    ],
+}
+
+# Rows per user for each table when only a user count is given
+DEFAULT_RATIOS = {
+    'pets': 1.5,
+    'photos': 2.0,
+    'community_posts': 0.3,
+    'comments': 0.9,
+    'tasks': 12.0,
+    'health_tracker': 9.0,
+}
+
+PASSWORD_HASH = '$2b$10$abcdefghijklmnopqrstuuJ6yQ0sYl1mC7xCqB3uB2o1hXcVq0W2'
+
+PET_NAMES = np.array([
+    'Bella', 'Max', 'Luna', 'Charlie', 'Lucy', 'Cooper', 'Daisy', 'Milo', 'Buddy', 'Molly',
+    'Rocky', 'Sadie', 'Bailey', 'Maggie', 'Toby', 'Chloe', 'Oliver', 'Sophie', 'Leo', 'Lola',
+    'Jack', 'Zoe', 'Duke', 'Ruby', 'Bear', 'Rosie', 'Tucker', 'Penny', 'Oscar', 'Coco',
+    "O'Malley", 'Mr Whiskers', 'Jelly-Bean', 'Pepper', 'Ginger', 'Shadow', 'Simba', 'Nala',
+])
+SPECIES = np.array(['dog', 'cat', 'bird', 'rabbit', 'hamster'])
+SPECIES_P = [0.48, 0.37, 0.06, 0.05, 0.04]
+BREEDS = {
+    'dog': ['Labrador', 'Golden Retriever', 'Beagle', 'Poodle', 'Bulldog', 'Mixed'],
+    'cat': ['Siamese', 'Persian', 'Maine Coon', 'Domestic Shorthair', 'Bengal'],
+    'bird': ['Budgie', 'Cockatiel', 'Canary'],
+    'rabbit': ['Holland Lop', 'Rex', 'Lionhead'],
+    'hamster': ['Syrian', 'Dwarf'],
+}
+# Median weight (kg) and log-normal spread per species, in SPECIES order
+SPECIES_WEIGHT = np.array([(22.0, 0.45), (4.5, 0.25), (0.1, 0.5), (2.0, 0.3), (0.12, 0.3)])
+GENDERS = np.array(['male', 'female', 'other'])
+
+TASK_TYPES = np.array(['feeding', 'cleaning', 'vaccination', 'medication', 'grooming', 'vet_visit', 'exercise', 'other'])
+TASK_TYPE_P = [0.34, 0.12, 0.04, 0.12, 0.1, 0.05, 0.2, 0.03]
+TASK_TITLES = np.array([
+    'Morning feeding', 'Clean litter box', 'Annual vaccination', 'Give medication',
+    'Brush coat', 'Vet checkup', 'Evening walk', 'Buy supplies',
+])
+PRIORITIES = np.array(['low', 'medium', 'high'])
+# Reminders are scheduled on the quarter hour, mostly during waking hours
+TASK_HOURS = np.arange(6, 22)
+TASK_HOUR_P = np.array([2, 6, 8, 6, 4, 3, 4, 5, 4, 3, 4, 6, 8, 7, 5, 3], dtype=float)
+TASK_HOUR_P /= TASK_HOUR_P.sum()
+
+DIETS = np.array(['Dry kibble', 'Wet food', 'Raw diet', 'Mixed diet', 'Prescription diet', 'Seeds and pellets'])
+MEDICAL_NOTES = np.array(['Healthy', 'Mild allergy', 'Follow-up in two weeks', 'Dental cleaning advised'])
+
+TAG_NAMES = [
+    'cute', 'sleepy', 'playful', 'puppy', 'kitten', 'outdoors', 'beach', 'snow', 'birthday',
+    'funny', 'vet', 'healthy', 'recovery', 'grooming', 'walk', 'park', 'toy', 'cuddles',
+]
+PHOTO_TITLES = np.array(['Nap time', 'At the park', 'New toy', 'Bath day', 'First walk', 'Best friends'])
+POST_TITLES = np.array([
+    'Tips for a picky eater?', 'Best toys for puppies', 'Vaccination schedule question',
+    'Our rescue story', 'Grooming at home', 'Recommended vets downtown',
+])
+POST_BODIES = np.array([
+    'Looking for advice from other owners.', 'Sharing what worked for us.',
+    'Has anyone else dealt with this?', 'Thanks in advance for any help!',
+])
+COMMENTS = np.array(['Great idea!', 'Same here.', 'Thanks for sharing.', 'Try a slow feeder.', 'Ask your vet.'])
+
+SECONDS_PER_DAY = 86400
+
+
+def to_sql_values(column):
+    """Convert a column array into Python values accepted by mysql.connector"""
+    if isinstance(column, np.ndarray):
+        if np.issubdtype(column.dtype, np.datetime64):
+            text = np.datetime_as_string(column, unit='s' if column.dtype == 'datetime64[s]' else 'D')
+            values = np.char.replace(text, 'T', ' ').astype(object)
+            values[np.isnat(column)] = None
+            return values.tolist()
+        return column.tolist()
+    return list(column)
+
+
+class DataFactory:
+    """Seeded generator for users, pets, tasks, health records, photos and posts"""
+
+    def __init__(self, users=1000, seed=0, now=None, chunk_size=100000, **counts):
+        self.seed = seed
+        self.chunk_size = chunk_size
+        now = now or datetime.now().replace(microsecond=0)
+        self.now = np.datetime64(now, 's')
+
+        self.counts = {'users': users, 'tags': max(len(TAG_NAMES), users // 500)}
+        for table, ratio in DEFAULT_RATIOS.items():
+            self.counts[table] = int(counts.pop(table, users * ratio))
+        if counts:
+            self.counts.update(counts)
+
+        # Parent attributes children must agree with, drawn up front in one pass
+        self._pet_owner = None
+        self._pet_weight = None
+        self._pet_species = None
+        self._photo_owner = None
+        self._photo_pet = None
+        self._post_created = None
+
+    def _rng(self, table, chunk_index=0):
+        table_index = list(TABLE_COLUMNS).index(table) if table in TABLE_COLUMNS else 99
+        return np.random.default_rng([self.seed, table_index, chunk_index])
+
+    def _ranges(self, table):
+        """(chunk_index, first_id, count) tuples covering a table"""
+        total = self.counts.get(table, 0)
+        for index, start in enumerate(range(0, total, self.chunk_size)):
+            yield index, start + 1, min(self.chunk_size, total - start)
+
+    def _past(self, rng, size, max_days):
+        """Timestamps spread uniformly over the last max_days days"""
+        offsets = rng.integers(0, max_days * SECONDS_PER_DAY, size=size)
+        return self.now - offsets.astype('timedelta64[s]')
+
+    # Parent attributes --------------------------------------------------
+
+    def pet_owners(self):
+        if self._pet_owner is None:
+            rng = self._rng('pets', 10 ** 6)
+            n = self.counts['pets']
+            # Most users have one pet, a few have many (Zipf-like skew)
+            self._pet_owner = rng.integers(1, self.counts['users'] + 1, size=n, dtype=np.int64)
+            heavy = rng.random(n) < 0.1
+            self._pet_owner[heavy] = (rng.zipf(1.6, size=heavy.sum()) - 1) % self.counts['users'] + 1
+            self._pet_species = rng.choice(len(SPECIES), size=n, p=SPECIES_P)
+            median, spread = SPECIES_WEIGHT[self._pet_species].T
+            weight = median * np.exp(rng.normal(0, spread))
+            self._pet_weight = np.clip(np.round(weight, 2), 0.05, 200)
+        return self._pet_owner
+
+    def photo_owners(self):
+        if self._photo_owner is None:
+            rng = self._rng('photos', 10 ** 6)
+            n = self.counts['photos']
+            random_users = rng.integers(1, self.counts['users'] + 1, size=n)
+            if self.counts['pets']:
+                pets = rng.integers(1, self.counts['pets'] + 1, size=n)
+                has_pet = rng.random(n) < 0.85
+                self._photo_pet = np.where(has_pet, pets, 0)
+                self._photo_owner = np.where(has_pet, self.pet_owners()[pets - 1], random_users)
+            else:
+                self._photo_pet = np.zeros(n, dtype=np.int64)
+                self._photo_owner = random_users
+        return self._photo_owner
+
+    def post_created(self):
+        if self._post_created is None:
+            rng = self._rng('community_posts', 10 ** 6)
+            self._post_created = self._past(rng, self.counts['community_posts'], 730)
+        return self._post_created
+
+    # Tables -------------------------------------------------------------
+
+    def users(self):
+        for index, first, n in self._ranges('users'):
+            rng = self._rng('users', index)
+            ids = np.arange(first, first + n)
+            names = np.char.add('user', ids.astype('U'))
+            yield {
+                'user_id': ids,
+                'username': names,
+                'email': np.char.add(names, '@example.com'),
+                'password_hash': np.full(n, PASSWORD_HASH),
+                'role': np.where(rng.random(n) < 0.001, 'admin', 'regular'),
+                'is_verified': (rng.random(n) < 0.9).astype(np.int8),
+                'created_at': self._past(rng, n, 1095),
+            }
+
+    def pets(self):
+        owners = self.pet_owners()
+        breed_table = [np.array(BREEDS[s]) for s in SPECIES]
+        for index, first, n in self._ranges('pets'):
+            rng = self._rng('pets', index)
+            rows = slice(first - 1, first - 1 + n)
+            species = self._pet_species[rows]
+            breeds = np.empty(n, dtype=object)
+            for code, options in enumerate(breed_table):
+                mask = species == code
+                breeds[mask] = rng.choice(options, size=mask.sum())
+            yield {
+                'pet_id': np.arange(first, first + n),
+                'user_id': owners[rows],
+                'name': rng.choice(PET_NAMES, size=n),
+                'breed': breeds,
+                'age': np.clip(np.round(rng.gamma(2.0, 2.5, size=n) * 2) / 2, 0.5, 50),
+                'species': SPECIES[species],
+                'gender': rng.choice(GENDERS, size=n, p=[0.49, 0.49, 0.02]),
+                'weight': self._pet_weight[rows],
+                'created_at': self._past(rng, n, 1095),
+            }
+
+    def tags(self):
+        for index, first, n in self._ranges('tags'):
+            rng = self._rng('tags', index)
+            ids = np.arange(first, first + n)
+            names = np.array([
+                TAG_NAMES[i - 1] if i <= len(TAG_NAMES) else f'tag{i}' for i in ids.tolist()
+            ])
+            creators = rng.integers(1, self.counts['users'] + 1, size=n).astype(object)
+            creators[ids <= len(TAG_NAMES)] = None
+            yield {
+                'tag_id': ids,
+                'tag_name': names,
+                'is_approved': (rng.random(n) < 0.95).astype(np.int8),
+                'created_by': creators,
+            }
+
+    def photos(self):
+        owners = self.photo_owners()
+        for index, first, n in self._ranges('photos'):
+            rng = self._rng('photos', index)
+            ids = np.arange(first, first + n)
+            rows = slice(first - 1, first - 1 + n)
+            pet_ids = self._photo_pet[rows].astype(object)
+            pet_ids[pet_ids == 0] = None
+            yield {
+                'photo_id': ids,
+                'user_id': owners[rows],
+                'pet_id': pet_ids,
+                'photo_url': np.char.add(np.char.add('https://res.cloudinary.com/demo/image/upload/pets/', ids.astype('U')), '.jpg'),
+                'title': rng.choice(PHOTO_TITLES, size=n),
+                'is_public': (rng.random(n) < 0.8).astype(np.int8),
+                'created_at': self._past(rng, n, 730),
+            }
+
+    @staticmethod
+    def _group_offsets(sizes):
+        """Position of each expanded row within its group (0, 1, ..., k-1)"""
+        starts = np.cumsum(sizes) - sizes
+        return np.arange(sizes.sum()) - np.repeat(starts, sizes)
+
+    def photo_tags(self):
+        owners = self.photo_owners()
+        n_tags = self.counts['tags']
+        next_id = 1
+        for index, first, n in self._ranges('photos'):
+            rng = self._rng('photo_tags', index)
+            per_photo = np.minimum(rng.poisson(1.8, size=n), min(5, n_tags))
+            photo_ids = np.repeat(np.arange(first, first + n), per_photo)
+            # Consecutive tag ids from a random start are distinct within a photo
+            start = np.repeat(rng.integers(0, n_tags, size=n), per_photo)
+            total = len(photo_ids)
+            yield {
+                'photo_tag_id': np.arange(next_id, next_id + total),
+                'photo_id': photo_ids,
+                'tag_id': (start + self._group_offsets(per_photo)) % n_tags + 1,
+                'added_by': owners[photo_ids - 1],
+            }
+            next_id += total
+
+    def photo_favorites(self):
+        n_users = self.counts['users']
+        next_id = 1
+        for index, first, n in self._ranges('photos'):
+            rng = self._rng('photo_favorites', index)
+            # Long-tailed popularity: most photos get a few favorites, some get many
+            per_photo = np.minimum(rng.geometric(0.3, size=n) - 1, min(50, n_users))
+            photo_ids = np.repeat(np.arange(first, first + n), per_photo)
+            start = np.repeat(rng.integers(0, n_users, size=n), per_photo)
+            total = len(photo_ids)
+            yield {
+                'favorite_id': np.arange(next_id, next_id + total),
+                'user_id': (start + self._group_offsets(per_photo)) % n_users + 1,
+                'photo_id': photo_ids,
+            }
+            next_id += total
+
+    def community_posts(self):
+        created = self.post_created()
+        for index, first, n in self._ranges('community_posts'):
+            rng = self._rng('community_posts', index)
+            yield {
+                'post_id': np.arange(first, first + n),
+                'user_id': rng.integers(1, self.counts['users'] + 1, size=n),
+                'title': rng.choice(POST_TITLES, size=n),
+                'content': rng.choice(POST_BODIES, size=n),
+                'is_approved': (rng.random(n) < 0.7).astype(np.int8),
+                'created_at': created[first - 1:first - 1 + n],
+            }
+
+    def comments(self):
+        if not self.counts['community_posts']:
+            return
+        created = self.post_created()
+        for index, first, n in self._ranges('comments'):
+            rng = self._rng('comments', index)
+            post_ids = rng.integers(1, self.counts['community_posts'] + 1, size=n)
+            delay = rng.exponential(2 * SECONDS_PER_DAY, size=n).astype('timedelta64[s]')
+            yield {
+                'comment_id': np.arange(first, first + n),
+                'post_id': post_ids,
+                'user_id': rng.integers(1, self.counts['users'] + 1, size=n),
+                'content': rng.choice(COMMENTS, size=n),
+                'created_at': np.minimum(created[post_ids - 1] + delay, self.now),
+            }
+
+    def task_due_dates(self, rng, n):
+        """Due dates: a backlog in the past, a dense near future and a long tail.
+
+        Times fall on the quarter hour and follow a daily routine profile.
+        """
+        bucket = rng.choice(3, size=n, p=[0.4, 0.45, 0.15])
+        days = np.select(
+            [bucket == 0, bucket == 1],
+            [-rng.exponential(20, size=n), rng.exponential(5, size=n)],
+            rng.uniform(30, 365, size=n)
+        )
+        today = self.now.astype('datetime64[D]')
+        day = today + np.floor(days).astype('timedelta64[D]')
+        hour = rng.choice(TASK_HOURS, size=n, p=TASK_HOUR_P)
+        minute = rng.integers(0, 4, size=n) * 15
+        return day.astype('datetime64[s]') + (hour * 3600 + minute * 60).astype('timedelta64[s]')
+
+    def tasks(self):
+        owners = self.pet_owners()
+        for index, first, n in self._ranges('tasks'):
+            rng = self._rng('tasks', index)
+            pet_ids = rng.integers(1, self.counts['pets'] + 1, size=n)
+            types = rng.choice(len(TASK_TYPES), size=n, p=TASK_TYPE_P)
+            due = self.task_due_dates(rng, n)
+            past = due <= self.now
+            completed = np.where(past, rng.random(n) < 0.85, rng.random(n) < 0.02)
+            completed_at = due + rng.integers(0, 4 * 3600, size=n).astype('timedelta64[s]')
+            completed_at = np.where(completed, np.minimum(completed_at, self.now), np.datetime64('NaT'))
+            created = due - rng.integers(3600, 30 * SECONDS_PER_DAY, size=n).astype('timedelta64[s]')
+            descriptions = np.full(n, None, dtype=object)
+            has_description = rng.random(n) < 0.3
+            descriptions[has_description] = 'Added from the scheduler'
+            yield {
+                'task_id': np.arange(first, first + n),
+                'pet_id': pet_ids,
+                'user_id': owners[pet_ids - 1],
+                'task_type': TASK_TYPES[types],
+                'title': TASK_TITLES[types],
+                'description': descriptions,
+                'due_date': due,
+                'completed': completed.astype(np.int8),
+                'priority': rng.choice(PRIORITIES, size=n, p=[0.3, 0.5, 0.2]),
+                'notification_sent': (past & (~completed | (rng.random(n) < 0.9))).astype(np.int8),
+                'completed_at': completed_at,
+                'created_at': np.minimum(created, self.now),
+            }
+
+    def health_tracker(self):
+        self.pet_owners()
+        for index, first, n in self._ranges('health_tracker'):
+            rng = self._rng('health_tracker', index)
+            pet_ids = rng.integers(1, self.counts['pets'] + 1, size=n)
+            recorded = self._past(rng, n, 1095).astype('datetime64[D]')
+            base = self._pet_weight[pet_ids - 1]
+            vet_visit = np.where(rng.random(n) < 0.3, recorded, np.datetime64('NaT', 'D'))
+            vaccinated = rng.random(n) < 0.1
+            vaccination = np.where(vaccinated, recorded, np.datetime64('NaT', 'D'))
+            notes = np.full(n, None, dtype=object)
+            has_notes = rng.random(n) < 0.2
+            notes[has_notes] = rng.choice(MEDICAL_NOTES, size=has_notes.sum())
+            yield {
+                'health_id': np.arange(first, first + n),
+                'pet_id': pet_ids,
+                'weight': np.clip(np.round(base * (1 + rng.normal(0, 0.05, size=n)), 2), 0.01, 999),
+                'diet': rng.choice(DIETS, size=n),
+                'medical_notes': notes,
+                'vet_visit_date': vet_visit,
+                'vaccination_date': vaccination,
+                'next_vaccination_date': np.where(vaccinated, recorded + np.timedelta64(365, 'D'), np.datetime64('NaT', 'D')),
+                'date_recorded': recorded,
+            }
+
+    def iter_chunks(self, tables=None):
+        """Yield (table, columns, chunk) in foreign-key order"""
+        for table in TABLE_COLUMNS:
+            if tables is not None and table not in tables:
+                continue
+            columns = TABLE_COLUMNS[table]
+            for chunk in getattr(self, table)():
+                yield table, columns, chunk
+
+    def write(self, sink, tables=None):
+        """Stream every chunk into a sink; returns rows written per table"""
+        written = {}
+        for table, columns, chunk in self.iter_chunks(tables):
+            sink.write(table, columns, chunk)
+            written[table] = written.get(table, 0) + len(chunk[columns[0]])
+        sink.close()
+        return written
+
+
+class DatabaseSink:
+    """Writes chunks through TestDatabase.bulk_insert"""
+
+    def __init__(self, db, commit_every_chunk=True):
+        self.db = db
+        self.commit_every_chunk = commit_every_chunk
+
+    def write(self, table, columns, chunk):
+        rows = zip(*(to_sql_values(chunk[c]) for c in columns))
+        self.db.bulk_insert(table, columns, rows)
+        if self.commit_every_chunk:
+            self.db.connection.commit()
+
+    def close(self):
+        self.db.connection.commit()
+
+
+class CsvSink:
+    """Appends chunks to <directory>/<table>.csv (``\\N`` marks NULL, as LOAD DATA expects)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._started = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, table, columns, chunk):
+        path = os.path.join(self.directory, f'{table}.csv')
+        first = table not in self._started
+        with open(path, 'w' if first else 'a', newline='') as f:
+            writer = csv.writer(f)
+            if first:
+                writer.writerow(columns)
+                self._started.add(table)
+            values = [to_sql_values(chunk[c]) for c in columns]
+            writer.writerows(
+                ['\\N' if v is None else v for v in row] for row in zip(*values)
+            )
+
+    def close(self):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Pet Care dataset")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--csv', metavar='DIR', help="write CSV files to DIR")
+    parser.add_argument('--db', action='store_true', help="load into the TEST_DB_* database")
+    for table in DEFAULT_RATIOS:
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, dest=table)
+    args = parser.parse_args(argv)
+
+    overrides = {t: getattr(args, t) for t in DEFAULT_RATIOS if getattr(args, t) is not None}
+    factory = DataFactory(users=args.users, seed=args.seed, chunk_size=args.chunk_size, **overrides)
+    print(f"🚀 Generating {sum(factory.counts.values()):,}+ rows (seed {args.seed})")
+
+    if args.db:
+        from config.health_trends import backfill
+        from config.photo_aggregates import rebuild
+        from config.test_database import TestDatabase
+        db = TestDatabase()
+        try:
+            db.initialize_schema()
+            db.cleanup_database(full=True)
+            written = factory.write(DatabaseSink(db))
+            rebuild(db)
+            backfill(db)
+        finally:
+            db.close()
+    elif args.csv:
+        written = factory.write(CsvSink(args.csv))
+    else:
+        parser.error("choose --csv DIR or --db")
+
+    for table, rows in written.items():
+        print(f"✅ {table}: {rows:,} rows")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,214 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of long-lived database connections.
+
+    Connections are created lazily by ``factory`` and ``session_setup`` runs
+    exactly once per physical connection, so per-session state (time zone,
+    autocommit, selected schema) is paid for when a socket is opened rather
+    than on every checkout.
+    """
+
+    def __init__(self, factory, max_size=5, min_size=0, timeout=30.0,
+                 session_setup=None, validate=None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size > max_size:
+            raise ValueError("min_size cannot exceed max_size")
+
+        self._factory = factory
+        self._session_setup = session_setup
+        self._validate = validate
+        self.max_size = max_size
+        self.min_size = min_size
+        self.timeout = timeout
+
+        self._lock = threading.Condition()
+        self._idle = []
+        self._in_use = set()
+        self._opening = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._stats = {
+            'opened': 0,
+            'discarded': 0,
+            'checkouts': 0,
+            'waited_checkouts': 0,
+            'timeouts': 0,
+            'total_wait_s': 0.0,
+            'max_wait_s': 0.0,
+            'peak_in_use': 0,
+            'peak_waiting': 0,
+        }
+
+        for _ in range(min_size):
+            self._idle.append(self._open())
+
+    def _open(self):
+        """Open and prepare a new physical connection"""
+        connection = self._factory()
+        try:
+            if self._session_setup:
+                self._session_setup(connection)
+        except Exception:
+            self._close_quietly(connection)
+            raise
+        with self._lock:
+            self._stats['opened'] += 1
+        return connection
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, connection):
+        if self._validate is None:
+            return True
+        try:
+            return bool(self._validate(connection))
+        except Exception:
+            return False
+
+    @property
+    def size(self):
+        """Number of physical connections currently owned by the pool"""
+        with self._lock:
+            return len(self._idle) + len(self._in_use) + self._opening
+
+    def acquire(self, timeout=None):
+        """Check a connection out of the pool, opening one if allowed"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        deadline = started + timeout
+        waited = False
+
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+
+                if self._idle:
+                    connection = self._idle.pop()
+                    self._in_use.add(connection)
+                    break
+
+                if len(self._in_use) + self._opening < self.max_size:
+                    self._opening += 1
+                    connection = None
+                    break
+
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No connection available within {timeout}s "
+                        f"(max_size={self.max_size})"
+                    )
+                waited = True
+                self._waiting += 1
+                self._stats['peak_waiting'] = max(self._stats['peak_waiting'], self._waiting)
+                try:
+                    self._lock.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        if connection is None:
+            connection = self._open_slot()
+        elif not self._is_usable(connection):
+            # Keep the slot reserved while the replacement is opened
+            with self._lock:
+                self._in_use.discard(connection)
+                self._opening += 1
+                self._stats['discarded'] += 1
+            self._close_quietly(connection)
+            connection = self._open_slot()
+
+        wait = time.perf_counter() - started
+        with self._lock:
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waited_checkouts'] += 1
+            self._stats['total_wait_s'] += wait
+            self._stats['max_wait_s'] = max(self._stats['max_wait_s'], wait)
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], len(self._in_use))
+        return connection
+
+    def _open_slot(self):
+        """Fill a slot reserved via ``_opening`` and mark it in use"""
+        try:
+            connection = self._open()
+        except Exception:
+            with self._lock:
+                self._opening -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self._opening -= 1
+            self._in_use.add(connection)
+        return connection
+
+    def release(self, connection, discard=False):
+        """Return a checked-out connection to the pool"""
+        with self._lock:
+            if connection not in self._in_use:
+                raise ValueError("Connection was not checked out from this pool")
+            self._in_use.discard(connection)
+            if discard or self._closed:
+                self._stats['discarded'] += 1
+            else:
+                self._idle.append(connection)
+                connection = None
+            self._lock.notify()
+
+        if connection is not None:
+            self._close_quietly(connection)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that checks a connection out for a block"""
+        connection = self.acquire(timeout)
+        discard = False
+        try:
+            yield connection
+        except Exception:
+            discard = not self._is_usable(connection)
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    def stats(self):
+        """Return a snapshot of pool usage and saturation metrics"""
+        with self._lock:
+            in_use = len(self._in_use)
+            snapshot = dict(self._stats)
+            snapshot.update({
+                'max_size': self.max_size,
+                'size': len(self._idle) + in_use + self._opening,
+                'in_use': in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'saturation': in_use / self.max_size,
+            })
+        checkouts = snapshot['checkouts']
+        snapshot['avg_wait_s'] = snapshot['total_wait_s'] / checkouts if checkouts else 0.0
+        return snapshot
+
+    def close(self):
+        """Close every idle connection; in-use ones close on release"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._lock.notify_all()
+        for connection in idle:
+            self._close_quietly(connection)
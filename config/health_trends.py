@@ -0,0 +1,347 @@
+"""
+Precomputed per-pet health trends over health_tracker.
+
+The health pages read two summary tables instead of scanning every record
+a pet has: health_trends (one row per pet: latest and 90-day weight, the
+fitted weight change, anomaly flags, last vet visit and vaccinations) and
+health_summaries (one row per pet and month). Both are computed here with
+vectorized NumPy over whole chunks of pets.
+
+Refreshes are incremental. health_trend_state keeps the highest health_id
+already folded in; a refresh recomputes only the pets with newer records,
+plus the pets healthModel marked stale by editing or deleting a record.
+``--backfill`` recomputes every pet in pet_id ranges. The command line
+works on the app's database (config.app_database: JAWSDB_URL or DB_*).
+
+    python -m config.health_trends                 # refresh from the watermark
+    python -m config.health_trends --backfill
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from config.data_factory import to_sql_values
+
+# The trend window ends at each pet's latest weighed record
+TREND_WINDOW_DAYS = 90
+
+# A weight is compared with the mean of the pet's previous BASELINE_RECORDS
+# weights, once there are at least MIN_BASELINE of them, and flagged when it
+# is further off than ANOMALY_SIGMAS standard deviations and ANOMALY_MIN_CHANGE
+# of the mean (so a pet with a perfectly steady weight isn't flagged for 0.1 kg)
+BASELINE_RECORDS = 5
+MIN_BASELINE = 3
+ANOMALY_SIGMAS = 3.0
+ANOMALY_MIN_CHANGE = 0.10
+
+WATERMARK_NAME = 'health_tracker'
+
+SOURCE_COLUMNS = [
+    'health_id', 'pet_id', 'weight', 'date_recorded', 'vet_visit_date', 'vaccination_date', 'next_vaccination_date',
+]
+TREND_COLUMNS = [
+    'pet_id', 'record_count', 'first_recorded', 'last_recorded', 'latest_weight', 'weight_avg_90d',
+    'weight_change_90d', 'weight_anomaly', 'anomaly_count', 'last_vet_visit', 'last_vaccination',
+    'next_vaccination', 'last_health_id',
+]
+SUMMARY_COLUMNS = [
+    'pet_id', 'period_start', 'record_count', 'weight_min', 'weight_max', 'weight_avg',
+    'vet_visits', 'vaccinations', 'anomalies',
+]
+
+# Trend rows per upsert statement
+UPSERT_ROWS = 500
+
+
+def _starts(*keys):
+    """Indexes where any of the (sorted) key arrays changes value"""
+    change = np.zeros(len(keys[0]), dtype=bool)
+    change[:1] = True
+    for key in keys:
+        change[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(change)
+
+
+def _latest(dates, starts):
+    """Latest non-null date per group; NaT sorts below every date, so max skips it"""
+    return np.maximum.reduceat(dates.view('int64'), starts).view(dates.dtype)
+
+
+def flag_weight_anomalies(pet_ids, weights):
+    """Boolean mask of weights far from the pet's rolling baseline.
+
+    Rows must be sorted by pet, then date. The baseline of each weight is
+    the mean and spread of the same pet's previous BASELINE_RECORDS weights,
+    taken from running sums so every row is scored in one pass.
+    """
+    n = len(weights)
+    index = np.arange(n)
+    starts = _starts(pet_ids)
+    first = np.repeat(starts, np.diff(np.append(starts, n)))
+    low = np.maximum(index - BASELINE_RECORDS, first)
+    count = index - low
+    totals = np.concatenate(([0.0], np.cumsum(weights)))
+    squares = np.concatenate(([0.0], np.cumsum(weights * weights)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (totals[index] - totals[low]) / count
+        variance = np.maximum((squares[index] - squares[low]) / count - mean * mean, 0.0)
+        threshold = np.maximum(ANOMALY_SIGMAS * np.sqrt(variance), ANOMALY_MIN_CHANGE * mean)
+        return (count >= MIN_BASELINE) & (np.abs(weights - mean) > threshold)
+
+
+def _empty(names):
+    return {name: np.array([]) for name in names}
+
+
+def compute_aggregates(columns):
+    """(trends, summaries) as {column: array} for every pet in columns.
+
+    columns holds health_tracker rows as arrays (see load_columns), in any
+    order, and must contain every record of each pet it mentions.
+    """
+    if not len(columns['health_id']):
+        return _empty(TREND_COLUMNS), _empty(SUMMARY_COLUMNS)
+    order = np.lexsort((columns['health_id'], columns['date_recorded'], columns['pet_id']))
+    health_id = columns['health_id'][order]
+    pet = columns['pet_id'][order]
+    recorded = columns['date_recorded'][order]
+    weight = columns['weight'][order]
+    vet_visit = columns['vet_visit_date'][order]
+    vaccination = columns['vaccination_date'][order]
+    next_vaccination = columns['next_vaccination_date'][order]
+    n = len(pet)
+
+    starts = _starts(pet)
+    pets = pet[starts]
+    ends = np.append(starts[1:], n)
+
+    # Rolling anomaly flags and the 90-day fit use weighed records only
+    weighed = np.flatnonzero(~np.isnan(weight))
+    w_pet, w_value, w_date = pet[weighed], weight[weighed], recorded[weighed]
+    flags = np.zeros(n, dtype=np.int64)
+    flags[weighed] = flag_weight_anomalies(w_pet, w_value)
+
+    latest_weight = np.full(len(pets), np.nan)
+    weight_avg = np.full(len(pets), np.nan)
+    weight_change = np.full(len(pets), np.nan)
+    latest_anomaly = np.zeros(len(pets), dtype=bool)
+    if len(weighed):
+        w_starts = _starts(w_pet)
+        w_last = np.append(w_starts[1:], len(w_pet)) - 1
+        w_group = np.searchsorted(pets, w_pet)
+        group_of_start = w_group[w_starts]
+        latest_weight[group_of_start] = w_value[w_last]
+        latest_anomaly[group_of_start] = flags[weighed[w_last]] > 0
+
+        run = np.repeat(np.arange(len(w_starts)), w_last - w_starts + 1)
+        days = (w_date - w_date[w_last][run]).astype(float)
+        window = (days >= -TREND_WINDOW_DAYS).astype(float)
+        size = len(pets)
+        count = np.bincount(w_group, window, size)
+        sum_x = np.bincount(w_group, window * days, size)
+        sum_y = np.bincount(w_group, window * w_value, size)
+        sum_xx = np.bincount(w_group, window * days * days, size)
+        sum_xy = np.bincount(w_group, window * days * w_value, size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight_avg = np.where(count > 0, sum_y / count, np.nan)
+            spread = count * sum_xx - sum_x * sum_x
+            slope = (count * sum_xy - sum_x * sum_y) / spread
+            weight_change = np.where((count >= 2) & (spread > 0), slope * TREND_WINDOW_DAYS, np.nan)
+
+    trends = {
+        'pet_id': pets,
+        'record_count': ends - starts,
+        'first_recorded': recorded[starts],
+        'last_recorded': recorded[ends - 1],
+        'latest_weight': latest_weight,
+        'weight_avg_90d': weight_avg,
+        'weight_change_90d': weight_change,
+        'weight_anomaly': latest_anomaly,
+        'anomaly_count': np.add.reduceat(flags, starts),
+        'last_vet_visit': _latest(vet_visit, starts),
+        'last_vaccination': _latest(vaccination, starts),
+        'next_vaccination': _latest(next_vaccination, starts),
+        'last_health_id': np.maximum.reduceat(health_id, starts),
+    }
+
+    month = recorded.astype('datetime64[M]')
+    periods = _starts(pet, month)
+    has_weight = ~np.isnan(weight)
+    weighed_count = np.add.reduceat(has_weight.astype(np.int64), periods)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        period_avg = np.add.reduceat(np.where(has_weight, weight, 0.0), periods) / weighed_count
+    summaries = {
+        'pet_id': pet[periods],
+        'period_start': month[periods].astype('datetime64[D]'),
+        'record_count': np.diff(np.append(periods, n)),
+        'weight_min': np.fmin.reduceat(weight, periods),
+        'weight_max': np.fmax.reduceat(weight, periods),
+        'weight_avg': np.where(weighed_count > 0, period_avg, np.nan),
+        'vet_visits': np.add.reduceat((~np.isnat(vet_visit)).astype(np.int64), periods),
+        'vaccinations': np.add.reduceat((~np.isnat(vaccination)).astype(np.int64), periods),
+        'anomalies': np.add.reduceat(flags, periods),
+    }
+    return trends, summaries
+
+
+def load_columns(rows):
+    """health_tracker rows as (SOURCE_COLUMNS...) tuples -> {column: array}; NULL becomes NaN/NaT"""
+    values = dict(zip(SOURCE_COLUMNS, zip(*rows))) if rows else dict.fromkeys(SOURCE_COLUMNS, ())
+    columns = {
+        'health_id': np.array(values['health_id'], dtype=np.int64),
+        'pet_id': np.array(values['pet_id'], dtype=np.int64),
+        'weight': np.array(values['weight'], dtype=float),
+    }
+    for name in SOURCE_COLUMNS[3:]:
+        columns[name] = np.array(values[name], dtype='datetime64[D]')
+    return columns
+
+
+def _sql_values(column):
+    if column.dtype.kind == 'f':
+        values = np.round(column, 2).astype(object)
+        values[np.isnan(column)] = None
+        return values.tolist()
+    if column.dtype.kind == 'b':
+        return column.astype(int).tolist()
+    return to_sql_values(column)
+
+
+def _sql_rows(table, names):
+    return list(zip(*(_sql_values(table[name]) for name in names)))
+
+
+def read_records(db, where, params, batch_size=50000):
+    """Columns of the health_tracker rows matching where"""
+    sql = f"SELECT {', '.join(SOURCE_COLUMNS)} FROM health_tracker WHERE {where}"
+    chunks = [load_columns(batch) for batch in db.iter_query(sql, params, batch_size, row_format='tuple')]
+    if not chunks:
+        return load_columns([])
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in SOURCE_COLUMNS}
+
+
+def read_watermark(db):
+    row = db.query_one("SELECT last_health_id FROM health_trend_state WHERE name = ?", [WATERMARK_NAME])
+    return row['last_health_id'] if row else 0
+
+
+def write_watermark(db, health_id):
+    db.query(
+        "INSERT INTO health_trend_state (name, last_health_id) VALUES (?, ?) "
+        "ON DUPLICATE KEY UPDATE last_health_id = VALUES(last_health_id)",
+        [WATERMARK_NAME, health_id]
+    )
+
+
+def _upsert_trends(db, rows):
+    """Insert or overwrite trend rows, leaving each row's stale flag alone"""
+    columns = ', '.join(TREND_COLUMNS)
+    row_sql = '(' + ', '.join('?' for _ in TREND_COLUMNS) + ')'
+    updates = ', '.join(f"{name} = VALUES({name})" for name in TREND_COLUMNS[1:])
+    for first in range(0, len(rows), UPSERT_ROWS):
+        chunk = rows[first:first + UPSERT_ROWS]
+        db.query(
+            f"INSERT INTO health_trends ({columns}) VALUES {', '.join(row_sql for _ in chunk)} "
+            f"ON DUPLICATE KEY UPDATE {updates}",
+            [value for row in chunk for value in row]
+        )
+
+
+def refresh(db, pets_per_chunk=1000, commit=True):
+    """Fold records added since the watermark, and stale pets, into the aggregates.
+
+    Returns the number of pets recomputed. Each pet is recomputed from all of
+    its records, so a refresh is idempotent; the watermark moves only after
+    every chunk is written.
+    """
+    started = time.perf_counter()
+    watermark = read_watermark(db)
+    high = db.query_one("SELECT COALESCE(MAX(health_id), 0) AS high FROM health_tracker")['high']
+    if high < watermark:
+        # health_tracker was emptied and its ids restarted
+        return backfill(db, commit=commit)
+
+    rows = db.query(
+        "SELECT DISTINCT pet_id FROM health_tracker WHERE health_id > ? AND health_id <= ? "
+        "UNION SELECT pet_id FROM health_trends WHERE stale = 1",
+        [watermark, high]
+    )
+    pet_ids = sorted(row['pet_id'] for row in rows)
+    for first in range(0, len(pet_ids), pets_per_chunk):
+        chunk = pet_ids[first:first + pets_per_chunk]
+        in_list = ', '.join('?' for _ in chunk)
+        # Cleared before reading, so an edit that lands meanwhile marks the pet again
+        db.query(f"UPDATE health_trends SET stale = 0 WHERE pet_id IN ({in_list})", chunk)
+        trends, summaries = compute_aggregates(read_records(db, f"pet_id IN ({in_list})", chunk))
+
+        gone = sorted(set(chunk) - set(trends['pet_id'].tolist()))
+        if gone:
+            db.query(f"DELETE FROM health_trends WHERE pet_id IN ({', '.join('?' for _ in gone)})", gone)
+        _upsert_trends(db, _sql_rows(trends, TREND_COLUMNS))
+        db.query(f"DELETE FROM health_summaries WHERE pet_id IN ({in_list})", chunk)
+        db.bulk_insert('health_summaries', SUMMARY_COLUMNS, _sql_rows(summaries, SUMMARY_COLUMNS))
+        if commit:
+            db.connection.commit()
+
+    write_watermark(db, high)
+    if commit:
+        db.connection.commit()
+    print(f"✅ Refreshed health trends for {len(pet_ids):,} pets up to health_id {high} "
+          f"in {time.perf_counter() - started:.1f}s")
+    return len(pet_ids)
+
+
+def backfill(db, pets_per_chunk=20000, commit=True):
+    """Recompute the aggregates of every pet, one pet_id range at a time; returns the pets written"""
+    started = time.perf_counter()
+    high = db.query_one("SELECT COALESCE(MAX(health_id), 0) AS high FROM health_tracker")['high']
+    bounds = db.query_one("SELECT MIN(pet_id) AS low, MAX(pet_id) AS high FROM health_tracker")
+    if bounds is None or bounds['low'] is None:
+        low, last_pet = 1, 0
+    else:
+        low, last_pet = bounds['low'], bounds['high']
+    for table in ('health_trends', 'health_summaries'):
+        db.query(f"DELETE FROM {table} WHERE pet_id < ? OR pet_id > ?", [low, last_pet])
+
+    written = 0
+    for first in range(low, last_pet + 1, pets_per_chunk):
+        last = min(first + pets_per_chunk - 1, last_pet)
+        trends, summaries = compute_aggregates(read_records(db, "pet_id BETWEEN ? AND ?", [first, last]))
+        for table, names, values in (
+            ('health_trends', TREND_COLUMNS, trends),
+            ('health_summaries', SUMMARY_COLUMNS, summaries),
+        ):
+            db.query(f"DELETE FROM {table} WHERE pet_id BETWEEN ? AND ?", [first, last])
+            db.bulk_insert(table, names, _sql_rows(values, names))
+        written += len(trends['pet_id'])
+        if commit:
+            db.connection.commit()
+
+    write_watermark(db, high)
+    if commit:
+        db.connection.commit()
+    print(f"✅ Backfilled health trends for {written:,} pets in {time.perf_counter() - started:.1f}s")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the precomputed health trends")
+    parser.add_argument('--backfill', action='store_true', help="recompute every pet instead of refreshing")
+    parser.add_argument('--pets-per-chunk', type=int, help="pets recomputed per batch of statements")
+    args = parser.parse_args(argv)
+
+    from config.app_database import AppDatabase
+    db = AppDatabase()
+    try:
+        options = {'pets_per_chunk': args.pets_per_chunk} if args.pets_per_chunk else {}
+        (backfill if args.backfill else refresh)(db, **options)
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
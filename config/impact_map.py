@@ -0,0 +1,349 @@
+"""
+Per-test dependency map for test impact analysis, as a pytest plugin.
+
+With ``--impact-map PATH`` every test records the repository files it
+executed and the schema tables its statements touched through TestDatabase,
+and the map is written to PATH when the session ends. Files come from
+coverage.py's per-test contexts when coverage is installed; without it (or
+when another tracer such as pytest-cov is active) the test module's static
+imports are used instead, together with those of every conftest.py above it
+and the plugins it loads.
+
+run_tests.py folds these maps into .test-impact.json after every run and,
+with ``--changed``, uses it to pick only the tests a ``git diff`` can affect.
+
+Loaded from conftest.py via ``pytest_plugins``.
+"""
+
+import ast
+import json
+import re
+import subprocess
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+
+from config.statements import OBSERVERS, code_text, created_tables, split_statements
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+IMPACT_VERSION = 1
+
+# Changes to these can affect any test, so they always mean a full run
+FULL_RUN_FILES = {'conftest.py', 'pyproject.toml', 'database/schema.sql', 'hkpifgzax132wnez.db'}
+
+# Non-Python files whose SQL is matched against the tables tests touch
+SQL_SOURCES = ('.js', '.sql')
+
+_WORD = re.compile(r'[A-Za-z_][\w$]*')
+_TABLE_REF = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+[`"]?([\w$]+)', re.IGNORECASE)
+
+
+def schema_tables():
+    """Names of the tables in the schema dump TestDatabase loads"""
+    from config.test_database import SCHEMA_CANDIDATES
+
+    for candidate in SCHEMA_CANDIDATES:
+        path = REPO_ROOT / candidate
+        if path.exists():
+            return frozenset(t.lower() for t in created_tables(split_statements(path.read_text())))
+    return frozenset()
+
+
+def statement_tables(sql, known):
+    """Schema tables a statement mentions, read or written"""
+    return {word for word in _WORD.findall(code_text(sql).lower()) if word in known}
+
+
+def source_tables(text, known):
+    """Schema tables referenced by SQL embedded in a source file"""
+    return {name.lower() for name in _TABLE_REF.findall(text) if name.lower() in known}
+
+
+# -- Recording -------------------------------------------------------------
+
+class TableRecorder:
+    """TestDatabase observer collecting the tables each test touches"""
+
+    def __init__(self, known):
+        self.known = known
+        self.tables = {}
+        self._cache = {}
+        self._current = None
+
+    def __call__(self, sql, params, rows, elapsed, round_trips=1, statements=1):
+        if self._current is None:
+            return
+        tables = self._cache.get(sql)
+        if tables is None:
+            tables = self._cache[sql] = statement_tables(sql, self.known)
+        self._current.update(tables)
+
+    def start(self, test_id):
+        self._current = self.tables.setdefault(test_id, set())
+
+    def stop(self):
+        self._current = None
+
+
+def _module_file(name):
+    """The repository file a dotted module name refers to, if any"""
+    base = REPO_ROOT.joinpath(*name.split('.'))
+    for path in (base.with_suffix('.py'), base / '__init__.py'):
+        if path.exists():
+            return path
+    return None
+
+
+@lru_cache(maxsize=None)
+def _direct_imports(path):
+    try:
+        tree = ast.parse(path.read_text())
+    except (OSError, SyntaxError):
+        return ()
+    found = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        found += filter(None, map(_module_file, names))
+    return tuple(found)
+
+
+@lru_cache(maxsize=None)
+def import_closure(path):
+    """Repository files a module imports, directly or transitively"""
+    seen = set()
+    pending = [Path(path)]
+    while pending:
+        for found in _direct_imports(pending.pop()):
+            if found not in seen:
+                seen.add(found)
+                pending.append(found)
+    return frozenset(seen)
+
+
+@lru_cache(maxsize=None)
+def _plugin_modules(path):
+    """Repository modules a conftest.py loads through pytest_plugins"""
+    try:
+        tree = ast.parse(Path(path).read_text())
+    except (OSError, SyntaxError):
+        return ()
+    found = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == 'pytest_plugins' for target in node.targets
+        ) and isinstance(node.value, (ast.List, ast.Tuple)):
+            names = [elt.value for elt in node.value.elts if isinstance(elt, ast.Constant)]
+            found += filter(None, map(_module_file, names))
+    return tuple(found)
+
+
+@lru_cache(maxsize=None)
+def conftest_closure(directory):
+    """Files every test under directory loads through conftest.py.
+
+    Each conftest.py from directory up to the repository root, the plugins
+    it lists in pytest_plugins, and everything those import, including
+    imports deferred into fixture bodies (the database classes).
+    """
+    directory = Path(directory).resolve()
+    files = set()
+    for parent in (directory, *directory.parents):
+        conftest = parent / 'conftest.py'
+        if conftest.exists():
+            for module in (conftest, *_plugin_modules(conftest)):
+                files.add(module)
+                files |= import_closure(module)
+        if parent == REPO_ROOT:
+            break
+    return frozenset(files)
+
+
+def static_dependencies(test_path):
+    """Repository files a test module depends on without tracing: its imports plus its conftest chain"""
+    test_path = Path(test_path)
+    closure = import_closure(test_path) | conftest_closure(test_path.parent) | {test_path}
+    return {_relative(p) for p in closure}
+
+
+def _relative(path):
+    try:
+        return Path(path).resolve().relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return None
+
+
+class ImpactRecorder:
+    """Builds the map for one pytest process"""
+
+    def __init__(self, known):
+        self.tables = TableRecorder(known)
+        self.files = {}
+        self.coverage = None
+        try:
+            import coverage
+        except ImportError:  # optional: falls back to static imports
+            coverage = None
+        if coverage is not None and sys.gettrace() is None:
+            # config_file=False: the project's coverage settings omit */test_*
+            self.coverage = coverage.Coverage(data_file=None, config_file=False, source=[str(REPO_ROOT)])
+            self.coverage.start()
+
+    def start(self, item):
+        self.tables.start(item.nodeid)
+        if self.coverage is not None:
+            self.coverage.switch_context(item.nodeid)
+            self.files[item.nodeid] = {_relative(item.path)}
+        else:
+            self.files[item.nodeid] = static_dependencies(item.path)
+
+    def stop(self):
+        self.tables.stop()
+
+    def finish(self):
+        """Stop tracing and return {node id: {'files': [...], 'tables': [...]}}"""
+        if self.coverage is not None:
+            self.coverage.stop()
+            data = self.coverage.get_data()
+            for measured in data.measured_files():
+                name = _relative(measured)
+                if name is None:
+                    continue
+                for contexts in data.contexts_by_lineno(measured).values():
+                    for context in contexts:
+                        if context in self.files:
+                            self.files[context].add(name)
+        return {
+            test_id: {
+                'files': sorted(filter(None, files)),
+                'tables': sorted(self.tables.tables.get(test_id, ())),
+            }
+            for test_id, files in self.files.items()
+        }
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('impact map')
+    group.addoption('--impact-map', metavar='PATH',
+                    help="record the files and tables each test touches to PATH")
+
+
+def pytest_configure(config):
+    path = config.getoption('impact_map')
+    if not path:
+        return
+    recorder = ImpactRecorder(schema_tables())
+    config._impact_recorder = recorder
+    OBSERVERS.append(recorder.tables)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    recorder = getattr(item.config, '_impact_recorder', None)
+    if recorder is None:
+        return (yield)
+    recorder.start(item)
+    try:
+        return (yield)
+    finally:
+        recorder.stop()
+
+
+def pytest_sessionfinish(session):
+    recorder = getattr(session.config, '_impact_recorder', None)
+    if recorder is None:
+        return
+    path = Path(session.config.getoption('impact_map'))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'version': IMPACT_VERSION, 'tests': recorder.finish()}, f)
+
+
+def pytest_unconfigure(config):
+    recorder = getattr(config, '_impact_recorder', None)
+    if recorder is not None and recorder.tables in OBSERVERS:
+        OBSERVERS.remove(recorder.tables)
+
+
+# -- Selection -------------------------------------------------------------
+
+def load_impact_map(path):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get('tests', {}) if data.get('version') == IMPACT_VERSION else {}
+
+
+def update_impact_map(fragment_paths, path):
+    """Fold per-process maps into the cache; tests of deleted modules are dropped"""
+    tests = load_impact_map(path)
+    for fragment in fragment_paths:
+        tests.update(load_impact_map(fragment))
+    tests = {
+        test_id: entry for test_id, entry in tests.items()
+        if (REPO_ROOT / test_id.split('::')[0]).exists()
+    }
+    with open(path, 'w') as f:
+        json.dump({'version': IMPACT_VERSION, 'tests': dict(sorted(tests.items()))}, f, indent=1)
+        f.write('\n')
+    return tests
+
+
+def changed_files(ref='HEAD'):
+    """Files changed since ref, staged or not, plus untracked ones; None if git fails"""
+    commands = [
+        ['git', 'diff', '--name-only', '--relative', ref, '--'],
+        ['git', 'ls-files', '--others', '--exclude-standard'],
+    ]
+    files = []
+    for command in commands:
+        result = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        files += result.stdout.split()
+    return sorted(set(files))
+
+
+def full_run_reason(changed, impact):
+    """Why the change needs every test, or None if selection is safe"""
+    if not impact:
+        return "no impact map recorded yet"
+    for name in changed:
+        if name in FULL_RUN_FILES or name.endswith('/conftest.py'):
+            return f"{name} changed"
+    return None
+
+
+def select_tests(node_ids, impact, changed, known=frozenset(), root=REPO_ROOT):
+    """Node ids, in order, that a change to the given files can affect.
+
+    A test is selected when it has no recorded entry yet, when its own module
+    or any file it executed changed, or when a changed .js/.sql file has SQL
+    touching one of its tables.
+    """
+    changed = set(changed)
+    tables = set()
+    for name in changed:
+        path = root / name
+        if name.endswith(SQL_SOURCES) and path.exists():
+            tables |= source_tables(path.read_text(errors='replace'), known)
+
+    selected = []
+    for node_id in node_ids:
+        entry = impact.get(node_id)
+        if (
+            entry is None
+            or node_id.split('::')[0] in changed
+            or changed.intersection(entry['files'])
+            or tables.intersection(entry['tables'])
+        ):
+            selected.append(node_id)
+    return selected
@@ -0,0 +1,340 @@
+"""
+Reconciliation of the materialized gallery aggregates.
+
+photos.favorite_count, photos.tag_names and tag_stats.usage_count are kept
+up to date incrementally by models/photoModel.js. This module rebuilds them
+in bulk (after seeding, or to repair drift) and verifies them against
+photo_favorites and photo_tags. ``--fuzz`` runs random sequences of the
+model's mutations through models/photoModel.js under Node and verifies
+after every step, to catch a write path that forgets a counter.
+
+    python -m config.photo_aggregates --verify
+    python -m config.photo_aggregates --rebuild
+    python -m config.photo_aggregates --fuzz 500 --seed 3
+
+--verify and --rebuild work on the app's database (config.app_database);
+--fuzz runs inside a rolled-back transaction on the test database and needs Node.js.
+"""
+
+import argparse
+import random
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.photo_model_bridge import ModelError, PhotoModel
+from config.statements import split_statements
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Where the app's write paths live, and the one module allowed to issue
+# deletes that cascade into photo_tags (through deleteAndReleaseTags)
+JS_SOURCES = ('models', 'routes', 'server.js')
+RELEASING_MODULE = 'models/photoModel.js'
+
+# MySQL error: "Cannot delete or update a parent row: a foreign key constraint fails"
+ER_ROW_IS_REFERENCED_2 = 1451
+
+# What photoModel throws when it refuses a mutation, as opposed to failing
+DUPLICATE_TAG = 'Tag already added to this photo'
+PHOTO_REFUSED = 'Photo not found or access denied'
+
+_CREATE_TABLE = re.compile(r"CREATE TABLE\s+(?:IF NOT EXISTS\s+)?`?(\w+)`?", re.IGNORECASE)
+_CASCADE_FROM = re.compile(r"REFERENCES\s+`?(\w+)`?\s*\([^)]*\)\s*ON DELETE CASCADE", re.IGNORECASE)
+_JS_DELETE = re.compile(r"\bDELETE\s+(?:\w+\s+)?FROM\s+`?(\w+)`?", re.IGNORECASE)
+
+# Same canonical order as REFRESH_TAG_NAMES_SQL in models/photoModel.js
+TAG_NAMES_EXPR = "GROUP_CONCAT(DISTINCT t.tag_name ORDER BY t.tag_name)"
+
+REBUILD_PHOTOS_SQL = f"""
+    UPDATE photos p
+    LEFT JOIN (
+        SELECT photo_id, COUNT(*) AS favorite_count FROM photo_favorites
+        WHERE photo_id BETWEEN ? AND ? GROUP BY photo_id
+    ) f ON f.photo_id = p.photo_id
+    LEFT JOIN (
+        SELECT pt.photo_id, {TAG_NAMES_EXPR} AS tag_names
+        FROM photo_tags pt JOIN tags t ON pt.tag_id = t.tag_id
+        WHERE pt.photo_id BETWEEN ? AND ? GROUP BY pt.photo_id
+    ) g ON g.photo_id = p.photo_id
+    SET p.favorite_count = COALESCE(f.favorite_count, 0),
+        p.tag_names = COALESCE(g.tag_names, '')
+    WHERE p.photo_id BETWEEN ? AND ?
+"""
+
+REBUILD_TAG_STATS_SQL = """
+    INSERT INTO tag_stats (tag_id, usage_count)
+    SELECT t.tag_id, COUNT(pt.photo_tag_id) FROM tags t
+    LEFT JOIN photo_tags pt ON pt.tag_id = t.tag_id
+    GROUP BY t.tag_id
+    ON DUPLICATE KEY UPDATE usage_count = VALUES(usage_count)
+"""
+
+# Each yields (key, stored, actual) for rows whose aggregate disagrees with the source
+DRIFT_QUERIES = {
+    'photos.favorite_count': """
+        SELECT p.photo_id AS `key`, p.favorite_count AS stored, COALESCE(f.n, 0) AS actual
+        FROM photos p
+        LEFT JOIN (SELECT photo_id, COUNT(*) AS n FROM photo_favorites GROUP BY photo_id) f
+            ON f.photo_id = p.photo_id
+        WHERE p.favorite_count <> COALESCE(f.n, 0)
+        ORDER BY p.photo_id
+    """,
+    'photos.tag_names': f"""
+        SELECT p.photo_id AS `key`, p.tag_names AS stored, COALESCE(g.tag_names, '') AS actual
+        FROM photos p
+        LEFT JOIN (
+            SELECT pt.photo_id, {TAG_NAMES_EXPR} AS tag_names
+            FROM photo_tags pt JOIN tags t ON pt.tag_id = t.tag_id
+            GROUP BY pt.photo_id
+        ) g ON g.photo_id = p.photo_id
+        WHERE CAST(p.tag_names AS BINARY) <> CAST(COALESCE(g.tag_names, '') AS BINARY)
+        ORDER BY p.photo_id
+    """,
+    'tag_stats.usage_count': """
+        SELECT t.tag_id AS `key`, COALESCE(ts.usage_count, 0) AS stored, COALESCE(c.n, 0) AS actual
+        FROM tags t
+        LEFT JOIN tag_stats ts ON ts.tag_id = t.tag_id
+        LEFT JOIN (SELECT tag_id, COUNT(*) AS n FROM photo_tags GROUP BY tag_id) c ON c.tag_id = t.tag_id
+        WHERE COALESCE(ts.usage_count, 0) <> COALESCE(c.n, 0)
+        ORDER BY t.tag_id
+    """,
+}
+
+
+def rebuild(db, chunk_size=100000, commit=True):
+    """Recompute every aggregate from the source tables, one photo_id range at a time"""
+    started = time.perf_counter()
+    bounds = db.query_one("SELECT MIN(photo_id) AS low, MAX(photo_id) AS high FROM photos")
+    if bounds and bounds['low'] is not None:
+        for first in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            last = first + chunk_size - 1
+            db.query(REBUILD_PHOTOS_SQL, [first, last] * 3)
+            if commit:
+                db.connection.commit()
+    db.query(REBUILD_TAG_STATS_SQL)
+    if commit:
+        db.connection.commit()
+    print(f"✅ Rebuilt photo aggregates in {time.perf_counter() - started:.1f}s")
+
+
+def cascading_deletes(schema_sql, target='photo_tags'):
+    """Tables whose DELETE reaches target through a chain of ON DELETE CASCADE keys"""
+    cascades_from = {}
+    for statement in split_statements(schema_sql):
+        match = _CREATE_TABLE.search(statement)
+        if match:
+            cascades_from[match.group(1)] = set(_CASCADE_FROM.findall(statement))
+    reached, pending = set(), [target]
+    while pending:
+        for parent in cascades_from.get(pending.pop(), ()):
+            if parent not in reached:
+                reached.add(parent)
+                pending.append(parent)
+    return reached
+
+
+def unreleased_deletes(root=REPO_ROOT, schema_path=None):
+    """(file, line, table) for JS deletes that cascade into photo_tags without releasing tag usage"""
+    schema_path = schema_path or root / 'hkpifgzax132wnez.db'
+    tables = cascading_deletes(Path(schema_path).read_text())
+    files = []
+    for source in JS_SOURCES:
+        path = root / source
+        if path.is_dir():
+            files.extend(sorted(path.rglob('*.js')))
+        elif path.exists():
+            files.append(path)
+    found = []
+    for path in files:
+        relative = path.relative_to(root).as_posix()
+        if relative == RELEASING_MODULE:
+            continue
+        for number, line in enumerate(path.read_text().splitlines(), 1):
+            for table in _JS_DELETE.findall(line):
+                if table in tables:
+                    found.append((relative, number, table))
+    return found
+
+
+def verify(db, sample=5):
+    """{aggregate: (drifted rows, first few (key, stored, actual))} for aggregates that drifted"""
+    drift = {}
+    for name, sql in DRIFT_QUERIES.items():
+        rows = db.query(sql)
+        if rows:
+            drift[name] = (len(rows), [(r['key'], r['stored'], r['actual']) for r in rows[:sample]])
+    return drift
+
+
+class MutationFuzzer:
+    """Random sequences of photoModel's mutations over a small pool of users, photos and tags.
+
+    The mutations are the model's own functions, run under Node by a
+    benchmarks.photo_model_bridge.PhotoModel whose db is the database verified.
+    """
+
+    def __init__(self, model, users, photos, tag_names, seed=0):
+        self.model = model
+        self.db = model.db
+        self.users = list(users)
+        self.photos = dict(photos)  # photo_id -> owner user_id
+        self.tag_names = list(tag_names)
+        self.rng = random.Random(seed)
+
+    def _attempt(self, refusal, name, *args):
+        """model.call(name, ...), or None when the model refuses with the given error message"""
+        try:
+            return self.model.call(name, *args)
+        except ModelError as e:
+            if not str(e).endswith(refusal):
+                raise
+            return None
+
+    def step(self):
+        """Apply one random mutation; returns a description of it"""
+        rng = self.rng
+        if not self.photos:
+            return 'no photos left'
+        if not self.users:
+            return 'no users left'
+        photo_id = rng.choice(sorted(self.photos))
+        user_id = rng.choice(self.users)
+        roll = rng.random()
+        if roll < 0.45:
+            result = self.model.call('toggleFavorite', photo_id, user_id)
+            return f"favorite {result['action']} photo={photo_id} user={user_id} -> {result['favorite_count']}"
+        if roll < 0.75:
+            tag_name = rng.choice(self.tag_names)
+            added = self._attempt(DUPLICATE_TAG, 'addTagToPhoto', photo_id, tag_name, user_id)
+            return f"add tag {tag_name!r} photo={photo_id} user={user_id} -> {bool(added)}"
+        if roll < 0.97:
+            tags = self.db.query("SELECT tag_id, added_by FROM photo_tags WHERE photo_id = ?", [photo_id])
+            if not tags:
+                return f"no tags on photo={photo_id}"
+            tag = rng.choice(tags)
+            # Mostly someone allowed to remove it, sometimes a stranger who is refused
+            remover = rng.choice([tag['added_by'], self.photos[photo_id], user_id])
+            removed = self.model.call('removeTagFromPhoto', photo_id, tag['tag_id'], remover)
+            return f"remove tag {tag['tag_id']} photo={photo_id} user={remover} -> {removed}"
+        if roll < 0.99:
+            owner = rng.choice([self.photos[photo_id], user_id])
+            if self._attempt(PHOTO_REFUSED, 'deletePhoto', photo_id, owner) is None:
+                return f"delete photo={photo_id} refused for user={owner}"
+            del self.photos[photo_id]
+            return f"delete photo={photo_id}"
+        # Deleting the owner cascades to every photo they own and those photos' tag links;
+        # userModel.deleteUser delegates to deleteUserAndReleaseTags
+        owner = self.photos[photo_id]
+        try:
+            self.model.call('deleteUserAndReleaseTags', owner)
+        except ModelError as e:
+            if e.errno != ER_ROW_IS_REFERENCED_2:
+                raise
+            return f"delete user={owner} refused"
+        self.photos = {photo: by for photo, by in self.photos.items() if by != owner}
+        self.users = [user for user in self.users if user != owner]
+        return f"delete user={owner}"
+
+    def run(self, steps, check_every=1):
+        """Run steps; returns (step number, history, drift) at the first drift, or None"""
+        history = []
+        for number in range(1, steps + 1):
+            history.append(self.step())
+            if number % check_every == 0 or number == steps:
+                drift = verify(self.db)
+                if drift:
+                    return number, history[-10:], drift
+        return None
+
+
+def seed_fuzz_pool(db, users=6, photos=12, tags=8, passive_owners=2):
+    """Insert a small, isolated pool for the fuzzer; returns (user ids, {photo: owner}, tag names).
+
+    Passive owners own photos but never favorite or tag anything, so nothing
+    blocks deleting them and their photos' cascade is exercised.
+    """
+    token = f"{random.randrange(16 ** 6):06x}"
+    user_ids = []
+    for n in range(users + passive_owners):
+        result = db.query(
+            "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+            [f"agg_{token}_{n}", f"agg_{token}_{n}@example.com", 'x']
+        )
+        user_ids.append(result.lastrowid)
+    owners = {}
+    for n in range(photos):
+        owner = user_ids[n % len(user_ids)]
+        result = db.query(
+            "INSERT INTO photos (user_id, photo_url, title, is_public) VALUES (?, ?, ?, 1)",
+            [owner, f"https://example.com/{token}/{n}.jpg", f"Fuzz {n}"]
+        )
+        owners[result.lastrowid] = owner
+    tag_names = [f"agg{token}{n}" for n in range(tags)]
+    return user_ids[:users], owners, tag_names
+
+
+def print_drift(drift):
+    for name, (count, samples) in drift.items():
+        print(f"❌ {name}: {count} rows drifted")
+        for key, stored, actual in samples:
+            print(f"   {key}: stored {stored!r}, actual {actual!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or verify the materialized gallery aggregates")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--verify', action='store_true', help="exit 1 if any aggregate drifted")
+    mode.add_argument('--rebuild', action='store_true', help="recompute every aggregate")
+    mode.add_argument('--fuzz', type=int, metavar='STEPS', help="random mutations, verified after each step")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="photos per rebuild statement")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.fuzz is None:
+        from config.app_database import AppDatabase
+        db = AppDatabase()
+    elif shutil.which('node') is None:
+        print("❌ Node.js is required: --fuzz runs models/photoModel.js")
+        return 1
+    else:
+        from config.test_database import TestDatabase
+        db = TestDatabase()
+    try:
+        if args.rebuild:
+            rebuild(db, args.chunk_size)
+            return 0
+        if args.verify:
+            drift = verify(db)
+            if drift:
+                print_drift(drift)
+                return 1
+            print("✅ Photo aggregates match photo_favorites and photo_tags")
+            return 0
+
+        model = PhotoModel(db)
+        db.begin_scope()
+        try:
+            rebuild(db, args.chunk_size, commit=False)
+            users, photos, tag_names = seed_fuzz_pool(db)
+            failure = MutationFuzzer(model, users, photos, tag_names, seed=args.seed).run(args.fuzz)
+        finally:
+            db.rollback_scope()
+            model.close()
+        if failure:
+            number, history, drift = failure
+            print(f"💥 Aggregates drifted after step {number}:")
+            for line in history:
+                print(f"   {line}")
+            print_drift(drift)
+            return 1
+        print(f"✅ {args.fuzz} random mutations, no drift")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
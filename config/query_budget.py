@@ -0,0 +1,226 @@
+"""
+Per-test query accounting and N+1 detection, as a pytest plugin.
+
+TestDatabase notifies its observers after every statement. While a test's
+body runs, QueryRecorder counts statements, round trips, rows and time, and
+groups statements by shape (the SQL with literals and placeholders
+normalised). A shape sent in ``threshold`` or more round trips with
+different parameters is reported as a likely N+1 loop; a batched
+executemany is one round trip, however many rows it carries. The hottest
+shapes are listed at session end with ``--query-report N``, or whenever a
+test exceeded its query budget.
+
+    @pytest.mark.query_budget(5)                 # at most 5 statements
+    @pytest.mark.query_budget(5, round_trips=3, rows=100)
+
+Loaded from conftest.py via ``pytest_plugins``.
+"""
+
+import re
+from collections import namedtuple
+
+import pytest
+
+from config.statements import OBSERVERS, code_text
+
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%s|\?|''")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_SPACE = re.compile(r"\s+")
+
+# Hottest shapes listed when a budget fails and --query-report wasn't given
+BUDGET_FAILURE_REPORT = 10
+
+QueryStats = namedtuple(
+    'QueryStats', ['statements', 'round_trips', 'rows', 'time_ms', 'repeated']
+)
+
+
+def statement_shape(sql):
+    """SQL with literals, placeholders and value lists replaced by ``?``"""
+    text = _SPACE.sub(' ', code_text(sql))
+    text = _NUMBER.sub('?', text)
+    text = _PLACEHOLDER.sub('?', text)
+    text = _LIST.sub('(?)', text)
+    text = _ROWS.sub('(?)', text)
+    return text
+
+
+class ShapeStats:
+    """Aggregate of every execution of one statement shape"""
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.count = 0
+        self.rows = 0
+        self.time_ms = 0.0
+        self.tests = set()
+
+    def add(self, rows, time_ms, test_id):
+        self.count += 1
+        self.rows += rows
+        self.time_ms += time_ms
+        if test_id:
+            self.tests.add(test_id)
+
+
+class QueryRecorder:
+    """Collects statements from TestDatabase observers, per test and per session"""
+
+    def __init__(self, threshold=5):
+        self.threshold = threshold
+        self.shapes = {}
+        self._shape_cache = {}
+        self._test_id = None
+        self._current = None
+
+    def __call__(self, sql, params, rows, elapsed, round_trips=1, statements=1):
+        shape = self._shape_cache.get(sql)
+        if shape is None:
+            shape = self._shape_cache[sql] = statement_shape(sql)
+        time_ms = elapsed * 1000
+        stats = self.shapes.get(shape)
+        if stats is None:
+            stats = self.shapes[shape] = ShapeStats(shape)
+        stats.add(rows, time_ms, self._test_id)
+
+        if self._current is not None:
+            current = self._current
+            current['statements'] += statements
+            current['round_trips'] += round_trips
+            current['rows'] += rows
+            current['time_ms'] += time_ms
+            seen = current['shapes'].setdefault(shape, [0, set()])
+            seen[0] += round_trips
+            seen[1].add(_param_key(sql, params))
+
+    def start(self, test_id):
+        self._test_id = test_id
+        self._current = {'statements': 0, 'round_trips': 0, 'rows': 0, 'time_ms': 0.0, 'shapes': {}}
+
+    def stop(self):
+        """Finish the current test and return its QueryStats"""
+        current, self._current, self._test_id = self._current, None, None
+        if current is None:
+            return None
+        repeated = {
+            shape: count
+            for shape, (count, variants) in current['shapes'].items()
+            if count >= self.threshold and len(variants) > 1
+        }
+        return QueryStats(
+            current['statements'], current['round_trips'], current['rows'], current['time_ms'], repeated
+        )
+
+    def hot_statements(self, limit=10):
+        """Shapes ordered by total time spent"""
+        ranked = sorted(self.shapes.values(), key=lambda s: s.time_ms, reverse=True)
+        return ranked[:limit]
+
+
+def _param_key(sql, params):
+    # Inline literals vary the SQL text itself; bound parameters vary params
+    try:
+        return sql, hash(tuple(params or ()))
+    except TypeError:
+        return sql, repr(params)
+
+
+def budget_violations(stats, marker):
+    """Messages for every limit in a query_budget marker that stats exceed"""
+    limits = dict(marker.kwargs)
+    if marker.args:
+        limits['statements'] = marker.args[0]
+    messages = []
+    for field in ('statements', 'round_trips', 'rows', 'time_ms'):
+        limit = limits.get(field)
+        if limit is not None and getattr(stats, field) > limit:
+            messages.append(f"{field}: {getattr(stats, field):g} > budget {limit:g}")
+    return messages
+
+
+def _shorten(shape, width=100):
+    return shape if len(shape) <= width else shape[:width - 3] + '...'
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('query budget')
+    group.addoption('--query-report', type=int, default=0, metavar='N',
+                    help="show the N hottest statement shapes at session end "
+                         f"(default: {BUDGET_FAILURE_REPORT} when a query budget fails, otherwise none)")
+    group.addoption('--n-plus-one-threshold', type=int, default=5, metavar='N',
+                    help="flag statement shapes repeated N+ times in one test")
+    group.addoption('--fail-on-n-plus-one', action='store_true',
+                    help="fail tests with repeated statement shapes instead of reporting them")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'query_budget(statements, round_trips=None, rows=None, time_ms=None): '
+        'fail the test when its body exceeds these database limits'
+    )
+    recorder = QueryRecorder(threshold=config.getoption('n_plus_one_threshold'))
+    config._query_recorder = recorder
+    config._query_n_plus_one = []
+    config._query_budget_failed = False
+    OBSERVERS.append(recorder)
+
+
+def pytest_unconfigure(config):
+    recorder = getattr(config, '_query_recorder', None)
+    if recorder in OBSERVERS:
+        OBSERVERS.remove(recorder)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    recorder = item.config._query_recorder
+    recorder.start(item.nodeid)
+    try:
+        result = yield
+    finally:
+        stats = recorder.stop()
+    item.user_properties.append(('query_stats', stats._asdict()))
+
+    problems = []
+    marker = item.get_closest_marker('query_budget')
+    if marker:
+        violations = budget_violations(stats, marker)
+        if violations:
+            item.config._query_budget_failed = True
+        problems.extend(violations)
+    if stats.repeated:
+        item.config._query_n_plus_one.append((item.nodeid, stats.repeated))
+        if item.config.getoption('fail_on_n_plus_one'):
+            problems.extend(
+                f"N+1: {count}x {_shorten(shape)}" for shape, count in stats.repeated.items()
+            )
+    if problems:
+        pytest.fail("Query budget exceeded:\n  " + "\n  ".join(problems), pytrace=False)
+    return result
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    recorder = getattr(config, '_query_recorder', None)
+    if recorder is None:
+        return
+    limit = config.getoption('query_report')
+    if not limit and config._query_budget_failed:
+        limit = BUDGET_FAILURE_REPORT
+    if (limit <= 0 or not recorder.shapes) and not config._query_n_plus_one:
+        return
+
+    write = terminalreporter.write_line
+    terminalreporter.section('query report')
+    if limit > 0 and recorder.shapes:
+        write(f"{'calls':>7} {'total ms':>10} {'avg ms':>8} {'rows':>9} {'tests':>6}  statement")
+        for stats in recorder.hot_statements(limit):
+            write(
+                f"{stats.count:7d} {stats.time_ms:10.1f} {stats.time_ms / stats.count:8.2f} "
+                f"{stats.rows:9d} {len(stats.tests):6d}  {_shorten(stats.shape)}"
+            )
+    for nodeid, repeated in config._query_n_plus_one:
+        for shape, count in repeated.items():
+            write(f"⚠️ N+1 in {nodeid}: {count}x {_shorten(shape)}")
@@ -0,0 +1,619 @@
+"""
+Record/replay cassettes for TestDatabase, as a pytest plugin.
+
+With ``TEST_DB_CASSETTE=record`` the suite runs against MySQL as usual and
+every top-level TestDatabase call a test makes (query, bulk_insert,
+iter_query, snapshots, cleanup) is stored with its normalised SQL,
+parameters and result in a gzipped JSON cassette next to the test module
+(``cassettes/<module>.json.gz``). With ``TEST_DB_CASSETTE=replay`` the same
+calls are answered from those files and no connection is opened.
+
+A call that is not in the cassette, or a schema dump that changed since the
+recording, raises CassetteDrift; re-record the affected module. Calls made
+while a module- or class-scoped fixture is set up or torn down are marked
+shared: they run inside whichever test needs the fixture first, so on replay
+they may be answered from another test's recording. Every other call must
+match the current test's own recording.
+
+    TEST_DB_CASSETTE=record pytest test_edge_cases.py
+    TEST_DB_CASSETTE=replay pytest test_edge_cases.py
+
+Loaded from conftest.py via ``pytest_plugins``.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+
+try:
+    import fcntl
+except ImportError:  # Windows: record without -n
+    fcntl = None
+
+MODES = ('off', 'record', 'replay')
+CASSETTE_VERSION = 2
+
+# Parameter lists longer than this are stored as a hash
+MAX_INLINE_KEY = 200
+
+_SPACE = re.compile(r"\s+")
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?$")
+
+
+class CassetteDrift(Exception):
+    """A test issued a call its cassette has no recording for"""
+
+
+def cassette_mode():
+    """TEST_DB_CASSETTE: off (default), record or replay"""
+    mode = os.getenv('TEST_DB_CASSETTE', 'off').lower()
+    if mode not in MODES:
+        raise ValueError(f"TEST_DB_CASSETTE must be one of {', '.join(MODES)}, not '{mode}'")
+    return mode
+
+
+def schema_fingerprint(path):
+    """Same hash initialize_schema() stores for the schema dump"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def normalize_sql(sql):
+    return _SPACE.sub(' ', sql).strip()
+
+
+def param_key(value):
+    """A parameter reduced to what must match between recording and replay.
+
+    Timestamps, typically derived from the current time, only need to be
+    timestamps; everything else must be equal.
+    """
+    if isinstance(value, (datetime, date)):
+        return '<datetime>'
+    if isinstance(value, str) and _TIMESTAMP.match(value):
+        return '<datetime>'
+    if isinstance(value, (list, tuple)):
+        return [param_key(v) for v in value]
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return 'sha1:' + hashlib.sha1(bytes(value)).hexdigest()
+    if isinstance(value, float):
+        return repr(value)
+    return value
+
+
+def params_key(params):
+    text = json.dumps(param_key(list(params or ())), separators=(',', ':'), default=str)
+    if len(text) > MAX_INLINE_KEY:
+        return 'sha1:' + hashlib.sha1(text.encode('utf-8')).hexdigest()
+    return text
+
+
+def encode_value(value):
+    """A result value as JSON, tagging the types JSON can't represent"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return {'$dec': str(value)}
+    if isinstance(value, datetime):
+        return {'$dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, timedelta):
+        return {'$td': value.total_seconds()}
+    if isinstance(value, (bytes, bytearray)):
+        return {'$b64': base64.b64encode(bytes(value)).decode('ascii')}
+    if isinstance(value, (set, frozenset)):
+        return {'$set': sorted(value)}
+    if isinstance(value, dict):
+        return {'$map': {str(k): encode_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(v) for v in value]
+    raise TypeError(f"Cannot store {type(value).__name__} in a cassette")
+
+
+def decode_value(value):
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    (tag, data), = value.items()
+    if tag == '$dec':
+        return Decimal(data)
+    if tag == '$dt':
+        return datetime.fromisoformat(data)
+    if tag == '$date':
+        return date.fromisoformat(data)
+    if tag == '$td':
+        return timedelta(seconds=data)
+    if tag == '$b64':
+        return base64.b64decode(data)
+    if tag == '$set':
+        return set(data)
+    if tag == '$map':
+        return {k: decode_value(v) for k, v in data.items()}
+    raise ValueError(f"Unknown cassette tag {tag}")
+
+
+def _encode_rows(rows):
+    """Rows as a column list plus value lists, which is far smaller than dicts"""
+    if rows and isinstance(rows[0], dict):
+        columns = list(rows[0])
+        return {'columns': columns, 'rows': [[encode_value(row[c]) for c in columns] for row in rows]}
+    return {'rows': [encode_value(list(row)) for row in rows]}
+
+
+def _decode_rows(data):
+    columns = data.get('columns')
+    if columns is None:
+        return [tuple(decode_value(row)) for row in data['rows']]
+    return [dict(zip(columns, decode_value(row))) for row in data['rows']]
+
+
+def encode_result(result, batches=False):
+    if batches:
+        return {'batches': [_encode_rows(batch) for batch in result]}
+    if isinstance(result, list):
+        return _encode_rows(result)
+    if hasattr(result, 'rowcount') and hasattr(result, 'lastrowid'):
+        return {'rowcount': result.rowcount, 'lastrowid': result.lastrowid}
+    return {'value': encode_value(result)}
+
+
+def decode_result(data, query_result):
+    if 'batches' in data:
+        return [_decode_rows(batch) for batch in data['batches']]
+    if 'rows' in data:
+        return _decode_rows(data)
+    if 'rowcount' in data:
+        return query_result(data['rowcount'], data['lastrowid'])
+    return decode_value(data['value'])
+
+
+def _raise_recorded(error):
+    from mysql.connector import errors
+
+    errno, sqlstate, msg = error
+    raise errors.get_mysql_exception(errno, msg, sqlstate)
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on a sidecar file, held by one process at a time"""
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_name(f".{path.name}.lock"), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class Cassette:
+    """One test module's recordings: test name -> list of calls"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.schema = None
+        self.tests = {}
+        self.recorded = set()
+        if self.path.exists():
+            self.schema, self.tests = self._read()
+
+    def _read(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            return None, {}
+        return data['schema'], data['tests']
+
+    def save(self):
+        """Write the tests recorded in this process over whatever is on disk.
+
+        Parallel workers record different tests of the same module, so the
+        read-merge-write runs under a file lock, and the new file replaces the
+        old one in a single rename.
+        """
+        if not self.recorded:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _file_lock(self.path):
+            tests = self._read()[1] if self.path.exists() else {}
+            tests.update({name: self.tests[name] for name in self.recorded})
+            data = {'version': CASSETTE_VERSION, 'schema': self.schema, 'tests': tests}
+            text = json.dumps(data, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+            partial = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            # mtime=0 keeps the bytes identical when nothing changed
+            with open(partial, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                f.write(text.encode('utf-8'))
+            os.replace(partial, self.path)
+        self.recorded.clear()
+
+
+class CassetteLibrary:
+    """Routes each test's calls to its module's cassette"""
+
+    def __init__(self, mode, directory=None, root=None):
+        self.mode = mode
+        self.directory = Path(directory) if directory else None
+        self.root = Path(root or os.getcwd())
+        self.schema = None
+        self._cassettes = {}
+        self._used = {}
+        self._current = None
+        # Depth of module/class fixture setups and teardowns now running
+        self.shared = 0
+
+    def cassette_path(self, module):
+        module = Path(module)
+        if self.directory is not None:
+            return self.directory / ('__'.join(module.with_suffix('').parts) + '.json.gz')
+        return self.root / module.parent / 'cassettes' / (module.stem + '.json.gz')
+
+    def _cassette(self, module):
+        path = self.cassette_path(module)
+        cassette = self._cassettes.get(path)
+        if cassette is None:
+            cassette = self._cassettes[path] = Cassette(path)
+        return cassette
+
+    def start(self, nodeid):
+        module, _, name = nodeid.partition('::')
+        cassette = self._cassette(module)
+        if self.mode == 'record':
+            cassette.tests[name] = []
+            cassette.recorded.add(name)
+        self._current = (cassette, name)
+
+    def stop(self):
+        self._current = None
+
+    def enter_shared(self):
+        self.shared += 1
+
+    def leave_shared(self):
+        self.shared -= 1
+
+    def record(self, op, sql, params, result=None, error=None):
+        if self._current is None:
+            return
+        cassette, name = self._current
+        cassette.schema = self.schema
+        entry = {'op': op, 'sql': normalize_sql(sql), 'key': params_key(params)}
+        if self.shared:
+            entry['shared'] = True
+        if error is not None:
+            entry['error'] = [error.errno, error.sqlstate, error.msg]
+        else:
+            entry['result'] = encode_result(result, batches=op == 'iter_query')
+        cassette.tests[name].append(entry)
+
+    def replay(self, op, sql, params, query_result):
+        """The recorded result of a call, from this test's tape.
+
+        A call made during a module/class fixture's setup or teardown may also
+        take a shared call recorded under another test of the module.
+        """
+        if self._current is None:
+            raise CassetteDrift(f"{op} outside a test cannot be replayed: {normalize_sql(sql)[:200]}")
+        cassette, name = self._current
+        if not cassette.tests:
+            raise CassetteDrift(f"No cassette at {cassette.path}; record it with TEST_DB_CASSETTE=record")
+        if self.schema is not None and cassette.schema != self.schema:
+            raise CassetteDrift(f"The schema changed since {cassette.path} was recorded; re-record it")
+
+        wanted = (op, normalize_sql(sql), params_key(params))
+        used = self._used.setdefault(cassette.path, {})
+        used.setdefault(name, set())
+        tests = [name]
+        if self.shared:
+            # Module- and class-scoped fixtures run inside whichever test needs them first
+            tests += [other for other in cassette.tests if other != name]
+        for test in tests:
+            taken = used.get(test, set())
+            for index, entry in enumerate(cassette.tests.get(test, [])):
+                if index in taken or (test != name and not entry.get('shared')):
+                    continue
+                if (entry['op'], entry['sql'], entry['key']) == wanted:
+                    used.setdefault(test, taken).add(index)
+                    if 'error' in entry:
+                        _raise_recorded(entry['error'])
+                    return decode_result(entry['result'], query_result)
+
+        expected = self._next_unused(cassette, name)
+        message = f"{name}: {op} is not in {cassette.path.name}\n  got:      {wanted[1][:300]}"
+        if expected is not None:
+            message += f"\n  recorded: {expected['sql'][:300]}"
+        raise CassetteDrift(message + "\nRe-record with TEST_DB_CASSETTE=record")
+
+    def _next_unused(self, cassette, name):
+        taken = self._used.get(cassette.path, {}).get(name, set())
+        for index, entry in enumerate(cassette.tests.get(name, [])):
+            if index not in taken:
+                return entry
+        return None
+
+    def unused(self):
+        """(cassette, test, count) for recorded calls no test asked for"""
+        stale = []
+        for path, cassette in self._cassettes.items():
+            used = self._used.get(path, {})
+            for test, entries in cassette.tests.items():
+                if test in used and len(used[test]) < len(entries):
+                    stale.append((path.name, test, len(entries) - len(used[test])))
+        return stale
+
+    def save(self):
+        """Write every cassette that gained recordings; returns their paths"""
+        written = []
+        for cassette in self._cassettes.values():
+            if cassette.recorded:
+                cassette.save()
+                written.append(cassette.path)
+        return written
+
+
+class RecordingMixin:
+    """Writes each top-level call to the current cassette.
+
+    Calls made from inside another recorded call (the seed of a snapshot,
+    query_one's query) are part of the outer call and aren't stored.
+    """
+
+    library = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cassette_depth = 0
+        if self.library is not None:
+            self.library.schema = schema_fingerprint(self.schema_path())
+
+    def _recorded(self, op, sql, params, call):
+        self._cassette_depth += 1
+        try:
+            result = call()
+        except Exception as e:
+            if self._cassette_depth == 1 and self.library is not None and hasattr(e, 'sqlstate'):
+                self.library.record(op, sql, params, error=e)
+            raise
+        finally:
+            self._cassette_depth -= 1
+        if self._cassette_depth == 0 and self.library is not None:
+            self.library.record(op, sql, params, result)
+        return result
+
+    def query(self, sql, params=None):
+        parent = super().query
+        return self._recorded('query', sql, params, lambda: parent(sql, params))
+
+    def bulk_insert(self, table, columns, rows, method='auto', ignore=False):
+        parent = super().bulk_insert
+        columns = list(columns)
+        rows = list(rows)
+        sql = f"{'INSERT IGNORE' if ignore else 'INSERT'} INTO {table} ({', '.join(columns)})"
+        return self._recorded('bulk_insert', sql, rows, lambda: parent(table, columns, rows, method, ignore))
+
+    def iter_query(self, sql, params=None, batch_size=10000, row_format='dict'):
+        parent = super().iter_query
+        if row_format == 'numpy':
+            yield from parent(sql, params, batch_size, row_format)
+            return
+        key = [*(params or ()), batch_size, row_format]
+        yield from self._recorded('iter_query', sql, key, lambda: list(parent(sql, params, batch_size, row_format)))
+
+    def snapshot(self, name, seed, version='1'):
+        parent = super().snapshot
+        return self._recorded('snapshot', name, [version], lambda: parent(name, seed, version))
+
+    def ensure_snapshot(self, name, seed, version='1'):
+        parent = super().ensure_snapshot
+        return self._recorded('ensure_snapshot', name, [version], lambda: parent(name, seed, version))
+
+    def restore_snapshot(self, name, version='1'):
+        parent = super().restore_snapshot
+        return self._recorded('restore_snapshot', name, [version], lambda: parent(name, version))
+
+    def create_snapshot(self, name, seed, version='1'):
+        parent = super().create_snapshot
+        return self._recorded('create_snapshot', name, [version], lambda: parent(name, seed, version))
+
+    def cleanup_database(self, full=False):
+        parent = super().cleanup_database
+        return self._recorded('cleanup_database', '', [full], lambda: parent(full))
+
+
+class ReplayConnection:
+    """Stands in for the MySQL connection; transactions are already in the recording"""
+
+    in_transaction = False
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def start_transaction(self):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class ReplayMixin:
+    """Answers every call from the cassettes without a server"""
+
+    library = None
+    query_result = None
+
+    def __init__(self, pool_size=None, pool_timeout=None, *, db_name=None):
+        self.test_db_name = db_name or os.getenv('TEST_DB_NAME', 'petcare_test')
+        self.pool = None
+        self._connection = ReplayConnection()
+        self._dirty_tables = {}
+        self._dirty_all = False
+        if self.library is not None:
+            self.library.schema = schema_fingerprint(self.schema_path())
+        print(f"📼 Replaying '{self.test_db_name}' from cassettes")
+
+    @property
+    def connection(self):
+        return self._connection
+
+    def _replayed(self, op, sql, params):
+        started = time.perf_counter()
+        result = self.library.replay(op, sql, params, self.query_result)
+        if self.observers and op == 'query':
+            self._notify(sql, tuple(params or ()), result, time.perf_counter() - started)
+        return result
+
+    def query(self, sql, params=None):
+        return self._replayed('query', sql, params)
+
+    def bulk_insert(self, table, columns, rows, method='auto', ignore=False):
+        sql = f"{'INSERT IGNORE' if ignore else 'INSERT'} INTO {table} ({', '.join(columns)})"
+        return self._replayed('bulk_insert', sql, list(rows))
+
+    def iter_query(self, sql, params=None, batch_size=10000, row_format='dict'):
+        if row_format == 'numpy':
+            raise CassetteDrift("iter_query(row_format='numpy') is not recorded; use a live database")
+        yield from self._replayed('iter_query', sql, [*(params or ()), batch_size, row_format])
+
+    def snapshot(self, name, seed, version='1'):
+        return self._replayed('snapshot', name, [version])
+
+    def ensure_snapshot(self, name, seed, version='1'):
+        return self._replayed('ensure_snapshot', name, [version])
+
+    def restore_snapshot(self, name, version='1'):
+        return self._replayed('restore_snapshot', name, [version])
+
+    def create_snapshot(self, name, seed, version='1'):
+        return self._replayed('create_snapshot', name, [version])
+
+    def cleanup_database(self, full=False):
+        return self._replayed('cleanup_database', '', [full])
+
+    # Server-side housekeeping has nothing to do without a server
+
+    def release_connection(self):
+        pass
+
+    def initialize_schema(self, force=None):
+        return False
+
+    @contextmanager
+    def named_lock(self, name, timeout=120):
+        yield
+
+    def clone_from(self, template_name):
+        pass
+
+    def drop_database(self):
+        pass
+
+    def drop_snapshot(self, name):
+        pass
+
+    def begin_scope(self, kind='fixture'):
+        return 1
+
+    def rollback_scope(self, kind='fixture'):
+        pass
+
+    def close(self):
+        pass
+
+
+@lru_cache(maxsize=None)
+def database_class(mode=None):
+    """TestDatabase, or its recording or replaying subclass for TEST_DB_CASSETTE"""
+    from config.test_database import QueryResult, TestDatabase
+
+    mode = mode or cassette_mode()
+    if mode == 'record':
+        return type('RecordingDatabase', (RecordingMixin, TestDatabase), {})
+    if mode == 'replay':
+        return type('ReplayDatabase', (ReplayMixin, TestDatabase), {'query_result': QueryResult})
+    return TestDatabase
+
+
+def pytest_configure(config):
+    mode = cassette_mode()
+    if mode == 'off':
+        return
+    library = CassetteLibrary(mode, directory=os.getenv('TEST_DB_CASSETTE_DIR'), root=config.rootpath)
+    config._cassette_library = library
+    RecordingMixin.library = ReplayMixin.library = library
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    library = getattr(item.config, '_cassette_library', None)
+    if library is None:
+        return (yield)
+    library.start(item.nodeid)
+    try:
+        return (yield)
+    finally:
+        library.stop()
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    library = getattr(request.config, '_cassette_library', None)
+    if library is None or fixturedef.scope == 'function':
+        return (yield)
+    entered = []
+
+    def enter_teardown():
+        entered.append(True)
+        library.enter_shared()
+
+    def leave_teardown():
+        if entered:
+            library.leave_shared()
+
+    # Finalizers run last-in first-out, so these two bracket the fixture's own teardown
+    fixturedef.addfinalizer(leave_teardown)
+    library.enter_shared()
+    try:
+        result = yield
+    finally:
+        library.leave_shared()
+    fixturedef.addfinalizer(enter_teardown)
+    return result
+
+
+def pytest_sessionfinish(session):
+    library = getattr(session.config, '_cassette_library', None)
+    if library is not None and library.mode == 'record':
+        for path in library.save():
+            print(f"📼 Recorded {path}")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    library = getattr(config, '_cassette_library', None)
+    if library is None or library.mode != 'replay':
+        return
+    for cassette, test, count in library.unused():
+        terminalreporter.write_line(
+            f"⚠️ {cassette}: {count} recorded call(s) of {test} were never replayed; re-record to drop them"
+        )
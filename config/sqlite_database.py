@@ -0,0 +1,252 @@
+"""
+Embedded SQLite backend for TestDatabase.
+
+SqliteDatabase keeps TestDatabase's whole surface (query, scopes and
+savepoints, bulk_insert, iter_query, snapshots, cleanup, observers) but runs
+against an in-memory SQLite database, with every statement passed through
+config.sqlite_dialect. Each instance is its own private database, so there
+is no server, no network round trip and nothing to clean up between runs.
+
+Select it with TEST_DB_BACKEND=sqlite. MySQL remains the source of truth:
+SQL outside the dialect shim fails here, and CI still runs against MySQL.
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from config.sqlite_dialect import CONVERTERS, adapt_param, register_functions, translate, translate_script
+from config.test_database import SCHEMA_META_TABLE, QueryResult, TestDatabase
+
+for _type_name, _converter in CONVERTERS.items():
+    sqlite3.register_converter(_type_name, _converter)
+
+# bulk_insert chunks by bytes; SQLite has no packet limit to respect
+MAX_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+class SqliteCursor:
+    """The slice of the mysql.connector cursor API TestDatabase uses"""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+        self._has_rows = False
+
+    def execute(self, sql, params=None, multi=False):
+        if multi:
+            raise TypeError("multi=True is not supported; pass the script instead")
+        params = tuple(adapt_param(value) for value in params or ())
+        statements = translate_script(sql)
+        self._has_rows = False
+        for index, statement in enumerate(statements):
+            last = index == len(statements) - 1
+            self._has_rows = self._connection.run(self._cursor, statement, params if last else ())
+
+    def executemany(self, sql, rows):
+        [statement] = translate(sql)
+        self._cursor.executemany(statement, ([adapt_param(value) for value in row] for row in rows))
+        self._has_rows = False
+
+    @property
+    def with_rows(self):
+        return self._has_rows
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def _rows(self, rows):
+        if not self._dictionary:
+            return rows
+        columns = self.column_names
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetchall(self):
+        return self._rows(self._cursor.fetchall()) if self._has_rows else []
+
+    def fetchmany(self, size):
+        return self._rows(self._cursor.fetchmany(size)) if self._has_rows else []
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def nextset(self):
+        return None
+
+    def close(self):
+        self._cursor.close()
+
+
+class SqliteConnection:
+    """The slice of the mysql.connector connection API TestDatabase uses.
+
+    Like a MySQL connection with autocommit off, the first write opens a
+    transaction that lasts until commit() or rollback().
+    """
+
+    unread_result = False
+
+    def __init__(self, path=':memory:', cached_statements=128):
+        self.raw = sqlite3.connect(
+            path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            cached_statements=cached_statements
+        )
+        register_functions(self.raw)
+        self._foreign_keys = None
+        self._foreign_keys_wanted = True
+        self._sync_foreign_keys()
+
+    def _sync_foreign_keys(self):
+        # PRAGMA foreign_keys is ignored inside a transaction, so it is applied once the transaction ends
+        if not self.raw.in_transaction and self._foreign_keys != self._foreign_keys_wanted:
+            self.raw.execute(f"PRAGMA foreign_keys = {'ON' if self._foreign_keys_wanted else 'OFF'}")
+            self._foreign_keys = self._foreign_keys_wanted
+
+    def run(self, cursor, statement, params):
+        """Execute one translated statement; True if it returned rows"""
+        if statement.startswith('PRAGMA foreign_keys'):
+            self._foreign_keys_wanted = statement.endswith('ON')
+            if self.raw.in_transaction and not self._foreign_keys_wanted:
+                # Within the transaction, checks can still be postponed to COMMIT
+                cursor.execute("PRAGMA defer_foreign_keys = ON")
+            self._sync_foreign_keys()
+            return False
+        cursor.execute(statement, params)
+        self._sync_foreign_keys()
+        return cursor.description is not None
+
+    @property
+    def in_transaction(self):
+        return self.raw.in_transaction
+
+    def start_transaction(self):
+        self.raw.execute("BEGIN")
+
+    def commit(self):
+        self.raw.commit()
+        self._sync_foreign_keys()
+
+    def rollback(self):
+        self.raw.rollback()
+        self._sync_foreign_keys()
+
+    def cursor(self, dictionary=False, buffered=True, prepared=False):
+        return SqliteCursor(self, dictionary=dictionary)
+
+    def consume_results(self):
+        pass
+
+    def is_connected(self):
+        try:
+            self.raw.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            return False
+        return True
+
+    def close(self):
+        self.raw.close()
+
+
+class SqliteDatabase(TestDatabase):
+    """TestDatabase on a private in-memory SQLite database"""
+
+    def __init__(self, pool_size=None, pool_timeout=None, *, db_name=None):
+        self._snapshots = {}
+        # One in-memory database per instance: pooled connections would each see an empty one
+        super().__init__(db_name=db_name, pool_size=0, pool_timeout=pool_timeout)
+        self.use_prepared = False
+
+    def _open_connection(self):
+        return SqliteConnection(
+            os.getenv('TEST_DB_SQLITE_PATH', ':memory:'),
+            cached_statements=self.prepared_cache_size
+        )
+
+    def connect(self):
+        self._connection = self._open_connection()
+        print("✅ Connected to embedded SQLite test database")
+
+    @contextmanager
+    def named_lock(self, name, timeout=120):
+        """Nothing to coordinate: no other process can see this database"""
+        yield
+
+    def clone_from(self, template_name):
+        """Each worker's database is private, so 'cloning' is applying the schema"""
+        self.initialize_schema(force=True)
+
+    def drop_database(self):
+        """The database disappears with its connection"""
+
+    @staticmethod
+    def _savepoint_lost(error):
+        return isinstance(error, sqlite3.OperationalError) and 'no such savepoint' in str(error)
+
+    def max_allowed_packet(self):
+        return MAX_CHUNK_BYTES
+
+    def _execute(self, connection, statement, params):
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(statement.sql, params)
+            if cursor.with_rows:
+                return cursor.fetchall()
+            return QueryResult(cursor.rowcount, cursor.lastrowid)
+        finally:
+            cursor.close()
+
+    def bulk_insert(self, table, columns, rows, method='auto', ignore=False):
+        """executemany is already in-process, so every method maps onto it"""
+        return super().bulk_insert(table, columns, rows, method='executemany', ignore=ignore)
+
+    def _snapshot_tables(self, name, version):
+        snapshot = self._snapshots.get(name)
+        if snapshot is None or snapshot[0] != str(version) or snapshot[1] != self._schema_fingerprint():
+            return None
+        return dict(snapshot[2])
+
+    def create_snapshot(self, name, seed, version='1'):
+        """Seed a dataset once and keep a copy of it in an attached in-memory schema"""
+        self._require_no_scope('create_snapshot')
+        self.drop_snapshot(name)
+        self.cleanup_database(full=True)
+        seed(self)
+        self.connection.commit()
+
+        schema = self._snapshot_schema(name)
+        raw = self.connection.raw
+        raw.execute(f"ATTACH DATABASE ':memory:' AS \"{schema}\"")
+        counts = {}
+        for (table,) in raw.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name <> ?",
+            (SCHEMA_META_TABLE,)
+        ).fetchall():
+            rows = raw.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            if rows:
+                raw.execute(f'CREATE TABLE "{schema}"."{table}" AS SELECT * FROM main."{table}"')
+                counts[table] = rows
+
+        self._snapshots[name] = (str(version), self._schema_fingerprint(), counts)
+        self._dirty_tables.update(counts)
+        print(f"✅ Snapshot '{name}' created ({sum(counts.values())} rows in {len(counts)} tables)")
+        return counts
+
+    def drop_snapshot(self, name):
+        """Detach a snapshot's in-memory schema"""
+        if self._snapshots.pop(name, None) is not None:
+            self.connection.commit()  # DETACH is refused inside a transaction
+            self.connection.raw.execute(f'DETACH DATABASE "{self._snapshot_schema(name)}"')
+
@@ -0,0 +1,533 @@
+"""
+MySQL to SQLite translation for the embedded test backend.
+
+translate() turns one MySQL statement into the SQLite statements that
+behave the same way for the schema dump and the SQL the tests issue:
+AUTO_INCREMENT keys, ENUM and VARCHAR limits (as CHECK constraints, like
+strict mode), ON UPDATE CURRENT_TIMESTAMP (as triggers), secondary KEYs,
+GROUP_CONCAT, SET FOREIGN_KEY_CHECKS, TRUNCATE and SHOW TABLES. String
+literals and comments are never rewritten. MySQL stays the source of truth;
+anything not listed here is passed through and fails loudly in SQLite.
+
+Kept free of any driver import so the translation can be unit tested on its own.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+from config.statements import iter_code_spans, split_statements
+
+# Literals are swapped for \0<n>\0 markers while the code around them is rewritten
+_MARKER = re.compile(r'\x00(\d+)\x00')
+
+_BACKSLASH_ESCAPES = {
+    '0': '\x00', "'": "'", '"': '"', 'b': '\b', 'n': '\n',
+    'r': '\r', 't': '\t', 'Z': '\x1a', '\\': '\\',
+}
+
+NOW_SQL = "datetime('now', 'localtime')"
+TODAY_SQL = "date('now', 'localtime')"
+
+SHOW_TABLES_SQL = (
+    "SELECT name AS Tables_in_main FROM sqlite_master "
+    "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+)
+
+_INTEGER_TYPES = {'int', 'integer', 'tinyint', 'smallint', 'mediumint', 'bigint', 'bit', 'bool', 'boolean', 'year'}
+_SIZED_TEXT_TYPES = {'char', 'varchar'}
+_TEXT_TYPES = {'tinytext', 'text', 'mediumtext', 'longtext', 'json', 'time', 'enum', 'set'} | _SIZED_TEXT_TYPES
+_REAL_TYPES = {'float', 'double', 'real'}
+_DECIMAL_TYPES = {'decimal', 'numeric', 'dec', 'fixed'}
+_BLOB_TYPES = {'binary', 'varbinary', 'tinyblob', 'blob', 'mediumblob', 'longblob'}
+# Declared type names are kept so the backend's converters return date/datetime/Decimal
+_TEMPORAL_TYPES = {'datetime': 'DATETIME', 'timestamp': 'TIMESTAMP', 'date': 'DATE'}
+
+_CREATE_TABLE = re.compile(r'\s*CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(IF\s+NOT\s+EXISTS\s+)?([^\s(]+)\s*\(', re.I)
+_COLUMN = re.compile(r'([^\s(]+)\s+(\w+)(?:\s*(\([^)]*\)))?((?:\s+(?:UNSIGNED|SIGNED|ZEROFILL)\b)*)(.*)$', re.I | re.S)
+_PRIMARY_KEY = re.compile(r'(?:CONSTRAINT\s+\S+\s+)?PRIMARY\s+KEY\s*(?:USING\s+\w+\s*)?\((.*)\)', re.I | re.S)
+_INDEX = re.compile(r'(UNIQUE\s+)?(?:KEY|INDEX)\b\s*([^\s(]+)?\s*\((.*)\)(?:\s+USING\s+\w+)?$', re.I | re.S)
+_UNIQUE_KEY = re.compile(r'(?:CONSTRAINT\s+\S+\s+)?UNIQUE\s+(?:KEY|INDEX)\b\s*([^\s(]+)?\s*\((.*)\)', re.I | re.S)
+_SKIPPED_INDEX = re.compile(r'(?:FULLTEXT|SPATIAL)\b', re.I)
+_KEY_PREFIX = re.compile(r'(\S+?)\s*\(\d+\)')
+
+_AUTO_INCREMENT = re.compile(r'\s+AUTO_INCREMENT\b', re.I)
+_INLINE_PRIMARY_KEY = re.compile(r'\s+PRIMARY\s+KEY\b', re.I)
+_ON_UPDATE_NOW = re.compile(r'\s+ON\s+UPDATE\s+(?:CURRENT_TIMESTAMP|NOW)\b(?:\s*\(\s*\d*\s*\))?', re.I)
+_DEFAULT_NOW = re.compile(r'\bDEFAULT\s+(?:CURRENT_TIMESTAMP|NOW)\b(?:\s*\(\s*\d*\s*\))?', re.I)
+_COLUMN_NOISE = re.compile(
+    r'\s+(?:COMMENT\s+\x00\d+\x00|(?:CHARACTER\s+SET|CHARSET|COLLATE)\s+\w+)', re.I
+)
+
+_FOREIGN_KEY_CHECKS = re.compile(r'\s*SET\s+(?:(?:SESSION|@@SESSION\.|@@)\s*)?FOREIGN_KEY_CHECKS\s*=\s*(\w+)', re.I)
+_TRUNCATE = re.compile(r'\s*TRUNCATE\s+(?:TABLE\s+)?(\S+)\s*$', re.I)
+_SHOW_TABLES = re.compile(r'\s*SHOW\s+(?:FULL\s+)?TABLES\s*$', re.I)
+_ALTER_AUTO_INCREMENT = re.compile(r'\s*ALTER\s+TABLE\s+\S+\s+AUTO_INCREMENT\s*=?\s*\d+\s*$', re.I)
+_DROP_TABLE = re.compile(r'\s*DROP\s+(?:TEMPORARY\s+)?TABLE\s+(IF\s+EXISTS\s+)?(.*?)(?:\s+(?:CASCADE|RESTRICT))?\s*$', re.I | re.S)
+_START_TRANSACTION = re.compile(r'\s*START\s+TRANSACTION\b.*$', re.I | re.S)
+# Session settings and whole-database statements have no embedded counterpart
+_NO_OP = re.compile(r'\s*(?:SET|LOCK\s+TABLES|UNLOCK\s+TABLES|(?:CREATE|DROP)\s+(?:DATABASE|SCHEMA)|USE)\b', re.I)
+
+_EXPRESSIONS = [
+    (re.compile(r'\bNOW\s*\(\s*\)|\bSYSDATE\s*\(\s*\)|\b(?:CURRENT_TIMESTAMP|LOCALTIMESTAMP|LOCALTIME)\b(?:\s*\(\s*\))?', re.I), NOW_SQL),
+    (re.compile(r'\bUTC_TIMESTAMP\s*\(\s*\)', re.I), "datetime('now')"),
+    (re.compile(r'\bCURDATE\s*\(\s*\)|\bCURRENT_DATE\b(?:\s*\(\s*\))?', re.I), TODAY_SQL),
+    (re.compile(r'\bLAST_INSERT_ID\s*\(\s*\)', re.I), 'last_insert_rowid()'),
+    (re.compile(r'\bIF\s*\(', re.I), 'iif('),
+    (re.compile(r'\bINSERT\s+IGNORE\b', re.I), 'INSERT OR IGNORE'),
+    # SQLite takes the database lock for the whole write transaction instead
+    (re.compile(r'\s+(?:FOR\s+UPDATE(?:\s+(?:SKIP\s+LOCKED|NOWAIT))?|FOR\s+SHARE|LOCK\s+IN\s+SHARE\s+MODE)\b', re.I), ''),
+    (re.compile(r'%s'), '?'),
+]
+_ON_DUPLICATE_KEY = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.I)
+_VALUES_CALL = re.compile(r'\bVALUES\s*\(\s*([^()\s]+)\s*\)', re.I)
+_GROUP_CONCAT = re.compile(
+    r'\s*(DISTINCT\s+)?(.*?)(?:\s+ORDER\s+BY\s+(.*?)(?:\s+(ASC|DESC))?)?(?:\s+SEPARATOR\s+(\S+))?\s*$',
+    re.I | re.S
+)
+_INTERVAL = re.compile(
+    r'\s*INTERVAL\s+(.+?)\s+(MICROSECOND|SECOND|MINUTE|HOUR|DAY|WEEK|MONTH|QUARTER|YEAR)\s*$', re.I | re.S
+)
+
+
+def _sqlite_literal(chunk):
+    """Re-quote a MySQL string literal (backslash escapes, either quote) for SQLite"""
+    quote = chunk[0]
+    if quote == '`':
+        return chunk
+    body = chunk[1:-1].replace(quote * 2, quote)
+    if '\\' in body:
+        body = re.sub(r'\\(.)', lambda m: _BACKSLASH_ESCAPES.get(m.group(1), m.group(0)), body, flags=re.S)
+    return "'" + body.replace("'", "''") + "'"
+
+
+def _mask(sql):
+    """Statement text with literals replaced by markers and comments dropped"""
+    parts = []
+    literals = []
+    for start, end, is_code in iter_code_spans(sql):
+        chunk = sql[start:end]
+        if is_code:
+            parts.append(chunk)
+        elif chunk[0] in '\'"`':
+            parts.append(f'\x00{len(literals)}\x00')
+            literals.append(_sqlite_literal(chunk))
+        else:
+            parts.append(' ')
+    return ''.join(parts), literals
+
+
+def _unmask(text, literals):
+    return _MARKER.sub(lambda m: literals[int(m.group(1))], text).strip()
+
+
+def _identifier(token, literals):
+    """Bare name of a possibly backtick-quoted identifier"""
+    return _unmask(token, literals).strip('`"').split('.')[-1].strip('`"')
+
+
+def _matching_paren(text, open_index):
+    depth = 0
+    for i in range(open_index, len(text)):
+        if text[i] == '(':
+            depth += 1
+        elif text[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"Unbalanced parentheses in: {text.strip()[:80]}")
+
+
+def _split_args(text):
+    """Split on commas outside parentheses"""
+    args = []
+    depth = start = 0
+    for i, ch in enumerate(text):
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            args.append(text[start:i].strip())
+            start = i + 1
+    args.append(text[start:].strip())
+    return args
+
+
+def _rewrite_calls(text, name, rewrite):
+    """Replace every ``name(...)`` call, innermost first, with rewrite(args)"""
+    for match in reversed(list(re.finditer(rf'\b{name}\s*\(', text, re.I))):
+        close = _matching_paren(text, match.end() - 1)
+        text = text[:match.start()] + rewrite(text[match.end():close]) + text[close + 1:]
+    return text
+
+
+def _group_concat(args):
+    distinct, expression, order, direction, separator = _GROUP_CONCAT.match(args).groups()
+    if len(_split_args(expression)) > 1:
+        expression = f'CONCAT({expression})'
+    if order and len(_split_args(order)) > 1:
+        raise ValueError("GROUP_CONCAT supports a single ORDER BY key on SQLite")
+    descending = 1 if direction and direction.upper() == 'DESC' else 0
+    return (f"mysql_group_concat({expression}, {order or 'NULL'}, {descending}, "
+            f"{1 if distinct else 0}, {separator or repr(',')})")
+
+
+def _date_arithmetic(sign):
+    def rewrite(args):
+        value, interval = _split_args(args)
+        match = _INTERVAL.match(interval)
+        if match is None:
+            raise ValueError(f"Unsupported interval: {interval}")
+        amount, unit = match.groups()
+        return f"mysql_date_add({value}, {sign}({amount}), '{unit.upper()}')"
+    return rewrite
+
+
+def _timestampdiff(args):
+    unit, start, end = _split_args(args)
+    return f"mysql_timestampdiff('{unit.upper()}', {start}, {end})"
+
+
+def _rewrite_expressions(text):
+    """Function and clause rewrites shared by every DML statement"""
+    text = _rewrite_calls(text, 'GROUP_CONCAT', _group_concat)
+    text = _rewrite_calls(text, 'DATE_ADD', _date_arithmetic(''))
+    text = _rewrite_calls(text, 'DATE_SUB', _date_arithmetic('-'))
+    text = _rewrite_calls(text, 'TIMESTAMPDIFF', _timestampdiff)
+    for pattern, replacement in _EXPRESSIONS:
+        text = pattern.sub(replacement, text)
+    duplicate = _ON_DUPLICATE_KEY.search(text)
+    if duplicate:
+        updates = _VALUES_CALL.sub(r'excluded.\1', text[duplicate.end():])
+        text = text[:duplicate.start()] + 'ON CONFLICT DO UPDATE SET' + updates
+    return text
+
+
+def _key_columns(columns):
+    """Index column list without MySQL key prefix lengths"""
+    return _KEY_PREFIX.sub(r'\1', columns.strip())
+
+
+def _column(item, table_name):
+    """Translate one column definition; returns (definition, flags)"""
+    match = _COLUMN.match(item)
+    if match is None:
+        return item, set()
+    name, type_name, args, _sign, rest = match.groups()
+    type_name = type_name.lower()
+    flags = set()
+
+    if _AUTO_INCREMENT.search(rest):
+        rest = _INLINE_PRIMARY_KEY.sub('', _AUTO_INCREMENT.sub('', rest))
+        flags.add('auto_increment')
+    if _ON_UPDATE_NOW.search(rest):
+        rest = _ON_UPDATE_NOW.sub('', rest)
+        flags.add('on_update')
+    rest = _DEFAULT_NOW.sub(f'DEFAULT ({NOW_SQL})', rest)
+    rest = _COLUMN_NOISE.sub('', rest)
+
+    collation = ''
+    checks = []
+    if 'auto_increment' in flags:
+        declared = 'INTEGER PRIMARY KEY'
+    elif type_name in _INTEGER_TYPES:
+        declared = 'INTEGER'
+    elif type_name in _TEXT_TYPES:
+        declared = 'TEXT'
+        collation = 'COLLATE NOCASE'  # the dump's utf8mb4_0900_ai_ci compares case-insensitively
+        if type_name in _SIZED_TEXT_TYPES and args:
+            checks.append(f'length({name}) <= {args.strip("() ")}')
+        elif type_name == 'enum' and args:
+            checks.append(f'{name} IN {args}')
+    elif type_name in _REAL_TYPES:
+        declared = 'REAL'
+    elif type_name in _DECIMAL_TYPES:
+        declared = 'DECIMAL' + (args or '').replace(' ', '')
+    elif type_name in _BLOB_TYPES:
+        declared = 'BLOB'
+    elif type_name in _TEMPORAL_TYPES:
+        declared = _TEMPORAL_TYPES[type_name]
+    else:
+        raise ValueError(f"Unsupported column type {type_name!r} in table {table_name}")
+
+    parts = [name, declared, rest.strip(), collation] + [f"CHECK ({check})" for check in checks]
+    return ' '.join(part for part in parts if part), flags
+
+
+def _create_table(text, literals):
+    """CREATE TABLE plus the CREATE INDEX and CREATE TRIGGER statements it implies"""
+    match = _CREATE_TABLE.match(text)
+    if match is None:
+        return [text]  # CREATE TABLE ... LIKE / AS SELECT pass through
+    if_not_exists, table = match.group(1) or '', match.group(2)
+    table_name = _identifier(table, literals)
+    close = _matching_paren(text, match.end() - 1)
+    items = _split_args(text[match.end():close])
+
+    definitions = []
+    indexes = []
+    auto_increment = None
+    on_update = []
+    for item in items:
+        if not item:
+            continue
+        if _SKIPPED_INDEX.match(item):
+            continue
+        unique = _UNIQUE_KEY.match(item)
+        index = unique or _INDEX.match(item)
+        if index is not None:
+            key, columns = index.group(index.re.groups - 1), index.group(index.re.groups)
+            columns = _key_columns(columns)
+            key_name = _identifier(key, literals) if key else '_'.join(
+                _identifier(c.split()[0], literals) for c in _split_args(columns))
+            indexes.append(
+                f"CREATE {'UNIQUE ' if unique or index.group(1) else ''}INDEX "
+                f"{'IF NOT EXISTS ' if if_not_exists else ''}`{table_name}_{key_name}` ON {table} ({columns})"
+            )
+            continue
+        primary = _PRIMARY_KEY.match(item)
+        if primary is not None:
+            definitions.append(('primary', f"PRIMARY KEY ({_key_columns(primary.group(1))})",
+                                _split_args(primary.group(1))))
+            continue
+        if re.match(r'(?:CONSTRAINT|FOREIGN\s+KEY|CHECK|UNIQUE)\b', item, re.I):
+            definitions.append(('constraint', item, None))
+            continue
+        definition, flags = _column(item, table_name)
+        name = item.split()[0]
+        if 'auto_increment' in flags:
+            auto_increment = _identifier(name, literals)
+        if 'on_update' in flags:
+            on_update.append(name)
+        definitions.append(('column', definition, None))
+
+    body = []
+    for kind, definition, key_columns in definitions:
+        # The AUTO_INCREMENT column already became the INTEGER PRIMARY KEY rowid alias
+        if kind == 'primary' and auto_increment and [_identifier(c, literals) for c in key_columns] == [auto_increment]:
+            continue
+        body.append(definition)
+
+    statements = [f"CREATE TABLE {if_not_exists}{table} (\n  " + ',\n  '.join(body) + "\n)"]
+    statements += indexes
+    for column in on_update:
+        column_name = _identifier(column, literals)
+        statements.append(
+            f"CREATE TRIGGER {if_not_exists}`{table_name}_{column_name}_on_update` "
+            f"AFTER UPDATE ON {table} FOR EACH ROW WHEN NEW.{column} IS OLD.{column} "
+            f"BEGIN UPDATE {table} SET {column} = {NOW_SQL} WHERE rowid = NEW.rowid; END"
+        )
+    return statements
+
+
+def _translate(text, literals):
+    if _CREATE_TABLE.match(text):
+        return _create_table(text, literals)
+    checks = _FOREIGN_KEY_CHECKS.match(text)
+    if checks:
+        enabled = checks.group(1).upper() not in ('0', 'OFF', 'FALSE')
+        return [f"PRAGMA foreign_keys = {'ON' if enabled else 'OFF'}"]
+    if _NO_OP.match(text) or _ALTER_AUTO_INCREMENT.match(text):
+        return []
+    truncate = _TRUNCATE.match(text)
+    if truncate:
+        return [f"DELETE FROM {truncate.group(1)}"]
+    if _SHOW_TABLES.match(text):
+        return [SHOW_TABLES_SQL]
+    drop = _DROP_TABLE.match(text)
+    if drop:
+        if_exists = drop.group(1) or ''
+        return [f"DROP TABLE {if_exists}{table}" for table in _split_args(drop.group(2))]
+    if _START_TRANSACTION.match(text):
+        return ['BEGIN']
+    return [_rewrite_expressions(text)]
+
+
+@lru_cache(maxsize=1024)
+def translate(sql):
+    """SQLite statements equivalent to one MySQL statement (possibly none)"""
+    text, literals = _mask(sql)
+    return tuple(_unmask(statement, literals) for statement in _translate(text, literals))
+
+
+@lru_cache(maxsize=1024)
+def translate_script(script):
+    """Translate every statement of a script, e.g. the schema dump"""
+    return tuple(
+        statement
+        for mysql_statement in split_statements(script)
+        for statement in translate(mysql_statement)
+    )
+
+
+# -- Functions registered on each connection -------------------------------
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return str(value)
+
+
+def _parse_temporal(value):
+    """datetime from a stored DATE/DATETIME value (None stays None)"""
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return datetime.fromisoformat(_text(value).strip())
+
+
+def _is_date_only(value):
+    return isinstance(value, date) and not isinstance(value, datetime) or (
+        isinstance(value, (str, bytes)) and len(value.strip()) == 10)
+
+
+def _format_temporal(moment, date_only):
+    if date_only and moment.time() == time():
+        return moment.strftime('%Y-%m-%d')
+    if moment.microsecond:
+        return moment.strftime('%Y-%m-%d %H:%M:%S.%f')
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _add_months(moment, months):
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    last_day = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)).day
+    return moment.replace(year=year, month=month, day=min(moment.day, last_day))
+
+
+_UNIT_SECONDS = {
+    'MICROSECOND': 1e-6, 'SECOND': 1, 'MINUTE': 60, 'HOUR': 3600, 'DAY': 86400, 'WEEK': 604800,
+}
+_UNIT_MONTHS = {'MONTH': 1, 'QUARTER': 3, 'YEAR': 12}
+
+
+def mysql_date_add(value, amount, unit):
+    """DATE_ADD(value, INTERVAL amount unit); DATE_SUB passes a negated amount"""
+    moment = _parse_temporal(value)
+    if moment is None or amount is None:
+        return None
+    if unit in _UNIT_MONTHS:
+        moment = _add_months(moment, int(amount) * _UNIT_MONTHS[unit])
+    else:
+        moment += timedelta(seconds=float(amount) * _UNIT_SECONDS[unit])
+    return _format_temporal(moment, _is_date_only(value))
+
+
+def mysql_timestampdiff(unit, start, end):
+    """TIMESTAMPDIFF(unit, start, end), truncated toward zero like MySQL"""
+    start, end = _parse_temporal(start), _parse_temporal(end)
+    if start is None or end is None:
+        return None
+    if unit in _UNIT_MONTHS:
+        months = (end.year - start.year) * 12 + end.month - start.month
+        # A month only counts once the day of month and time of day are reached again
+        if months > 0 and (end.day, end.time()) < (start.day, start.time()):
+            months -= 1
+        elif months < 0 and (end.day, end.time()) > (start.day, start.time()):
+            months += 1
+        return int(months / _UNIT_MONTHS[unit])
+    return int((end - start).total_seconds() / _UNIT_SECONDS[unit])
+
+
+_DATE_FORMAT_SPECIFIERS = {
+    'a': lambda d: d.strftime('%a'), 'b': lambda d: d.strftime('%b'), 'c': lambda d: str(d.month),
+    'd': lambda d: f'{d.day:02d}', 'e': lambda d: str(d.day), 'f': lambda d: f'{d.microsecond:06d}',
+    'H': lambda d: f'{d.hour:02d}', 'h': lambda d: d.strftime('%I'), 'I': lambda d: d.strftime('%I'),
+    'i': lambda d: f'{d.minute:02d}', 'j': lambda d: d.strftime('%j'), 'k': lambda d: str(d.hour),
+    'l': lambda d: str(d.hour % 12 or 12), 'M': lambda d: d.strftime('%B'), 'm': lambda d: f'{d.month:02d}',
+    'p': lambda d: 'AM' if d.hour < 12 else 'PM', 'r': lambda d: d.strftime('%I:%M:%S ') + ('AM' if d.hour < 12 else 'PM'),
+    'S': lambda d: f'{d.second:02d}', 's': lambda d: f'{d.second:02d}', 'T': lambda d: d.strftime('%H:%M:%S'),
+    'W': lambda d: d.strftime('%A'), 'w': lambda d: str((d.weekday() + 1) % 7), 'Y': lambda d: f'{d.year:04d}',
+    'y': lambda d: f'{d.year % 100:02d}', '%': lambda d: '%',
+}
+
+
+def date_format(value, pattern):
+    """DATE_FORMAT(value, pattern) for the common specifiers"""
+    moment = _parse_temporal(value)
+    if moment is None or pattern is None:
+        return None
+    return re.sub(
+        r'%(.)',
+        lambda m: _DATE_FORMAT_SPECIFIERS.get(m.group(1), lambda d: m.group(1))(moment),
+        pattern
+    )
+
+
+def concat(*values):
+    """CONCAT(): NULL if any argument is NULL"""
+    if any(value is None for value in values):
+        return None
+    return ''.join(_text(value) for value in values)
+
+
+class GroupConcat:
+    """Aggregate behind mysql_group_concat(value, order_key, descending, distinct, separator)"""
+
+    def __init__(self):
+        self.items = []
+        self.descending = self.distinct = False
+        self.separator = ','
+
+    def step(self, value, order_key, descending, distinct, separator):
+        self.descending, self.distinct, self.separator = bool(descending), bool(distinct), separator
+        if value is not None:
+            self.items.append((order_key, _text(value)))
+
+    def finalize(self):
+        if not self.items:
+            return None
+        items = sorted(self.items, key=lambda item: (item[0] is not None, item[0]), reverse=self.descending)
+        values = [value for _key, value in items]
+        if self.distinct:
+            values = list(dict.fromkeys(values))
+        return self.separator.join(values)
+
+
+def register_functions(connection):
+    """Install the MySQL functions translate() relies on"""
+    connection.create_function('CONCAT', -1, concat, deterministic=True)
+    connection.create_function('DATE_FORMAT', 2, date_format, deterministic=True)
+    connection.create_function('mysql_date_add', 3, mysql_date_add, deterministic=True)
+    connection.create_function('mysql_timestampdiff', 3, mysql_timestampdiff, deterministic=True)
+    connection.create_aggregate('mysql_group_concat', 5, GroupConcat)
+
+
+# -- Values ----------------------------------------------------------------
+
+def adapt_param(value):
+    """Bind a Python value the way mysql.connector would render it"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, timedelta)):
+        return str(value)
+    return value
+
+
+def _convert_datetime(raw):
+    return datetime.fromisoformat(raw.decode('utf-8'))
+
+
+def _convert_date(raw):
+    return date.fromisoformat(raw.decode('utf-8')[:10])
+
+
+def _convert_decimal(raw):
+    return Decimal(raw.decode('utf-8'))
+
+
+# Declared column type -> converter, for sqlite3.PARSE_DECLTYPES
+CONVERTERS = {
+    'DATETIME': _convert_datetime,
+    'TIMESTAMP': _convert_datetime,
+    'DATE': _convert_date,
+    'DECIMAL': _convert_decimal,
+}
@@ -0,0 +1,142 @@
+"""
+Startup profile for the test session, as a pytest plugin.
+
+    pytest --startup-profile                               # 10 slowest per section
+    pytest --startup-profile --startup-profile-top 25 -m nodb
+
+Reports where the time before and around the tests goes: interpreter,
+pytest and plugin startup, importing each test module during collection,
+and setting up each fixture. It also says when the MySQL driver, dotenv and
+numpy were first loaded, and by which test, so a ``-m nodb`` run can be
+checked to load none of them. For a per-import breakdown use
+``python -X importtime -m pytest``.
+
+Loaded from conftest.py via ``pytest_plugins``.
+"""
+
+import sys
+import time
+
+import pytest
+
+# Imports worth keeping out of database-free runs
+HEAVY_MODULES = ('mysql.connector', 'dotenv', 'numpy')
+
+
+class StartupProfile:
+    """Timings for one pytest process, relative to pytest_configure"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # CPU time is the best clock for what ran before this plugin could
+        self.startup_cpu = time.process_time()
+        self.collection = 0.0
+        self.first_test = None
+        self.modules = {}
+        self.fixtures = {}
+        self.loaded = {}
+        self.check_imports('startup')
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def check_imports(self, where):
+        """Attribute heavy modules that appeared since the last check to where"""
+        for name in HEAVY_MODULES:
+            if name not in self.loaded and name in sys.modules:
+                self.loaded[name] = where
+
+    def add_fixture(self, name, elapsed):
+        calls, total = self.fixtures.get(name, (0, 0.0))
+        self.fixtures[name] = (calls + 1, total + elapsed)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('startup profile')
+    group.addoption('--startup-profile', action='store_true',
+                    help="report startup, module import and fixture setup times")
+    group.addoption('--startup-profile-top', type=int, default=10, metavar='N',
+                    help="slowest modules and fixtures to list in the startup profile")
+
+
+def pytest_configure(config):
+    if config.getoption('startup_profile'):
+        config._startup_profile = StartupProfile()
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_collection(session):
+    profile = getattr(session.config, '_startup_profile', None)
+    if profile is None:
+        return (yield)
+    started = time.perf_counter()
+    try:
+        return (yield)
+    finally:
+        profile.collection = time.perf_counter() - started
+        profile.check_imports('collection')
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_make_collect_report(collector):
+    profile = getattr(collector.config, '_startup_profile', None)
+    if profile is None or not isinstance(collector, pytest.Module):
+        return (yield)
+    started = time.perf_counter()
+    try:
+        return (yield)
+    finally:
+        profile.modules[collector.nodeid] = time.perf_counter() - started
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    profile = getattr(item.config, '_startup_profile', None)
+    if profile is None:
+        return (yield)
+    if profile.first_test is None:
+        profile.first_test = profile.elapsed()
+    try:
+        return (yield)
+    finally:
+        profile.check_imports(item.nodeid)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    profile = getattr(request.config, '_startup_profile', None)
+    if profile is None:
+        return (yield)
+    started = time.perf_counter()
+    try:
+        return (yield)
+    finally:
+        profile.add_fixture(fixturedef.argname, time.perf_counter() - started)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    profile = getattr(config, '_startup_profile', None)
+    if profile is None:
+        return
+    limit = config.getoption('startup_profile_top')
+    write = terminalreporter.write_line
+    terminalreporter.write_sep('=', 'startup profile')
+    write(f"  {profile.startup_cpu:8.3f}s  CPU before configure (interpreter, pytest, conftest, plugins)")
+    write(f"  {profile.collection:8.3f}s  collection ({len(profile.modules)} modules)")
+    if profile.first_test is not None:
+        write(f"  {profile.first_test:8.3f}s  until the first test started")
+
+    if limit and profile.modules:
+        write("slowest test module imports:")
+        for nodeid, elapsed in sorted(profile.modules.items(), key=lambda entry: -entry[1])[:limit]:
+            write(f"  {elapsed:8.3f}s  {nodeid}")
+    if limit and profile.fixtures:
+        write("slowest fixture setups:")
+        ranked = sorted(profile.fixtures.items(), key=lambda entry: -entry[1][1])[:limit]
+        for name, (calls, total) in ranked:
+            write(f"  {total:8.3f}s  {name} ({calls}x)")
+
+    write("heavy imports:")
+    for name in HEAVY_MODULES:
+        where = profile.loaded.get(name)
+        write(f"  {name:16} {'loaded during ' + where if where else 'not loaded'}")
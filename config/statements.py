@@ -0,0 +1,335 @@
+"""
+SQL statement compilation for TestDatabase.
+
+Tests write SQL with either ``?`` (as the Node models do) or ``%s``
+placeholders. A statement is scanned once, outside of string literals and
+comments, and the result is cached so hot loops don't re-parse it.
+"""
+
+import re
+from collections import OrderedDict, namedtuple
+
+# Leading keywords whose statements produce a result set
+ROW_RETURNING = {'SELECT', 'SHOW', 'WITH', 'EXPLAIN', 'DESCRIBE', 'DESC', 'VALUES', 'TABLE'}
+
+# Statements that never modify table data
+READ_ONLY = ROW_RETURNING | {
+    'START', 'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE',
+    'SET', 'USE', 'LOCK', 'UNLOCK', 'FLUSH', 'ANALYZE', 'CHECKSUM',
+}
+
+# Callables every TestDatabase notifies after each statement, as
+# observer(sql, params, rows, elapsed, round_trips=1, statements=1).
+# Kept here so pytest plugins can register without importing the MySQL driver.
+OBSERVERS = []
+
+CompiledStatement = namedtuple(
+    'CompiledStatement',
+    ['source', 'sql', 'param_count', 'keyword', 'returns_rows', 'written_tables']
+)
+
+
+class LRUCache:
+    """Small ordered-dict LRU with hit/miss/eviction counters"""
+
+    def __init__(self, capacity=256, on_evict=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._on_evict = on_evict
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        """Return the cached value (refreshing its recency) or None"""
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            old_key, old_value = self._items.popitem(last=False)
+            self.evictions += 1
+            if self._on_evict:
+                self._on_evict(old_key, old_value)
+
+    def pop(self, key):
+        """Remove an entry without counting it as an eviction"""
+        return self._items.pop(key, None)
+
+    def clear(self):
+        items, self._items = self._items, OrderedDict()
+        if self._on_evict:
+            for key, value in items.items():
+                self._on_evict(key, value)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._items),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _skip_quoted(sql, i, quote):
+    """Return the index just past a quoted literal starting at ``i``"""
+    n = len(sql)
+    i += 1
+    while i < n:
+        ch = sql[i]
+        if ch == '\\' and quote != '`':
+            i += 2
+            continue
+        if ch == quote:
+            if i + 1 < n and sql[i + 1] == quote:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return n
+
+
+def _skip_comment(sql, i):
+    """Return the index past a comment at ``i``, or ``i`` if there is none"""
+    n = len(sql)
+    if sql.startswith('/*', i):
+        end = sql.find('*/', i + 2)
+        return n if end == -1 else end + 2
+    if sql[i] == '#' or (sql.startswith('--', i) and (i + 2 >= n or sql[i + 2].isspace())):
+        end = sql.find('\n', i)
+        return n if end == -1 else end + 1
+    return i
+
+
+def iter_code_spans(sql):
+    """Yield ``(start, end, is_code)`` spans, separating literals/comments from code"""
+    n = len(sql)
+    i = 0
+    start = 0
+    while i < n:
+        ch = sql[i]
+        if ch in ("'", '"', '`'):
+            if start < i:
+                yield start, i, True
+            end = _skip_quoted(sql, i, ch)
+            yield i, end, False
+            i = start = end
+            continue
+        end = _skip_comment(sql, i)
+        if end != i:
+            if start < i:
+                yield start, i, True
+            yield i, end, False
+            i = start = end
+            continue
+        i += 1
+    if start < n:
+        yield start, n, True
+
+
+def leading_keyword(sql):
+    """First keyword of a statement, ignoring comments and parentheses"""
+    for start, end, is_code in iter_code_spans(sql):
+        if not is_code:
+            continue
+        words = sql[start:end].replace('(', ' ').split()
+        if words:
+            return words[0].upper()
+    return ''
+
+
+def compile_statement(sql):
+    """Translate ``?`` placeholders to ``%s`` and classify the statement"""
+    parts = []
+    param_count = 0
+    for start, end, is_code in iter_code_spans(sql):
+        chunk = sql[start:end]
+        if is_code:
+            param_count += chunk.count('?') + chunk.count('%s')
+            chunk = chunk.replace('?', '%s')
+        parts.append(chunk)
+    keyword = leading_keyword(sql)
+    return CompiledStatement(
+        source=sql,
+        sql=''.join(parts).strip(),
+        param_count=param_count,
+        keyword=keyword,
+        returns_rows=keyword in ROW_RETURNING,
+        written_tables=written_tables(sql, keyword),
+    )
+
+
+_IDENT = r'([\w$]+(?:\.[\w$]+)?)'
+_INSERT_TARGET = re.compile(
+    r'(?:INSERT|REPLACE)\s+(?:(?:LOW_PRIORITY|DELAYED|HIGH_PRIORITY|IGNORE)\s+)*(?:INTO\s+)?' + _IDENT,
+    re.IGNORECASE
+)
+_UPDATE_TARGETS = re.compile(
+    r'UPDATE\s+(?:(?:LOW_PRIORITY|IGNORE)\s+)*(.*?)\s+SET\s', re.IGNORECASE | re.DOTALL
+)
+_DELETE_TARGET = re.compile(
+    r'DELETE\s+(?:(?:LOW_PRIORITY|QUICK|IGNORE)\s+)*FROM\s+' + _IDENT + r'\s*(?:$|WHERE\s|ORDER\s|LIMIT\s|AS\s|[\w$]+\s*(?:$|WHERE\s))',
+    re.IGNORECASE
+)
+_TRUNCATE_TARGET = re.compile(r'TRUNCATE\s+(?:TABLE\s+)?' + _IDENT, re.IGNORECASE)
+_LOAD_TARGET = re.compile(r'LOAD\s+(?:DATA|XML)\b.*?\bINTO\s+TABLE\s+' + _IDENT, re.IGNORECASE | re.DOTALL)
+_JOIN_SPLIT = re.compile(
+    r',|\b(?:(?:NATURAL\s+)?(?:LEFT|RIGHT|INNER|CROSS|STRAIGHT_JOIN)\s+(?:OUTER\s+)?)?JOIN\b|\bON\b.*?(?=,|\bJOIN\b|$)',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def code_text(sql):
+    """Statement text with comments dropped, strings blanked and identifiers unquoted"""
+    parts = []
+    for start, end, is_code in iter_code_spans(sql):
+        chunk = sql[start:end]
+        if is_code:
+            parts.append(chunk)
+        elif chunk[0] == '`':
+            parts.append(chunk[1:-1].replace('``', '`'))
+        elif chunk[0] in ("'", '"'):
+            parts.append("''")
+        else:
+            parts.append(' ')
+    return ''.join(parts).strip()
+
+
+def _table_name(identifier):
+    return identifier.split('.')[-1]
+
+
+def written_tables(sql, keyword=None):
+    """Tables a statement writes to.
+
+    Returns an empty tuple for statements that don't modify data and None
+    when the targets can't be determined (DDL, procedures, multi-table
+    DELETE), in which case callers should assume any table may have changed.
+    """
+    keyword = keyword or leading_keyword(sql)
+    if keyword in READ_ONLY:
+        return ()
+    text = code_text(sql)
+    if keyword in ('INSERT', 'REPLACE'):
+        match = _INSERT_TARGET.match(text)
+    elif keyword == 'DELETE':
+        match = _DELETE_TARGET.match(text)
+    elif keyword == 'TRUNCATE':
+        match = _TRUNCATE_TARGET.match(text)
+    elif keyword == 'LOAD':
+        match = _LOAD_TARGET.match(text)
+    elif keyword == 'UPDATE':
+        targets = _UPDATE_TARGETS.match(text)
+        if not targets:
+            return None
+        names = []
+        for ref in _JOIN_SPLIT.split(targets.group(1)):
+            words = ref.replace('(', ' ').split()
+            if words:
+                names.append(_table_name(words[0]))
+        return tuple(dict.fromkeys(names)) or None
+    else:
+        return None
+    return (_table_name(match.group(1)),) if match else None
+
+
+class StatementCompiler:
+    """LRU-cached front end for compile_statement"""
+
+    def __init__(self, capacity=256):
+        self._cache = LRUCache(capacity)
+
+    def compile(self, sql):
+        compiled = self._cache.get(sql)
+        if compiled is None:
+            compiled = compile_statement(sql)
+            self._cache.put(sql, compiled)
+        return compiled
+
+    def stats(self):
+        return self._cache.stats()
+
+
+_DELIMITER = re.compile(r'DELIMITER[ \t]', re.IGNORECASE)
+
+
+def split_statements(script):
+    """Split a SQL script into statements.
+
+    Delimiters inside string literals and comments are ignored, and client
+    ``DELIMITER`` directives (used around triggers and procedures) are
+    honoured. Comment-only fragments are dropped.
+    """
+    statements = []
+    delimiter = ';'
+    current = []
+
+    def flush():
+        statement = ''.join(current).strip()
+        current.clear()
+        if leading_keyword(statement):
+            statements.append(statement)
+
+    for start, end, is_code in iter_code_spans(script):
+        chunk = script[start:end]
+        if not is_code:
+            current.append(chunk)
+            continue
+        pos = 0
+        while pos < len(chunk):
+            if not leading_keyword(''.join(current)):
+                directive = pos + len(chunk[pos:]) - len(chunk[pos:].lstrip())
+                if _DELIMITER.match(chunk, directive):
+                    line_end = chunk.find('\n', directive)
+                    line_end = len(chunk) if line_end == -1 else line_end
+                    delimiter = chunk[directive + 10:line_end].strip() or ';'
+                    current.clear()
+                    pos = line_end + 1
+                    continue
+            found = chunk.find(delimiter, pos)
+            if found == -1:
+                current.append(chunk[pos:])
+                break
+            current.append(chunk[pos:found])
+            flush()
+            pos = found + len(delimiter)
+    flush()
+    return statements
+
+
+_CREATE_TABLE = re.compile(
+    r'\s*CREATE\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[`"]?([\w$]+)[`"]?',
+    re.IGNORECASE
+)
+
+
+def created_tables(statements):
+    """Names of the tables created by a list of statements, in order"""
+    names = []
+    for statement in statements:
+        for start, end, is_code in iter_code_spans(statement):
+            if is_code and statement[start:end].strip():
+                match = _CREATE_TABLE.match(statement, start)
+                if match:
+                    names.append(match.group(1))
+                break
+    return names
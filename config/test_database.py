@@ -1,37 +1,232 @@
-import mysql.connector
-from mysql.connector import Error
+import asyncio
+import hashlib
 import os
-from dotenv import load_dotenv
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from weakref import WeakKeyDictionary
+from config.bulk_load import (
+    LOAD_DATA_MIN_ROWS,
+    build_insert_sql,
+    build_load_data_sql,
+    chunk_rows,
+    encode_tsv,
+)
+from config.db_pool import ConnectionPool
+from config.statements import (
+    OBSERVERS,
+    LRUCache,
+    StatementCompiler,
+    code_text,
+    created_tables,
+    split_statements,
+)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# First existing file wins; the last entry is the checked-in schema dump
+SCHEMA_CANDIDATES = ('database/schema.sql', 'hkpifgzax132wnez.db')
+SCHEMA_META_TABLE = '_schema_meta'
+SNAPSHOT_META_TABLE = '_snapshot_meta'
+
+# Statements a test may issue that would end a fixture's transaction
+TRANSACTION_CONTROL = {'START', 'BEGIN', 'COMMIT', 'ROLLBACK'}
+
+# MySQL error: "SAVEPOINT ... does not exist"
+ER_SP_DOES_NOT_EXIST = 1305
+
+# MySQL error: "Query execution was interrupted"
+ER_QUERY_INTERRUPTED = 1317
+
+# MySQL error: "This command is not supported in the prepared statement protocol yet"
+ER_UNSUPPORTED_PS = 1295
+
+
+class _DriverNotLoaded(Exception):
+    """Stands in for mysql.connector.Error until the driver is imported"""
+
+
+# The MySQL driver is imported when the first MySQL connection is opened, so
+# database-free runs and the SQLite backend never load it. Until then no
+# driver error can be raised, and `except Error` matches nothing.
+Error = _DriverNotLoaded
+
+
+def mysql_connector():
+    """The mysql.connector module, imported on first use"""
+    global Error
+    import mysql.connector
+    Error = mysql.connector.Error
+    return mysql.connector
+
+
+class QueryResult:
+    """Outcome of a statement that does not return rows"""
+    
+    def __init__(self, rowcount, lastrowid):
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
+    
+    @property
+    def last_row_id(self):
+        return self.lastrowid
+
+
+_settings_loaded = False
+
+
+def load_settings():
+    """Load .env into the environment, once, when the first database is created"""
+    global _settings_loaded
+    if not _settings_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _settings_loaded = True
+
+
+def _context_owner():
+    """The asyncio task running now or, outside an event loop, the thread"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task or threading.current_thread()
+
+
+class _Lease:
+    """A connection checked out implicitly by the first use in a thread or task.
+    
+    Returned to the pool by release_connection(), when the owning task
+    finishes, or when the owning thread exits and drops its context.
+    """
+    
+    def __init__(self, pool, connection):
+        self.pool = pool
+        self.connection = connection
+    
+    def release(self, *_args):
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        try:
+            # Don't hand an open transaction to the next borrower
+            if connection.in_transaction:
+                connection.rollback()
+        except Error:
+            self.pool.release(connection, discard=True)
+            return
+        self.pool.release(connection)
+    
+    def __del__(self):
+        self.release()
+
+
+def _close_cursor(_sql, cursor):
+    """Close an evicted cursor, releasing its server-side statement"""
+    if cursor is None:
+        return
+    try:
+        cursor.close()
+    except Error:
+        pass
 
-load_dotenv()
 
 class TestDatabase:
     """Isolated test database management"""
     
-    def __init__(self):
-        self.connection = None
-        self.test_db_name = os.getenv('TEST_DB_NAME', 'petcare_test')
-        self._ensure_test_database()
-        self.connect()
+    # Callables notified after each statement as
+    # observer(sql, params, rows, elapsed, round_trips=1, statements=1)
+    observers = OBSERVERS
+    
+    def __init__(self, pool_size=None, pool_timeout=None, *, db_name=None):
+        load_settings()
+        self._connection = None
+        self._database_ensured = False
+        self._max_allowed_packet = None
+        self.local_infile = os.getenv('TEST_DB_LOCAL_INFILE', '0') == '1'
+        
+        # Statement compilation and per-connection cursor caches
+        self.use_prepared = os.getenv('TEST_DB_PREPARED', '1') == '1'
+        self.prepared_cache_size = int(os.getenv('TEST_DB_STATEMENT_CACHE', '128'))
+        self.statements = StatementCompiler(capacity=max(self.prepared_cache_size * 2, 256))
+        self._prepared_cursors = WeakKeyDictionary()
+        self._text_cursors = WeakKeyDictionary()
+        self._unpreparable = set()
+        
+        # Tables written since the last cleanup, with approximate row counts
+        self._dirty_tables = {}
+        self._dirty_all = False
+        self.delete_threshold = int(os.getenv('TEST_DB_DELETE_THRESHOLD', '1000'))
+        
+        # Open transaction scopes per connection: (savepoint name or None, kind)
+        self._scopes = WeakKeyDictionary()
+        self.test_db_name = db_name or os.getenv('TEST_DB_NAME', 'petcare_test')
+        self.time_zone = os.getenv('TEST_DB_TIMEZONE', '-05:00')
+        
+        # pool_size=0 keeps the original single shared connection
+        if pool_size is None:
+            pool_size = int(os.getenv('TEST_DB_POOL_SIZE', '0'))
+        if pool_timeout is None:
+            pool_timeout = float(os.getenv('TEST_DB_POOL_TIMEOUT', '30'))
+        
+        self.pool = None
+        self._checked_out = ContextVar(f'test_db_connection_{id(self)}', default=None)
+        
+        if pool_size > 0:
+            self.pool = ConnectionPool(
+                self._open_connection,
+                max_size=pool_size,
+                min_size=1,
+                timeout=pool_timeout,
+                validate=lambda conn: conn.is_connected()
+            )
+            print(f"✅ Test database pool ready (max {pool_size} connections)")
+        else:
+            self.connect()
     
-    def _ensure_test_database(self):
+    def _connection_params(self):
+        """Connection settings shared by every connection we open"""
+        return {
+            'host': os.getenv('TEST_DB_HOST', 'localhost'),
+            'user': os.getenv('TEST_DB_USER', 'root'),
+            'password': os.getenv('TEST_DB_PASSWORD', ''),
+            'port': os.getenv('TEST_DB_PORT', '3306'),
+            'allow_local_infile': self.local_infile
+        }
+    
+    def _open_connection(self):
+        """Open a connection and run per-session setup exactly once"""
+        connection = mysql_connector().connect(
+            **self._connection_params(),
+            autocommit=False  # Use transactions for rollback
+        )
+        try:
+            self._ensure_test_database(connection)
+            connection.database = self.test_db_name
+            cursor = connection.cursor()
+            cursor.execute("SET time_zone = %s", (self.time_zone,))
+            cursor.close()
+        except Error:
+            connection.close()
+            raise
+        return connection
+    
+    def _ensure_test_database(self, connection):
         """Create test database if it doesn't exist"""
+        if self._database_ensured:
+            return
         try:
-            # Connect without specifying database
-            temp_conn = mysql.connector.connect(
-                host=os.getenv('TEST_DB_HOST', 'localhost'),
-                user=os.getenv('TEST_DB_USER', 'root'),
-                password=os.getenv('TEST_DB_PASSWORD', ''),
-                port=os.getenv('TEST_DB_PORT', '3306')
-            )
-            cursor = temp_conn.cursor()
+            cursor = connection.cursor()
             
             # Create test database
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.test_db_name}")
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{self.test_db_name}`")
             print(f"✅ Test database '{self.test_db_name}' ensured")
             
             cursor.close()
-            temp_conn.close()
+            self._database_ensured = True
             
         except Error as e:
             print(f"❌ Failed to create test database: {e}")
@@ -40,82 +235,752 @@ class TestDatabase:
     def connect(self):
         """Connect to the test database"""
         try:
-            self.connection = mysql.connector.connect(
-                host=os.getenv('TEST_DB_HOST', 'localhost'),
-                user=os.getenv('TEST_DB_USER', 'root'),
-                password=os.getenv('TEST_DB_PASSWORD', ''),
-                database=self.test_db_name,
-                port=os.getenv('TEST_DB_PORT', '3306'),
-                autocommit=False  # Use transactions for rollback
-            )
+            self._connection = self._open_connection()
             print("✅ Connected to test database")
         except Error as e:
             print(f"❌ Test database connection failed: {e}")
             raise
     
-    def initialize_schema(self):
-        """Initialize the database schema for testing"""
+    @property
+    def connection(self):
+        """Connection for the current thread or task.
+        
+        In pooled mode the first access checks a connection out of the pool
+        and pins it to the calling thread or task until release_connection()
+        or until that thread or task finishes. Child tasks and threads never
+        share their parent's connection; each checks out its own.
+        """
+        if self.pool is None:
+            return self._connection
+        owner = _context_owner()
+        pinned = self._checked_out.get()
+        if pinned is not None and pinned[0] is owner:
+            return pinned[1]
+        connection = self.pool.acquire()
+        lease = _Lease(self.pool, connection)
+        self._checked_out.set((owner, connection, lease))
+        if isinstance(owner, asyncio.Task):
+            owner.add_done_callback(lease.release)
+        return connection
+    
+    def release_connection(self):
+        """Return the current thread's or task's implicit checkout to the pool"""
+        if self.pool is None:
+            return
+        pinned = self._checked_out.get()
+        if pinned is not None and pinned[0] is _context_owner() and pinned[2] is not None:
+            self._checked_out.set(None)
+            pinned[2].release()
+    
+    @contextmanager
+    def checkout(self, timeout=None):
+        """Pin a pooled connection to the current thread or task for a block"""
+        if self.pool is None:
+            yield self._connection
+            return
+        with self.pool.connection(timeout) as connection:
+            token = self._checked_out.set((_context_owner(), connection, None))
+            try:
+                yield connection
+            finally:
+                self._checked_out.reset(token)
+                # Don't hand an open transaction to the next borrower
+                if connection.in_transaction:
+                    connection.rollback()
+    
+    def pool_stats(self):
+        """Saturation metrics for the connection pool (None when unpooled)"""
+        return self.pool.stats() if self.pool else None
+    
+    def schema_path(self):
+        """Schema source: TEST_DB_SCHEMA, database/schema.sql, or the repo's dump"""
+        configured = os.getenv('TEST_DB_SCHEMA')
+        if configured:
+            return Path(configured)
+        for candidate in SCHEMA_CANDIDATES:
+            path = REPO_ROOT / candidate
+            if path.exists():
+                return path
+        return REPO_ROOT / SCHEMA_CANDIDATES[-1]
+    
+    def initialize_schema(self, force=None):
+        """Initialize the database schema for testing.
+        
+        The schema source is fingerprinted and the hash stored in a metadata
+        table; when it matches, no DDL is replayed. Returns True if the schema
+        was (re)applied.
+        """
+        if force is None:
+            force = os.getenv('TEST_DB_FORCE_SCHEMA', '0') == '1'
+        path = self.schema_path()
+        with open(path, 'rb') as f:
+            schema_bytes = f.read()
+        fingerprint = hashlib.sha256(schema_bytes).hexdigest()
+        
+        cursor = self.connection.cursor()
         try:
-            cursor = self.connection.cursor()
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {SCHEMA_META_TABLE} ("
+                "schema_name VARCHAR(255) PRIMARY KEY, "
+                "fingerprint CHAR(64) NOT NULL, "
+                "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            )
+            cursor.execute(
+                f"SELECT fingerprint FROM {SCHEMA_META_TABLE} WHERE schema_name = %s",
+                (path.name,)
+            )
+            row = cursor.fetchone()
+            if row and row[0] == fingerprint and not force:
+                print(f"✅ Test database schema unchanged ({fingerprint[:12]}), skipping DDL")
+                return False
             
-            # Read and execute schema file
-            with open('database/schema.sql', 'r') as f:
-                schema_sql = f.read()
+            statements = split_statements(schema_bytes.decode('utf-8'))
+            tables = created_tables(statements)
             
-            # Split by semicolon and execute each statement
-            for statement in schema_sql.split(';'):
-                if statement.strip():
-                    cursor.execute(statement)
+            # Rebuild the schema's tables from scratch so CREATE TABLE can't collide
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            if tables:
+                cursor.execute("DROP TABLE IF EXISTS " + ', '.join(f"`{t}`" for t in tables))
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
             
+            cursor.execute(
+                f"REPLACE INTO {SCHEMA_META_TABLE} (schema_name, fingerprint) VALUES (%s, %s)",
+                (path.name, fingerprint)
+            )
             self.connection.commit()
-            cursor.close()
-            print("✅ Test database schema initialized")
+            print(f"✅ Test database schema initialized from {path.name} ({len(statements)} statements)")
+            return True
             
         except Error as e:
             self.connection.rollback()
             print(f"❌ Failed to initialize schema: {e}")
             raise
+        finally:
+            cursor.close()
     
-    def cleanup_database(self):
-        """Clean all test data (truncate all tables)"""
+    @contextmanager
+    def named_lock(self, name, timeout=120):
+        """Server-wide advisory lock, used to coordinate parallel workers"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (name, timeout))
+            if cursor.fetchone()[0] != 1:
+                raise TimeoutError(f"Could not acquire lock '{name}' within {timeout}s")
+            try:
+                yield
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (name,))
+                cursor.fetchone()
+        finally:
+            cursor.close()
+    
+    def clone_from(self, template_name):
+        """Replace this database's tables with copies of a template database.
+        
+        Uses SHOW CREATE TABLE (unlike CREATE TABLE ... LIKE it keeps foreign
+        keys) and copies any template rows, including the schema fingerprint,
+        so initialize_schema() on the clone is a no-op.
+        """
         try:
             cursor = self.connection.cursor()
-            
-            # Disable foreign key checks
-            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
-            
-            # Get all tables
-            cursor.execute("SHOW TABLES")
+            cursor.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = %s AND table_type = 'BASE TABLE'",
+                (template_name,)
+            )
             tables = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SHOW TABLES")
+            existing = [row[0] for row in cursor.fetchall()]
             
-            # Truncate all tables
+            statements = ["SET FOREIGN_KEY_CHECKS = 0"]
+            if existing:
+                statements.append("DROP TABLE IF EXISTS " + ', '.join(f"`{t}`" for t in existing))
             for table in tables:
-                cursor.execute(f"TRUNCATE TABLE {table}")
-                print(f"✅ Cleared table: {table}")
+                cursor.execute(f"SHOW CREATE TABLE `{template_name}`.`{table}`")
+                statements.append(cursor.fetchone()[1])
+                statements.append(f"INSERT INTO `{table}` SELECT * FROM `{template_name}`.`{table}`")
+            statements.append("SET FOREIGN_KEY_CHECKS = 1")
             
-            # Re-enable foreign key checks
-            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+            self._execute_batch(cursor, statements)
+            self.connection.commit()
+            cursor.close()
+            self._dirty_tables.clear()
+            self._dirty_all = False
+            print(f"✅ Cloned {len(tables)} tables from '{template_name}' into '{self.test_db_name}'")
             
+        except Error as e:
+            self.connection.rollback()
+            print(f"❌ Failed to clone test database: {e}")
+            raise
+    
+    def drop_database(self):
+        """Drop this test database (used for per-worker databases)"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{self.test_db_name}`")
+            print(f"✅ Dropped test database '{self.test_db_name}'")
+        finally:
+            cursor.close()
+    
+    def mark_dirty(self, *tables, rows=0):
+        """Record writes made outside query(); no tables means 'assume everything'"""
+        if not tables:
+            self._dirty_all = True
+            return
+        for table in tables:
+            self._dirty_tables[table] = self._dirty_tables.get(table, 0) + max(rows, 0)
+    
+    def dirty_tables(self):
+        """Tables written since the last cleanup (None if unknown)"""
+        return None if self._dirty_all else sorted(self._dirty_tables)
+    
+    def cleanup_database(self, full=False):
+        """Clear tables written since the last cleanup in a single round trip.
+        
+        Tables that saw only a few rows are emptied with DELETE and an
+        AUTO_INCREMENT reset, which is cheaper than TRUNCATE rebuilding the
+        table. Writes made through raw cursors bypass query() and are not
+        tracked: record them with mark_dirty(), or pass full=True to clear
+        every table.
+        """
+        try:
+            cursor = self.connection.cursor()
+            
+            if full or self._dirty_all:
+                cursor.execute("SHOW TABLES")
+                rows_written = {row[0]: None for row in cursor.fetchall()}
+            else:
+                rows_written = dict(self._dirty_tables)
+            rows_written.pop(SCHEMA_META_TABLE, None)
+            
+            if not rows_written:
+                cursor.close()
+                print("✅ Test database already clean")
+                return []
+            
+            statements = ["SET FOREIGN_KEY_CHECKS = 0"]
+            statements += self._clear_statements(rows_written, reset_auto_increment=True)
+            statements.append("SET FOREIGN_KEY_CHECKS = 1")
+            
+            self._execute_batch(cursor, statements)
             self.connection.commit()
             cursor.close()
-            print("✅ Test database cleaned up")
+            self._dirty_tables.clear()
+            self._dirty_all = False
+            print(f"✅ Test database cleaned up ({len(rows_written)} tables)")
+            return sorted(rows_written)
             
         except Error as e:
             self.connection.rollback()
             print(f"❌ Failed to clean database: {e}")
             raise
     
-    def query(self, sql, params=None):
-        """Execute query and return results"""
-        cursor = self.connection.cursor(dictionary=True)
+    def _clear_statements(self, rows_by_table, reset_auto_increment=False):
+        """DELETE small tables, TRUNCATE large or unknown-size ones"""
+        statements = []
+        for table, rows in sorted(rows_by_table.items()):
+            if rows is not None and rows <= self.delete_threshold:
+                statements.append(f"DELETE FROM `{table}`")
+                if reset_auto_increment:
+                    statements.append(f"ALTER TABLE `{table}` AUTO_INCREMENT = 1")
+            else:
+                statements.append(f"TRUNCATE TABLE `{table}`")
+        return statements
+    
+    def _snapshot_schema(self, name):
+        return f"{self.test_db_name}_snap_{name}"
+    
+    def _schema_fingerprint(self):
+        rows = self.query(f"SELECT fingerprint FROM {SCHEMA_META_TABLE} ORDER BY schema_name LIMIT 1")
+        return rows[0]['fingerprint'] if rows else ''
+    
+    def _snapshot_tables(self, name, version):
+        """Row counts of a snapshot, or None if missing or stale"""
+        schema = self._snapshot_schema(name)
+        exists = self.query(
+            "SELECT 1 FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+            [schema, SNAPSHOT_META_TABLE]
+        )
+        if not exists:
+            return None
+        rows = self.query(
+            f"SELECT table_name, row_count, version, schema_fingerprint FROM `{schema}`.{SNAPSHOT_META_TABLE}"
+        )
+        fingerprint = self._schema_fingerprint()
+        if not rows or any(r['version'] != str(version) or r['schema_fingerprint'] != fingerprint for r in rows):
+            return None
+        return {r['table_name']: r['row_count'] for r in rows}
+    
+    def create_snapshot(self, name, seed, version='1'):
+        """Seed a dataset once and store a copy of it in a template schema.
+        
+        seed(db) runs against a freshly cleaned working database. Every
+        table it leaves non-empty is copied into <db>_snap_<name>, tagged
+        with version and the schema fingerprint so edits to either rebuild it.
+        This truncates and commits, so it refuses to run inside a transaction
+        scope; call it from a session- or module-scoped fixture.
+        """
+        self._require_no_scope('create_snapshot')
+        schema = self._snapshot_schema(name)
+        self.cleanup_database(full=True)
+        seed(self)
+        self.connection.commit()
+        
+        cursor = self.connection.cursor()
         try:
-            cursor.execute(sql, params or ())
-            if sql.strip().upper().startswith('SELECT'):
-                return cursor.fetchall()
+            cursor.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = %s AND table_type = 'BASE TABLE' AND table_name <> %s",
+                (self.test_db_name, SCHEMA_META_TABLE)
+            )
+            tables = [row[0] for row in cursor.fetchall()]
+            counts = {}
+            for table in tables:
+                cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
+                rows = cursor.fetchone()[0]
+                if rows:
+                    counts[table] = rows
+            
+            fingerprint = self._schema_fingerprint()
+            statements = [
+                f"DROP DATABASE IF EXISTS `{schema}`",
+                f"CREATE DATABASE `{schema}`",
+                f"CREATE TABLE `{schema}`.{SNAPSHOT_META_TABLE} ("
+                "table_name VARCHAR(64) PRIMARY KEY, row_count INT NOT NULL, "
+                "version VARCHAR(64) NOT NULL, schema_fingerprint CHAR(64) NOT NULL)",
+            ]
+            for table, rows in counts.items():
+                statements.append(f"CREATE TABLE `{schema}`.`{table}` LIKE `{table}`")
+                statements.append(f"INSERT INTO `{schema}`.`{table}` SELECT * FROM `{table}`")
+            self._execute_batch(cursor, statements)
+            cursor.executemany(
+                f"INSERT INTO `{schema}`.{SNAPSHOT_META_TABLE} VALUES (%s, %s, %s, %s)",
+                [(table, rows, str(version), fingerprint) for table, rows in counts.items()]
+            )
+            self.connection.commit()
+        finally:
+            cursor.close()
+        
+        self._dirty_tables.update(counts)
+        print(f"✅ Snapshot '{name}' created ({sum(counts.values())} rows in {len(counts)} tables)")
+        return counts
+    
+    def restore_snapshot(self, name, version='1'):
+        """Reset the working database to a snapshot in one round trip.
+        
+        Clears the snapshot's tables plus anything written since the last
+        cleanup, then refills them with INSERT ... SELECT from the template
+        schema. Small tables are emptied with DELETE so a restore inside a
+        test transaction is rolled back with it.
+        """
+        counts = self._snapshot_tables(name, version)
+        if counts is None:
+            raise LookupError(f"Snapshot '{name}' (version {version}) does not exist or is stale")
+        schema = self._snapshot_schema(name)
+        
+        if self._dirty_all:
+            cursor = self.connection.cursor()
+            cursor.execute("SHOW TABLES")
+            to_clear = {row[0]: None for row in cursor.fetchall()}
+            cursor.close()
+        else:
+            to_clear = dict(self._dirty_tables)
+        to_clear.pop(SCHEMA_META_TABLE, None)
+        for table, rows in counts.items():
+            if table not in to_clear:
+                to_clear[table] = rows
+            elif to_clear[table] is not None:
+                to_clear[table] += rows
+        
+        statements = ["SET FOREIGN_KEY_CHECKS = 0"]
+        statements += self._clear_statements(to_clear)
+        statements += [
+            f"INSERT INTO `{table}` SELECT * FROM `{schema}`.`{table}`" for table in counts
+        ]
+        statements.append("SET FOREIGN_KEY_CHECKS = 1")
+        
+        cursor = self.connection.cursor()
+        try:
+            self._execute_batch(cursor, statements)
+        finally:
+            cursor.close()
+        
+        # Only the snapshot's own rows are present now
+        self._dirty_tables = dict(counts)
+        self._dirty_all = False
+        return counts
+    
+    def ensure_snapshot(self, name, seed, version='1'):
+        """Create a snapshot unless an up-to-date one already exists"""
+        counts = self._snapshot_tables(name, version)
+        if counts is None:
+            counts = self.create_snapshot(name, seed, version)
+        return counts
+    
+    def snapshot(self, name, seed, version='1'):
+        """Restore a named dataset, seeding it first if it doesn't exist yet"""
+        self.ensure_snapshot(name, seed, version)
+        return self.restore_snapshot(name, version)
+    
+    def drop_snapshot(self, name):
+        """Remove a snapshot's template schema"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{self._snapshot_schema(name)}`")
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _execute_batch(cursor, statements):
+        """Send several statements to the server in one round trip"""
+        script = ';\n'.join(statements)
+        try:
+            # mysql-connector-python < 9.2
+            for _ in cursor.execute(script, multi=True):
+                pass
+        except TypeError:
+            cursor.execute(script)
+            while cursor.nextset():
+                pass
+    
+    def _require_no_scope(self, operation):
+        """Refuse to commit underneath an open fixture transaction"""
+        if self._scopes.get(self.connection):
+            raise RuntimeError(
+                f"{operation}() commits and would end the open test transaction; "
+                "call it from a session- or module-scoped fixture instead"
+            )
+    
+    def _scope_stack(self, connection=None):
+        connection = connection or self.connection
+        stack = self._scopes.get(connection)
+        if stack is None:
+            stack = self._scopes[connection] = []
+        return stack
+    
+    def _run_control(self, connection, sql):
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+    
+    def begin_scope(self, kind='fixture'):
+        """Open a transaction scope; nested scopes become SAVEPOINTs.
+        
+        Returns the new nesting depth. Each scope is undone by rollback_scope(),
+        so data seeded in an outer (module/class) scope survives per-test rollbacks.
+        """
+        connection = self.connection
+        stack = self._scope_stack(connection)
+        if not stack and not connection.in_transaction:
+            connection.start_transaction()
+            stack.append((None, kind))
+        else:
+            name = f"scope_{len(stack) + 1}"
+            self._run_control(connection, f"SAVEPOINT {name}")
+            stack.append((name, kind))
+        return len(stack)
+    
+    def rollback_scope(self, kind='fixture'):
+        """Undo everything since the innermost begin_scope() and close it.
+        
+        Scopes a test opened with START TRANSACTION and never closed are
+        unwound along with the fixture's own scope.
+        """
+        connection = self.connection
+        stack = self._scope_stack(connection)
+        while kind == 'fixture' and stack and stack[-1][1] == 'statement':
+            stack.pop()
+        if not stack:
+            connection.rollback()
+            return
+        name, _kind = stack.pop()
+        if name is None:
+            connection.rollback()
+            return
+        try:
+            self._run_control(connection, f"ROLLBACK TO SAVEPOINT {name}")
+            self._run_control(connection, f"RELEASE SAVEPOINT {name}")
+        except Exception as e:
+            if not self._savepoint_lost(e):
+                raise
+            # DDL or TRUNCATE committed implicitly and dropped every savepoint
+            print(f"⚠️ Savepoint {name} was lost to an implicit commit; rolling back fully")
+            stack.clear()
+            connection.rollback()
+    
+    @staticmethod
+    def _savepoint_lost(error):
+        """True if error says the savepoint no longer exists"""
+        return isinstance(error, Error) and error.errno == ER_SP_DOES_NOT_EXIST
+    
+    @contextmanager
+    def scope(self):
+        """Context manager form of begin_scope()/rollback_scope()"""
+        self.begin_scope()
+        try:
+            yield self
+        finally:
+            self.rollback_scope()
+    
+    def _nested_transaction_control(self, connection, stack, statement):
+        """Map a test's own START/COMMIT/ROLLBACK onto savepoints"""
+        words = code_text(statement.sql).upper().split()
+        if statement.keyword == 'ROLLBACK' and 'TO' in words[1:3]:
+            return None  # explicit ROLLBACK TO SAVEPOINT passes through
+        
+        if statement.keyword in ('START', 'BEGIN'):
+            self.begin_scope(kind='statement')
+        elif stack[-1][1] == 'statement':
+            name = stack[-1][0]
+            if statement.keyword == 'ROLLBACK':
+                self.rollback_scope(kind='statement')
+            else:
+                stack.pop()
+                self._run_control(connection, f"RELEASE SAVEPOINT {name}")
+        elif statement.keyword == 'ROLLBACK':
+            # Bare ROLLBACK undoes the test's work but keeps the fixture scope open
+            name = stack[-1][0]
+            if name is None:
+                connection.rollback()
+                connection.start_transaction()
             else:
-                return cursor
+                self._run_control(connection, f"ROLLBACK TO SAVEPOINT {name}")
+        # A bare COMMIT inside a fixture scope is a no-op: the fixture owns the transaction
+        return QueryResult(0, None)
+    
+    def query(self, sql, params=None):
+        """Execute query and return results.
+        
+        Row-returning statements give a list of dicts; anything else gives a
+        QueryResult with rowcount/lastrowid. Parameterised statements run as
+        server-side prepared statements cached per connection.
+        """
+        statement = self.statements.compile(sql)
+        params = tuple(params or ())
+        connection = self.connection
+        
+        stack = self._scopes.get(connection)
+        if stack and statement.keyword in TRANSACTION_CONTROL:
+            handled = self._nested_transaction_control(connection, stack, statement)
+            if handled is not None:
+                return handled
+        
+        started = time.perf_counter()
+        result = self._execute(connection, statement, params)
+        if self.observers:
+            self._notify(sql, params, result, time.perf_counter() - started)
+        if statement.written_tables is None:
+            self._dirty_all = True
+        elif statement.written_tables:
+            self.mark_dirty(*statement.written_tables, rows=getattr(result, 'rowcount', 0))
+        return result
+    
+    def _notify(self, sql, params, result, elapsed, round_trips=1, statements=1):
+        rows = len(result) if isinstance(result, list) else max(getattr(result, 'rowcount', 0), 0)
+        for observer in self.observers:
+            observer(sql, params, rows, elapsed, round_trips=round_trips, statements=statements)
+    
+    def _execute(self, connection, statement, params):
+        """Run a compiled statement, preferring the prepared-statement path"""
+        if params and self.use_prepared and statement.sql not in self._unpreparable:
+            try:
+                return self._execute_prepared(connection, statement, params)
+            except Error as e:
+                if e.errno != ER_UNSUPPORTED_PS:
+                    raise
+                self._unpreparable.add(statement.sql)
+        
+        cursor = self._text_cursors.get(connection)
+        if cursor is None:
+            cursor = connection.cursor(dictionary=True, buffered=True)
+            self._text_cursors[connection] = cursor
+        cursor.execute(statement.sql, params or None)
+        if cursor.with_rows:
+            return cursor.fetchall()
+        return QueryResult(cursor.rowcount, cursor.lastrowid)
+    
+    def _execute_prepared(self, connection, statement, params):
+        """Run a statement through the connection's prepared-cursor LRU"""
+        cache = self._prepared_cursors.get(connection)
+        if cache is None:
+            cache = LRUCache(self.prepared_cache_size, on_evict=_close_cursor)
+            self._prepared_cursors[connection] = cache
+        
+        cursor = cache.get(statement.sql)
+        if cursor is None:
+            cursor = connection.cursor(prepared=True)
+            cache.put(statement.sql, cursor)
+        try:
+            cursor.execute(statement.sql, params)
+            if cursor.with_rows:
+                columns = cursor.column_names
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            return QueryResult(cursor.rowcount, cursor.lastrowid)
+        except Error:
+            # A failed execute can leave the handle unusable; prepare afresh next time
+            _close_cursor(statement.sql, cache.pop(statement.sql))
+            raise
+    
+    def statement_stats(self):
+        """Hit/miss counters for the statement compiler and prepared-statement cache"""
+        caches = list(self._prepared_cursors.values())
+        prepared = {
+            'size': sum(len(c) for c in caches),
+            'hits': sum(c.hits for c in caches),
+            'misses': sum(c.misses for c in caches),
+            'evictions': sum(c.evictions for c in caches),
+        }
+        lookups = prepared['hits'] + prepared['misses']
+        prepared['hit_rate'] = prepared['hits'] / lookups if lookups else 0.0
+        prepared['unpreparable'] = len(self._unpreparable)
+        return {'compiled': self.statements.stats(), 'prepared': prepared}
+    
+    def max_allowed_packet(self):
+        """Server packet limit, read once and cached"""
+        if self._max_allowed_packet is None:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("SELECT @@max_allowed_packet")
+                self._max_allowed_packet = int(cursor.fetchone()[0])
+            finally:
+                cursor.close()
+        return self._max_allowed_packet
+    
+    def bulk_insert(self, table, columns, rows, method='auto', ignore=False):
+        """Insert many rows with as few round trips as possible.
+        
+        method is one of 'auto', 'multi_row', 'executemany' or 'load_data'.
+        rows may be any iterable (including a generator) and is consumed in
+        chunks sized to fit max_allowed_packet. Returns the inserted row count.
+        """
+        columns = list(columns)
+        if method == 'auto':
+            method = self._pick_bulk_method(rows)
+        
+        if method == 'load_data':
+            return self._bulk_load_data(table, columns, rows, ignore)
+        if method not in ('multi_row', 'executemany'):
+            raise ValueError(f"Unknown bulk insert method: {method}")
+        
+        header = build_insert_sql(table, columns, 0, ignore)
+        max_bytes = self.max_allowed_packet()
+        inserted = 0
+        cursor = self.connection.cursor()
+        try:
+            for chunk in chunk_rows(rows, max_bytes, len(header)):
+                started = time.perf_counter()
+                if method == 'executemany':
+                    sql = build_insert_sql(table, columns, 1, ignore)
+                    cursor.executemany(sql, chunk)
+                else:
+                    sql = build_insert_sql(table, columns, len(chunk), ignore)
+                    cursor.execute(sql, [value for row in chunk for value in row])
+                inserted += cursor.rowcount
+                if self.observers:
+                    statements = len(chunk) if method == 'executemany' else 1
+                    result = QueryResult(cursor.rowcount, None)
+                    self._notify(sql, None, result, time.perf_counter() - started, statements=statements)
+        finally:
+            cursor.close()
+            self.mark_dirty(table, rows=inserted)
+        return inserted
+    
+    def _pick_bulk_method(self, rows):
+        """Choose LOAD DATA only for large loads when the server allows it"""
+        if hasattr(rows, '__len__') and len(rows) < LOAD_DATA_MIN_ROWS:
+            return 'multi_row'
+        if self.local_infile and self.query_one("SELECT @@local_infile AS enabled")['enabled']:
+            return 'load_data'
+        return 'multi_row'
+    
+    def _bulk_load_data(self, table, columns, rows, ignore):
+        """Spool rows to a temp file and load them with LOAD DATA LOCAL INFILE"""
+        if not self.local_infile:
+            raise ValueError("LOAD DATA requires TEST_DB_LOCAL_INFILE=1")
+        
+        # mysql.connector only streams LOCAL INFILE from a path, so rows are
+        # written out in bounded chunks instead of being held in memory
+        with tempfile.NamedTemporaryFile(suffix='.tsv', delete=False) as spool:
+            for chunk in chunk_rows(rows, 16 * 1024 * 1024):
+                spool.write(encode_tsv(chunk))
+        cursor = self.connection.cursor()
+        try:
+            sql = build_load_data_sql(spool.name, table, columns, ignore)
+            started = time.perf_counter()
+            cursor.execute(sql)
+            if self.observers:
+                self._notify(sql, None, QueryResult(cursor.rowcount, None), time.perf_counter() - started)
+            return cursor.rowcount
         finally:
             cursor.close()
+            os.unlink(spool.name)
+            # LOAD DATA row counts are large by definition, so TRUNCATE on cleanup
+            self.mark_dirty(table, rows=self.delete_threshold + 1)
+    
+    def iter_query(self, sql, params=None, batch_size=10000, row_format='dict'):
+        """Stream a large result set in batches without buffering it client-side.
+        
+        Uses an unbuffered cursor on the caller's connection, so rows are read
+        off the socket one batch at a time and the scan sees the caller's
+        uncommitted writes. row_format is 'dict', 'tuple' or 'numpy' (a record
+        array per batch). The connection is busy until the generator ends;
+        closing it early cancels the statement instead of reading the rest.
+        """
+        if row_format not in ('dict', 'tuple', 'numpy'):
+            raise ValueError(f"Unknown row_format: {row_format}")
+        if row_format == 'numpy':
+            import numpy as np
+        
+        statement = self.statements.compile(sql)
+        connection = self.connection
+        cursor = connection.cursor(buffered=False, dictionary=row_format == 'dict')
+        finished = False
+        streamed = batches = 0
+        started = time.perf_counter()
+        try:
+            cursor.execute(statement.sql, tuple(params or ()) or None)
+            columns = cursor.column_names
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                streamed += len(rows)
+                batches += 1
+                if row_format == 'numpy':
+                    yield np.rec.fromrecords(rows, names=columns)
+                else:
+                    yield rows
+            finished = True
+        finally:
+            if not finished and connection.unread_result:
+                self._cancel_streaming(connection)
+            cursor.close()
+            if self.observers:
+                # Time includes the consumer's work between batches
+                result = QueryResult(streamed, None)
+                self._notify(sql, params, result, time.perf_counter() - started, round_trips=max(batches, 1))
+    
+    def _cancel_streaming(self, connection):
+        """Stop a half-read result: KILL QUERY from a side connection, then discard what was sent"""
+        try:
+            side = mysql_connector().connect(**self._connection_params())
+            try:
+                cursor = side.cursor()
+                cursor.execute("KILL QUERY %s", (connection.connection_id,))
+                cursor.close()
+            finally:
+                side.close()
+        except Error as e:
+            print(f"⚠️ Could not cancel the streaming query, reading the rest instead: {e}")
+        try:
+            connection.consume_results()
+        except Error as e:
+            if e.errno != ER_QUERY_INTERRUPTED:
+                raise
     
     def query_one(self, sql, params=None):
         """Execute query and return single result"""
@@ -124,6 +989,16 @@ class TestDatabase:
     
     def close(self):
         """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        for cache in list(self._prepared_cursors.values()):
+            cache.clear()
+        for cursor in list(self._text_cursors.values()):
+            _close_cursor(None, cursor)
+        self._prepared_cursors.clear()
+        self._text_cursors.clear()
+        if self.pool is not None:
+            self.release_connection()
+            self.pool.close()
+            print("✅ Test database pool closed")
+        elif self._connection and self._connection.is_connected():
+            self._connection.close()
             print("✅ Test database connection closed")
\ No newline at end of file
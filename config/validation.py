@@ -0,0 +1,316 @@
+"""
+Column-at-a-time validation of users, pets and tasks.
+
+The rules live in config/validation-rules.json, which the Node models read
+as well, so tests and imports check exactly what the app enforces. Each
+entity's rules are compiled once into a Validator that checks whole columns
+(NumPy arrays, lists, or CSV chunks) in one pass and reports every failing
+field of every row.
+
+    report = validator('pets').validate({'name': names, 'age': ages, ...})
+    validator('tasks').check({'title': 'Walk', 'priority': 'urgent'})  # ValueError
+
+    python -m config.validation pets seed-data/pets.csv
+    python -m config.validation tasks seed-data/tasks.csv --skip due_date
+"""
+
+import argparse
+import csv
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+RULES_FILE = Path(__file__).resolve().parent / 'validation-rules.json'
+
+# CsvSink and LOAD DATA write NULL as \N
+CSV_NULL = '\\N'
+
+
+@lru_cache(maxsize=None)
+def load_rules(path=RULES_FILE):
+    """{entity: {field: rule}} from the shared rules file"""
+    with open(path) as f:
+        return json.load(f)
+
+
+class _Memo(dict):
+    """Caches a predicate per distinct value, so repeated values are checked once"""
+
+    def __init__(self, predicate):
+        super().__init__()
+        self.predicate = predicate
+
+    def __missing__(self, value):
+        result = self[value] = self.predicate(value)
+        return result
+
+
+def _text_predicate(rule):
+    pattern = re.compile(rule['pattern']) if 'pattern' in rule else None
+    min_length = rule.get('min_length', 0)
+    max_length = rule.get('max_length')
+    strip = rule.get('strip', True)
+    required = rule.get('required', True)
+
+    def valid(value):
+        if value is None or value == '':
+            return not required
+        if not isinstance(value, str):
+            return False
+        text = value.strip() if strip else value
+        if not text and not required:
+            return True
+        if len(text) < min_length or (max_length is not None and len(text) > max_length):
+            return False
+        return pattern is None or pattern.fullmatch(text) is not None
+
+    return valid
+
+
+def _choice_predicate(rule):
+    choices = frozenset(rule['choices'])
+    required = rule.get('required', True)
+    return lambda value: value in choices or (value is None and not required)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _as_float(values):
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return np.fromiter(map(_to_float, values), dtype=float, count=len(values))
+
+
+def _to_datetime(value):
+    if value is None:
+        return np.datetime64('NaT', 's')
+    try:
+        return np.datetime64(value, 's')
+    except (TypeError, ValueError):
+        return np.datetime64('NaT', 's')
+
+
+def _as_datetime(values):
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+        return values.astype('datetime64[s]')
+    try:
+        return np.asarray(values, dtype='datetime64[s]')
+    except (TypeError, ValueError):
+        return np.array([_to_datetime(value) for value in values], dtype='datetime64[s]')
+
+
+class FieldCheck:
+    """One compiled rule: maps a column to a boolean mask of valid rows"""
+
+    def __init__(self, field, rule):
+        self.field = field
+        self.rule = rule
+        self.kind = rule['type']
+        self.message = rule['message']
+        self.required = rule.get('required', True)
+        if self.kind == 'text':
+            self._predicate = _text_predicate(rule)
+        elif self.kind == 'choice':
+            self._predicate = _choice_predicate(rule)
+        elif self.kind not in ('number', 'datetime'):
+            raise ValueError(f"Unknown rule type '{self.kind}' for {field}")
+
+    def __call__(self, values, now):
+        if self.kind == 'choice' and isinstance(values, np.ndarray) and values.dtype.kind == 'U':
+            return np.isin(values, self.rule['choices'])
+        if self.kind in ('text', 'choice'):
+            if isinstance(values, np.ndarray):
+                values = values.tolist()  # plain str hashes and compares faster than np.str_
+            memo = _Memo(self._predicate)
+            return np.fromiter(map(memo.__getitem__, values), dtype=bool, count=len(values))
+        if self.kind == 'number':
+            return self._numbers(_as_float(values))
+        return self._datetimes(_as_datetime(values), now)
+
+    def _numbers(self, numbers):
+        rule = self.rule
+        valid = ~np.isnan(numbers)
+        if 'exclusive_min' in rule:
+            valid &= numbers > rule['exclusive_min']
+        if 'min' in rule:
+            valid &= numbers >= rule['min']
+        if 'max' in rule:
+            valid &= numbers <= rule['max']
+        if not self.required:
+            valid |= np.isnan(numbers)
+        return valid
+
+    def _datetimes(self, stamps, now):
+        valid = ~np.isnat(stamps)
+        if self.rule.get('future'):
+            valid &= stamps > now
+        if 'max_days_ahead' in self.rule:
+            valid &= stamps <= now + np.timedelta64(self.rule['max_days_ahead'], 'D')
+        if not self.required:
+            valid |= np.isnat(stamps)
+        return valid
+
+
+class ValidationReport:
+    """Failing rows of one validated batch, by field"""
+
+    def __init__(self, size, failures, messages, offset=0):
+        self.size = size
+        self.offset = offset
+        self.failures = failures
+        self.messages = messages
+
+    @property
+    def valid(self):
+        """Boolean mask of rows that passed every rule"""
+        mask = np.ones(self.size, dtype=bool)
+        for rows in self.failures.values():
+            mask[rows] = False
+        return mask
+
+    @property
+    def invalid_rows(self):
+        return self.size - int(self.valid.sum())
+
+    @property
+    def error_count(self):
+        return sum(len(rows) for rows in self.failures.values())
+
+    def errors(self):
+        """[(row, [(field, message), ...]), ...] ordered by row, rows numbered from offset"""
+        by_row = {}
+        for field, rows in self.failures.items():
+            for row in rows.tolist():
+                by_row.setdefault(row, []).append((field, self.messages[field]))
+        return [(row + self.offset, by_row[row]) for row in sorted(by_row)]
+
+    def counts(self):
+        """Failures per field"""
+        return {field: len(rows) for field, rows in self.failures.items()}
+
+
+class Validator:
+    """An entity's rules, compiled once"""
+
+    def __init__(self, entity, rules, skip=()):
+        self.entity = entity
+        self.checks = [FieldCheck(field, rule) for field, rule in rules.items() if field not in skip]
+
+    def validate(self, columns, now=None, offset=0):
+        """Check every row of {field: values}; all columns must have the same length.
+
+        A required field without a column fails on every row.
+        """
+        size = len(next(iter(columns.values()))) if columns else 0
+        now = np.datetime64(now or datetime.now(), 's')
+        failures, messages = {}, {}
+        for check in self.checks:
+            values = columns.get(check.field)
+            if values is None:
+                if not check.required:
+                    continue
+                bad = np.arange(size)
+            else:
+                bad = np.flatnonzero(~check(values, now))
+            messages[check.field] = check.message
+            if len(bad):
+                failures[check.field] = bad
+        return ValidationReport(size, failures, messages, offset)
+
+    def validate_rows(self, rows, now=None, offset=0):
+        """Check a list of dicts"""
+        columns = {check.field: [row.get(check.field) for row in rows] for check in self.checks}
+        return self.validate(columns, now=now, offset=offset)
+
+    def errors(self, record, now=None):
+        """Messages for one record, checking only the fields it has"""
+        present = {field: [value] for field, value in record.items()}
+        checks = [check for check in self.checks if check.field in present]
+        now = np.datetime64(now or datetime.now(), 's')
+        return [check.message for check in checks if not check(present[check.field], now)[0]]
+
+    def check(self, record, now=None):
+        """Raise ValueError with the first failing rule's message, as the models do"""
+        errors = self.errors(record, now)
+        if errors:
+            raise ValueError(errors[0])
+
+
+@lru_cache(maxsize=None)
+def validator(entity, skip=()):
+    """The compiled Validator for 'users', 'pets' or 'tasks', minus skipped fields"""
+    return Validator(entity, load_rules()[entity], skip=frozenset(skip))
+
+
+def iter_csv_chunks(path, chunk_rows=100000):
+    """Yield (offset, {column: [values]}) from a CSV with a header row"""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        offset = 0
+        while True:
+            rows = [row for _, row in zip(range(chunk_rows), reader)]
+            if not rows:
+                return
+            columns = {
+                name: [None if value == CSV_NULL else value for value in values]
+                for name, values in zip(header, zip(*rows))
+            }
+            yield offset, columns
+            offset += len(rows)
+
+
+def validate_csv(path, entity, skip=(), now=None, chunk_rows=100000):
+    """Yield a ValidationReport per chunk of a CSV export; rows count from 0 after the header"""
+    checker = validator(entity, tuple(skip))
+    for offset, columns in iter_csv_chunks(path, chunk_rows):
+        yield checker.validate(columns, now=now, offset=offset)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a CSV export against the app's rules")
+    parser.add_argument('entity', choices=sorted(load_rules()))
+    parser.add_argument('csv', help="CSV file with a header row (e.g. from config.data_factory --csv)")
+    parser.add_argument('--skip', action='append', default=[], metavar='FIELD',
+                        help="field to leave unchecked (repeatable), e.g. due_date for historical tasks")
+    parser.add_argument('--chunk-rows', type=int, default=100000)
+    parser.add_argument('--show', type=int, default=20, metavar='N', help="invalid rows to print")
+    args = parser.parse_args(argv)
+
+    started = datetime.now()
+    rows = invalid = 0
+    counts = {}
+    shown = []
+    for report in validate_csv(args.csv, args.entity, skip=args.skip, chunk_rows=args.chunk_rows):
+        rows += report.size
+        invalid += report.invalid_rows
+        for field, count in report.counts().items():
+            counts[field] = counts.get(field, 0) + count
+        if len(shown) < args.show:
+            shown += report.errors()[:args.show - len(shown)]
+    elapsed = (datetime.now() - started).total_seconds()
+
+    print(f"📊 {rows:,} {args.entity} rows checked in {elapsed:.2f}s")
+    if not invalid:
+        print("✅ All rows valid")
+        return 0
+    print(f"❌ {invalid:,} invalid rows")
+    for field, count in counts.items():
+        print(f"   {field}: {count:,}")
+    for row, errors in shown:
+        print(f"   row {row + 1}: " + '; '.join(f"{field}: {message}" for field, message in errors))
+    return 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,44 +1,190 @@
 import pytest
-import mysql.connector
-from mysql.connector import Error
+import hashlib
+import itertools
 import os
-from datetime import datetime
-from config.test_database import TestDatabase
+import uuid
+
+# Per-test query counting, @pytest.mark.query_budget and the N+1 report;
+# TEST_DB_CASSETTE=record/replay for recorded database calls;
+# --impact-map for run_tests.py --changed; --startup-profile
+pytest_plugins = ['config.query_budget', 'config.query_cassette', 'config.impact_map', 'config.startup_profile']
+
+# TEST_DB_BACKEND=sqlite runs against an embedded in-memory database instead of MySQL
+BACKEND = os.getenv('TEST_DB_BACKEND', 'mysql')
+
+# Fixtures that open the test database; tests using them are marked `db`
+DB_FIXTURES = {'test_database', 'db_module', 'db_class', 'db_connection'}
+
+# Set by run_tests.py for each pytest shard ("shard1", ...) and by pytest-xdist
+# in worker processes ("gw0", "gw1", ...); each gets its own database
+WORKER_ID = '_'.join(filter(None, [os.getenv('TEST_SHARD'), os.getenv('PYTEST_XDIST_WORKER')])) or None
+
+# Cassettes match parameters exactly, so recorded runs need the same IDs every time.
+# Read in pytest_configure: config.query_cassette is imported only as a plugin,
+# so pytest can rewrite its asserts
+CASSETTE_MODE = 'off'
+
+# Unique per process so IDs never collide across workers or reruns
+RUN_TOKEN = uuid.uuid4().hex[:6]
+_id_worker = WORKER_ID or 'main'
+_id_counter = itertools.count(1)
+
+
+def database_class():
+    """TestDatabase, its recording/replaying subclass, or the SQLite backend.
+
+    Imported on first use, so runs without database tests never load the
+    MySQL driver or .env.
+    """
+    from config.test_database import load_settings
+
+    load_settings()
+    if BACKEND == 'sqlite':
+        from config.sqlite_database import SqliteDatabase
+        return SqliteDatabase
+    from config.query_cassette import database_class as cassette_database_class
+
+    return cassette_database_class()
+
+
+# MySQL client errors meaning there is no server to test against:
+# access denied, can't connect (socket / TCP), unknown host
+UNAVAILABLE_ERRNOS = {1045, 2002, 2003, 2005}
+
+
+def open_database(TestDatabase, **kwargs):
+    """Connect, skipping the tests that need it when no MySQL server is reachable"""
+    if BACKEND == 'sqlite' or CASSETTE_MODE == 'replay':
+        return TestDatabase(**kwargs)
+    from mysql.connector import Error
+
+    try:
+        return TestDatabase(**kwargs)
+    except Error as e:
+        if e.errno not in UNAVAILABLE_ERRNOS:
+            raise
+        pytest.skip(f"Database not available: {e}")
+
+
+def pytest_configure(config):
+    global CASSETTE_MODE
+    from config.query_cassette import cassette_mode
+
+    CASSETTE_MODE = cassette_mode()
+    config.addinivalue_line(
+        'markers',
+        'mysql_only: uses SQL the SQLite backend does not translate; skipped with TEST_DB_BACKEND=sqlite'
+    )
+    config.addinivalue_line('markers', 'db: needs the test database (set automatically from fixtures)')
+    config.addinivalue_line('markers', 'nodb: pure logic, runs without a database (`pytest -m nodb`)')
+
+
+def pytest_collection_modifyitems(config, items):
+    """Mark tests db/nodb by the fixtures they use; skip mysql_only tests on the embedded backend"""
+    skip = pytest.mark.skip(reason="MySQL-only SQL (TEST_DB_BACKEND=sqlite)")
+    for item in items:
+        if not (item.get_closest_marker('db') or item.get_closest_marker('nodb')):
+            uses_db = DB_FIXTURES.intersection(getattr(item, 'fixturenames', ()))
+            item.add_marker(pytest.mark.db if uses_db else pytest.mark.nodb)
+        if BACKEND == 'sqlite' and 'mysql_only' in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_runtest_setup(item):
+    if item.get_closest_marker('nodb') and DB_FIXTURES.intersection(item.fixturenames):
+        pytest.fail(f"{item.nodeid} is marked nodb but uses a database fixture", pytrace=False)
+
+
+def unique_id(prefix):
+    """Collision-free identifier for UNIQUE columns (usernames, emails, tokens)"""
+    return f"{prefix}_{_id_worker}_{RUN_TOKEN}_{next(_id_counter)}"
+
+
+@pytest.fixture(autouse=True)
+def _cassette_ids(request):
+    """Derive unique_id() from the test's node id while recording or replaying"""
+    global _id_worker, RUN_TOKEN, _id_counter
+    if CASSETTE_MODE != 'off':
+        _id_worker = 'tape'
+        RUN_TOKEN = hashlib.sha1(request.node.nodeid.encode('utf-8')).hexdigest()[:6]
+        _id_counter = itertools.count(1)
+    yield
+
 
 @pytest.fixture(scope="session")
 def test_database():
-    """Session-level test database fixture"""
-    db = TestDatabase()
+    """Session-level test database fixture.
+    
+    Under pytest-xdist each worker gets its own database (e.g.
+    petcare_test_gw3) cloned from the base database, which acts as the
+    template and is initialized once under a server-side lock.
+    """
+    TestDatabase = database_class()
+    base_name = os.getenv('TEST_DB_NAME', 'petcare_test')
     
-    # Initialize schema once per session
-    db.initialize_schema()
+    if WORKER_ID:
+        template = open_database(TestDatabase, db_name=base_name)
+        with template.named_lock(f"{base_name}_template"):
+            template.initialize_schema()
+        template.close()
+        
+        db = open_database(TestDatabase, db_name=f"{base_name}_{WORKER_ID}")
+        db.clone_from(base_name)
+    else:
+        db = open_database(TestDatabase)
+        # Initialize schema once per session
+        db.initialize_schema()
     
     yield db
     
     # Optional: Clean up entire database after all tests
     # db.cleanup_database()
+    
+    # Per-worker databases are disposable; the base database is kept
+    if WORKER_ID and os.getenv('TEST_DB_KEEP_WORKER_DBS', '0') != '1':
+        db.drop_database()
     db.close()
 
+@pytest.fixture(scope="module")
+def db_module(test_database):
+    """Module-level transaction scope for data seeded once per module"""
+    test_database.begin_scope()
+    yield test_database
+    test_database.rollback_scope()
+
+@pytest.fixture(scope="class")
+def db_class(test_database):
+    """Class-level transaction scope for data seeded once per test class"""
+    test_database.begin_scope()
+    yield test_database
+    test_database.rollback_scope()
+
 @pytest.fixture(scope="function")
 def db_connection(test_database):
-    """Function-level database connection with transaction rollback"""
-    # Start transaction for this test
-    test_database.connection.start_transaction()
+    """Function-level database connection with transaction rollback.
+    
+    Nests inside db_module/db_class when a test uses them: the test runs
+    under a SAVEPOINT and its own START TRANSACTION/COMMIT/ROLLBACK
+    statements are mapped onto savepoints instead of ending the outer
+    transaction.
+    """
+    # Start transaction (or savepoint) for this test
+    test_database.begin_scope()
     
     yield test_database
     
-    # Rollback transaction to undo all changes
-    test_database.connection.rollback()
+    # Rollback to undo all changes
+    test_database.rollback_scope()
     print("✅ Test transaction rolled back")
 
 @pytest.fixture
 def sample_user_data():
     """Provide sample user data for tests"""
     return {
-        'username': f'testuser_{datetime.now().strftime("%H%M%S")}',
-        'email': f'test_{datetime.now().strftime("%H%M%S")}@example.com',
+        'username': unique_id('testuser'),
+        'email': f"{unique_id('test')}@example.com",
         'password_hash': 'hashed_password_123',
-        'verification_token': f'token_{datetime.now().strftime("%H%M%S")}'
+        'verification_token': unique_id('token')
     }
 
 @pytest.fixture
@@ -0,0 +1,73 @@
+const { query } = require('../config/database');
+
+/**
+ * Adds the precomputed health trend tables. health_trends holds one row per pet
+ * (latest and 90-day weight, fitted weight change, anomaly flags, vet visit and
+ * vaccination dates), health_summaries one row per pet and month, and
+ * health_trend_state the highest health_id already folded in. The tables are
+ * filled by `python -m config.health_trends --backfill` and kept current by
+ * running `python -m config.health_trends` on a schedule; healthModel marks a
+ * pet stale when one of its records is edited or deleted.
+ *
+ * @returns {Promise<void>} Resolves when the tables exist, rejects on error
+ * @throws {Error} If database operations fail
+ */
+async function addHealthTrends() {
+  try {
+    await query(`
+      CREATE TABLE IF NOT EXISTS health_trends (
+        pet_id INT NOT NULL PRIMARY KEY,
+        record_count INT NOT NULL DEFAULT 0,
+        first_recorded DATE DEFAULT NULL,
+        last_recorded DATE DEFAULT NULL,
+        latest_weight DECIMAL(5,2) DEFAULT NULL,
+        weight_avg_90d DECIMAL(5,2) DEFAULT NULL,
+        weight_change_90d DECIMAL(6,2) DEFAULT NULL,
+        weight_anomaly TINYINT(1) NOT NULL DEFAULT 0,
+        anomaly_count INT NOT NULL DEFAULT 0,
+        last_vet_visit DATE DEFAULT NULL,
+        last_vaccination DATE DEFAULT NULL,
+        next_vaccination DATE DEFAULT NULL,
+        last_health_id INT NOT NULL DEFAULT 0,
+        stale TINYINT(1) NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        FOREIGN KEY (pet_id) REFERENCES pets(pet_id) ON DELETE CASCADE,
+        INDEX idx_health_trends_stale (stale)
+      )
+    `);
+
+    await query(`
+      CREATE TABLE IF NOT EXISTS health_summaries (
+        pet_id INT NOT NULL,
+        period_start DATE NOT NULL,
+        record_count INT NOT NULL DEFAULT 0,
+        weight_min DECIMAL(5,2) DEFAULT NULL,
+        weight_max DECIMAL(5,2) DEFAULT NULL,
+        weight_avg DECIMAL(5,2) DEFAULT NULL,
+        vet_visits INT NOT NULL DEFAULT 0,
+        vaccinations INT NOT NULL DEFAULT 0,
+        anomalies INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (pet_id, period_start),
+        FOREIGN KEY (pet_id) REFERENCES pets(pet_id) ON DELETE CASCADE
+      )
+    `);
+
+    await query(`
+      CREATE TABLE IF NOT EXISTS health_trend_state (
+        name VARCHAR(64) NOT NULL PRIMARY KEY,
+        last_health_id INT NOT NULL DEFAULT 0
+      )
+    `);
+  } catch (error) {
+    // console.error('❌ Health trends migration failed:', error);
+    throw error;
+  }
+}
+
+if (require.main === module) {
+  addHealthTrends()
+    .then(() => process.exit(0))
+    .catch(() => process.exit(1));
+}
+
+module.exports = { addHealthTrends };
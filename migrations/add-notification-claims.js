@@ -0,0 +1,57 @@
+const { query } = require('../config/database');
+
+/**
+ * Adds the claim columns and indexes used by the batched due-task sweep in
+ * notificationService.checkDueTasks. A node claims a chunk of due tasks by
+ * writing its token into notification_claim, so several nodes can sweep at
+ * once without notifying the same task twice.
+ *
+ * @returns {Promise<void>} Resolves when the columns and indexes exist, rejects on error
+ * @throws {Error} If database operations fail
+ */
+async function addNotificationClaims() {
+  try {
+    try {
+      await query('ALTER TABLE tasks ADD COLUMN notification_claim VARCHAR(64) NULL');
+    } catch (error) {
+      if (error.code !== 'ER_DUP_FIELDNAME') {
+        throw error;
+      }
+    }
+
+    try {
+      await query('ALTER TABLE tasks ADD COLUMN notification_claimed_at DATETIME NULL');
+    } catch (error) {
+      if (error.code !== 'ER_DUP_FIELDNAME') {
+        throw error;
+      }
+    }
+
+    try {
+      await query('CREATE INDEX idx_tasks_notification_due ON tasks (notification_sent, completed, due_date)');
+    } catch (error) {
+      if (error.code !== 'ER_DUP_KEYNAME') {
+        throw error;
+      }
+    }
+
+    try {
+      await query('CREATE INDEX idx_tasks_notification_claim ON tasks (notification_claim)');
+    } catch (error) {
+      if (error.code !== 'ER_DUP_KEYNAME') {
+        throw error;
+      }
+    }
+  } catch (error) {
+    // console.error('❌ Notification claims migration failed:', error);
+    throw error;
+  }
+}
+
+if (require.main === module) {
+  addNotificationClaims()
+    .then(() => process.exit(0))
+    .catch(() => process.exit(1));
+}
+
+module.exports = { addNotificationClaims };
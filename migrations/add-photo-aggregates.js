@@ -0,0 +1,81 @@
+const { query } = require('../config/database');
+
+/**
+ * Adds the materialized gallery aggregates and backfills them. Each photo stores
+ * its favorite count and sorted tag list, so gallery pages and the popular sort
+ * no longer join photo_tags and photo_favorites; tag_stats keeps tag usage for
+ * getPopularTags. photoModel maintains all three incrementally from then on, and
+ * `python -m config.photo_aggregates --verify` checks them against the source tables.
+ *
+ * @returns {Promise<void>} Resolves when the aggregates exist and are filled, rejects on error
+ * @throws {Error} If database operations fail
+ */
+async function addPhotoAggregates() {
+  try {
+    try {
+      await query("ALTER TABLE photos ADD COLUMN favorite_count INT NOT NULL DEFAULT 0");
+    } catch (error) {
+      if (error.code !== 'ER_DUP_FIELDNAME') {
+        throw error;
+      }
+    }
+
+    try {
+      await query("ALTER TABLE photos ADD COLUMN tag_names VARCHAR(1024) NOT NULL DEFAULT ''");
+    } catch (error) {
+      if (error.code !== 'ER_DUP_FIELDNAME') {
+        throw error;
+      }
+    }
+
+    try {
+      await query('CREATE INDEX idx_photos_public_popular ON photos (is_public, favorite_count, created_at)');
+    } catch (error) {
+      if (error.code !== 'ER_DUP_KEYNAME') {
+        throw error;
+      }
+    }
+
+    await query(`
+      CREATE TABLE IF NOT EXISTS tag_stats (
+        tag_id INT NOT NULL PRIMARY KEY,
+        usage_count INT NOT NULL DEFAULT 0,
+        FOREIGN KEY (tag_id) REFERENCES tags(tag_id) ON DELETE CASCADE,
+        INDEX idx_tag_stats_usage (usage_count)
+      )
+    `);
+
+    await query(`
+      UPDATE photos p
+      LEFT JOIN (
+        SELECT photo_id, COUNT(*) AS favorite_count FROM photo_favorites GROUP BY photo_id
+      ) f ON f.photo_id = p.photo_id
+      LEFT JOIN (
+        SELECT pt.photo_id, GROUP_CONCAT(DISTINCT t.tag_name ORDER BY t.tag_name) AS tag_names
+        FROM photo_tags pt JOIN tags t ON pt.tag_id = t.tag_id
+        GROUP BY pt.photo_id
+      ) g ON g.photo_id = p.photo_id
+      SET p.favorite_count = COALESCE(f.favorite_count, 0),
+          p.tag_names = COALESCE(g.tag_names, '')
+    `);
+
+    await query(`
+      INSERT INTO tag_stats (tag_id, usage_count)
+      SELECT t.tag_id, COUNT(pt.photo_tag_id) FROM tags t
+      LEFT JOIN photo_tags pt ON pt.tag_id = t.tag_id
+      GROUP BY t.tag_id
+      ON DUPLICATE KEY UPDATE usage_count = VALUES(usage_count)
+    `);
+  } catch (error) {
+    // console.error('❌ Photo aggregates migration failed:', error);
+    throw error;
+  }
+}
+
+if (require.main === module) {
+  addPhotoAggregates()
+    .then(() => process.exit(0))
+    .catch(() => process.exit(1));
+}
+
+module.exports = { addPhotoAggregates };
@@ -0,0 +1,28 @@
+const { query } = require('../config/database');
+
+/**
+ * Adds the index behind keyset pagination of the public gallery. With
+ * (is_public, created_at) the newest/oldest pages read forward from the
+ * cursor row instead of sorting every public photo; InnoDB appends the
+ * primary key, which covers the photo_id tiebreaker.
+ * 
+ * @returns {Promise<void>} Resolves when the index exists, rejects on error
+ * @throws {Error} If database operations fail
+ */
+async function addPhotoKeysetIndex() {
+  try {
+    await query('CREATE INDEX idx_photos_public_created ON photos (is_public, created_at)');
+  } catch (error) {
+    if (error.code !== 'ER_DUP_KEYNAME') {
+      throw error;
+    }
+  }
+}
+
+if (require.main === module) {
+  addPhotoKeysetIndex()
+    .then(() => process.exit(0))
+    .catch(() => process.exit(1));
+}
+
+module.exports = { addPhotoKeysetIndex };
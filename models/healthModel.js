@@ -1,5 +1,19 @@
 const { query } = require('../config/database');
 
+// How far back pages listing raw health records go; the trends cover the rest
+const RECENT_RECORD_MONTHS = 12;
+
+/**
+ * True for the error MySQL raises when a table is missing, as the health trend
+ * tables are until migrations/add-health-trends.js has been applied.
+ * 
+ * @param {Error} error - Error thrown by a query
+ * @returns {boolean} True if the query named a table that does not exist
+ */
+function isMissingTable(error) {
+  return error.code === 'ER_NO_SUCH_TABLE';
+}
+
 /**
  * Validates that weight is between 0.1 and 200 kg.
  * 
@@ -100,6 +114,122 @@ async function getHealthRecords(petId) {
   return query(`SELECT * FROM health_tracker WHERE pet_id=? ORDER BY date_recorded DESC`, [petId]);
 }
 
+/**
+ * Retrieves the recent health records of several pets in one query (newest
+ * first), for pages that show the precomputed trends next to them. Older
+ * records are covered by the trends and monthly summaries.
+ * 
+ * @param {Array<number>} petIds - IDs of the pets
+ * @param {number} [months=12] - How many months back to include
+ * @param {number} [limit=200] - Maximum number of records across all pets
+ * @returns {Promise<Object>} Arrays of health record objects keyed by pet ID
+ */
+async function getRecentHealthRecords(petIds, months = RECENT_RECORD_MONTHS, limit = 200) {
+  if (petIds.length === 0) return {};
+  const placeholders = petIds.map(() => '?').join(',');
+  const numLimit = parseInt(limit);
+  const rows = await query(
+    `SELECT * FROM health_tracker
+     WHERE pet_id IN (${placeholders}) AND date_recorded >= DATE_SUB(CURDATE(), INTERVAL ? MONTH)
+     ORDER BY date_recorded DESC, health_id DESC
+     LIMIT ${numLimit}`,
+    [...petIds, months]
+  );
+  const records = {};
+  rows.forEach(row => {
+    (records[row.pet_id] = records[row.pet_id] || []).push(row);
+  });
+  return records;
+}
+
+/**
+ * Retrieves the precomputed health trend of each pet: record count, latest and
+ * 90-day weight, fitted 90-day weight change, anomaly flags, last vet visit and
+ * vaccinations. Rows are kept up to date by `python -m config.health_trends`.
+ * Returns no trends when the health trends migration has not been applied.
+ * 
+ * @param {Array<number>} petIds - IDs of the pets
+ * @returns {Promise<Object>} Trend rows keyed by pet ID; pets without one are absent
+ */
+async function getHealthTrends(petIds) {
+  if (petIds.length === 0) return {};
+  const placeholders = petIds.map(() => '?').join(',');
+  let rows;
+  try {
+    rows = await query(`SELECT * FROM health_trends WHERE pet_id IN (${placeholders})`, petIds);
+  } catch (error) {
+    if (isMissingTable(error)) return {};
+    throw error;
+  }
+  const trends = {};
+  rows.forEach(row => {
+    trends[row.pet_id] = row;
+  });
+  return trends;
+}
+
+/**
+ * Retrieves precomputed monthly health summaries (newest month first).
+ * Returns no summaries when the health trends migration has not been applied.
+ * 
+ * @param {Array<number>} petIds - IDs of the pets
+ * @param {number} [months=12] - How many months back to include
+ * @returns {Promise<Object>} Arrays of monthly summary rows keyed by pet ID
+ */
+async function getHealthSummaries(petIds, months = 12) {
+  if (petIds.length === 0) return {};
+  const placeholders = petIds.map(() => '?').join(',');
+  let rows;
+  try {
+    rows = await query(
+      `SELECT * FROM health_summaries
+       WHERE pet_id IN (${placeholders}) AND period_start >= DATE_SUB(CURDATE(), INTERVAL ? MONTH)
+       ORDER BY pet_id, period_start DESC`,
+      [...petIds, months]
+    );
+  } catch (error) {
+    if (isMissingTable(error)) return {};
+    throw error;
+  }
+  const summaries = {};
+  rows.forEach(row => {
+    (summaries[row.pet_id] = summaries[row.pet_id] || []).push(row);
+  });
+  return summaries;
+}
+
+/**
+ * Flags a pet's precomputed health trend for recalculation. Needed after edits
+ * and deletes, which the health_id watermark of the refresh does not see.
+ * Does nothing when the health trends migration has not been applied.
+ * 
+ * @param {number} petId - ID of the pet
+ * @returns {Promise<Object|null>} Database update result, or null without the table
+ */
+async function markHealthTrendsStale(petId) {
+  try {
+    return await query('UPDATE health_trends SET stale = 1 WHERE pet_id = ?', [petId]);
+  } catch (error) {
+    if (isMissingTable(error)) return null;
+    throw error;
+  }
+}
+
+/**
+ * Marks a pet's trend stale after a health record write that has already been
+ * made. A failure here must not report the write itself as failed.
+ * 
+ * @param {number} petId - ID of the pet
+ * @returns {Promise<void>}
+ */
+async function markStaleAfterWrite(petId) {
+  try {
+    await markHealthTrendsStale(petId);
+  } catch (error) {
+    // console.error('Error marking health trends stale:', error);
+  }
+}
+
 /**
  * Retrieves a specific health record by its ID.
  * 
@@ -268,7 +398,9 @@ async function updateHealthRecord(recordId, recordData, userId) {
   params.push(recordId);
   
   const sql = `UPDATE health_tracker SET ${updates.join(', ')} WHERE health_id = ?`;
-  return query(sql, params);
+  const result = await query(sql, params);
+  await markStaleAfterWrite(record[0].pet_id);
+  return result;
 }
 
 /**
@@ -290,11 +422,18 @@ async function deleteHealthRecord(recordId, userId) {
     throw new Error('Health record not found or access denied');
   }
   
-  return query('DELETE FROM health_tracker WHERE health_id = ?', [recordId]);
+  const result = await query('DELETE FROM health_tracker WHERE health_id = ?', [recordId]);
+  await markStaleAfterWrite(record[0].pet_id);
+  return result;
 }
 
 module.exports = { 
+  RECENT_RECORD_MONTHS,
   getHealthRecords, 
+  getRecentHealthRecords,
+  getHealthTrends,
+  getHealthSummaries,
+  markHealthTrendsStale,
   getHealthRecordById,
   addHealthRecord,
   updateHealthRecord,
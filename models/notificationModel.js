@@ -27,6 +27,37 @@ class NotificationModel {
     ]);
   }
 
+  /**
+   * Creates several notifications with a single multi-row INSERT.
+   * 
+   * @param {Array<Object>} notifications - Objects with userId, type, title, message and optional relatedId
+   * @returns {Promise<Object|null>} Database insert result, or null when there is nothing to insert
+   */
+  async createNotifications(notifications) {
+    if (notifications.length === 0) {
+      return null;
+    }
+
+    const rows = notifications.map(() => '(?, ?, ?, ?, ?, ?)').join(', ');
+    const sql = `
+      INSERT INTO notifications (user_id, type, title, message, related_id, is_read)
+      VALUES ${rows}
+    `;
+
+    const params = [];
+    for (const notification of notifications) {
+      params.push(
+        notification.userId,
+        notification.type,
+        notification.title,
+        notification.message,
+        notification.relatedId ?? null,
+        false
+      );
+    }
+    return query(sql, params);
+  }
+
   /**
    * Retrieves notifications for a specific user with pagination.
    * Results are sorted by creation date (newest first).
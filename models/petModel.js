@@ -1,4 +1,10 @@
 const { query } = require('../config/database');
+const { pets: PET_RULES } = require('../config/validation-rules.json');
+
+// Shared with the Python test suite (config/validation.py)
+const fullMatch = (pattern) => new RegExp(`^(?:${pattern})$`);
+const PET_NAME_PATTERN = fullMatch(PET_RULES.name.pattern);
+const PET_SPECIES_PATTERN = fullMatch(PET_RULES.species.pattern);
 
 /**
  * Validates pet name format and length.
@@ -9,7 +15,8 @@ const { query } = require('../config/database');
 function validatePetName(name) {
     if (!name || typeof name !== 'string') return false;
     const trimmed = name.trim();
-    return /^[A-Za-z\s'-]+$/.test(trimmed) && trimmed.length >= 2 && trimmed.length <= 50;
+    const { min_length, max_length } = PET_RULES.name;
+    return PET_NAME_PATTERN.test(trimmed) && trimmed.length >= min_length && trimmed.length <= max_length;
 }
 
 /**
@@ -21,7 +28,8 @@ function validatePetName(name) {
 function validatePetSpecies(species) {
     if (!species || typeof species !== 'string') return false;
     const trimmed = species.trim();
-    return /^[A-Za-z\s]+$/.test(trimmed) && trimmed.length >= 2 && trimmed.length <= 30;
+    const { min_length, max_length } = PET_RULES.species;
+    return PET_SPECIES_PATTERN.test(trimmed) && trimmed.length >= min_length && trimmed.length <= max_length;
 }
 
 /**
@@ -33,7 +41,7 @@ function validatePetSpecies(species) {
 function validatePetBreed(breed) {
     if (!breed || typeof breed !== 'string') return false;
     const trimmed = breed.trim();
-    return trimmed.length >= 2 && trimmed.length <= 50;
+    return trimmed.length >= PET_RULES.breed.min_length && trimmed.length <= PET_RULES.breed.max_length;
 }
 
 /**
@@ -45,7 +53,7 @@ function validatePetBreed(breed) {
 function validatePetAge(age) {
     if (age === undefined || age === null) return false;
     const ageNum = parseFloat(age);
-    return !isNaN(ageNum) && ageNum > 0 && ageNum <= 50;
+    return !isNaN(ageNum) && ageNum > PET_RULES.age.exclusive_min && ageNum <= PET_RULES.age.max;
 }
 
 /**
@@ -57,7 +65,7 @@ function validatePetAge(age) {
 function validatePetWeight(weight) {
     if (weight === undefined || weight === null) return false;
     const weightNum = parseFloat(weight);
-    return !isNaN(weightNum) && weightNum > 0 && weightNum <= 200;
+    return !isNaN(weightNum) && weightNum > PET_RULES.weight.exclusive_min && weightNum <= PET_RULES.weight.max;
 }
 
 /**
@@ -67,7 +75,7 @@ function validatePetWeight(weight) {
  * @returns {boolean} True if gender is valid ('male', 'female', or 'other')
  */
 function validatePetGender(gender) {
-    return ['male', 'female', 'other'].includes(gender);
+    return PET_RULES.gender.choices.includes(gender);
 }
 
 /**
@@ -97,27 +105,27 @@ async function getPetsByUser(userId) {
  */
 async function createPet(userId, { name, breed, age, species, gender, weight }) {
     if (!validatePetName(name)) {
-        throw new Error('Pet name must be 2-50 letters long (letters, spaces, apostrophes, hyphens allowed)');
+        throw new Error(PET_RULES.name.message);
     }
     
     if (!validatePetSpecies(species)) {
-        throw new Error('Species must be 2-30 letters long');
+        throw new Error(PET_RULES.species.message);
     }
     
     if (!validatePetBreed(breed)) {
-        throw new Error('Breed must be 2-50 characters long');
+        throw new Error(PET_RULES.breed.message);
     }
     
     if (!validatePetAge(age)) {
-        throw new Error('Age must be greater than 0 and less than or equal to 50');
+        throw new Error(PET_RULES.age.message);
     }
     
     if (!validatePetWeight(weight)) {
-        throw new Error('Weight must be greater than 0 and less than or equal to 200');
+        throw new Error(PET_RULES.weight.message);
     }
     
     if (!validatePetGender(gender)) {
-        throw new Error('Please select a valid gender (male, female, other)');
+        throw new Error(PET_RULES.gender.message);
     }
 
     if (name === undefined || breed === undefined || age === undefined || 
@@ -161,27 +169,27 @@ async function createPet(userId, { name, breed, age, species, gender, weight })
  */
 async function updatePet(petId, { name, breed, age, species, gender, weight }) {
     if (name !== undefined && !validatePetName(name)) {
-        throw new Error('Pet name must be 2-50 letters long (letters, spaces, apostrophes, hyphens allowed)');
+        throw new Error(PET_RULES.name.message);
     }
     
     if (species !== undefined && !validatePetSpecies(species)) {
-        throw new Error('Species must be 2-30 letters long');
+        throw new Error(PET_RULES.species.message);
     }
     
     if (breed !== undefined && !validatePetBreed(breed)) {
-        throw new Error('Breed must be 2-50 characters long');
+        throw new Error(PET_RULES.breed.message);
     }
     
     if (age !== undefined && !validatePetAge(age)) {
-        throw new Error('Age must be greater than 0 and less than or equal to 50');
+        throw new Error(PET_RULES.age.message);
     }
     
     if (weight !== undefined && !validatePetWeight(weight)) {
-        throw new Error('Weight must be greater than 0 and less than or equal to 200');
+        throw new Error(PET_RULES.weight.message);
     }
     
     if (gender !== undefined && !validatePetGender(gender)) {
-        throw new Error('Please select a valid gender (male, female, other)');
+        throw new Error(PET_RULES.gender.message);
     }
 
     const updates = [];
@@ -1,5 +1,288 @@
 const { query, queryOne } = require('../config/database');
 
+const CURSOR_VERSION = 1;
+const CREATED_KEY = "DATE_FORMAT(p.created_at, '%Y-%m-%d %T')";
+
+/**
+ * Keyset columns for each gallery sort, most significant first. Every list
+ * ends with p.photo_id so the order is total and a cursor names exactly one row.
+ * MySQL sorts NULL lowest: first in ASC order, last in DESC order.
+ */
+const KEYSET_SORTS = {
+    newest: [
+        { expr: 'p.created_at', select: CREATED_KEY, dir: 'DESC', nullable: true },
+        { expr: 'p.photo_id', dir: 'DESC' }
+    ],
+    oldest: [
+        { expr: 'p.created_at', select: CREATED_KEY, dir: 'ASC', nullable: true },
+        { expr: 'p.photo_id', dir: 'ASC' }
+    ],
+    popular: [
+        { expr: 'p.favorite_count', dir: 'DESC' },
+        { expr: 'p.created_at', select: CREATED_KEY, dir: 'DESC', nullable: true },
+        { expr: 'p.photo_id', dir: 'DESC' }
+    ]
+};
+
+/**
+ * Encodes the sort keys of the last row on a page as an opaque cursor.
+ *
+ * @param {string} sortBy - Sort the cursor belongs to
+ * @param {Array} values - Key values in KEYSET_SORTS[sortBy] order
+ * @returns {string} URL-safe cursor
+ */
+function encodeCursor(sortBy, values) {
+    return Buffer.from(JSON.stringify({ v: CURSOR_VERSION, s: sortBy, k: values })).toString('base64url');
+}
+
+/**
+ * Decodes a cursor produced by encodeCursor for the same sort.
+ *
+ * @param {string} cursor - Cursor from a previous page
+ * @param {string} sortBy - Sort of the current request
+ * @returns {Array|null} Key values, or null if the cursor is missing, malformed or for another sort
+ */
+function decodeCursor(cursor, sortBy) {
+    if (!cursor) return null;
+    try {
+        const data = JSON.parse(Buffer.from(String(cursor), 'base64url').toString('utf8'));
+        const keys = KEYSET_SORTS[sortBy];
+        if (data.v !== CURSOR_VERSION || data.s !== sortBy || !Array.isArray(data.k) || data.k.length !== keys.length) {
+            return null;
+        }
+        return data.k;
+    } catch (error) {
+        return null;
+    }
+}
+
+/**
+ * Builds the condition selecting rows that sort strictly after the cursor row:
+ * (k0 after v0) OR (k0 = v0 AND k1 after v1) OR ...
+ *
+ * @param {Array<Object>} keys - Keyset columns from KEYSET_SORTS
+ * @param {Array} values - Cursor values for those columns
+ * @returns {{sql: string, params: Array}} Condition and its parameters
+ */
+function keysetCondition(keys, values) {
+    const branches = [];
+    const params = [];
+
+    keys.forEach((key, i) => {
+        const value = values[i];
+        let after;
+        if (value === null) {
+            // Nothing sorts after NULL in DESC order; everything non-NULL does in ASC
+            if (key.dir === 'DESC') return;
+            after = { sql: `${key.expr} IS NOT NULL`, params: [] };
+        } else if (key.dir === 'DESC') {
+            after = key.nullable
+                ? { sql: `(${key.expr} < ? OR ${key.expr} IS NULL)`, params: [value] }
+                : { sql: `${key.expr} < ?`, params: [value] };
+        } else {
+            after = { sql: `${key.expr} > ?`, params: [value] };
+        }
+
+        const terms = [];
+        for (let j = 0; j < i; j++) {
+            if (values[j] === null) {
+                terms.push(`${keys[j].expr} IS NULL`);
+            } else {
+                terms.push(`${keys[j].expr} = ?`);
+                params.push(values[j]);
+            }
+        }
+        terms.push(after.sql);
+        params.push(...after.params);
+        branches.push(`(${terms.join(' AND ')})`);
+    });
+
+    return { sql: branches.length ? `(${branches.join(' OR ')})` : '0 = 1', params };
+}
+
+/**
+ * ORDER BY clause for a keyset sort.
+ *
+ * @param {Array<Object>} keys - Keyset columns from KEYSET_SORTS
+ * @returns {string} ORDER BY clause
+ */
+function keysetOrderBy(keys) {
+    return 'ORDER BY ' + keys.map(key => `${key.expr} ${key.dir}`).join(', ');
+}
+
+/**
+ * Runs the id-only phase of a keyset page and returns the ids plus the next cursor.
+ * Fetches one extra row so the last page does not hand out a cursor to an empty page.
+ *
+ * @param {string} sortBy - Sort from KEYSET_SORTS
+ * @param {string} whereClause - WHERE clause without the keyset condition
+ * @param {Array} params - Parameters for whereClause
+ * @param {string|null} cursor - Cursor from the previous page
+ * @param {number} limit - Photos per page
+ * @returns {Promise<{ids: Array<number>, nextCursor: string|null}>} Page ids and next cursor
+ */
+async function keysetPageIds(sortBy, whereClause, params, cursor, limit) {
+    const keys = KEYSET_SORTS[sortBy];
+    const values = decodeCursor(cursor, sortBy);
+    const numLimit = parseInt(limit);
+    let where = whereClause;
+    const pageParams = [...params];
+
+    if (values) {
+        const condition = keysetCondition(keys, values);
+        where += ` AND ${condition.sql}`;
+        pageParams.push(...condition.params);
+    }
+
+    const columns = keys.map((key, i) => `${key.select || key.expr} AS k${i}`).join(', ');
+    const rows = await query(`
+        SELECT ${columns}
+        FROM photos p
+        ${where}
+        ${keysetOrderBy(keys)}
+        LIMIT ${numLimit + 1}
+    `, pageParams);
+
+    const page = rows.slice(0, numLimit);
+    const last = page[page.length - 1];
+    const nextCursor = rows.length > numLimit
+        ? encodeCursor(sortBy, keys.map((key, i) => last[`k${i}`]))
+        : null;
+    return { ids: page.map(row => row[`k${keys.length - 1}`]), nextCursor };
+}
+
+/**
+ * Rebuilds photos.tag_names for one photo from photo_tags. A photo carries a
+ * handful of tags, so this stays cheap while keeping the list in one
+ * canonical order (config/photo_aggregates.py uses the same expression).
+ */
+const REFRESH_TAG_NAMES_SQL = `
+    UPDATE photos SET tag_names = (
+        SELECT COALESCE(GROUP_CONCAT(DISTINCT t.tag_name ORDER BY t.tag_name), '')
+        FROM photo_tags pt
+        JOIN tags t ON pt.tag_id = t.tag_id
+        WHERE pt.photo_id = ?
+    )
+    WHERE photo_id = ?
+`;
+
+/**
+ * Adjusts the usage counters of tags by delta.
+ *
+ * @param {Array<number>} tagIds - Tags whose usage changed
+ * @param {number} delta - +1 when a photo gained the tag, -1 when it lost it
+ * @returns {Promise<void>}
+ */
+async function adjustTagUsage(tagIds, delta) {
+    if (tagIds.length === 0) return;
+    const rows = tagIds.map(() => '(?, ?)').join(', ');
+    const params = tagIds.flatMap(tagId => [tagId, delta]);
+    await query(
+        `INSERT INTO tag_stats (tag_id, usage_count) VALUES ${rows}
+         ON DUPLICATE KEY UPDATE usage_count = usage_count + VALUES(usage_count)`,
+        params
+    );
+}
+
+/**
+ * Runs a delete that removes photos and releases their tags' usage counts.
+ * Favorites and tag links go with a photo through ON DELETE CASCADE, which
+ * bypasses the counters, so the tag ids are read first. Every delete that
+ * cascades into photo_tags (photos, users) must go through here;
+ * config/photo_aggregates.py checks the JS sources for any that don't.
+ *
+ * @param {string} whereClause - Condition on photos selecting the photos the delete removes
+ * @param {string} deleteSql - The delete statement, taking the same params
+ * @param {Array} params - Parameters for whereClause and deleteSql
+ * @returns {Promise<Object>} Database delete result
+ */
+async function deleteAndReleaseTags(whereClause, deleteSql, params) {
+    const tags = await query(
+        `SELECT pt.tag_id FROM photo_tags pt JOIN photos ON pt.photo_id = photos.photo_id ${whereClause}`,
+        params
+    );
+    const result = await query(deleteSql, params);
+    if (result.affectedRows > 0) {
+        await adjustTagUsage(tags.map(tag => tag.tag_id), -1);
+    }
+    return result;
+}
+
+/**
+ * Deletes a photo and releases its tags' usage counts.
+ *
+ * @param {string} whereClause - Condition on photos identifying the photo
+ * @param {Array} params - Parameters for whereClause
+ * @returns {Promise<Object>} Database delete result
+ */
+async function deletePhotoAndReleaseTags(whereClause, params) {
+    return deleteAndReleaseTags(whereClause, `DELETE FROM photos ${whereClause}`, params);
+}
+
+/**
+ * Reads a photo's favorite_count counter, which toggleFavorite keeps in step,
+ * instead of counting its photo_favorites rows.
+ *
+ * @param {number} photoId - ID of the photo
+ * @returns {Promise<number>} Stored favorite count (0 for a missing photo)
+ */
+async function storedFavoriteCount(photoId) {
+    const photo = await queryOne('SELECT favorite_count FROM photos WHERE photo_id = ?', [photoId]);
+    return photo ? photo.favorite_count : 0;
+}
+
+/**
+ * SQL condition on health_tracker ht for a gallery health status filter.
+ *
+ * @param {string} healthStatus - Health status ('healthy', 'needs_vaccination', 'underweight', 'overweight', 'recent_vet_visit')
+ * @returns {string} Condition starting with AND, or '' for an unknown status
+ */
+function healthStatusCondition(healthStatus) {
+    switch (healthStatus) {
+        case 'healthy':
+            return `
+                AND (ht.weight IS NOT NULL AND ht.weight BETWEEN 1 AND 200)
+                AND (ht.vaccination_date IS NULL OR ht.vaccination_date >= DATE_SUB(CURDATE(), INTERVAL 1 YEAR))
+                AND (ht.next_vaccination_date IS NULL OR ht.next_vaccination_date >= CURDATE())
+            `;
+        case 'needs_vaccination':
+            return `
+                AND (ht.vaccination_date IS NULL OR ht.vaccination_date < DATE_SUB(CURDATE(), INTERVAL 1 YEAR))
+                AND (ht.next_vaccination_date IS NULL OR ht.next_vaccination_date < CURDATE())
+            `;
+        case 'underweight':
+            return 'AND ht.weight IS NOT NULL AND ht.weight < 1';
+        case 'overweight':
+            return 'AND ht.weight IS NOT NULL AND ht.weight > 200';
+        case 'recent_vet_visit':
+            return 'AND ht.vet_visit_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)';
+        default:
+            return '';
+    }
+}
+
+/**
+ * Sets is_favorited on each photo with one query for the whole page.
+ *
+ * @param {Array<Object>} photos - Photos to annotate
+ * @param {number|null} userId - User whose favorites are checked
+ * @returns {Promise<void>}
+ */
+async function markFavorited(photos, userId) {
+    let favorited = new Set();
+    if (userId && photos.length > 0) {
+        const ids = photos.map(photo => photo.photo_id);
+        const rows = await query(
+            `SELECT photo_id FROM photo_favorites WHERE user_id = ? AND photo_id IN (${ids.map(() => '?').join(', ')})`,
+            [userId, ...ids]
+        );
+        favorited = new Set(rows.map(row => row.photo_id));
+    }
+    for (const photo of photos) {
+        photo.is_favorited = favorited.has(photo.photo_id) ? 1 : 0;
+    }
+}
+
 const photoModel = {
     /**
      * Retrieves public photos with filtering and pagination.
@@ -20,7 +303,10 @@ const photoModel = {
         const params = [];
         
         if (filters.tag) {
-            whereClause += ' AND t.tag_name = ?';
+            whereClause += ` AND EXISTS (
+                SELECT 1 FROM photo_tags pt JOIN tags t ON pt.tag_id = t.tag_id
+                WHERE pt.photo_id = p.photo_id AND t.tag_name = ?
+            )`;
             params.push(filters.tag);
         }
         
@@ -37,14 +323,14 @@ const photoModel = {
         let orderByClause = '';
         switch (sortBy) {
             case 'oldest':
-                orderByClause = 'ORDER BY p.created_at ASC';
+                orderByClause = 'ORDER BY p.created_at ASC, p.photo_id ASC';
                 break;
             case 'popular':
-                orderByClause = 'ORDER BY favorite_count DESC, p.created_at DESC';
+                orderByClause = 'ORDER BY p.favorite_count DESC, p.created_at DESC, p.photo_id DESC';
                 break;
             case 'newest':
             default:
-                orderByClause = 'ORDER BY p.created_at DESC';
+                orderByClause = 'ORDER BY p.created_at DESC, p.photo_id DESC';
                 break;
         }
 
@@ -56,15 +342,10 @@ const photoModel = {
                 p.*,
                 u.username,
                 u.profile_picture_url,
-                COALESCE(GROUP_CONCAT(DISTINCT t.tag_name), '') as tags,
-                COALESCE(COUNT(DISTINCT pf.favorite_id), 0) as favorite_count
+                p.tag_names as tags
             FROM photos p
             LEFT JOIN users u ON p.user_id = u.user_id
-            LEFT JOIN photo_tags pt ON p.photo_id = pt.photo_id
-            LEFT JOIN tags t ON pt.tag_id = t.tag_id
-            LEFT JOIN photo_favorites pf ON p.photo_id = pf.photo_id
             ${whereClause}
-            GROUP BY p.photo_id, u.username, u.profile_picture_url
             ${orderByClause}
             LIMIT ${numLimit} OFFSET ${numOffset}
         `;
@@ -93,6 +374,64 @@ const photoModel = {
         }
     },
 
+    /**
+     * Retrieves public photos page by page with keyset (cursor) pagination.
+     * Returns the same rows in the same order as getPublicPhotos, but each page
+     * starts from the previous page's last row instead of skipping OFFSET rows,
+     * so deep pages cost about the same as the first one.
+     *
+     * @param {string|null} [cursor=null] - nextCursor of the previous page; null for the first page
+     * @param {number} [limit=12] - Number of photos per page
+     * @param {Object} [filters={}] - Filtering options, as for getPublicPhotos
+     * @param {string} [sortBy='newest'] - Sorting method ('newest', 'oldest', 'popular')
+     * @returns {Promise<{photos: Array, nextCursor: string|null}>} Page of photos and the cursor for the next page
+     */
+    async getPublicPhotosKeyset(cursor = null, limit = 12, filters = {}, sortBy = 'newest') {
+        if (!KEYSET_SORTS[sortBy]) sortBy = 'newest';
+
+        let whereClause = 'WHERE p.is_public = 1';
+        const params = [];
+
+        if (filters.tag) {
+            whereClause += ` AND EXISTS (
+                SELECT 1 FROM photo_tags pt JOIN tags t ON pt.tag_id = t.tag_id
+                WHERE pt.photo_id = p.photo_id AND t.tag_name = ?
+            )`;
+            params.push(filters.tag);
+        }
+
+        if (filters.user_id) {
+            whereClause += ' AND p.user_id = ?';
+            params.push(filters.user_id);
+        }
+
+        if (filters.search) {
+            whereClause += ' AND (p.title LIKE ? OR p.description LIKE ?)';
+            params.push(`%${filters.search}%`, `%${filters.search}%`);
+        }
+
+        const { ids, nextCursor } = await keysetPageIds(sortBy, whereClause, params, cursor, limit);
+        if (ids.length === 0) {
+            return { photos: [], nextCursor: null };
+        }
+
+        const sql = `
+            SELECT 
+                p.*,
+                u.username,
+                u.profile_picture_url,
+                p.tag_names as tags
+            FROM photos p
+            LEFT JOIN users u ON p.user_id = u.user_id
+            WHERE p.photo_id IN (${ids.map(() => '?').join(', ')})
+            ${keysetOrderBy(KEYSET_SORTS[sortBy])}
+        `;
+
+        const photos = await query(sql, ids);
+        await markFavorited(photos, filters.current_user_id);
+        return { photos, nextCursor };
+    },
+
     /**
      * Retrieves photos belonging to a specific user.
      * 
@@ -111,7 +450,7 @@ const photoModel = {
                 orderByClause = 'ORDER BY p.created_at ASC';
                 break;
             case 'popular':
-                orderByClause = 'ORDER BY favorite_count DESC, p.created_at DESC';
+                orderByClause = 'ORDER BY p.favorite_count DESC, p.created_at DESC';
                 break;
             case 'newest':
             default:
@@ -123,15 +462,9 @@ const photoModel = {
         const numOffset = parseInt(offset);
         
         const sql = `
-            SELECT p.*, 
-                   COALESCE(GROUP_CONCAT(DISTINCT t.tag_name), '') as tags,
-                   COALESCE(COUNT(DISTINCT pf.favorite_id), 0) as favorite_count
+            SELECT p.*, p.tag_names as tags
             FROM photos p
-            LEFT JOIN photo_tags pt ON p.photo_id = pt.photo_id
-            LEFT JOIN tags t ON pt.tag_id = t.tag_id
-            LEFT JOIN photo_favorites pf ON p.photo_id = pf.photo_id
             WHERE p.user_id = ?
-            GROUP BY p.photo_id
             ${orderByClause}
             LIMIT ${numLimit} OFFSET ${numOffset}
         `;
@@ -168,16 +501,10 @@ const photoModel = {
         }
 
         const sql = `
-            SELECT p.*, u.username, u.profile_picture_url,
-                   COALESCE(GROUP_CONCAT(DISTINCT t.tag_name), '') as tags,
-                   COALESCE(COUNT(DISTINCT pf.favorite_id), 0) as favorite_count
+            SELECT p.*, u.username, u.profile_picture_url, p.tag_names as tags
             FROM photos p
             LEFT JOIN users u ON p.user_id = u.user_id
-            LEFT JOIN photo_tags pt ON p.photo_id = pt.photo_id
-            LEFT JOIN tags t ON pt.tag_id = t.tag_id
-            LEFT JOIN photo_favorites pf ON p.photo_id = pf.photo_id
             ${whereClause}
-            GROUP BY p.photo_id, u.username, u.profile_picture_url
         `;
         
         const photos = await query(sql, params);
@@ -283,8 +610,10 @@ const photoModel = {
      * @throws {Error} If photo not found or access denied
      */
     async deletePhoto(photoId, userId) {
-        const sql = 'DELETE FROM photos WHERE photo_id = ? AND user_id = ?';
-        const result = await query(sql, [photoId, userId]);
+        const result = await deletePhotoAndReleaseTags(
+            'WHERE photos.photo_id = ? AND photos.user_id = ?',
+            [photoId, userId]
+        );
         
         if (result.affectedRows === 0) {
             throw new Error('Photo not found or access denied');
@@ -293,6 +622,27 @@ const photoModel = {
         return result;
     },
 
+    /**
+     * Deletes any photo regardless of owner (admin moderation).
+     * 
+     * @param {number} photoId - ID of the photo to delete
+     * @returns {Promise<Object>} Database delete result
+     */
+    async deletePhotoAsAdmin(photoId) {
+        return deletePhotoAndReleaseTags('WHERE photos.photo_id = ?', [photoId]);
+    },
+
+    /**
+     * Deletes a user account. Their photos go with it through ON DELETE
+     * CASCADE, so their tags' usage counts are released as for a photo delete.
+     *
+     * @param {number} userId - ID of the user to delete
+     * @returns {Promise<Object>} Database delete result
+     */
+    async deleteUserAndReleaseTags(userId) {
+        return deleteAndReleaseTags('WHERE photos.user_id = ?', 'DELETE FROM users WHERE user_id = ?', [userId]);
+    },
+
     /**
      * Adds a tag to a photo. Creates tag if it doesn't exist (requires admin approval).
      * 
@@ -318,13 +668,16 @@ const photoModel = {
                 'INSERT INTO photo_tags (photo_id, tag_id, added_by) VALUES (?, ?, ?)',
                 [photoId, tag.tag_id, userId]
             );
-            return true;
         } catch (error) {
             if (error.code === 'ER_DUP_ENTRY') {
                 throw new Error('Tag already added to this photo');
             }
             throw error;
         }
+        
+        await adjustTagUsage([tag.tag_id], 1);
+        await query(REFRESH_TAG_NAMES_SQL, [photoId, photoId]);
+        return true;
     },
 
     /**
@@ -344,7 +697,13 @@ const photoModel = {
         `;
         
         const result = await query(sql, [photoId, tagId, userId, userId]);
-        return result.affectedRows > 0;
+        if (result.affectedRows === 0) {
+            return false;
+        }
+        
+        await adjustTagUsage([tagId], -1);
+        await query(REFRESH_TAG_NAMES_SQL, [photoId, photoId]);
+        return true;
     },
 
     /**
@@ -361,17 +720,21 @@ const photoModel = {
         );
         
         if (existing) {
-            await query(
+            const result = await query(
                 'DELETE FROM photo_favorites WHERE photo_id = ? AND user_id = ?',
                 [photoId, userId]
             );
-            return { action: 'removed', favorite_count: await this.getFavoriteCount(photoId) };
+            if (result.affectedRows > 0) {
+                await query('UPDATE photos SET favorite_count = favorite_count - 1 WHERE photo_id = ?', [photoId]);
+            }
+            return { action: 'removed', favorite_count: await storedFavoriteCount(photoId) };
         } else {
             await query(
                 'INSERT INTO photo_favorites (photo_id, user_id) VALUES (?, ?)',
                 [photoId, userId]
             );
-            return { action: 'added', favorite_count: await this.getFavoriteCount(photoId) };
+            await query('UPDATE photos SET favorite_count = favorite_count + 1 WHERE photo_id = ?', [photoId]);
+            return { action: 'added', favorite_count: await storedFavoriteCount(photoId) };
         }
     },
 
@@ -391,6 +754,8 @@ const photoModel = {
 
     /**
      * Gets popular tags based on usage count.
+     * Reads the tag_stats counters; falls back to counting photo_tags when the
+     * aggregates migration has not been applied.
      * 
      * @param {number} [limit=20] - Maximum number of tags to return
      * @returns {Promise<Array>} Array of popular tag objects
@@ -399,12 +764,11 @@ const photoModel = {
         const numLimit = parseInt(limit);
         
         const sql = `
-            SELECT t.tag_name, COUNT(pt.photo_tag_id) as usage_count
-            FROM tags t
-            JOIN photo_tags pt ON t.tag_id = pt.tag_id
-            WHERE t.is_approved = 1
-            GROUP BY t.tag_id, t.tag_name
-            ORDER BY usage_count DESC
+            SELECT t.tag_name, ts.usage_count
+            FROM tag_stats ts
+            JOIN tags t ON ts.tag_id = t.tag_id
+            WHERE t.is_approved = 1 AND ts.usage_count > 0
+            ORDER BY ts.usage_count DESC
             LIMIT ${numLimit}
         `;
         
@@ -412,14 +776,11 @@ const photoModel = {
             return await query(sql);
         } catch (error) {
             const fallbackSql = `
-                SELECT tag_name, COUNT(*) as usage_count 
-                FROM (
-                    SELECT t.tag_name
-                    FROM photo_tags pt
-                    JOIN tags t ON pt.tag_id = t.tag_id
-                    WHERE t.is_approved = 1
-                ) as tag_usage
-                GROUP BY tag_name
+                SELECT t.tag_name, COUNT(pt.photo_tag_id) as usage_count
+                FROM tags t
+                JOIN photo_tags pt ON t.tag_id = pt.tag_id
+                WHERE t.is_approved = 1
+                GROUP BY t.tag_id, t.tag_name
                 ORDER BY usage_count DESC
                 LIMIT ${numLimit}
             `;
@@ -443,47 +804,20 @@ const photoModel = {
         const numLimit = parseInt(limit);
         const numOffset = parseInt(offset);
 
-        let healthCondition = '';
+        const healthCondition = healthStatusCondition(healthStatus);
         const params = [userId];
 
-        switch (healthStatus) {
-            case 'healthy':
-                healthCondition = `
-                    AND (ht.weight IS NOT NULL AND ht.weight BETWEEN 1 AND 200)
-                    AND (ht.vaccination_date IS NULL OR ht.vaccination_date >= DATE_SUB(CURDATE(), INTERVAL 1 YEAR))
-                    AND (ht.next_vaccination_date IS NULL OR ht.next_vaccination_date >= CURDATE())
-                `;
-                break;
-            case 'needs_vaccination':
-                healthCondition = `
-                    AND (ht.vaccination_date IS NULL OR ht.vaccination_date < DATE_SUB(CURDATE(), INTERVAL 1 YEAR))
-                    AND (ht.next_vaccination_date IS NULL OR ht.next_vaccination_date < CURDATE())
-                `;
-                break;
-            case 'underweight':
-                healthCondition = 'AND ht.weight IS NOT NULL AND ht.weight < 1';
-                break;
-            case 'overweight':
-                healthCondition = 'AND ht.weight IS NOT NULL AND ht.weight > 200';
-                break;
-            case 'recent_vet_visit':
-                healthCondition = 'AND ht.vet_visit_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)';
-                break;
-            default:
-                healthCondition = '';
-        }
-
         let orderByClause = '';
         switch (sortBy) {
             case 'oldest':
-                orderByClause = 'ORDER BY p.created_at ASC';
+                orderByClause = 'ORDER BY p.created_at ASC, p.photo_id ASC';
                 break;
             case 'popular':
-                orderByClause = 'ORDER BY favorite_count DESC, p.created_at DESC';
+                orderByClause = 'ORDER BY p.favorite_count DESC, p.created_at DESC, p.photo_id DESC';
                 break;
             case 'newest':
             default:
-                orderByClause = 'ORDER BY p.created_at DESC';
+                orderByClause = 'ORDER BY p.created_at DESC, p.photo_id DESC';
                 break;
         }
 
@@ -492,8 +826,7 @@ const photoModel = {
                 p.*,
                 u.username,
                 u.profile_picture_url,
-                COALESCE(GROUP_CONCAT(DISTINCT t.tag_name), '') as tags,
-                COALESCE(COUNT(DISTINCT pf.favorite_id), 0) as favorite_count,
+                p.tag_names as tags,
                 ht.weight,
                 ht.vaccination_date,
                 ht.next_vaccination_date,
@@ -501,9 +834,6 @@ const photoModel = {
                 pet.name as pet_name
             FROM photos p
             INNER JOIN users u ON p.user_id = u.user_id
-            LEFT JOIN photo_tags pt ON p.photo_id = pt.photo_id
-            LEFT JOIN tags t ON pt.tag_id = t.tag_id
-            LEFT JOIN photo_favorites pf ON p.photo_id = pf.photo_id
             LEFT JOIN pets pet ON p.pet_id = pet.pet_id
             LEFT JOIN health_tracker ht ON pet.pet_id = ht.pet_id
             WHERE p.user_id = ? 
@@ -511,9 +841,6 @@ const photoModel = {
             AND pet.pet_id IS NOT NULL
             AND ht.health_id IS NOT NULL
             ${healthCondition}
-            GROUP BY p.photo_id, u.username, u.profile_picture_url, 
-                     ht.weight, ht.vaccination_date, ht.next_vaccination_date, 
-                     ht.vet_visit_date, pet.name
             ${orderByClause}
             LIMIT ${numLimit} OFFSET ${numOffset}
         `;
@@ -536,6 +863,68 @@ const photoModel = {
         }
     },
 
+    /**
+     * Retrieves photos filtered by pet health status with keyset (cursor) pagination.
+     * Pages by photo: a photo whose pet has several matching health records keeps
+     * all of its rows on the same page.
+     *
+     * @param {number} userId - User ID to filter photos
+     * @param {string} healthStatus - Health status to filter by, as for getPhotosByHealthStatus
+     * @param {string|null} [cursor=null] - nextCursor of the previous page; null for the first page
+     * @param {number} [limit=12] - Number of photos per page
+     * @param {string} [sortBy='newest'] - Sorting method ('newest', 'oldest', 'popular')
+     * @returns {Promise<{photos: Array, nextCursor: string|null}>} Page of photos and the cursor for the next page
+     */
+    async getPhotosByHealthStatusKeyset(userId, healthStatus, cursor = null, limit = 12, sortBy = 'newest') {
+        if (!KEYSET_SORTS[sortBy]) sortBy = 'newest';
+        const healthCondition = healthStatusCondition(healthStatus);
+
+        const pageWhere = `
+            WHERE p.user_id = ?
+            AND p.is_public = 1
+            AND EXISTS (
+                SELECT 1 FROM pets pet JOIN health_tracker ht ON pet.pet_id = ht.pet_id
+                WHERE pet.pet_id = p.pet_id
+                ${healthCondition}
+            )
+        `;
+        try {
+            const { ids, nextCursor } = await keysetPageIds(sortBy, pageWhere, [userId], cursor, limit);
+            if (ids.length === 0) {
+                return { photos: [], nextCursor: null };
+            }
+
+            const sql = `
+                SELECT DISTINCT 
+                    p.*,
+                    u.username,
+                    u.profile_picture_url,
+                    p.tag_names as tags,
+                    ht.weight,
+                    ht.vaccination_date,
+                    ht.next_vaccination_date,
+                    ht.vet_visit_date,
+                    pet.name as pet_name
+                FROM photos p
+                INNER JOIN users u ON p.user_id = u.user_id
+                LEFT JOIN pets pet ON p.pet_id = pet.pet_id
+                LEFT JOIN health_tracker ht ON pet.pet_id = ht.pet_id
+                WHERE p.photo_id IN (${ids.map(() => '?').join(', ')})
+                AND pet.pet_id IS NOT NULL
+                AND ht.health_id IS NOT NULL
+                ${healthCondition}
+                ${keysetOrderBy(KEYSET_SORTS[sortBy])}
+            `;
+
+            const photos = await query(sql, ids);
+            await markFavorited(photos, userId);
+            return { photos, nextCursor };
+        } catch (error) {
+            // console.error('Error in getPhotosByHealthStatusKeyset:', error);
+            return { photos: [], nextCursor: null };
+        }
+    },
+
     /**
      * Gets health status summary statistics for a user's pets.
      * 
@@ -592,4 +981,9 @@ const photoModel = {
     }
 };
 
+photoModel.KEYSET_SORTS = KEYSET_SORTS;
+photoModel.encodeCursor = encodeCursor;
+photoModel.decodeCursor = decodeCursor;
+photoModel.keysetCondition = keysetCondition;
+
 module.exports = photoModel;
\ No newline at end of file
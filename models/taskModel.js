@@ -3,10 +3,14 @@ const {
   toMySQLDateTime, 
   formatForDateTimeLocal
 } = require('../utils/timezone');
+const { tasks: TASK_RULES } = require('../config/validation-rules.json');
+
+// Shared with the Python test suite (config/validation.py)
+const TITLE_PATTERN = new RegExp(`^(?:${TASK_RULES.title.pattern})$`);
 
 const validationRules = {
-  taskType: ['feeding', 'cleaning', 'vaccination', 'medication', 'grooming', 'vet_visit', 'exercise', 'other'],
-  priority: ['low', 'medium', 'high'],
+  taskType: TASK_RULES.task_type.choices,
+  priority: TASK_RULES.priority.choices,
   
   /**
    * Validates task title format and length.
@@ -16,9 +20,9 @@ const validationRules = {
   validateTitle: (title) => {
     if (typeof title !== 'string') return false;
     const trimmed = title.trim();
-    return trimmed.length >= 1 && 
-           trimmed.length <= 100 && 
-           /^[a-zA-Z0-9\s\-_,.!()]+$/.test(trimmed);
+    return trimmed.length >= TASK_RULES.title.min_length && 
+           trimmed.length <= TASK_RULES.title.max_length && 
+           TITLE_PATTERN.test(trimmed);
   },
   
   /**
@@ -29,7 +33,7 @@ const validationRules = {
   validateDescription: (description) => {
     if (!description) return true;
     if (typeof description !== 'string') return false;
-    return description.length <= 500;
+    return description.length <= TASK_RULES.description.max_length;
   },
 
   /**
@@ -121,19 +125,19 @@ function parseDateTimeLocalInput(dateTimeString) {
  */
 async function createTask(userId, taskData) {
   if (!validationRules.validateTitle(taskData.title)) {
-    throw new Error('Invalid title format');
+    throw new Error(TASK_RULES.title.message);
   }
   
   if (!validationRules.validateDescription(taskData.description)) {
-    throw new Error('Invalid description format');
+    throw new Error(TASK_RULES.description.message);
   }
   
   if (!validationRules.taskType.includes(taskData.task_type)) {
-    throw new Error('Invalid task type');
+    throw new Error(TASK_RULES.task_type.message);
   }
   
   if (!validationRules.priority.includes(taskData.priority)) {
-    throw new Error('Invalid priority');
+    throw new Error(TASK_RULES.priority.message);
   }
 
   const petCheck = await query(
@@ -264,11 +268,11 @@ async function updateTask(taskId, userId, taskData) {
   }
 
   if (!validationRules.validateTitle(taskData.title)) {
-    throw new Error('Invalid title format');
+    throw new Error(TASK_RULES.title.message);
   }
   
   if (!validationRules.validateDescription(taskData.description)) {
-    throw new Error('Invalid description format');
+    throw new Error(TASK_RULES.description.message);
   }
   
   if (!validationRules.validateStartTime(taskData.due_date)) {
@@ -276,7 +280,7 @@ async function updateTask(taskId, userId, taskData) {
   }
   
   if (!validationRules.priority.includes(taskData.priority)) {
-    throw new Error('Invalid priority');
+    throw new Error(TASK_RULES.priority.message);
   }
 
   const startDate = parseDateTimeLocalInput(taskData.due_date);
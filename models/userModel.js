@@ -1,4 +1,5 @@
 const { query, queryOne } = require('../config/database');
+const photoModel = require('./photoModel');
 
 /**
  * Creates a new user account with verification token.
@@ -146,13 +147,13 @@ async function getUserProfile(userId) {
 }
 
 /**
- * Deletes a user account.
+ * Deletes a user account, releasing the tag usage counts of their photos.
  * 
  * @param {number} userId - ID of the user to delete
  * @returns {Promise<Object>} Database delete result
  */
 async function deleteUser(userId) {
-  return query(`DELETE FROM users WHERE user_id=?`, [userId]);
+  return photoModel.deleteUserAndReleaseTags(userId);
 }
 
 /**
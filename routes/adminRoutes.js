@@ -5,8 +5,10 @@ const {
   updateUsername,
   checkUserExistsExcludingCurrent,
   updateUserBio,
-  updateBioModerationStatus
+  updateBioModerationStatus,
+  deleteUser
 } = require('../models/userModel');
+const photoModel = require('../models/photoModel');
 const { uploadMultiple } = require('../config/upload');
 
 /**
@@ -193,7 +195,7 @@ router.post('/tags/:id/reject', requireAdmin, async (req, res) => {
  */
 router.post('/gallery/photo/:id/delete', requireAdmin, async (req, res) => {
   try {
-    await query('DELETE FROM photos WHERE photo_id = ?', [req.params.id]);
+    await photoModel.deletePhotoAsAdmin(req.params.id);
     res.json({ success: true, message: 'Photo deleted successfully' });
   } catch (error) {
     // console.error('Admin delete photo error:', error);
@@ -539,7 +541,7 @@ router.post('/users/:id/delete', requireAdmin, async (req, res) => {
       return res.status(400).json({ success: false, error: 'Cannot delete your own account' });
     }
 
-    const result = await query('DELETE FROM users WHERE user_id = ?', [userId]);
+    await deleteUser(userId);
     res.json({ success: true });
   } catch (error) {
     // console.error('Delete user error:', error);
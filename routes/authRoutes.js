@@ -6,6 +6,7 @@ const crypto = require('crypto');
 const { createUser, findByEmail, findByUsername, verifyUser, findById } = require('../models/userModel');
 const { queryOne, query } = require('../config/database');
 const sendEmail = require('../email/sendVerification');
+const { users: USER_RULES } = require('../config/validation-rules.json');
 
 const router = express.Router();
 
@@ -226,7 +227,7 @@ router.post('/register', async (req, res) => {
     });
   }
 
-  const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+  const emailRegex = new RegExp(`^(?:${USER_RULES.email.pattern})$`);
   if (!emailRegex.test(email)) {
     return res.status(400).render('register', {
       title: 'Register - Pet Care Management',
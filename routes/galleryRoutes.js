@@ -35,7 +35,15 @@ router.get('/', requireAuth, async (req, res) => {
             current_user_id: req.session.userId
         };
 
-        const photos = await photoModel.getPublicPhotos(page, limit, filters, sortBy);
+        // First pages and cursor links page by keyset; bare ?page=N links keep using OFFSET
+        const cursor = req.query.cursor || null;
+        let photos;
+        let nextCursor = null;
+        if (cursor || page === 1) {
+            ({ photos, nextCursor } = await photoModel.getPublicPhotosKeyset(cursor, limit, filters, sortBy));
+        } else {
+            photos = await photoModel.getPublicPhotos(page, limit, filters, sortBy);
+        }
         const popularTags = await photoModel.getPopularTags();
 
         res.render('gallery/index', {
@@ -46,7 +54,8 @@ router.get('/', requireAuth, async (req, res) => {
             currentTag: req.query.tag,
             currentSearch: req.query.search,
             currentSort: sortBy,
-            hasMore: photos.length === limit
+            nextCursor,
+            hasMore: nextCursor !== null || (!cursor && page > 1 && photos.length === limit)
         });
     } catch (error) {
         // console.error('Gallery error:', error);
@@ -114,13 +123,26 @@ router.get('/health-status/:status', requireAuth, async (req, res) => {
             current_user_id: req.session.userId
         };
 
-        const photos = await photoModel.getPhotosByHealthStatus(
-            req.session.userId,
-            healthStatus,
-            page,
-            limit,
-            sortBy
-        );
+        const cursor = req.query.cursor || null;
+        let photos;
+        let nextCursor = null;
+        if (cursor || page === 1) {
+            ({ photos, nextCursor } = await photoModel.getPhotosByHealthStatusKeyset(
+                req.session.userId,
+                healthStatus,
+                cursor,
+                limit,
+                sortBy
+            ));
+        } else {
+            photos = await photoModel.getPhotosByHealthStatus(
+                req.session.userId,
+                healthStatus,
+                page,
+                limit,
+                sortBy
+            );
+        }
 
         const popularTags = await photoModel.getPopularTags();
         const healthSummary = await photoModel.getHealthStatusSummary(req.session.userId);
@@ -142,7 +164,8 @@ router.get('/health-status/:status', requireAuth, async (req, res) => {
             currentHealthStatus: healthStatus,
             currentSort: sortBy,
             statusLabels,
-            hasMore: photos.length === limit
+            nextCursor,
+            hasMore: nextCursor !== null || (!cursor && page > 1 && photos.length === limit)
         });
     } catch (error) {
         // console.error('Health gallery error:', error);
@@ -1,5 +1,5 @@
 const express = require('express');
-const { getHealthRecords, getHealthRecordById, addHealthRecord, updateHealthRecord, deleteHealthRecord } = require('../models/healthModel');
+const { getHealthRecords, getHealthTrends, getHealthSummaries, getHealthRecordById, addHealthRecord, updateHealthRecord, deleteHealthRecord } = require('../models/healthModel');
 const { query } = require('../config/database');
 
 const router = express.Router();
@@ -375,6 +375,39 @@ router.get('/records', requireAuth, async (req, res) => {
   }
 });
 
+/**
+ * GET /health/trends
+ * Retrieves the precomputed health trends and monthly summaries for all pets
+ * belonging to the authenticated user, without scanning their health records.
+ *
+ * @name GET /health/trends
+ * @function
+ * @memberof module:routes/healthRoute
+ * @param {number} req.query.months - Months of summaries to include (default: 12)
+ * @returns {Object} JSON object with pet IDs as keys and { trend, months } as values
+ */
+router.get('/trends', requireAuth, async (req, res) => {
+  try {
+    const pets = await query('SELECT pet_id FROM pets WHERE user_id = ?', [req.session.userId]);
+    const petIds = pets.map(pet => pet.pet_id);
+    const months = Math.min(Math.max(parseInt(req.query.months) || 12, 1), 120);
+    const [trends, summaries] = await Promise.all([
+      getHealthTrends(petIds),
+      getHealthSummaries(petIds, months)
+    ]);
+
+    const trendsByPet = {};
+    petIds.forEach(petId => {
+      trendsByPet[petId] = { trend: trends[petId] || null, months: summaries[petId] || [] };
+    });
+
+    res.json(trendsByPet);
+  } catch (error) {
+
+    res.status(500).json({ error: 'Error fetching health trends' });
+  }
+});
+
 /**
  * GET /health/edit/:recordId
  * Renders the edit form for a specific health record.
@@ -3,6 +3,7 @@ const path = require('path');
 const fs = require('fs');
 const { uploadProfile } = require('../config/upload-cloudinary');
 const { query, queryOne } = require('../config/database');
+const { users: USER_RULES } = require('../config/validation-rules.json');
 const {
   updateUserProfilePicture,
   getUserProfileWithStats,
@@ -320,7 +321,7 @@ router.post('/email', requireAuth, async (req, res) => {
       });
     }
     const trimmedEmail = email.trim().toLowerCase();
-    const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+    const emailRegex = new RegExp(`^(?:${USER_RULES.email.pattern})$`);
     if (!emailRegex.test(trimmedEmail)) {
       return res.status(400).json({
         success: false,
@@ -115,38 +115,491 @@
 
 #!/usr/bin/env python3
 """
-Simple test runner
+Test orchestrator: runs the pytest, Jest and Cypress suites concurrently.
+
+pytest is split into shards balanced by the per-test durations recorded in
+.test-durations.json, and every shard gets its own database (TEST_SHARD).
+Output from all suites is streamed live, each line prefixed with its suite,
+and the results are merged into a single JUnit XML report.
+
+With --changed, only the tests a git diff can affect are run, selected from
+the per-test dependency map in .test-impact.json (see config/impact_map.py).
 """
 
+import argparse
+import importlib.util
+import json
+import os
+import re
+import shlex
+import shutil
+import statistics
 import subprocess
 import sys
-import os
+import threading
+import time
+import tomllib
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from config.impact_map import changed_files, full_run_reason, load_impact_map, select_tests, update_impact_map
+
+ROOT = Path(__file__).resolve().parent
+REPORT_DIR = ROOT / 'test-reports'
+DURATIONS_FILE = ROOT / '.test-durations.json'
+IMPACT_FILE = ROOT / '.test-impact.json'
+# Jest and Cypress run from node_modules; without `npm ci` their suites are skipped
+NODE_BIN = ROOT / 'node_modules' / '.bin'
+PYPROJECT = ROOT / 'pyproject.toml'
+SUITES = ('python', 'jest', 'cypress', 'registration')
+DEFAULT_SUITES = ('python', 'jest', 'cypress')
+
+# Estimate for tests with no recorded duration when nothing else is known
+DEFAULT_DURATION = 1.0
+
+# Outside these, a changed file may alter what the browser tests see
+NON_APP_PATHS = ('tests/python/', 'tests/unit/', 'benchmarks/', 'config/test_', 'RegistrationTests/')
+NON_APP_SUFFIXES = ('.py', '.md', '.txt')
+
+
+class Job:
+    """One subprocess of the run and, once finished, its outcome"""
+
+    def __init__(self, name, command, reports=(), cwd=ROOT, env=None):
+        self.name = name
+        self.command = command
+        self.reports = reports
+        self.cwd = cwd
+        self.env = env
+        self.returncode = None
+        self.elapsed = 0.0
+        self.skipped = None
+        # A requested suite whose tool is missing fails the run unless --allow-missing
+        self.unavailable = False
+        self.required = True
+
+    def run(self, lock):
+        """Run the command, streaming each output line with a [name] prefix"""
+        if self.skipped is None and shutil.which(self.command[0]) is None:
+            self.skipped = f"{Path(self.command[0]).name} not installed"
+            self.unavailable = True
+        if self.skipped is not None:
+            with lock:
+                print(f"[{self.name}] ⚠️ Skipped: {self.skipped}", flush=True)
+            return self
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            self.command, cwd=self.cwd, env=self.env, text=True, errors='replace',
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=1
+        )
+        for line in process.stdout:
+            with lock:
+                print(f"[{self.name}] {line.rstrip()}", flush=True)
+        self.returncode = process.wait()
+        self.elapsed = time.perf_counter() - started
+        return self
+
+    @property
+    def missing(self):
+        """True if the suite could not run and was not allowed to be missing"""
+        return self.unavailable and self.required
+
+    @property
+    def passed(self):
+        """Exited 0, or skipped because --changed left it nothing to run"""
+        if self.skipped is not None:
+            return not self.missing
+        return self.returncode == 0
+
+
+# -- pytest sharding -------------------------------------------------------
+
+def junit_key(node_id):
+    """The classname::name pytest's JUnit report uses for a node id"""
+    path, bracket, params = node_id.partition('[')
+    names = path.split('::')
+    names[0] = re.sub(r'\.py$', '', names[0].replace('/', '.'))
+    names[-1] += bracket + params
+    return '.'.join(names[:-1]) + '::' + names[-1]
+
+
+def load_durations(path=DURATIONS_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def update_durations(report_paths, path=DURATIONS_FILE):
+    """Fold the test times from pytest JUnit reports into the durations file"""
+    durations = load_durations(path)
+    for report in report_paths:
+        if not report.exists():
+            continue
+        for case in ET.parse(report).iter('testcase'):
+            if case.find('skipped') is None:
+                key = f"{case.get('classname')}::{case.get('name')}"
+                durations[key] = round(float(case.get('time') or 0), 4)
+    with open(path, 'w') as f:
+        json.dump(dict(sorted(durations.items())), f, indent=1)
+        f.write('\n')
+    return durations
+
+
+def collect_tests(pytest_args, env):
+    """Node ids pytest would run, or None if collection itself fails"""
+    result = subprocess.run(
+        [sys.executable, '-m', 'pytest', '--collect-only', '-q', '-o', 'addopts=', *pytest_args],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode not in (0, 5):  # 5: nothing collected
+        return None
+    return [line.strip() for line in result.stdout.splitlines() if '::' in line]
+
+
+def shard_tests(node_ids, durations, shards):
+    """Split tests into shards of similar total duration.
+
+    Longest tests are placed first, each on the currently lightest shard.
+    Tests without a recorded time count as the median known time. Each
+    shard keeps collection order so module and class fixtures stay grouped.
+    """
+    known = [durations[junit_key(n)] for n in node_ids if junit_key(n) in durations]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    order = {node_id: index for index, node_id in enumerate(node_ids)}
+    loads = [[0.0, shard, []] for shard in range(max(1, min(shards, len(node_ids))))]
+    for node_id in sorted(node_ids, key=lambda n: -durations.get(junit_key(n), default)):
+        lightest = min(loads, key=lambda load: (load[0], load[1]))
+        lightest[0] += durations.get(junit_key(node_id), default)
+        lightest[2].append(node_id)
+    return [sorted(ids, key=order.__getitem__) for _total, _shard, ids in loads if ids]
+
+
+def is_test_target(arg):
+    """True for a test path or node id rather than an option or its value"""
+    return not arg.startswith('-') and ('::' in arg or (ROOT / arg).exists())
+
+
+def coverage_addopts(path=PYPROJECT):
+    """(sources, reports) of the --cov and --cov-report options in pyproject's addopts"""
+    with open(path, 'rb') as f:
+        addopts = tomllib.load(f)['tool']['pytest']['ini_options'].get('addopts', '')
+    sources, reports = [], []
+    for option in shlex.split(addopts):
+        name, _, value = option.partition('=')
+        if name == '--cov':
+            sources.append(value)
+        elif name == '--cov-report':
+            reports.append(value)
+    return sources, reports
+
+
+def coverage_file(number):
+    return ROOT / f'.coverage.python-{number}'
+
+
+def report_coverage(reports):
+    """Combine the shards' coverage data and write the reports pyproject asks for"""
+    data = sorted(ROOT.glob('.coverage.python-*'))
+    if not data:
+        return
+    coverage = [sys.executable, '-m', 'coverage']
+    subprocess.run(coverage + ['combine', '--quiet', *map(str, data)], cwd=ROOT)
+    for report in reports:
+        kind, _, output = report.partition(':')
+        if kind == 'html':
+            subprocess.run(coverage + ['html', *(['-d', output] if output else [])], cwd=ROOT)
+        elif kind == 'xml':
+            subprocess.run(coverage + ['xml', *(['-o', output] if output else [])], cwd=ROOT)
+        elif kind in ('term', 'term-missing'):
+            subprocess.run(coverage + ['report', *(['-m'] if kind == 'term-missing' else [])], cwd=ROOT)
+
+
+def python_jobs(args, pytest_args, env, changed=None, coverage=None):
+    """One pytest job per shard, each with its own database, JUnit file and impact map.
+
+    pyproject's addopts are cleared: its --cov reports would be written by
+    every shard at once. With `coverage` (the --cov sources) each shard
+    records to its own data file instead, combined by report_coverage().
+    """
+    targets = pytest_args if any(is_test_target(arg) for arg in pytest_args) else ['tests/', *pytest_args]
+    node_ids = collect_tests(targets, env)
+    base = [sys.executable, '-m', 'pytest', '-o', 'addopts=', '-p', 'no:cacheprovider']
+    if coverage is not None:
+        base += [f'--cov={source}' if source else '--cov' for source in coverage] + ['--cov-report=']
+
+    if node_ids and changed is not None:
+        impact = load_impact_map(IMPACT_FILE)
+        reason = full_run_reason(changed, impact)
+        if reason:
+            print(f"🔍 Running every Python test: {reason}")
+        else:
+            from config.impact_map import schema_tables
+            selected = select_tests(node_ids, impact, changed, schema_tables())
+            print(f"🔍 {len(selected)} of {len(node_ids)} Python tests affected by the change")
+            if not selected:
+                return []
+            node_ids = selected
+            targets = [arg for arg in pytest_args if not is_test_target(arg)] + node_ids
+
+    if not node_ids or args.shards <= 1:
+        # Collection errors are reported by a normal unsharded run
+        report = REPORT_DIR / 'python-1.xml'
+        impact = REPORT_DIR / 'impact-1.json'
+        command = base + [*targets, f'--junit-xml={report}', f'--impact-map={impact}']
+        return [Job('python', command, [report], env=dict(env, COVERAGE_FILE=str(coverage_file(1))))]
+
+    # Shards get explicit node ids, so only the options carry over
+    options = [arg for arg in pytest_args if not is_test_target(arg)]
+    shards = shard_tests(node_ids, load_durations(), args.shards)
+    jobs = []
+    for number, ids in enumerate(shards, 1):
+        report = REPORT_DIR / f'python-{number}.xml'
+        impact = REPORT_DIR / f'impact-{number}.json'
+        shard_env = dict(env, TEST_SHARD=f'shard{number}', COVERAGE_FILE=str(coverage_file(number)))
+        command = base + options + ids + [f'--junit-xml={report}', f'--impact-map={impact}']
+        jobs.append(Job(f'python:{number}/{len(shards)}', command, [report], env=shard_env))
+    print(f"📊 Sharded {len(node_ids)} tests across {len(shards)} pytest workers")
+    return jobs
+
+
+# -- Other suites ----------------------------------------------------------
+
+def jest_job(env, changed=None):
+    report = REPORT_DIR / 'jest.json'
+    command = [str(NODE_BIN / 'jest'), 'tests/unit/', '--ci', '--json', f'--outputFile={report}']
+    job = Job('jest', command, [report], env=env)
+    if changed is not None:
+        # Jest follows the import graph itself
+        sources = [name for name in changed if name.endswith(('.js', '.json'))]
+        command[1:2] = ['--testPathPattern=tests/unit/', '--findRelatedTests', *sources]
+        if not sources:
+            job.skipped = "no JavaScript changes"
+    return job
+
+
+def app_changed(changed):
+    """True if any changed file can affect the running app"""
+    return any(
+        not name.startswith(NON_APP_PATHS) and not name.endswith(NON_APP_SUFFIXES)
+        for name in changed
+    )
+
+
+def cypress_job(env, changed=None):
+    # start-server-and-test boots server.js for cypress.config.js's baseUrl
+    pattern = REPORT_DIR / 'cypress' / 'results-[hash].xml'
+    cypress = f"npx cypress run --reporter junit --reporter-options mochaFile={pattern}"
+    command = [str(NODE_BIN / 'start-server-and-test'), 'start', 'http://localhost:3000', cypress]
+    job = Job('cypress', command, [REPORT_DIR / 'cypress'], env=env)
+    if changed is not None and not app_changed(changed):
+        job.skipped = "no app changes"
+    return job
+
+
+def registration_job(env):
+    command = ['node', 'run-all-tests.js']
+    return Job('registration', command, [], cwd=ROOT / 'RegistrationTests', env=env)
+
+
+# -- JUnit merge -----------------------------------------------------------
+
+def jest_suites(path):
+    """JUnit <testsuite> elements from Jest's --json output"""
+    with open(path) as f:
+        results = json.load(f)
+    suites = []
+    for result in results.get('testResults', []):
+        name = os.path.relpath(result['name'], ROOT)
+        suite = ET.Element('testsuite', name=name)
+        for assertion in result.get('assertionResults', []):
+            case = ET.SubElement(
+                suite, 'testcase',
+                classname=' › '.join(assertion.get('ancestorTitles') or [name]),
+                name=assertion['title'],
+                time=f"{(assertion.get('duration') or 0) / 1000:.3f}"
+            )
+            if assertion['status'] == 'failed':
+                failure = ET.SubElement(case, 'failure', message=assertion['title'])
+                failure.text = '\n'.join(assertion.get('failureMessages') or [])
+            elif assertion['status'] in ('pending', 'skipped', 'todo'):
+                ET.SubElement(case, 'skipped')
+        if result.get('status') == 'failed' and not result.get('assertionResults'):
+            # The file itself failed to load or run
+            case = ET.SubElement(suite, 'testcase', classname=name, name='(suite)', time='0')
+            ET.SubElement(case, 'error', message='Test suite failed to run').text = result.get('message', '')
+        suites.append(suite)
+    return suites
+
+
+def junit_suites(path):
+    root = ET.parse(path).getroot()
+    return [root] if root.tag == 'testsuite' else list(root.iter('testsuite'))
+
+
+def report_suites(job):
+    """Every <testsuite> a job produced, or a synthetic one if it left no report"""
+    suites = []
+    for report in job.reports:
+        paths = sorted(report.glob('*.xml')) if report.is_dir() else [report]
+        for path in paths:
+            if not path.exists():
+                continue
+            suites += jest_suites(path) if path.suffix == '.json' else junit_suites(path)
+    if not suites and (job.skipped is None or job.missing):
+        suite = ET.Element('testsuite', name=job.name)
+        case = ET.SubElement(suite, 'testcase', classname=job.name, name=job.name, time=f'{job.elapsed:.3f}')
+        if job.missing:
+            ET.SubElement(case, 'error', message=job.skipped)
+        elif job.returncode != 0:
+            ET.SubElement(case, 'error', message=f'exit code {job.returncode}')
+        suites.append(suite)
+    return suites
+
+
+def merge_reports(jobs, output):
+    """Combine every job's results into one <testsuites> document"""
+    root = ET.Element('testsuites', name='petcare')
+    totals = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0}
+    elapsed = 0.0
+    for job in jobs:
+        for suite in report_suites(job):
+            suite.set('name', f"{job.name}: {suite.get('name', '')}")
+            cases = list(suite.iter('testcase'))
+            counts = {
+                'tests': len(cases),
+                'failures': sum(case.find('failure') is not None for case in cases),
+                'errors': sum(case.find('error') is not None for case in cases),
+                'skipped': sum(case.find('skipped') is not None for case in cases),
+            }
+            for key, value in counts.items():
+                suite.set(key, str(value))
+                totals[key] += value
+            time_taken = sum(float(case.get('time') or 0) for case in cases)
+            suite.set('time', f'{time_taken:.3f}')
+            elapsed += time_taken
+            root.append(suite)
+    for key, value in totals.items():
+        root.set(key, str(value))
+    root.set('time', f'{elapsed:.3f}')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(root).write(output, encoding='utf-8', xml_declaration=True)
+    return totals
+
+
+# -- Main ------------------------------------------------------------------
+
+def reset_reports():
+    REPORT_DIR.mkdir(exist_ok=True)
+    stale_files = [*REPORT_DIR.glob('python-*.xml'), *REPORT_DIR.glob('impact-*.json'), REPORT_DIR / 'jest.json']
+    stale_files += ROOT.glob('.coverage.python-*')
+    for stale in stale_files:
+        stale.unlink(missing_ok=True)
+    shutil.rmtree(REPORT_DIR / 'cypress', ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pet Care Management test runner",
+        epilog="Unrecognised arguments are passed to pytest (or to the benchmarks with --bench)."
+    )
+    parser.add_argument('--bench', metavar='SCALE', action='append',
+                        help="run the query benchmarks at SCALE (1k, 100k, 10m) instead of the tests")
+    parser.add_argument('--suite', action='append', choices=SUITES,
+                        help=f"suite to run (repeatable; default: {', '.join(DEFAULT_SUITES)})")
+    parser.add_argument('--shards', type=int, default=min(4, os.cpu_count() or 1),
+                        help="pytest worker processes, balanced by recorded durations")
+    parser.add_argument('--report', type=Path, default=REPORT_DIR / 'junit.xml',
+                        help="merged JUnit XML report")
+    parser.add_argument('--changed', metavar='REF', nargs='?', const='HEAD',
+                        help="only run tests affected by changes since REF (default: HEAD)")
+    parser.add_argument('--coverage', action='store_true',
+                        help="measure the pytest shards with pyproject's --cov options and combine them")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="pass the run when a requested suite's tool is not installed")
+    args, extra_args = parser.parse_known_args(argv)
+    if extra_args[:1] == ['--']:
+        extra_args = extra_args[1:]
+    if args.bench:
+        from benchmarks.query_benchmarks import main as run_benchmarks
+        scales = [arg for scale in args.bench for arg in ('--scale', scale)]
+        return run_benchmarks(scales + extra_args)
 
-def main():
     print("🚀 Starting Pet Care Management Tests...")
-    
-    # Set environment
-    env = os.environ.copy()
-    env['PYTHONPATH'] = os.getcwd()
-    
-    # Run basic tests
-    print("\n📊 Running Basic Tests...")
-    
-    # Use python -m pytest instead of just pytest
-    result = subprocess.run([
-        'python', '-m', 'pytest', 'tests/', '-v'
-    ], env=env, capture_output=True, text=True)
-    
-    print(result.stdout)
-    if result.stderr:
-        print("STDERR:", result.stderr)
-    
-    if result.returncode == 0:
-        print("🎉 BASIC TESTS PASSED!")
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONUNBUFFERED='1')
+    reset_reports()
+
+    changed = None
+    if args.changed:
+        changed = changed_files(args.changed)
+        if changed is None:
+            print(f"⚠️ Could not diff against {args.changed}; running everything")
+        else:
+            print(f"🔍 {len(changed)} files changed since {args.changed}")
+
+    suites = args.suite or DEFAULT_SUITES
+    coverage_sources = coverage_reports = None
+    if 'python' in suites:
+        if args.coverage and importlib.util.find_spec('pytest_cov') is None:
+            print("❌ --coverage needs pytest-cov: pip install pytest-cov")
+            return 1
+        if args.coverage:
+            coverage_sources, coverage_reports = coverage_addopts()
+        else:
+            print("⚠️ Coverage off: pyproject's --cov addopts are not applied to the shards; "
+                  "pass --coverage to measure them")
+
+    jobs = []
+    if 'python' in suites:
+        jobs += python_jobs(args, extra_args, env, changed, coverage_sources)
+    if 'jest' in suites:
+        jobs.append(jest_job(env, changed))
+    if 'cypress' in suites:
+        jobs.append(cypress_job(env, changed))
+    if 'registration' in suites:
+        jobs.append(registration_job(env))
+
+    for job in jobs:
+        job.required = not args.allow_missing
+
+    lock = threading.Lock()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        list(pool.map(lambda job: job.run(lock), jobs))
+    wall = time.perf_counter() - started
+
+    python_reports = [report for job in jobs if job.name.startswith('python') for report in job.reports]
+    if python_reports:
+        update_durations(python_reports)
+        update_impact_map(sorted(REPORT_DIR.glob('impact-*.json')), IMPACT_FILE)
+    if coverage_reports is not None:
+        report_coverage(coverage_reports)
+    totals = merge_reports(jobs, args.report)
+
+    print("\n" + "=" * 60)
+    print("📋 SUITE SUMMARY")
+    print("=" * 60)
+    for job in jobs:
+        if job.missing:
+            status = f"❌ {job.skipped} (pass --allow-missing to skip it)"
+        elif job.skipped:
+            status = f"⚠️ skipped ({job.skipped})"
+        else:
+            status = "✅" if job.passed else f"❌ exit {job.returncode}"
+        print(f"{job.name:20} {job.elapsed:8.1f}s  {status}")
+    print(f"\n⏱️ Wall time {wall:.1f}s (suites added up: {sum(job.elapsed for job in jobs):.1f}s)")
+    print(f"📊 {totals['tests']} tests, {totals['failures']} failures, "
+          f"{totals['errors']} errors, {totals['skipped']} skipped")
+    print(f"📁 JUnit report: {args.report}")
+
+    if all(job.passed for job in jobs):
+        print("🎉 ALL SUITES PASSED!")
         return 0
-    else:
-        print("💥 TESTS FAILED!")
-        return 1
+    print("💥 TESTS FAILED!")
+    return 1
+
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -9,6 +9,12 @@ const fs = require('fs');
 require('dotenv').config();
 require('./config/cloudinary');
 const { findById } = require('./models/userModel');
+const {
+  RECENT_RECORD_MONTHS,
+  getRecentHealthRecords,
+  getHealthTrends,
+  getHealthSummaries
+} = require('./models/healthModel');
 const { testConnection, query } = require('./config/database');
 const authRoutes = require('./routes/authRoutes');
 const petRoutes = require('./routes/petRoutes');
@@ -747,15 +753,9 @@ app.use((req, res, next) => {
 app.get('/health-tracker', requireAuth, async (req, res) => {
   try {
     const pets = await query('SELECT * FROM pets WHERE user_id = ?', [req.session.userId]);
-    const healthRecords = {};
-    for (const pet of pets) {
-      const records = await query('SELECT * FROM health_tracker WHERE pet_id = ? ORDER BY date_recorded DESC LIMIT 10', [pet.pet_id]);
-      healthRecords[pet.pet_id] = records;
-    }
     res.render('health-tracker', {
       title: 'Health Tracker',
-      pets,
-      healthRecords
+      pets
     });
   } catch (err) {
 
@@ -893,7 +893,7 @@ app.get('/landing', (req, res) => {
 
 /**
  * GET /health-tracker-history
- * Health tracker history page with all health records.
+ * Health tracker history page with each pet's trend, monthly summary and recent health records.
  *
  * @name GET /health-tracker-history
  * @function
@@ -902,15 +902,20 @@ app.get('/landing', (req, res) => {
 app.get('/health-tracker-history', requireAuth, async (req, res) => {
   try {
     const pets = await query('SELECT * FROM pets WHERE user_id = ?', [req.session.userId]);
-    const healthRecords = {};
-    for (const pet of pets) {
-      const records = await query('SELECT * FROM health_tracker WHERE pet_id = ? ORDER BY date_recorded DESC', [pet.pet_id]);
-      healthRecords[pet.pet_id] = records;
-    }
+    const petIds = pets.map(pet => pet.pet_id);
+    // Trends and monthly blocks are precomputed; raw records are one capped query for every pet
+    const [healthRecords, healthTrends, healthSummaries] = await Promise.all([
+      getRecentHealthRecords(petIds),
+      getHealthTrends(petIds),
+      getHealthSummaries(petIds)
+    ]);
     res.render('health-tracker-history', {
       title: 'Health Tracker History',
       pets,
       healthRecords,
+      healthTrends,
+      healthSummaries,
+      recordMonths: RECENT_RECORD_MONTHS,
       message: req.query.message || null
     });
   } catch (err) {
@@ -1,44 +1,123 @@
+const crypto = require('crypto');
 const notificationModel = require('../models/notificationModel');
 const { query } = require('../config/database');
 
+// Tasks claimed, notified and marked per round of the due-task sweep
+const SWEEP_CHUNK_SIZE = 1000;
+// A claim older than this belongs to a node that died mid-sweep and may be taken over
+const CLAIM_TTL_MS = 5 * 60 * 1000;
+// Digest notifications written per multi-row INSERT
+const DIGEST_CHUNK_SIZE = 500;
+
+// Same layout as Date#toLocaleString() in en-US, e.g. 5/1/2024, 10:00:00 AM
+const DUE_TIME_FORMAT = '%c/%e/%Y, %l:%i:%S %p';
+
+// Claims up to SWEEP_CHUNK_SIZE due tasks for one sweep. InnoDB locks the rows
+// while the UPDATE runs, so a second node blocks, re-reads the claim columns
+// and skips the rows the first one took.
+const CLAIM_DUE_TASKS_SQL = `
+  UPDATE tasks
+  SET notification_claim = ?, notification_claimed_at = ?
+  WHERE completed = false
+  AND notification_sent = false
+  AND due_date BETWEEN ? AND ?
+  AND (notification_claim IS NULL OR notification_claimed_at < ?)
+  ORDER BY due_date, task_id
+  LIMIT ${SWEEP_CHUNK_SIZE}
+`;
+
+/**
+ * Builds the set-based INSERT ... SELECT that writes one task_due notification
+ * per claimed task, with the same titles and messages as createTaskDueNotification.
+ *
+ * @param {number} count - Number of task ids bound to the IN list
+ * @returns {string} SQL taking [now, ...taskIds, claim]
+ */
+function dueNotificationsSql(count) {
+  const placeholders = new Array(count).fill('?').join(', ');
+  return `
+    INSERT INTO notifications (user_id, type, title, message, related_id, is_read)
+    SELECT d.user_id, 'task_due',
+      CASE
+        WHEN d.minutes <= 0 THEN CONCAT('🚨 Task Overdue: ', d.title)
+        WHEN d.minutes <= 15 THEN CONCAT('⚠️ Task Due Soon: ', d.title)
+        ELSE CONCAT('📅 Task Reminder: ', d.title)
+      END,
+      CASE
+        WHEN d.minutes <= 0 THEN CONCAT('The task "', d.title, '" for ', d.pet_name, ' is overdue! It was due at ', d.due_time, '.')
+        WHEN d.minutes <= 15 THEN CONCAT('The task "', d.title, '" for ', d.pet_name, ' is due in ', d.minutes, ' minutes (', d.due_time, ').')
+        ELSE CONCAT('Reminder: "', d.title, '" for ', d.pet_name, ' is due at ', d.due_time, '.')
+      END,
+      d.task_id, false
+    FROM (
+      SELECT t.task_id, t.user_id, t.title, p.name AS pet_name,
+        TIMESTAMPDIFF(MINUTE, ?, t.due_date) AS minutes,
+        DATE_FORMAT(t.due_date, '${DUE_TIME_FORMAT}') AS due_time
+      FROM tasks t
+      JOIN pets p ON t.pet_id = p.pet_id
+      JOIN users u ON t.user_id = u.user_id
+      WHERE t.task_id IN (${placeholders})
+      AND t.notification_claim = ?
+    ) d
+  `;
+}
+
+/**
+ * Builds the UPDATE that marks a chunk as notified and releases its claim.
+ *
+ * @param {number} count - Number of task ids bound to the IN list
+ * @returns {string} SQL taking [...taskIds, claim]
+ */
+function markNotifiedSql(count) {
+  const placeholders = new Array(count).fill('?').join(', ');
+  return `
+    UPDATE tasks
+    SET notification_sent = true, notification_claim = NULL, notification_claimed_at = NULL
+    WHERE task_id IN (${placeholders})
+    AND notification_claim = ?
+  `;
+}
+
 class NotificationService {
-  // Check for due tasks and create notifications
+  /**
+   * Sweeps tasks due within the next hour and notifies their owners in chunks:
+   * claim a chunk, write its notifications with one INSERT ... SELECT, then mark
+   * it with one UPDATE. Several app nodes can sweep at once; each only writes
+   * notifications for tasks carrying its own claim token. A node that dies
+   * between the INSERT and the UPDATE leaves its chunk claimed until the claim
+   * expires, after which the chunk is notified again.
+   *
+   * @returns {Promise<number>} Number of tasks notified
+   */
   async checkDueTasks() {
+    let notified = 0;
     try {
-      // console.log('🔔 Checking for due tasks...');
-      
-      // Get tasks that are due in the next hour or are overdue
       const now = new Date();
       const oneHourFromNow = new Date(now.getTime() + 60 * 60 * 1000);
-      
-      const sql = `
-        SELECT t.*, p.name as pet_name, u.user_id, u.username
-        FROM tasks t
-        JOIN pets p ON t.pet_id = p.pet_id
-        JOIN users u ON t.user_id = u.user_id
-        WHERE t.completed = false 
-        AND t.due_date BETWEEN ? AND ?
-        AND t.notification_sent = false
-      `;
-      
-      const dueTasks = await query(sql, [now, oneHourFromNow]);
-      
-      // console.log(`📋 Found ${dueTasks.length} due tasks`);
-      
-      for (const task of dueTasks) {
-        await this.createTaskDueNotification(task);
-        
-        // Mark task as notification sent
-        await query(
-          'UPDATE tasks SET notification_sent = true WHERE task_id = ?',
-          [task.task_id]
-        );
+      const staleBefore = new Date(now.getTime() - CLAIM_TTL_MS);
+      const claim = crypto.randomUUID();
+
+      for (;;) {
+        const claimed = await query(CLAIM_DUE_TASKS_SQL, [claim, now, now, oneHourFromNow, staleBefore]);
+        if (!claimed.affectedRows) {
+          break;
+        }
+
+        const rows = await query('SELECT task_id FROM tasks WHERE notification_claim = ?', [claim]);
+        const taskIds = rows.map(row => parseInt(row.task_id));
+        if (taskIds.length === 0) {
+          break;
+        }
+
+        await query(dueNotificationsSql(taskIds.length), [now, ...taskIds, claim]);
+        const marked = await query(markNotifiedSql(taskIds.length), [...taskIds, claim]);
+        notified += marked.affectedRows;
       }
-      
-      return dueTasks.length;
+
+      return notified;
     } catch (error) {
       // console.error('Error checking due tasks:', error);
-      return 0;
+      return notified;
     }
   }
 
@@ -118,11 +197,12 @@ class NotificationService {
         tasksByUser[userId].push(task);
       });
       
-      // Create digest notifications for each user
-      for (const [userId, tasks] of Object.entries(tasksByUser)) {
-        if (tasks.length > 0) {
-          await this.createDailyDigestNotification(parseInt(userId), tasks);
-        }
+      // Build every user's digest, then write them a chunk at a time
+      const digests = Object.entries(tasksByUser)
+        .filter(([, tasks]) => tasks.length > 0)
+        .map(([userId, tasks]) => this.buildDailyDigest(parseInt(userId), tasks));
+      for (let i = 0; i < digests.length; i += DIGEST_CHUNK_SIZE) {
+        await notificationModel.createNotifications(digests.slice(i, i + DIGEST_CHUNK_SIZE));
       }
       
       return tomorrowTasks.length;
@@ -132,20 +212,23 @@ class NotificationService {
     }
   }
 
-  async createDailyDigestNotification(userId, tasks) {
+  // Build the digest notification for one user's tasks due tomorrow
+  buildDailyDigest(userId, tasks) {
     const taskList = tasks.map(task => 
       `• ${task.title} for ${task.pet_name} at ${new Date(task.due_date).toLocaleTimeString()}`
     ).join('\n');
 
-    const title = `📋 Daily Task Digest (${tasks.length} tasks)`;
-    const message = `You have ${tasks.length} tasks scheduled for tomorrow:\n\n${taskList}`;
+    return {
+      userId: parseInt(userId), // Ensure user_id is number
+      type: 'daily_digest',
+      title: `📋 Daily Task Digest (${tasks.length} tasks)`,
+      message: `You have ${tasks.length} tasks scheduled for tomorrow:\n\n${taskList}`
+    };
+  }
 
-    await notificationModel.createNotification(
-      parseInt(userId), // Ensure user_id is number
-      'daily_digest',
-      title,
-      message
-    );
+  async createDailyDigestNotification(userId, tasks) {
+    const digest = this.buildDailyDigest(userId, tasks);
+    await notificationModel.createNotification(digest.userId, digest.type, digest.title, digest.message);
   }
 }
 
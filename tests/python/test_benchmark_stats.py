@@ -0,0 +1,56 @@
+"""
+Tests for the benchmark latency statistics
+"""
+
+import random
+
+from benchmarks.stats import is_regression, mann_whitney_greater, percentile, summarize
+
+
+class TestPercentile:
+    """Test linear-interpolated percentiles"""
+
+    def test_interpolates_between_ranks(self):
+        """Test percentiles fall between neighbouring samples"""
+        samples = [4, 1, 3, 2]
+        assert percentile(samples, 0) == 1
+        assert percentile(samples, 50) == 2.5
+        assert percentile(samples, 100) == 4
+
+    def test_summarize(self):
+        """Test the summary reports the usual latency percentiles"""
+        summary = summarize(list(range(1, 101)))
+        assert summary['n'] == 100
+        assert summary['p50'] == 50.5
+        assert round(summary['p99'], 2) == 99.01
+
+
+class TestMannWhitney:
+    """Test the regression significance check"""
+
+    def test_identical_samples_are_not_significant(self):
+        """Test equal distributions give a large p-value"""
+        samples = [1.0] * 30
+        assert mann_whitney_greater(samples, samples) > 0.4
+
+    def test_shifted_samples_are_significant(self):
+        """Test a clear slowdown is detected"""
+        rng = random.Random(1)
+        baseline = [rng.gauss(10, 1) for _ in range(30)]
+        current = [rng.gauss(14, 1) for _ in range(30)]
+        assert mann_whitney_greater(current, baseline) < 0.001
+        assert mann_whitney_greater(baseline, current) > 0.99
+        assert is_regression(current, baseline)
+
+    def test_small_slowdown_is_not_a_regression(self):
+        """Test significant but immaterial slowdowns are ignored"""
+        baseline = [10.0 + i * 0.01 for i in range(30)]
+        current = [x * 1.05 for x in baseline]
+        assert not is_regression(current, baseline, min_ratio=1.2)
+
+    def test_noise_is_not_a_regression(self):
+        """Test draws from the same distribution don't trip the check"""
+        rng = random.Random(7)
+        baseline = [rng.lognormvariate(2, 0.5) for _ in range(30)]
+        current = [rng.lognormvariate(2, 0.5) for _ in range(30)]
+        assert not is_regression(current, baseline)
@@ -0,0 +1,44 @@
+from datetime import datetime
+from config.bulk_load import (
+    build_insert_sql,
+    build_load_data_sql,
+    chunk_rows,
+    encode_tsv,
+    estimate_row_bytes,
+)
+
+
+class TestBulkLoad:
+    """Bulk insert payload building"""
+
+    def test_multi_row_insert_sql(self):
+        """Test one placeholder group is emitted per row"""
+        sql = build_insert_sql('pets', ['user_id', 'name'], 3)
+        assert sql == "INSERT INTO `pets` (`user_id`, `name`) VALUES (%s, %s), (%s, %s), (%s, %s)"
+
+    def test_chunks_respect_packet_budget(self):
+        """Test no chunk exceeds the max_allowed_packet budget"""
+        rows = [(i, 'x' * 100) for i in range(1000)]
+        max_bytes = 4096
+        chunks = list(chunk_rows(iter(rows), max_bytes))
+
+        assert sum(len(c) for c in chunks) == 1000
+        for chunk in chunks:
+            assert sum(estimate_row_bytes(r) for r in chunk) <= max_bytes
+        assert len(chunks) > 1
+
+    def test_oversized_row_gets_its_own_chunk(self):
+        """Test a row bigger than the budget is not dropped"""
+        chunks = list(chunk_rows([(1, 'y' * 500), (2, 'z')], 100))
+        assert [len(c) for c in chunks] == [1, 1]
+
+    def test_tsv_escapes_special_values(self):
+        """Test NULLs, tabs and newlines survive LOAD DATA encoding"""
+        payload = encode_tsv([(None, 'a\tb', 'line\nbreak', True, datetime(2025, 1, 2, 3, 4, 5))])
+        assert payload == b'\\N\ta\\tb\tline\\nbreak\t1\t2025-01-02 03:04:05.000000\n'
+
+    def test_load_data_sql_lists_columns(self):
+        """Test LOAD DATA targets the given columns"""
+        sql = build_load_data_sql('/tmp/rows.tsv', 'tasks', ['pet_id', 'title'])
+        assert sql.startswith("LOAD DATA LOCAL INFILE '/tmp/rows.tsv' INTO TABLE `tasks`")
+        assert sql.endswith("(`pet_id`, `title`)")
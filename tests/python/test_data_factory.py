@@ -0,0 +1,68 @@
+import pytest
+from datetime import datetime, timedelta
+
+np = pytest.importorskip("numpy")
+
+from config.data_factory import DataFactory, CsvSink, to_sql_values  # noqa: E402
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def collect(factory, table):
+    """Concatenate every chunk of one table"""
+    chunks = [chunk for name, _cols, chunk in factory.iter_chunks([table]) if name == table]
+    return {col: np.concatenate([c[col] for c in chunks]) for col in chunks[0]}
+
+
+class TestDataFactory:
+    """Synthetic dataset generation"""
+
+    def test_same_seed_is_reproducible(self):
+        """Test identical seeds and chunk sizes produce identical rows"""
+        a = collect(DataFactory(users=300, seed=7, now=NOW, chunk_size=100), 'tasks')
+        b = collect(DataFactory(users=300, seed=7, now=NOW, chunk_size=100), 'tasks')
+        assert (a['due_date'] == b['due_date']).all()
+        assert (a['pet_id'] == b['pet_id']).all()
+
+    def test_tasks_belong_to_pet_owner(self):
+        """Test tasks.user_id always matches the owner of tasks.pet_id"""
+        factory = DataFactory(users=200, seed=1, now=NOW, chunk_size=64)
+        pets = collect(factory, 'pets')
+        tasks = collect(factory, 'tasks')
+        owners = dict(zip(pets['pet_id'].tolist(), pets['user_id'].tolist()))
+        assert all(owners[p] == u for p, u in zip(tasks['pet_id'].tolist(), tasks['user_id'].tolist()))
+        assert tasks['user_id'].max() <= 200
+
+    def test_due_dates_are_realistic(self):
+        """Test due dates mix overdue and upcoming tasks within a year"""
+        tasks = collect(DataFactory(users=500, seed=3, now=NOW), 'tasks')
+        now = np.datetime64(NOW, 's')
+        due = tasks['due_date']
+        assert (due <= now).any() and (due > now).any()
+        assert due.max() <= np.datetime64(NOW + timedelta(days=366), 's')
+        minutes = (due.astype('int64') // 60) % 60
+        assert set(np.unique(minutes).tolist()) <= {0, 15, 30, 45}
+        # Overdue work is mostly done; future work mostly isn't
+        assert tasks['completed'][due <= now].mean() > 0.7
+        assert tasks['completed'][due > now].mean() < 0.1
+
+    def test_unique_constraints_hold(self):
+        """Test photo_tags and photo_favorites respect their UNIQUE keys"""
+        factory = DataFactory(users=100, seed=2, now=NOW, chunk_size=50)
+        tags = collect(factory, 'photo_tags')
+        favorites = collect(factory, 'photo_favorites')
+        assert len(set(zip(tags['photo_id'].tolist(), tags['tag_id'].tolist()))) == len(tags['photo_id'])
+        assert len(set(zip(favorites['user_id'].tolist(), favorites['photo_id'].tolist()))) == len(favorites['user_id'])
+
+    def test_csv_sink_marks_nulls(self, tmp_path):
+        """Test CSV output has a header and LOAD DATA style NULLs"""
+        factory = DataFactory(users=20, seed=0, now=NOW)
+        factory.write(CsvSink(str(tmp_path)), tables=['users', 'pets', 'photos'])
+        lines = (tmp_path / 'photos.csv').read_text().splitlines()
+        assert lines[0] == 'photo_id,user_id,pet_id,photo_url,title,is_public,created_at'
+        assert len(lines) == 41
+
+    def test_datetime_columns_convert_to_sql_strings(self):
+        """Test NaT becomes None and timestamps use a space separator"""
+        column = np.array(['2026-01-01T08:30:00', 'NaT'], dtype='datetime64[s]')
+        assert to_sql_values(column) == ['2026-01-01 08:30:00', None]
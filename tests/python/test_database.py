@@ -1,14 +1,20 @@
 import pytest
-import mysql.connector
-from mysql.connector import Error
 import os
+import uuid
 from datetime import datetime, timedelta
 
+# Connects to MySQL directly rather than through the db fixtures; the driver
+# is imported inside each test so `-m nodb` runs never load it
+pytestmark = pytest.mark.db
+
 class TestDatabaseBasic:
     """Basic database connection tests"""
     
     def test_database_connection(self):
         """Test basic database connection"""
+        import mysql.connector
+        from mysql.connector import Error
+        
         try:
             connection = mysql.connector.connect(
                 host=os.getenv('TEST_DB_HOST', 'localhost'),
@@ -34,6 +40,9 @@ class TestDatabaseBasic:
     
     def test_user_creation(self):
         """Test basic user creation"""
+        import mysql.connector
+        from mysql.connector import Error
+        
         try:
             connection = mysql.connector.connect(
                 host=os.getenv('TEST_DB_HOST', 'localhost'),
@@ -46,10 +55,10 @@ class TestDatabaseBasic:
             cursor = connection.cursor(dictionary=True)
             
             # Create test user
-            test_email = f"test_{datetime.now().strftime('%H%M%S')}@example.com"
+            test_email = f"test_{uuid.uuid4().hex[:12]}@example.com"
             cursor.execute(
                 "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
-                ('test_user', test_email, 'test_hash')
+                (f"test_user_{uuid.uuid4().hex[:12]}", test_email, 'test_hash')
             )
             connection.commit()
             
@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+import pytest
+from config.db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """Stand-in for a mysql.connector connection"""
+
+    def __init__(self):
+        self.setup_calls = 0
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession(FakeConnection):
+    """FakeConnection with the bits TestDatabase touches on release"""
+
+    in_transaction = False
+
+    def is_connected(self):
+        return not self.closed
+
+    def rollback(self):
+        pass
+
+
+def wait_for(condition, timeout=2):
+    """Poll until condition() holds, failing after timeout seconds"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def pooled_db():
+    """A pooled TestDatabase whose connections are FakeSessions"""
+    from config.test_database import TestDatabase
+
+    class FakePooledDatabase(TestDatabase):
+        def _open_connection(self):
+            return FakeSession()
+
+    db = FakePooledDatabase(pool_size=3, pool_timeout=0.2)
+    yield db
+    db.close()
+
+
+class TestConnectionPool:
+    """Connection pool behaviour without a live database"""
+
+    def test_session_setup_runs_once_per_connection(self):
+        """Test session setup is not repeated on every checkout"""
+        def setup(conn):
+            conn.setup_calls += 1
+
+        pool = ConnectionPool(FakeConnection, max_size=2, session_setup=setup)
+        for _ in range(5):
+            with pool.connection() as conn:
+                pass
+
+        assert conn.setup_calls == 1
+        assert pool.stats()['opened'] == 1
+        assert pool.stats()['checkouts'] == 5
+
+    def test_pool_respects_max_size(self):
+        """Test checkout times out once every connection is in use"""
+        pool = ConnectionPool(FakeConnection, max_size=2, timeout=0.05)
+        first = pool.acquire()
+        second = pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+
+        stats = pool.stats()
+        assert stats['in_use'] == 2
+        assert stats['saturation'] == 1.0
+        assert stats['timeouts'] == 1
+
+        pool.release(first)
+        pool.release(second)
+        assert pool.stats()['idle'] == 2
+
+    def test_waiting_checkout_is_woken_by_release(self):
+        """Test a blocked thread receives the released connection"""
+        pool = ConnectionPool(FakeConnection, max_size=1, timeout=2)
+        held = pool.acquire()
+        received = []
+
+        worker = threading.Thread(target=lambda: received.append(pool.acquire()))
+        worker.start()
+        wait_for(lambda: pool.stats()['waiting'] == 1)
+        pool.release(held)
+        worker.join(timeout=2)
+
+        assert received == [held]
+        assert pool.stats()['waited_checkouts'] == 1
+
+    def test_unusable_connection_is_replaced(self):
+        """Test stale connections are discarded on checkout"""
+        pool = ConnectionPool(FakeConnection, max_size=1, validate=lambda c: not c.closed)
+        conn = pool.acquire()
+        pool.release(conn)
+        conn.closed = True
+
+        replacement = pool.acquire()
+
+        assert replacement is not conn
+        assert pool.stats()['discarded'] == 1
+        assert pool.size == 1
+
+    def test_close_closes_idle_connections(self):
+        """Test closing the pool closes idle sockets"""
+        pool = ConnectionPool(FakeConnection, max_size=2, min_size=2)
+        pool.close()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+
+
+class TestPooledConnectionPinning:
+    """Implicit checkouts made through TestDatabase.connection"""
+
+    def test_finished_threads_return_their_connections(self, pooled_db):
+        """Test threads that never call release_connection() don't leak pool slots"""
+        seen = []
+
+        def work():
+            seen.append(pooled_db.connection)
+
+        for _ in range(5):
+            worker = threading.Thread(target=work)
+            worker.start()
+            worker.join()
+
+        assert len(seen) == 5
+        stats = pooled_db.pool_stats()
+        assert stats['in_use'] == 0 and stats['timeouts'] == 0
+
+    def test_tasks_get_their_own_connection(self, pooled_db):
+        """Test child tasks don't inherit the parent's connection and release theirs on exit"""
+        async def child():
+            connection = pooled_db.connection
+            await asyncio.sleep(0)
+            return connection
+
+        async def parent():
+            mine = pooled_db.connection
+            first, second = await asyncio.gather(child(), child())
+            return mine, first, second
+
+        mine, first, second = asyncio.run(parent())
+
+        assert len({id(mine), id(first), id(second)}) == 3
+        assert pooled_db.pool_stats()['in_use'] == 0
+
+    def test_release_connection_is_idempotent(self, pooled_db):
+        """Test an explicit release followed by thread-exit cleanup releases once"""
+        connection = pooled_db.connection
+        assert pooled_db.connection is connection
+        pooled_db.release_connection()
+        pooled_db.release_connection()
+        assert pooled_db.pool_stats()['in_use'] == 0
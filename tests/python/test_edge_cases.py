@@ -1,7 +1,8 @@
 import pytest
-import re
 from datetime import datetime, timedelta
 
+from config.validation import validator
+
 class TestEdgeCases:
     """Edge case validation tests"""
     
@@ -20,41 +21,43 @@ class TestEdgeCases:
             'invalid@.com'
         ]
         
+        users = validator('users')
+        
         # Test valid emails
         for email in valid_emails:
-            assert re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', email) is not None
+            assert users.errors({'email': email}) == []
         
         # Test invalid emails
         for email in invalid_emails:
-            assert re.match(r'^[^\s@]+@[^\s@]+\.[^\s@]+$', email) is None
+            assert users.errors({'email': email}) == ["Please enter a valid email address"]
     
     def test_pet_name_validation(self):
         """Test pet name validation boundaries"""
         # Valid names
         valid_names = ['Fluffy', 'Max', 'Buddy Jr', "O'Malley"]
+        pets = validator('pets')
         for name in valid_names:
-            assert len(name.strip()) >= 2
-            assert len(name.strip()) <= 50
-            assert re.match(r"^[A-Za-z\s'-]+$", name) is not None
+            assert pets.errors({'name': name}) == []
         
         # Invalid names
-        with pytest.raises(AssertionError):
-            assert len("A".strip()) >= 2  # Too short
+        with pytest.raises(ValueError, match="Pet name must be 2-50 letters long"):
+            pets.check({'name': "A"})  # Too short
         
-        with pytest.raises(AssertionError):
-            long_name = "A" * 51
-            assert len(long_name.strip()) <= 50  # Too long
+        with pytest.raises(ValueError, match="Pet name must be 2-50 letters long"):
+            pets.check({'name': "A" * 51})  # Too long
     
     def test_pet_age_validation(self):
         """Test pet age boundaries"""
         valid_ages = [0.5, 1, 15.5, 50]
         invalid_ages = [0, -1, 51, 100]
         
+        pets = validator('pets')
+        
         for age in valid_ages:
-            assert age > 0 and age <= 50
+            assert pets.errors({'age': age}) == []
         
         for age in invalid_ages:
-            assert not (age > 0 and age <= 50)
+            assert pets.errors({'age': age}) == ["Age must be greater than 0 and less than or equal to 50"]
     
     def test_task_due_date_validation(self):
         """Test task due date validation"""
@@ -73,10 +76,10 @@ class TestEdgeCases:
             now + timedelta(days=366)  # More than 1 year
         ]
         
-        max_date = now + timedelta(days=365)
+        tasks = validator('tasks')
         
         for date in valid_dates:
-            assert date > now and date <= max_date
+            assert tasks.errors({'due_date': date}, now=now) == []
         
         for date in invalid_dates:
-            assert not (date > now and date <= max_date)
\ No newline at end of file
+            assert tasks.errors({'due_date': date}, now=now) == ["Due date must be in the future and within 1 year"]
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Tests for the precomputed health trends and their incremental refresh
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from config.health_trends import (  # noqa: E402
+    SOURCE_COLUMNS,
+    backfill,
+    compute_aggregates,
+    flag_weight_anomalies,
+    load_columns,
+    read_watermark,
+    refresh,
+)
+
+START = date(2025, 1, 1)
+
+
+def records(*rows):
+    """Columns from (health_id, pet_id, weight, days after START, vet visit?, vaccination?) tuples"""
+    values = []
+    for health_id, pet_id, weight, day, vet, vaccinated in rows:
+        recorded = START + timedelta(days=day)
+        values.append((
+            health_id, pet_id, weight, recorded, recorded if vet else None,
+            recorded if vaccinated else None, recorded + timedelta(days=365) if vaccinated else None,
+        ))
+    return load_columns(values)
+
+
+class TestAnomalyFlags:
+    """Rolling weight baselines"""
+
+    def test_spike_is_flagged_once_there_is_a_baseline(self):
+        """Test a jump is flagged only after MIN_BASELINE earlier weights"""
+        pets = np.array([1] * 6)
+        assert flag_weight_anomalies(pets, np.array([10.0, 10.2, 9.9, 10.1, 14.0, 10.0])).tolist() == \
+            [False, False, False, False, True, False]
+        assert not flag_weight_anomalies(pets[:3], np.array([10.0, 10.2, 20.0])).any()
+
+    def test_baselines_do_not_cross_pets(self):
+        """Test a new pet's first weights are never compared with another pet's"""
+        pets = np.array([1, 1, 1, 1, 2, 2, 2, 2])
+        weights = np.array([5.0, 5.0, 5.0, 5.0, 30.0, 30.0, 30.0, 30.0])
+        assert not flag_weight_anomalies(pets, weights).any()
+
+    def test_small_changes_on_a_steady_weight_are_not_flagged(self):
+        """Test zero spread doesn't turn 0.1 kg into an anomaly"""
+        assert not flag_weight_anomalies(np.ones(5), np.array([10.0, 10.0, 10.0, 10.0, 10.1])).any()
+
+
+class TestComputeAggregates:
+    """Per-pet trends and monthly summaries"""
+
+    def test_trend_row_per_pet(self):
+        """Test counts, latest values and the 90-day fitted change, in any input order"""
+        columns = records(
+            (4, 1, 12.0, 60, False, True),
+            (1, 1, 10.0, 0, True, False),
+            (3, 1, None, 45, True, False),
+            (2, 1, 11.0, 30, False, False),
+            (5, 2, 4.0, 10, False, False),
+        )
+        trends, _summaries = compute_aggregates(columns)
+        assert trends['pet_id'].tolist() == [1, 2]
+        assert trends['record_count'].tolist() == [4, 1]
+        assert trends['latest_weight'].tolist() == [12.0, 4.0]
+        assert trends['weight_avg_90d'][0] == pytest.approx(11.0)
+        assert trends['weight_change_90d'][0] == pytest.approx(3.0)  # 1 kg per 30 days
+        assert np.isnan(trends['weight_change_90d'][1])
+        assert str(trends['last_vet_visit'][0]) == str(START + timedelta(days=45))
+        assert np.isnat(trends['last_vaccination'][1])
+        assert trends['last_health_id'].tolist() == [4, 5]
+
+    def test_window_ends_at_the_latest_weight(self):
+        """Test records older than the window are left out of the average and fit"""
+        trends, _summaries = compute_aggregates(records(
+            (1, 1, 30.0, 0, False, False), (2, 1, 10.0, 200, False, False), (3, 1, 10.0, 250, False, False),
+        ))
+        assert trends['weight_avg_90d'][0] == pytest.approx(10.0)
+        assert trends['weight_change_90d'][0] == pytest.approx(0.0)
+
+    def test_monthly_summaries(self):
+        """Test one row per pet and month, with NULL weights left out of min/max/avg"""
+        _trends, summaries = compute_aggregates(records(
+            (1, 1, 10.0, 0, True, False),
+            (2, 1, 12.0, 20, False, True),
+            (3, 1, None, 40, True, False),
+            (4, 2, 3.0, 5, False, False),
+        ))
+        assert summaries['pet_id'].tolist() == [1, 1, 2]
+        assert [str(d) for d in summaries['period_start']] == ['2025-01-01', '2025-02-01', '2025-01-01']
+        assert summaries['record_count'].tolist() == [2, 1, 1]
+        assert summaries['weight_avg'][0] == pytest.approx(11.0)
+        assert np.isnan(summaries['weight_max'][1])
+        assert summaries['vet_visits'].tolist() == [1, 1, 0]
+        assert summaries['vaccinations'].tolist() == [1, 0, 0]
+
+    def test_no_records(self):
+        """Test an empty batch yields empty tables"""
+        trends, summaries = compute_aggregates(load_columns([]))
+        assert len(trends['pet_id']) == 0 and len(summaries['pet_id']) == 0
+        assert list(load_columns([])) == SOURCE_COLUMNS
+
+
+def add_record(db, pet_id, weight, day):
+    return db.query(
+        "INSERT INTO health_tracker (pet_id, weight, date_recorded) VALUES (?, ?, ?)",
+        [pet_id, weight, START + timedelta(days=day)]
+    ).lastrowid
+
+
+class TestRefreshAgainstDatabase:
+    """The watermark and stale flags keep the summary tables in step"""
+
+    def test_refresh_picks_up_new_edited_and_deleted_records(self, db_connection):
+        """Test new records, a model edit and a delete each reach the aggregates"""
+        db = db_connection
+        owner = db.query(
+            "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+            ['trend_owner', 'trend_owner@example.com', 'x']
+        ).lastrowid
+        pet_id = db.query(
+            "INSERT INTO pets (user_id, name, breed, age, species, gender, weight) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [owner, 'Trend', 'Beagle', 4, 'dog', 'male', 10]
+        ).lastrowid
+        for day in (0, 30):
+            add_record(db, pet_id, 10 + day / 30, day)
+        backfill(db, commit=False)
+
+        def trend():
+            return db.query_one("SELECT * FROM health_trends WHERE pet_id = ?", [pet_id])
+
+        assert trend()['record_count'] == 2
+        latest = add_record(db, pet_id, 12, 60)
+        refresh(db, commit=False)
+        assert trend()['record_count'] == 3 and float(trend()['latest_weight']) == 12.0
+        assert read_watermark(db) >= latest
+
+        # healthModel.updateHealthRecord: the edit keeps its health_id, so the pet is marked stale
+        db.query("UPDATE health_tracker SET weight = ? WHERE health_id = ?", [11.5, latest])
+        db.query("UPDATE health_trends SET stale = 1 WHERE pet_id = ?", [pet_id])
+        refresh(db, commit=False)
+        assert float(trend()['latest_weight']) == 11.5 and trend()['stale'] == 0
+        months = db.query(
+            "SELECT record_count FROM health_summaries WHERE pet_id = ? ORDER BY period_start", [pet_id]
+        )
+        assert [row['record_count'] for row in months] == [2, 1]  # January, March
+
+        db.query("DELETE FROM health_tracker WHERE pet_id = ?", [pet_id])
+        db.query("UPDATE health_trends SET stale = 1 WHERE pet_id = ?", [pet_id])
+        refresh(db, commit=False)
+        assert trend() is None
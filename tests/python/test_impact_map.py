@@ -0,0 +1,113 @@
+"""
+Tests for the per-test dependency map and change-based test selection
+"""
+
+import json
+
+from config.impact_map import (
+    REPO_ROOT,
+    TableRecorder,
+    full_run_reason,
+    import_closure,
+    select_tests,
+    source_tables,
+    statement_tables,
+    static_dependencies,
+    update_impact_map,
+)
+
+KNOWN = frozenset({'users', 'pets', 'tasks', 'photos'})
+
+IMPACT = {
+    'tests/python/test_a.py::test_pets': {'files': ['config/bulk_load.py', 'tests/python/test_a.py'],
+                                          'tables': ['pets', 'users']},
+    'tests/python/test_a.py::test_tasks': {'files': ['tests/python/test_a.py'], 'tables': ['tasks']},
+    'tests/python/test_b.py::test_pure': {'files': ['config/statements.py', 'tests/python/test_b.py'],
+                                          'tables': []},
+}
+NODE_IDS = list(IMPACT) + ['tests/python/test_b.py::test_new']
+
+
+class TestRecording:
+    """What a test is recorded as depending on"""
+
+    def test_statement_tables_skip_literals_and_unknown_names(self):
+        """Only schema tables in SQL code count, read or written"""
+        sql = "SELECT p.name FROM pets p JOIN users u USING (user_id) WHERE u.bio = 'tasks' -- photos"
+        assert statement_tables(sql, KNOWN) == {'pets', 'users'}
+
+    def test_source_tables_come_from_embedded_sql(self):
+        """A JS model's queries name its tables; prose and routes don't"""
+        source = "const sql = `UPDATE tasks SET completed = 1`;\nrouter.get('/users', list); // pets"
+        assert source_tables(source, KNOWN) == {'tasks'}
+
+    def test_observer_attributes_tables_to_the_running_test(self):
+        """Statements outside a test (session fixtures' teardown) are ignored"""
+        recorder = TableRecorder(KNOWN)
+        recorder.start('t1')
+        recorder("INSERT INTO pets (name) VALUES (?)", ['Rex'], 1, 0.001)
+        recorder.stop()
+        recorder("DELETE FROM users", None, 3, 0.001)
+        assert recorder.tables == {'t1': {'pets'}}
+
+    def test_import_closure_follows_repository_modules(self):
+        """Transitive imports inside the repo are found; third-party ones are not"""
+        closure = import_closure(REPO_ROOT / 'tests/python/test_sqlite_backend.py')
+        names = {path.relative_to(REPO_ROOT).as_posix() for path in closure}
+        assert {'config/sqlite_database.py', 'config/sqlite_dialect.py', 'config/test_database.py'} <= names
+        assert all(not name.startswith('pytest') for name in names)
+
+    def test_static_dependencies_include_the_conftest_chain(self):
+        """Modules conftest.py loads lazily or as plugins count for every test below it"""
+        files = static_dependencies(REPO_ROOT / 'test_edge_cases.py')
+        assert {'test_edge_cases.py', 'conftest.py', 'config/validation.py'} <= files
+        assert {'config/test_database.py', 'config/sqlite_database.py', 'config/statements.py',
+                'config/query_cassette.py', 'config/query_budget.py'} <= files
+
+        node_id = 'test_edge_cases.py::TestEdgeCases::test_user_duplicate_email'
+        impact = {node_id: {'files': sorted(files), 'tables': ['users']}}
+        assert select_tests([node_id], impact, ['config/test_database.py']) == [node_id]
+
+
+class TestSelection:
+    """Picking the tests a change can affect"""
+
+    def test_changed_python_file_selects_its_dependents(self):
+        """New tests without a recorded entry always run"""
+        assert select_tests(NODE_IDS, IMPACT, ['config/bulk_load.py']) == [
+            'tests/python/test_a.py::test_pets', 'tests/python/test_b.py::test_new'
+        ]
+
+    def test_changed_test_module_selects_all_its_tests(self):
+        """Editing a test module reruns every test in it"""
+        selected = select_tests(NODE_IDS, IMPACT, ['tests/python/test_a.py'])
+        assert selected[:2] == ['tests/python/test_a.py::test_pets', 'tests/python/test_a.py::test_tasks']
+
+    def test_changed_sql_selects_tests_touching_its_tables(self, tmp_path):
+        """A JS model's queries map onto the tables Python tests touched"""
+        (tmp_path / 'models').mkdir()
+        (tmp_path / 'models/Task.js').write_text("db.query('SELECT * FROM tasks WHERE task_id = ?', [id])")
+        (tmp_path / 'README.md').write_text("Everything FROM users")
+        selected = select_tests(NODE_IDS, IMPACT, ['models/Task.js', 'README.md'], KNOWN, root=tmp_path)
+        assert selected == ['tests/python/test_a.py::test_tasks', 'tests/python/test_b.py::test_new']
+
+    def test_full_run_triggers(self):
+        """The schema dump, any conftest.py and a missing map mean every test"""
+        assert full_run_reason(['hkpifgzax132wnez.db'], IMPACT) == "hkpifgzax132wnez.db changed"
+        assert full_run_reason(['tests/python/conftest.py'], IMPACT)
+        assert full_run_reason(['models/Task.js'], {}) == "no impact map recorded yet"
+        assert full_run_reason(['models/Task.js', 'README.md'], IMPACT) is None
+
+    def test_map_update_replaces_rerun_tests_and_drops_deleted_modules(self, tmp_path):
+        """Entries from the latest run win; tests of removed modules are pruned"""
+        kept = 'tests/python/test_statements.py::test_kept'
+        cache = tmp_path / 'impact.json'
+        cache.write_text(json.dumps({'version': 1, 'tests': {
+            kept: {'files': ['old.py'], 'tables': []},
+            'tests/python/test_gone.py::test_x': {'files': [], 'tables': []},
+        }}))
+        fragment = tmp_path / 'impact-1.json'
+        fragment.write_text(json.dumps({'version': 1, 'tests': {kept: {'files': ['new.py'], 'tables': []}}}))
+
+        assert update_impact_map([fragment], cache) == {kept: {'files': ['new.py'], 'tables': []}}
+        assert json.loads(cache.read_text())['tests'] == {kept: {'files': ['new.py'], 'tables': []}}
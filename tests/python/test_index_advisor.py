@@ -0,0 +1,108 @@
+"""
+Tests for the EXPLAIN-driven index advisor's parsing and proposal logic
+"""
+
+from benchmarks.index_advisor import (
+    IndexProposal,
+    analyze_predicates,
+    iter_js_strings,
+    placeholder_targets,
+    plan_issues,
+    propose_indexes,
+    table_aliases,
+)
+
+TASKS_SQL = """
+    SELECT t.*, p.name as pet_name
+    FROM tasks t
+    JOIN pets p ON t.pet_id = p.pet_id
+    WHERE t.user_id = ?
+    AND t.completed = false
+    AND t.due_date BETWEEN ? AND ?
+    ORDER BY t.due_date ASC
+"""
+
+COLUMNS = {
+    'tasks': {'task_id', 'user_id', 'pet_id', 'completed', 'due_date'},
+    'pets': {'pet_id', 'user_id', 'name'},
+}
+
+
+class TestJsExtraction:
+    """Test pulling SQL literals out of JavaScript"""
+
+    def test_template_literals_and_comments(self):
+        """Test strings are found with line numbers and comments are skipped"""
+        source = (
+            "// const old = 'SELECT * FROM ignored';\n"
+            "const rows = await query(`\n"
+            "  SELECT * FROM photos LIMIT ${numLimit} OFFSET ${numOffset}`);\n"
+            "db.query('SELECT name FROM pets WHERE pet_id = ?', [id]);\n"
+        )
+        strings = list(iter_js_strings(source))
+        assert strings[0] == (2, "\n  SELECT * FROM photos LIMIT 20 OFFSET 0", True)
+        assert strings[1] == (4, 'SELECT name FROM pets WHERE pet_id = ?', False)
+
+
+class TestPredicateAnalysis:
+    """Test statement parsing for index candidates"""
+
+    def test_aliases(self):
+        """Test FROM/JOIN aliases resolve to tables"""
+        assert table_aliases(TASKS_SQL) == {'tasks': 'tasks', 't': 'tasks', 'pets': 'pets', 'p': 'pets'}
+
+    def test_predicates(self):
+        """Test equality, range, join and sort columns are separated"""
+        predicates = analyze_predicates(TASKS_SQL)
+        assert predicates.equality == ['t.user_id', 't.completed']
+        assert predicates.ranges == ['t.due_date']
+        assert predicates.joins == [('t.pet_id', 'p.pet_id')]
+        assert predicates.order_by == ['t.due_date']
+
+    def test_function_on_column_is_non_sargable(self):
+        """Test DATE(col) = ? is reported rather than indexed"""
+        predicates = analyze_predicates("SELECT * FROM tasks t WHERE DATE(t.due_date) = DATE(?)")
+        assert predicates.non_sargable == ['t.due_date']
+        assert predicates.equality == []
+
+    def test_placeholder_targets(self):
+        """Test each placeholder is tied to the column it is compared with"""
+        assert placeholder_targets(TASKS_SQL) == [
+            ('column', 't.user_id'), ('column', 't.due_date'), ('column', 't.due_date')
+        ]
+        assert placeholder_targets("SELECT * FROM photos LIMIT ? OFFSET ?") == [
+            ('keyword', 'LIMIT'), ('keyword', 'OFFSET')
+        ]
+
+
+class TestPlansAndProposals:
+    """Test EXPLAIN JSON parsing and composite index proposals"""
+
+    PLAN = {
+        'query_block': {
+            'ordering_operation': {
+                'using_filesort': True,
+                'nested_loop': [
+                    {'table': {'table_name': 't', 'access_type': 'ALL', 'rows_examined_per_scan': 90000}},
+                    {'table': {'table_name': 'p', 'access_type': 'eq_ref', 'rows_examined_per_scan': 1}},
+                ],
+            }
+        }
+    }
+
+    def test_plan_issues(self):
+        """Test full scans and filesorts are found anywhere in the plan"""
+        kinds = sorted(issue.kind for issue in plan_issues(self.PLAN))
+        assert kinds == ['filesort', 'full_scan']
+
+    def test_equality_then_range(self):
+        """Test the proposal orders equality columns before the range column"""
+        issues = plan_issues(self.PLAN)
+        proposals = propose_indexes(TASKS_SQL, issues, table_aliases(TASKS_SQL), COLUMNS, {})
+        assert proposals == [IndexProposal('tasks', ('user_id', 'completed', 'due_date'))]
+
+    def test_existing_index_suppresses_proposal(self):
+        """Test nothing is proposed when an index already starts with the same columns"""
+        existing = {'tasks': [('user_id', 'completed', 'due_date', 'task_id')]}
+        issues = plan_issues(self.PLAN)
+        assert propose_indexes(TASKS_SQL, issues, table_aliases(TASKS_SQL), COLUMNS, existing) == []
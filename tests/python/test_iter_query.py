@@ -0,0 +1,133 @@
+"""
+Tests for TestDatabase.iter_query: streaming on the caller's connection and
+stopping early without reading the rest of the result
+"""
+
+import pytest
+
+from config.sqlite_database import SqliteDatabase
+
+
+class FakeCursor:
+    """Unbuffered cursor over the rows its connection will send"""
+
+    column_names = ('n',)
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=None):
+        self.connection.executed.append(sql)
+        self.connection.pending = [(n,) for n in range(self.connection.result_rows)]
+
+    def fetchmany(self, size):
+        rows, self.connection.pending = self.connection.pending[:size], self.connection.pending[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeStreamingConnection:
+    """Records what was streamed on it and how an early stop was handled"""
+
+    in_transaction = False
+    result_rows = 1000
+
+    def __init__(self):
+        self.executed = []
+        self.pending = []
+        self.drained = 0
+
+    @property
+    def unread_result(self):
+        return bool(self.pending)
+
+    def cursor(self, buffered=True, dictionary=False, prepared=False):
+        return FakeCursor(self)
+
+    def consume_results(self):
+        self.drained += len(self.pending)
+        self.pending = []
+
+    def is_connected(self):
+        return True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pooled_db():
+    """A pooled TestDatabase on fake connections whose KILL QUERY empties the result"""
+    from config.test_database import TestDatabase
+
+    class FakePooledDatabase(TestDatabase):
+        observers = []
+        cancelled = []
+
+        def _open_connection(self):
+            return FakeStreamingConnection()
+
+        def _cancel_streaming(self, connection):
+            self.cancelled.append(connection)
+            connection.pending = connection.pending[:2]  # already on the wire
+            connection.consume_results()
+
+    db = FakePooledDatabase(pool_size=2)
+    yield db
+    db.close()
+
+
+class TestIterQueryPooled:
+    """Pooled mode, with fake connections"""
+
+    def test_streams_on_the_callers_connection(self, pooled_db):
+        """Test the scan runs on the connection the test's own writes went through"""
+        mine = pooled_db.connection
+        batches = list(pooled_db.iter_query("SELECT n FROM numbers", batch_size=400, row_format='tuple'))
+
+        assert [len(batch) for batch in batches] == [400, 400, 200]
+        assert mine.executed == ["SELECT n FROM numbers"]
+        assert pooled_db.pool_stats()['peak_in_use'] == 1
+
+    def test_closing_early_cancels_instead_of_draining(self, pooled_db):
+        """Test closing the generator after one batch kills the query and reads only what was sent"""
+        stream = pooled_db.iter_query("SELECT n FROM numbers", batch_size=10, row_format='tuple')
+        assert len(next(stream)) == 10
+        stream.close()
+
+        connection = pooled_db.connection
+        assert pooled_db.cancelled == [connection]
+        assert connection.drained == 2 and not connection.unread_result
+
+
+class TestIterQueryOnSqlite:
+    """Streaming inside a fixture transaction on the embedded backend"""
+
+    @pytest.fixture
+    def db(self):
+        database = SqliteDatabase()
+        database.initialize_schema()
+        yield database
+        database.close()
+
+    def test_sees_uncommitted_rows_and_stops_early(self, db):
+        """Test a scan inside a scope sees its rows, and an early stop leaves the scope usable"""
+        db.begin_scope()
+        db.bulk_insert('users', ['username', 'email', 'password_hash'],
+                       [(f'stream{n}', f'stream{n}@example.com', 'hash') for n in range(25)])
+
+        sql = "SELECT username FROM users ORDER BY user_id"
+        assert sum(len(batch) for batch in db.iter_query(sql, batch_size=10)) == 25
+
+        stream = db.iter_query(sql, batch_size=10)
+        assert next(stream)[0]['username'] == 'stream0'
+        stream.close()
+        assert db.query_one("SELECT COUNT(*) AS n FROM users")['n'] == 25
+
+        db.rollback_scope()
+        assert db.query_one("SELECT COUNT(*) AS n FROM users")['n'] == 0
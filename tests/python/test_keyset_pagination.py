@@ -0,0 +1,154 @@
+"""
+Tests for the keyset pagination harness, run against models/photoModel.js
+"""
+
+import shutil
+
+import pytest
+
+from benchmarks.keyset_pagination import (
+    GalleryQueries,
+    PhotoModel,
+    first_difference,
+    photo_order,
+)
+
+needs_node = pytest.mark.skipif(shutil.which('node') is None, reason="needs Node.js to run models/photoModel.js")
+
+# Buffer.from(JSON.stringify({v: 1, s: 'popular', k: [...]})).toString('base64url')
+NODE_CURSOR = 'eyJ2IjoxLCJzIjoicG9wdWxhciIsImsiOlszLCIyMDI0LTA1LTAxIDEwOjAwOjAwIiw0Ml19'
+
+
+class FakeDb:
+    """Returns queued results in order and records every statement"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.executed = []
+
+    def query(self, sql, params=None):
+        self.executed.append((sql, list(params or [])))
+        return self.results.pop(0)
+
+
+@pytest.fixture(scope="module")
+def model():
+    photo_model = PhotoModel()
+    yield photo_model
+    photo_model.close()
+
+
+@needs_node
+class TestCursors:
+    """The model's cursors, through the bridge"""
+
+    def test_round_trips_through_the_bridge(self, model):
+        """The model's cursor for a row decodes back to its key values"""
+        assert model.call('encodeCursor', 'popular', [3, '2024-05-01 10:00:00', 42]) == NODE_CURSOR
+        assert model.call('decodeCursor', NODE_CURSOR, 'popular') == [3, '2024-05-01 10:00:00', 42]
+
+    def test_rejects_foreign_or_broken_cursors(self, model):
+        """A cursor from another sort or a mangled one starts from the first page"""
+        assert model.call('decodeCursor', NODE_CURSOR, 'newest') is None
+        assert model.call('decodeCursor', 'not-a-cursor', 'newest') is None
+        assert model.call('decodeCursor', None, 'newest') is None
+
+
+@needs_node
+class TestKeysetCondition:
+    """Rows strictly after the cursor row, with MySQL's NULL ordering"""
+
+    def condition(self, model, sort, values):
+        result = model.call('keysetCondition', model.call('KEYSET_SORTS')[sort], values)
+        return result['sql'], result['params']
+
+    def test_descending_dates_keep_nulls_last(self, model):
+        """A non-NULL date is followed by earlier dates and then the NULL dates"""
+        sql, params = self.condition(model, 'newest', ['2024-05-01 10:00:00', 42])
+        assert sql == (
+            "(((p.created_at < ? OR p.created_at IS NULL)) "
+            "OR (p.created_at = ? AND p.photo_id < ?))"
+        )
+        assert params == ['2024-05-01 10:00:00', '2024-05-01 10:00:00', 42]
+
+    def test_null_cursor_values(self, model):
+        """After a NULL date only ties remain when descending; every date follows when ascending"""
+        sql, params = self.condition(model, 'newest', [None, 42])
+        assert sql == "((p.created_at IS NULL AND p.photo_id < ?))"
+        assert params == [42]
+
+        sql, params = self.condition(model, 'oldest', [None, 42])
+        assert sql == "((p.created_at IS NOT NULL) OR (p.created_at IS NULL AND p.photo_id > ?))"
+        assert params == [42]
+
+    def test_popular_prefixes_equal_counts(self, model):
+        """Later keys only break ties of the earlier ones"""
+        sql, params = self.condition(model, 'popular', [3, '2024-05-01 10:00:00', 42])
+        assert sql.count(' OR (') == 2
+        assert params == [3, 3, '2024-05-01 10:00:00', 3, '2024-05-01 10:00:00', 42]
+
+
+@needs_node
+class TestGalleryQueries:
+    """Both pagination modes run the model's own methods"""
+
+    def test_keyset_page_hands_out_cursor_only_when_more_rows_exist(self, model):
+        """The id phase reads one extra row to decide whether another page exists"""
+        ids = [{'k0': '2024-05-02 09:00:00', 'k1': 7}, {'k0': '2024-05-01 10:00:00', 'k1': 5},
+               {'k0': '2024-04-30 08:00:00', 'k1': 3}]
+        model.db = db = FakeDb(ids, [{'photo_id': 7}, {'photo_id': 5}])
+
+        rows, cursor = GalleryQueries(model, 'newest').keyset_page(None, 2)
+
+        assert model.statements == db.executed
+        assert [row['photo_id'] for row in rows] == [7, 5]
+        assert model.call('decodeCursor', cursor, 'newest') == ['2024-05-01 10:00:00', 5]
+        assert 'LIMIT 3' in db.executed[0][0]
+        assert db.executed[1][1] == [7, 5]
+
+        model.db = FakeDb(ids[:1], [{'photo_id': 7}])
+        _rows, cursor = GalleryQueries(model, 'newest').keyset_page(None, 2)
+        assert cursor is None
+
+    def test_offset_page_runs_the_model_sql(self, model):
+        """OFFSET mode is getPublicPhotos, with its LIMIT/OFFSET arithmetic and tiebreaker"""
+        model.db = db = FakeDb([])
+        GalleryQueries(model, 'popular', tag='cute').offset_page(3, 12)
+        sql, params = db.executed[0]
+        assert 'LIMIT 12 OFFSET 24' in sql
+        assert 'ORDER BY p.favorite_count DESC, p.created_at DESC, p.photo_id DESC' in sql
+        assert params == ['cute']
+
+    def test_health_listing_filters_on_status(self, model):
+        """The id phase keeps the health condition and binds only the user"""
+        model.db = db = FakeDb([])
+        rows, cursor = GalleryQueries(model, 'popular', user_id=9, health_status='overweight').keyset_page(None, 12)
+        assert (rows, cursor) == ([], None)
+        sql, params = db.executed[0]
+        assert params == [9]
+        assert 'ht.weight > 200' in sql
+
+    def test_model_errors_are_raised(self, model):
+        """A query error reaches the caller when the model rethrows it"""
+        class FailingDb:
+            def query(self, sql, params=None):
+                raise RuntimeError("table photos is gone")
+
+        model.db = FailingDb()
+        with pytest.raises(RuntimeError, match="table photos is gone"):
+            GalleryQueries(model, 'newest').keyset_page(None, 12)
+
+
+class TestOrdering:
+    """Comparing the photo order of both modes"""
+
+    def test_photo_order_collapses_repeated_health_rows(self):
+        """A photo with several matching health records counts once"""
+        rows = [{'photo_id': 4}, {'photo_id': 4}, {'photo_id': 2}, {'photo_id': 9}, {'photo_id': 9}]
+        assert photo_order(rows) == [4, 2, 9]
+
+    def test_first_difference(self):
+        """Reports the first mismatch, including a shorter sequence"""
+        assert first_difference([1, 2, 3], [1, 2, 3]) is None
+        assert first_difference([1, 2, 3], [1, 3, 2]) == 1
+        assert first_difference([1, 2, 3], [1, 2]) == 2
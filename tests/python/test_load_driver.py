@@ -0,0 +1,184 @@
+"""
+Tests for the concurrent-user load driver
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from benchmarks.load_driver import (
+    SOURCES,
+    AioBackend,
+    LoadDriver,
+    QueueLimitError,
+    adapt_sql,
+    parse_mix,
+    scaling_limit,
+    statement_drift,
+)
+from benchmarks.query_catalog import REPO_ROOT
+
+
+class FakeBackend:
+    """In-memory backend: a fixed-size connection queue and canned results"""
+
+    name = 'fake'
+
+    def __init__(self, pool_size, delay=0.001):
+        self.delay = delay
+        self.executed = []
+        self._idle = asyncio.Queue()
+        for number in range(pool_size):
+            self._idle.put_nowait(number)
+
+    async def acquire(self):
+        return await self._idle.get()
+
+    async def release(self, connection, discard=False):
+        self._idle.put_nowait(connection)
+
+    async def execute(self, connection, sql, params):
+        self.executed.append(sql)
+        await asyncio.sleep(self.delay)
+        if sql.startswith('SHOW GLOBAL STATUS'):
+            return [{'Variable_name': 'Innodb_row_lock_waits', 'Value': str(len(self.executed))}]
+        if 'FROM pets' in sql and 'COUNT' not in sql:
+            return [{'pet_id': 1}]
+        return []
+
+
+class TestLoadDriver:
+    """Test stages, session setup and the pool queue limit"""
+
+    def test_stage_reports_throughput_and_latency(self):
+        """Test a short stage completes journeys and fills in the summary"""
+        backend = FakeBackend(pool_size=3)
+        driver = LoadDriver(backend, users_total=10, now=datetime(2025, 1, 1), mix={'dashboard': 1})
+        stage = asyncio.run(driver.run_stage(users=4, duration=0.1))
+        assert stage['users'] == 4
+        assert stage['journeys'] > 0
+        assert stage['p95_ms'] >= stage['p50_ms'] > 0
+        assert stage['row_lock_waits'] > 0
+        # every app statement is preceded by SET time_zone, as in config/database.js
+        app = [sql for sql in backend.executed if not sql.startswith('SHOW')]
+        assert app[0] == "SET time_zone = '-05:00'"
+        assert sum(sql.startswith('SET') for sql in app) * 2 == len(app)
+
+    def test_queue_limit_rejects_excess_waiters(self):
+        """Test statements beyond the queue limit fail fast instead of waiting"""
+        backend = FakeBackend(pool_size=1, delay=0.01)
+        driver = LoadDriver(backend, users_total=10, now=datetime(2025, 1, 1), queue_limit=1)
+
+        async def burst():
+            results = await asyncio.gather(
+                *(driver.run_statement('SELECT 1', ()) for _ in range(4)), return_exceptions=True
+            )
+            return [type(r) for r in results]
+
+        outcomes = asyncio.run(burst())
+        assert outcomes.count(QueueLimitError) == 2
+        assert driver.metrics.errors['queue_limit'] == 2
+
+
+class CountingAioBackend(AioBackend):
+    """AioBackend whose connections are numbered stand-ins, optionally failing to open"""
+
+    def __init__(self, pool_size):
+        super().__init__({}, pool_size)
+        self.opened = 0
+        self.closed = []
+        self.refuse = False
+
+    async def _open_connection(self):
+        if self.refuse:
+            raise OSError("server unavailable")
+        self.opened += 1
+        backend = self
+
+        class Connection:
+            number = self.opened
+
+            async def close(self):
+                backend.closed.append(self.number)
+
+        return Connection()
+
+
+class TestAioBackend:
+    """Test the asyncio pool replaces discarded connections"""
+
+    def test_discarded_connection_is_closed_and_replaced(self):
+        """Test a discarded connection never comes back and the pool keeps its size"""
+        async def scenario():
+            backend = CountingAioBackend(pool_size=2)
+            await backend.start()
+            first = await backend.acquire()
+            await backend.release(first, discard=True)
+            numbers = sorted([(await backend.acquire()).number, (await backend.acquire()).number])
+            return backend, first.number, numbers
+
+        backend, discarded, numbers = asyncio.run(scenario())
+        assert backend.closed == [discarded]
+        assert discarded not in numbers and len(numbers) == 2
+        assert backend.opened == 3
+
+    def test_failed_replacement_is_opened_on_next_acquire(self):
+        """Test a slot whose replacement could not be opened is refilled later"""
+        async def scenario():
+            backend = CountingAioBackend(pool_size=1)
+            await backend.start()
+            backend.refuse = True
+            await backend.release(await backend.acquire(), discard=True)
+            backend.refuse = False
+            return backend, await asyncio.wait_for(backend.acquire(), timeout=1)
+
+        backend, connection = asyncio.run(scenario())
+        assert connection.number == 2 and backend.opened == 2
+
+
+class TestHelpers:
+    """Test mix parsing, schema adaptation and scaling-limit detection"""
+
+    def test_parse_mix(self):
+        """Test journey weights parse and unknown journeys are rejected"""
+        assert parse_mix('dashboard=4, gallery') == {'dashboard': 4.0, 'gallery': 1.0}
+        with pytest.raises(ValueError):
+            parse_mix('checkout=1')
+
+    def test_adapt_sql(self):
+        """Test start_time falls back to due_date on older schemas"""
+        sql = "SELECT * FROM tasks t WHERE t.start_time > ? ORDER BY t.start_time"
+        assert adapt_sql(sql, True) == sql
+        assert 't.start_time' not in adapt_sql(sql, False)
+
+    def test_scaling_limit(self):
+        """Test the knee is the last stage before throughput flattens and latency jumps"""
+        stages = [
+            {'users': 1, 'journeys_per_s': 100, 'p95_ms': 10},
+            {'users': 2, 'journeys_per_s': 190, 'p95_ms': 11},
+            {'users': 4, 'journeys_per_s': 200, 'p95_ms': 25},
+            {'users': 8, 'journeys_per_s': 201, 'p95_ms': 50},
+        ]
+        assert scaling_limit(stages) == 2
+        assert scaling_limit(stages[:2]) is None
+
+
+class TestStatementDrift:
+    """The journeys' statements are copies of the app's"""
+
+    def test_journeys_match_the_app(self):
+        """Every copied statement is still in the model or route it names"""
+        assert statement_drift() == []
+
+    def test_edited_model_is_reported(self, tmp_path):
+        """A model statement changed after it was copied flags the copy"""
+        for source in {spec.source.partition(':')[0] for spec in SOURCES}:
+            text = (REPO_ROOT / source).read_text()
+            if source == 'models/notificationModel.js':
+                text = text.replace('SELECT COUNT(*) as count', 'SELECT COUNT(*) AS unread')
+            (tmp_path / source).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / source).write_text(text)
+        assert statement_drift(tmp_path) == [
+            ('UNREAD_COUNT_SQL', 'its SQL is not in models/notificationModel.js:getUnreadCount'),
+        ]
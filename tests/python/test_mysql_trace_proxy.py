@@ -0,0 +1,166 @@
+"""
+Tests for the MySQL tracing proxy
+"""
+
+import socket
+import struct
+import threading
+
+from benchmarks.mysql_trace_proxy import (
+    PacketReader,
+    ResponseTracker,
+    TraceProxy,
+    avoidable_round_trips,
+    group_by_gap,
+    session_state_repeats,
+    summarize,
+)
+
+CLIENT_PROTOCOL_41 = 0x00000200
+
+
+def packet(sequence, payload):
+    return len(payload).to_bytes(3, 'little') + bytes([sequence]) + payload
+
+
+def read_packet(sock):
+    header = _read_exactly(sock, 4)
+    return header[3], _read_exactly(sock, int.from_bytes(header[:3], 'little'))
+
+
+def _read_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("closed")
+        data += chunk
+    return data
+
+
+OK = b'\x00\x00\x00\x02\x00\x00\x00'
+EOF_PACKET = b'\xfe\x00\x00\x02\x00'
+
+
+def fake_mysql_server(listener, connection_id):
+    """Minimal server: handshake, then OK for every query and one row for SELECT"""
+    conn, _ = listener.accept()
+    with conn:
+        greeting = b'\x0a' + b'8.0.0-fake\x00' + struct.pack('<I', connection_id) + b'\x00' * 20
+        conn.sendall(packet(0, greeting))
+        read_packet(conn)
+        conn.sendall(packet(2, OK))
+        while True:
+            try:
+                _, payload = read_packet(conn)
+            except ConnectionError:
+                return
+            if payload[0] == 0x01:
+                return
+            if payload[1:].upper().startswith(b'SELECT'):
+                conn.sendall(
+                    packet(1, b'\x01') + packet(2, b'\x03def' + b'\x00' * 10) + packet(3, EOF_PACKET)
+                    + packet(4, b'\x011') + packet(5, EOF_PACKET)
+                )
+            else:
+                conn.sendall(packet(1, OK))
+
+
+class TestPacketParsing:
+    """Test packet reassembly and response tracking"""
+
+    def test_packets_split_across_reads(self):
+        """Test packets are reassembled regardless of TCP chunking"""
+        reader = PacketReader()
+        data = packet(0, b'\x03SELECT 1') + packet(1, b'\x00')
+        assert reader.feed(data[:5]) == []
+        assert reader.feed(data[5:]) == [(0, b'\x03SELECT 1'), (1, b'\x00')]
+
+    def test_result_set_with_eof(self):
+        """Test a classic result set ends on the EOF after the rows"""
+        tracker = ResponseTracker('QUERY', deprecate_eof=False)
+        responses = [b'\x01', b'\x03def', EOF_PACKET, b'\x011', EOF_PACKET]
+        assert [tracker.feed(p) for p in responses] == [False, False, False, False, True]
+
+    def test_result_set_with_deprecated_eof(self):
+        """Test CLIENT_DEPRECATE_EOF result sets end on an OK with a 0xfe header"""
+        tracker = ResponseTracker('STMT_EXECUTE', deprecate_eof=True)
+        responses = [b'\x01', b'\x03def', b'\x011', b'\xfe\x00\x00\x02\x00\x00\x00']
+        assert [tracker.feed(p) for p in responses] == [False, False, False, True]
+
+    def test_prepare_response(self):
+        """Test COM_STMT_PREPARE captures the statement id and skips definitions"""
+        tracker = ResponseTracker('STMT_PREPARE', deprecate_eof=False)
+        ok = b'\x00' + struct.pack('<IHH', 7, 1, 1) + b'\x00\x00\x00'
+        assert tracker.feed(ok) is False
+        assert [tracker.feed(p) for p in (b'param', EOF_PACKET, b'column', EOF_PACKET)] == [False, False, False, True]
+        assert tracker.statement_id == 7
+
+    def test_tls_capability_is_cleared(self):
+        """Test the greeting rewrite only clears CLIENT_SSL"""
+        from benchmarks.mysql_trace_proxy import CLIENT_SSL, _ConnectionTrace
+
+        version = b'8.0.0\x00'
+        flags = 0xffff
+        greeting = packet(0, b'\x0a' + version + b'\x01\x00\x00\x00' + b'a' * 8 + b'\x00' + struct.pack('<H', flags))
+        rewritten = _ConnectionTrace._without_tls(greeting, len(version))
+        assert struct.unpack('<H', rewritten[-2:])[0] == flags & ~CLIENT_SSL
+        assert rewritten[:-2] == greeting[:-2]
+
+
+class TestTraceProxy:
+    """Test the proxy end to end against a fake server"""
+
+    def test_records_statements_per_span(self):
+        """Test statements are attributed to spans and repeated session state is found"""
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        server = threading.Thread(target=fake_mysql_server, args=(listener, 42), daemon=True)
+        server.start()
+
+        with TraceProxy('127.0.0.1', listener.getsockname()[1]) as proxy:
+            client = socket.create_connection(('127.0.0.1', proxy.port))
+            read_packet(client)
+            client.sendall(packet(1, struct.pack('<I', CLIENT_PROTOCOL_41) + b'\x00' * 28))
+            read_packet(client)
+
+            for page in ('GET /dashboard', 'GET /tasks'):
+                with proxy.span(page):
+                    for sql in (b"SET time_zone = '-05:00'", b'SELECT 1'):
+                        client.sendall(packet(0, b'\x03' + sql))
+                        while read_packet(client)[1][:1] not in (b'\x00', b'\xfe'):
+                            pass
+                        if sql.startswith(b'SELECT'):
+                            read_packet(client)
+                            read_packet(client)
+            client.sendall(packet(0, b'\x01'))
+            client.close()
+            assert proxy.wait_idle()
+
+        server.join(timeout=5)
+        listener.close()
+        statements = [s for s in proxy.statements if s.command == 'QUERY']
+        assert [s.sql for s in statements] == ["SET time_zone = '-05:00'", 'SELECT 1'] * 2
+        assert {s.connection_id for s in statements} == {42}
+        assert all(s.finished is not None for s in statements)
+        assert [s.spans for s in statements] == [('GET /dashboard',)] * 2 + [('GET /tasks',)] * 2
+        assert session_state_repeats(statements) == [(42, "SET time_zone = '-05:00'", 2)]
+        assert avoidable_round_trips(statements) == 1
+        assert summarize(statements)['round_trips'] == 4
+
+
+class TestGrouping:
+    """Test request grouping of unlabelled traces"""
+
+    def test_group_by_gap(self):
+        """Test idle gaps split a trace into requests"""
+        from benchmarks.mysql_trace_proxy import TracedStatement
+
+        def statement(issued):
+            s = TracedStatement(1, 'QUERY', 'SELECT 1', issued, 0, None, ())
+            s.finished = issued + 0.001
+            return s
+
+        groups = group_by_gap([statement(0.0), statement(0.002), statement(1.0)], gap_ms=50)
+        assert [len(g) for g in groups.values()] == [2, 1]
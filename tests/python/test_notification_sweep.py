@@ -0,0 +1,146 @@
+"""
+Tests for the batched notification sweep reference implementation
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from benchmarks.notification_sweep import (
+    REPO_ROOT,
+    SOURCES,
+    BatchedSweep,
+    claim_sql,
+    due_notification,
+    legacy_sweep,
+    locale_string,
+    sweep_drift,
+)
+
+# Stands in for TestDatabase's QueryResult
+QueryResult = namedtuple('QueryResult', ['rowcount', 'lastrowid'])
+
+NOW = datetime(2024, 5, 1, 9, 0, 0)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+class ChunkedTasksDb:
+    """Hands out pending task ids in claim-sized chunks and records every statement"""
+
+    def __init__(self, pending):
+        self.pending = list(pending)
+        self.claimed = []
+        self.executed = []
+        self.connection = FakeConnection()
+
+    def query(self, sql, params=None):
+        text = ' '.join(sql.split())
+        self.executed.append((text, list(params or [])))
+        if text.startswith('UPDATE tasks SET notification_claim'):
+            limit = int(text.rsplit('LIMIT ', 1)[1])
+            self.claimed, self.pending = self.pending[:limit], self.pending[limit:]
+            return QueryResult(len(self.claimed), None)
+        if text.startswith('SELECT task_id'):
+            return [{'task_id': task_id} for task_id in self.claimed]
+        return QueryResult(len(self.claimed), None)
+
+
+class TestBatchedSweep:
+    """Claim, INSERT ... SELECT and UPDATE ... IN per chunk"""
+
+    def test_four_statements_per_chunk(self):
+        """2,500 tasks in chunks of 1,000 take three chunks and a final empty claim"""
+        db = ChunkedTasksDb(range(1, 2501))
+        sweep = BatchedSweep(claim='node-a')
+
+        assert sweep.run(db, NOW) == 2500
+        assert sweep.chunks == 3
+        kinds = [sql.split(' ')[0] for sql, _ in db.executed]
+        assert kinds == ['UPDATE', 'SELECT', 'INSERT', 'UPDATE'] * 3 + ['UPDATE']
+        assert db.connection.commits == len(db.executed)
+
+    def test_writes_are_guarded_by_the_claim(self):
+        """Only tasks still carrying this node's claim are notified and marked"""
+        db = ChunkedTasksDb([4, 9])
+        BatchedSweep(claim='node-a').run(db, NOW)
+
+        claim, _ids, insert, mark = db.executed[:4]
+        assert claim[1] == ['node-a', NOW, NOW, NOW + timedelta(hours=1), NOW - timedelta(minutes=5)]
+        assert 'AND t.notification_claim = ?' in insert[0] and insert[1] == [NOW, 4, 9, 'node-a']
+        assert 'WHERE task_id IN (?, ?) AND notification_claim = ?' in mark[0]
+        assert mark[1] == [4, 9, 'node-a']
+
+    def test_claim_skips_live_claims(self):
+        """Another node's claim is only taken over once it has expired"""
+        sql = ' '.join(claim_sql(250).split())
+        assert '(notification_claim IS NULL OR notification_claimed_at < ?)' in sql
+        assert sql.endswith('ORDER BY due_date, task_id LIMIT 250')
+
+
+class TestLegacyMessages:
+    """The per-task messages the SQL sweep reproduces"""
+
+    def test_locale_string_matches_en_us(self):
+        """Same layout as Date#toLocaleString() in en-US"""
+        assert locale_string(datetime(2024, 5, 1, 0, 5, 9)) == '5/1/2024, 12:05:09 AM'
+        assert locale_string(datetime(2024, 12, 31, 13, 0, 0)) == '12/31/2024, 1:00:00 PM'
+
+    def test_urgency_by_minutes_until_due(self):
+        """Under a minute counts as overdue, up to 15 minutes as urgent"""
+        task = {'title': 'Feed', 'pet_name': 'Rex'}
+        titles = [
+            due_notification({**task, 'due_date': NOW + timedelta(seconds=seconds)}, NOW)[0]
+            for seconds in (59, 60, 15 * 60 + 59, 16 * 60)
+        ]
+        assert titles == ['🚨 Task Overdue: Feed', '⚠️ Task Due Soon: Feed',
+                          '⚠️ Task Due Soon: Feed', '📅 Task Reminder: Feed']
+        _title, message = due_notification({**task, 'due_date': NOW + timedelta(minutes=7)}, NOW)
+        assert message == 'The task "Feed" for Rex is due in 7 minutes (5/1/2024, 9:07:00 AM).'
+
+    def test_legacy_sweep_issues_two_statements_per_task(self):
+        """The original loop: one SELECT, then an INSERT and an UPDATE per task"""
+        tasks = [{'task_id': n, 'user_id': 1, 'title': 'Walk', 'pet_name': 'Rex',
+                  'due_date': NOW + timedelta(minutes=30)} for n in (1, 2)]
+
+        class Db(ChunkedTasksDb):
+            def query(self, sql, params=None):
+                self.executed.append((' '.join(sql.split()), list(params or [])))
+                return tasks if sql.strip().startswith('SELECT') else QueryResult(1, None)
+
+        db = Db([])
+        assert legacy_sweep(db, NOW) == 2
+        assert [sql.split(' ')[0] for sql, _ in db.executed] == ['SELECT', 'INSERT', 'UPDATE', 'INSERT', 'UPDATE']
+
+
+class TestSweepDrift:
+    """The sweep's statements are copies of notificationService's"""
+
+    def copy_app(self, tmp_path, edit=None):
+        for source in {spec.source.partition(':')[0] for spec in SOURCES}:
+            text = (REPO_ROOT / source).read_text()
+            if edit:
+                text = edit(text)
+            (tmp_path / source).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / source).write_text(text)
+        return tmp_path
+
+    def test_copies_match_the_service(self):
+        """Every copied statement and the due-time format are still in the app"""
+        assert sweep_drift() == []
+
+    def test_edited_service_is_reported(self, tmp_path):
+        """Changing the mark UPDATE or the date format in the service flags the copy"""
+        def edit(text):
+            return (text.replace('notification_sent = true,', 'notification_sent = 1,')
+                    .replace("'%c/%e/%Y, %l:%i:%S %p'", "'%Y-%m-%d %H:%i'"))
+
+        assert sweep_drift(self.copy_app(tmp_path, edit)) == [
+            ('DUE_TIME_FORMAT', 'its SQL is not in services/notificationService.js:DUE_TIME_FORMAT'),
+            ('mark_notified_sql', 'its SQL is not in services/notificationService.js:markNotifiedSql'),
+        ]
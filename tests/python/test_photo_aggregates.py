@@ -0,0 +1,230 @@
+"""
+Tests for the materialized gallery aggregates and their reconciliation
+"""
+
+import shutil
+from collections import namedtuple
+
+import pytest
+
+from benchmarks.photo_model_bridge import ModelError, PhotoModel
+from config.photo_aggregates import (
+    DRIFT_QUERIES,
+    DUPLICATE_TAG,
+    REPO_ROOT,
+    MutationFuzzer,
+    cascading_deletes,
+    rebuild,
+    seed_fuzz_pool,
+    unreleased_deletes,
+    verify,
+)
+
+# Stands in for TestDatabase's QueryResult
+QueryResult = namedtuple('QueryResult', ['rowcount', 'lastrowid'])
+
+needs_node = pytest.mark.skipif(shutil.which('node') is None, reason="needs Node.js to run models/photoModel.js")
+
+
+class ScriptedDb:
+    """Answers statements by their leading words and records everything executed"""
+
+    def __init__(self, answers=None):
+        self.answers = answers or {}
+        self.executed = []
+
+    def query(self, sql, params=None):
+        text = ' '.join(sql.split())
+        self.executed.append((text, list(params or [])))
+        for prefix, answer in self.answers.items():
+            if text.startswith(prefix):
+                return answer(params) if callable(answer) else answer
+        if text.startswith('SELECT'):
+            return []
+        return QueryResult(1, 99)
+
+    def query_one(self, sql, params=None):
+        rows = self.query(sql, params)
+        return rows[0] if rows else None
+
+
+class DriverError(Exception):
+    """A driver error carrying a MySQL errno, as mysql.connector raises them"""
+
+    def __init__(self, errno):
+        super().__init__(f"error {errno}")
+        self.errno = errno
+
+
+def refuse(errno):
+    def answer(params):
+        raise DriverError(errno)
+    return answer
+
+
+@pytest.fixture
+def model():
+    photo_model = PhotoModel(ScriptedDb())
+    yield photo_model
+    photo_model.close()
+
+
+@needs_node
+class TestModelMutations:
+    """Every photoModel write path adjusts its counters only when the write happened"""
+
+    def test_toggle_favorite_counts_both_directions(self, model):
+        """Adding increments, removing decrements, a lost race changes nothing"""
+        model.db = ScriptedDb({'SELECT favorite_count': [{'favorite_count': 4}]})
+        assert model.call('toggleFavorite', 5, 2) == {'action': 'added', 'favorite_count': 4}
+        assert model.db.executed[-2] == ('UPDATE photos SET favorite_count = favorite_count + 1 WHERE photo_id = ?', [5])
+
+        model.db = ScriptedDb({'SELECT favorite_id': [{'favorite_id': 1}]})
+        assert model.call('toggleFavorite', 5, 2)['action'] == 'removed'
+        assert model.db.executed[-2] == ('UPDATE photos SET favorite_count = favorite_count - 1 WHERE photo_id = ?', [5])
+
+        model.db = ScriptedDb({'SELECT favorite_id': [{'favorite_id': 1}], 'DELETE': QueryResult(0, None)})
+        model.call('toggleFavorite', 5, 2)
+        assert not any(sql.startswith('UPDATE') for sql, _ in model.db.executed)
+
+    def test_add_tag_bumps_usage_and_refreshes_names(self, model):
+        """A new tag link adds one use and rebuilds the photo's tag list"""
+        model.db = ScriptedDb({'SELECT tag_id': [{'tag_id': 7}]})
+        assert model.call('addTagToPhoto', 5, 'cute', 2) is True
+        upsert, refresh = model.db.executed[-2], model.db.executed[-1]
+        assert upsert[0].startswith('INSERT INTO tag_stats') and upsert[1] == [7, 1]
+        assert refresh[0].startswith('UPDATE photos SET tag_names') and refresh[1] == [5, 5]
+
+    def test_duplicate_tag_touches_no_counter(self, model):
+        """Re-adding a tag is refused on ER_DUP_ENTRY before any counter moves"""
+        model.db = ScriptedDb({'SELECT tag_id': [{'tag_id': 7}], 'INSERT INTO photo_tags': refuse(1062)})
+        with pytest.raises(ModelError, match=DUPLICATE_TAG):
+            model.call('addTagToPhoto', 5, 'cute', 2)
+        assert not any('tag_stats' in sql for sql, _ in model.db.executed)
+
+    def test_refused_tag_removal_touches_no_counter(self, model):
+        """Only the tag's adder or the photo owner may remove it"""
+        model.db = ScriptedDb({'DELETE pt': QueryResult(0, None)})
+        assert model.call('removeTagFromPhoto', 5, 7, 3) is False
+        assert len(model.db.executed) == 1
+
+    def test_delete_photo_releases_tags_read_before_the_cascade(self, model):
+        """Tag ids are read first because ON DELETE CASCADE bypasses the counters"""
+        model.db = ScriptedDb({'SELECT pt.tag_id': [{'tag_id': 3}, {'tag_id': 8}]})
+        model.call('deletePhoto', 5, 2)
+        kinds = [sql.split(' ')[0] for sql, _ in model.db.executed]
+        assert kinds == ['SELECT', 'DELETE', 'INSERT']
+        assert model.db.executed[-1][1] == [3, -1, 8, -1]
+
+    def test_delete_user_releases_the_tags_of_their_photos(self, model):
+        """The user's photos cascade away, so their tags are read and released like a photo delete"""
+        model.db = ScriptedDb({'SELECT pt.tag_id': [{'tag_id': 4}]})
+        model.call('deleteUserAndReleaseTags', 7)
+        assert [sql for sql, _ in model.db.executed][1] == 'DELETE FROM users WHERE user_id = ?'
+        assert model.db.executed[-1][1] == [4, -1]
+
+    def test_referenced_user_delete_is_refused(self, model):
+        """A user whose favorites or tag links still reference them can't be deleted; no counter moves"""
+        model.db = ScriptedDb({'DELETE FROM users': refuse(1451)})
+        with pytest.raises(ModelError) as refused:
+            model.call('deleteUserAndReleaseTags', 7)
+        assert (refused.value.code, refused.value.errno) == ('ER_ROW_IS_REFERENCED_2', 1451)
+        assert len(model.db.executed) == 2
+
+
+class TestCascadingDeletes:
+    """Every JS delete that cascades into photo_tags releases tag usage"""
+
+    SCHEMA = """
+        CREATE TABLE `users` (`user_id` int);
+        CREATE TABLE `photos` (`photo_id` int, `user_id` int,
+          CONSTRAINT `photos_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`user_id`) ON DELETE CASCADE);
+        CREATE TABLE `photo_tags` (`photo_id` int, `added_by` int,
+          FOREIGN KEY (`photo_id`) REFERENCES `photos` (`photo_id`) ON DELETE CASCADE,
+          FOREIGN KEY (`added_by`) REFERENCES `users` (`user_id`));
+        CREATE TABLE `pets` (`pet_id` int);
+    """
+
+    def test_cascade_chains_are_followed(self):
+        """Tables reaching photo_tags through several cascades are found; plain references are not"""
+        assert cascading_deletes(self.SCHEMA) == {'photos', 'users'}
+
+    def test_app_deletes_all_release_tag_usage(self):
+        """No model or route deletes users or photos behind photoModel's back"""
+        assert unreleased_deletes() == []
+
+    def test_raw_delete_is_reported(self, tmp_path):
+        """A route deleting a user with a bare DELETE is flagged"""
+        (tmp_path / 'schema.sql').write_text(self.SCHEMA)
+        (tmp_path / 'routes').mkdir()
+        (tmp_path / 'routes' / 'admin.js').write_text(
+            "await query('DELETE FROM pets WHERE pet_id = ?', [id]);\n"
+            "await query('DELETE FROM users WHERE user_id = ?', [id]);\n"
+        )
+        assert unreleased_deletes(tmp_path, tmp_path / 'schema.sql') == [('routes/admin.js', 2, 'users')]
+        assert 'users' in cascading_deletes((REPO_ROOT / 'hkpifgzax132wnez.db').read_text())
+
+
+class TestVerify:
+    """Drift reporting"""
+
+    def test_reports_only_drifted_aggregates(self):
+        """Each drift query names the key and both values"""
+        drifted = [{'key': 5, 'stored': 2, 'actual': 3}]
+        db = ScriptedDb({'SELECT p.photo_id AS `key`, p.favorite_count': drifted})
+        assert verify(db) == {'photos.favorite_count': (1, [(5, 2, 3)])}
+        assert len(db.executed) == len(DRIFT_QUERIES)
+
+
+@needs_node
+class TestMutationFuzzer:
+    """Random mutation sequences, run through photoModel"""
+
+    def test_same_seed_same_sequence(self, model):
+        """A failing sequence can be replayed from its seed"""
+        def run(seed):
+            model.db = ScriptedDb({'SELECT tag_id, added_by': [{'tag_id': 1, 'added_by': 1}]})
+            fuzzer = MutationFuzzer(model, [1, 2, 3], {10: 1, 11: 2, 12: 3}, ['a', 'b'], seed=seed)
+            return [fuzzer.step() for _ in range(30)]
+
+        assert run(4) == run(4)
+        assert run(4) != run(5)
+
+    def test_model_refusals_are_steps_not_failures(self, model):
+        """Duplicate tags, refused photo deletes and referenced users are part of the sequence"""
+        model.db = ScriptedDb({
+            'SELECT tag_id, added_by': [{'tag_id': 1, 'added_by': 1}],
+            'INSERT INTO photo_tags': refuse(1062),
+            'DELETE FROM photos': QueryResult(0, None),
+            'DELETE FROM users': refuse(1451),
+        })
+        fuzzer = MutationFuzzer(model, [1, 2, 3], {10: 1, 11: 2, 12: 3}, ['a', 'b'], seed=4)
+        history = [fuzzer.step() for _ in range(200)]
+        assert any(line.endswith('-> False') for line in history if line.startswith('add tag'))
+        assert any(line.startswith('delete photo=') and 'refused' in line for line in history)
+        assert any(line.startswith('delete user=') and line.endswith('refused') for line in history)
+        assert len(fuzzer.photos) == 3
+
+    def test_stops_at_first_drift(self, model):
+        """The run reports the step and recent history once verify finds drift"""
+        drifted = [{'key': 1, 'stored': 0, 'actual': 1}]
+        model.db = ScriptedDb({'SELECT t.tag_id AS `key`': drifted})
+        failure = MutationFuzzer(model, [1], {10: 1}, ['a'], seed=0).run(20)
+        assert failure is not None
+        number, history, drift = failure
+        assert number == 1 and len(history) == 1
+        assert 'tag_stats.usage_count' in drift
+
+
+class TestAggregatesAgainstDatabase:
+    """Random model mutations never leave the aggregates out of step"""
+
+    @needs_node
+    @pytest.mark.mysql_only  # multi-table UPDATE/DELETE ... JOIN
+    def test_random_mutations_do_not_drift(self, db_connection, model):
+        """Test 200 random mutations of photoModel, verified after every one"""
+        rebuild(db_connection, commit=False)
+        users, photos, tag_names = seed_fuzz_pool(db_connection)
+        model.db = db_connection
+        failure = MutationFuzzer(model, users, photos, tag_names, seed=11).run(200)
+        assert failure is None, failure
@@ -0,0 +1,136 @@
+"""
+Tests for query accounting and N+1 detection
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from config.query_budget import QueryRecorder, budget_violations, statement_shape
+from config.test_database import REPO_ROOT
+
+# A module whose tests feed the recorder directly, without a database
+REPORTED_TESTS = """
+import pytest
+
+@pytest.mark.query_budget({budget})
+def test_lookups(request):
+    for user_id in range(3):
+        request.config._query_recorder("SELECT * FROM users WHERE user_id = ?", (user_id,), 1, 0.001)
+"""
+
+
+class TestStatementShape:
+    """Test statement normalisation"""
+
+    def test_literals_and_placeholders_share_a_shape(self):
+        """Test statements differing only in values normalise alike"""
+        assert statement_shape("UPDATE tasks SET notification_sent = true WHERE task_id = 17") == \
+            statement_shape("UPDATE tasks  SET notification_sent = true WHERE task_id = ?")
+        assert statement_shape("SELECT * FROM users WHERE email = 'a@b.c'") == \
+            statement_shape("SELECT * FROM users WHERE email = %s")
+
+    def test_value_lists_collapse(self):
+        """Test IN lists and multi-row VALUES normalise regardless of length"""
+        assert statement_shape("SELECT * FROM pets WHERE pet_id IN (1, 2, 3)") == \
+            statement_shape("SELECT * FROM pets WHERE pet_id IN (?, ?)")
+        assert statement_shape("INSERT INTO tags (a, b) VALUES (%s, %s), (%s, %s)") == \
+            statement_shape("INSERT INTO tags (a, b) VALUES (%s, %s)")
+
+    def test_identifiers_with_digits_are_kept(self):
+        """Test digits inside identifiers are not treated as literals"""
+        assert 't1.user_id' in statement_shape("SELECT t1.user_id FROM users t1")
+
+
+class TestQueryRecorder:
+    """Test per-test counters and repeated-shape detection"""
+
+    def test_counts_only_inside_a_test(self):
+        """Test statements outside start/stop only reach the session totals"""
+        recorder = QueryRecorder()
+        recorder("SELECT 1", (), 1, 0.001)
+        recorder.start('test_a')
+        recorder("SELECT * FROM users WHERE user_id = ?", (1,), 1, 0.002)
+        recorder("INSERT INTO tags (tag_name) VALUES (?), (?)", None, 2, 0.001, statements=2, round_trips=1)
+        stats = recorder.stop()
+        assert stats.statements == 3
+        assert stats.round_trips == 2
+        assert stats.rows == 3
+        assert stats.time_ms == pytest.approx(3.0)
+        assert sum(s.count for s in recorder.shapes.values()) == 3
+
+    def test_detects_n_plus_one(self):
+        """Test a shape repeated with different parameters is flagged"""
+        recorder = QueryRecorder(threshold=3)
+        recorder.start('test_loop')
+        for task_id in range(5):
+            recorder("UPDATE tasks SET notification_sent = true WHERE task_id = ?", (task_id,), 1, 0.001)
+        for _ in range(5):
+            recorder("SELECT COUNT(*) FROM users", (), 1, 0.001)
+        stats = recorder.stop()
+        assert list(stats.repeated.values()) == [5]
+        assert 'UPDATE tasks' in next(iter(stats.repeated))
+
+    def test_batched_rows_are_one_round_trip(self):
+        """Test an executemany of many rows is not mistaken for a loop"""
+        recorder = QueryRecorder(threshold=3)
+        recorder.start('test_seed')
+        recorder("INSERT INTO users (username) VALUES (?)", None, 5, 0.001, statements=5)
+        recorder("INSERT INTO users (username) VALUES (?)", ('fresh',), 1, 0.001)
+        stats = recorder.stop()
+        assert stats.statements == 6
+        assert stats.repeated == {}
+
+    def test_hot_statements_ordered_by_time(self):
+        """Test the session report ranks shapes by total time"""
+        recorder = QueryRecorder()
+        recorder("SELECT 1", (), 1, 0.001)
+        recorder("SELECT * FROM photos", (), 10, 0.5)
+        assert recorder.hot_statements(1)[0].shape == 'SELECT * FROM photos'
+
+
+class TestBudgetViolations:
+    """Test query_budget marker limits"""
+
+    def test_reports_each_exceeded_limit(self):
+        """Test statement and row limits are checked independently"""
+        recorder = QueryRecorder()
+        recorder.start('test_budget')
+        for user_id in range(4):
+            recorder("SELECT * FROM users WHERE user_id = ?", (user_id,), 5, 0.001)
+        stats = recorder.stop()
+        marker = pytest.mark.query_budget(3, rows=100).mark
+        assert budget_violations(stats, marker) == ['statements: 4 > budget 3']
+        assert budget_violations(stats, pytest.mark.query_budget(10).mark) == []
+
+
+class TestSessionReport:
+    """Test when the hottest shapes are listed at session end"""
+
+    def run(self, tmp_path, budget, *args):
+        (tmp_path / 'conftest.py').write_text("pytest_plugins = ['config.query_budget']\n")
+        (tmp_path / 'test_reported.py').write_text(REPORTED_TESTS.format(budget=budget))
+        return subprocess.run(
+            [sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider', *args],
+            cwd=tmp_path, env=dict(os.environ, PYTHONPATH=str(REPO_ROOT)), capture_output=True, text=True
+        )
+
+    def test_quiet_by_default(self, tmp_path):
+        """Test a run within budget prints no report"""
+        result = self.run(tmp_path, 10)
+        assert result.returncode == 0, result.stdout
+        assert 'query report' not in result.stdout
+
+    def test_on_request(self, tmp_path):
+        """Test --query-report N lists the shapes"""
+        result = self.run(tmp_path, 10, '--query-report', '5')
+        assert 'query report' in result.stdout and 'SELECT * FROM users' in result.stdout
+
+    def test_when_a_budget_fails(self, tmp_path):
+        """Test an exceeded budget brings the report along with the failure"""
+        result = self.run(tmp_path, 2)
+        assert result.returncode == 1
+        assert 'statements: 3 > budget 2' in result.stdout
+        assert 'query report' in result.stdout and 'SELECT * FROM users' in result.stdout
@@ -0,0 +1,219 @@
+"""
+Tests for the record/replay query cassettes
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from config.query_cassette import (
+    Cassette,
+    CassetteDrift,
+    CassetteLibrary,
+    RecordingMixin,
+    ReplayMixin,
+    decode_value,
+    encode_value,
+    params_key,
+)
+
+# Stands in for TestDatabase's QueryResult
+QueryResult = namedtuple('QueryResult', ['rowcount', 'lastrowid'])
+
+NODE = 'tests/python/test_pets.py::TestPets::test_feeding'
+
+
+class FakeDatabase:
+    """The TestDatabase surface the mixins wrap, answering from queued results"""
+
+    observers = []
+    schema_file = None
+
+    def __init__(self, answers=None):
+        self.answers = answers or {}
+
+    def schema_path(self):
+        return self.schema_file
+
+    def query(self, sql, params=None):
+        queued = self.answers.get(' '.join(sql.split()))
+        return queued.pop(0) if queued else QueryResult(1, 7)
+
+    def snapshot(self, name, seed, version='1'):
+        seed(self)
+        return {'users': 1}
+
+    def _notify(self, sql, params, result, elapsed, round_trips=1, statements=1):
+        for observer in self.observers:
+            observer(sql, params, result, elapsed)
+
+
+class Recording(RecordingMixin, FakeDatabase):
+    pass
+
+
+class Replaying(ReplayMixin, FakeDatabase):
+    query_result = QueryResult
+
+
+@pytest.fixture
+def schema(tmp_path):
+    path = tmp_path / 'schema.sql'
+    path.write_text('CREATE TABLE users (user_id INT);')
+    Recording.schema_file = Replaying.schema_file = path
+    return path
+
+
+def record(tmp_path, calls, answers=None):
+    """Record one test's calls and write its cassette"""
+    library = CassetteLibrary('record', root=tmp_path)
+    Recording.library = library
+    db = Recording(answers)
+    library.start(NODE)
+    calls(db)
+    library.stop()
+    return library.save()
+
+
+def replay(tmp_path):
+    """A replaying database positioned on the recorded test"""
+    library = CassetteLibrary('replay', root=tmp_path)
+    Replaying.library = library
+    db = Replaying()
+    library.start(NODE)
+    return library, db
+
+
+class TestValues:
+    """Values survive the JSON round trip with their types"""
+
+    def test_round_trip(self):
+        """Decimals, dates, times and bytes come back as they went in"""
+        values = [None, 3, 'x', Decimal('12.50'), datetime(2024, 5, 1, 9, 30), date(2024, 5, 1),
+                  timedelta(hours=2), b'\x00\xff', {'users': 2}]
+        assert decode_value(encode_value(values)) == values
+
+    def test_timestamps_only_need_to_be_timestamps(self):
+        """Parameters derived from the current time don't count as drift"""
+        assert params_key([1, '2024-05-01 09:00:00']) == params_key([1, datetime(2031, 1, 1)])
+        assert params_key([1, 'rex']) != params_key([2, 'rex'])
+
+
+class TestRecordReplay:
+    """Calls recorded against one database are answered without it"""
+
+    def test_replays_results_in_recorded_order(self, tmp_path, schema):
+        """A repeated statement gets each of its recorded results in turn"""
+        answers = {'SELECT COUNT(*) AS n FROM pets': [[{'n': 1}], [{'n': 2}]]}
+
+        def calls(db):
+            db.query("SELECT   COUNT(*) AS n\n FROM pets")
+            db.query("INSERT INTO pets (name) VALUES (?)", ['Rex'])
+            db.query("SELECT COUNT(*) AS n FROM pets")
+
+        [path] = record(tmp_path, calls, answers)
+        assert path == tmp_path / 'tests/python/cassettes/test_pets.json.gz'
+
+        library, db = replay(tmp_path)
+        assert db.query("SELECT COUNT(*) AS n FROM pets") == [{'n': 1}]
+        assert db.query("INSERT INTO pets (name) VALUES (?)", ['Rex']) == QueryResult(1, 7)
+        assert db.query("SELECT COUNT(*) AS n FROM pets") == [{'n': 2}]
+        assert library.unused() == []
+
+    def test_nested_calls_belong_to_the_outer_call(self, tmp_path, schema):
+        """A snapshot's seed statements are not replayed on their own"""
+        def seed(db):
+            db.query("INSERT INTO users (username) VALUES (?)", ['owner'])
+
+        record(tmp_path, lambda db: db.snapshot('owner', seed))
+
+        library, db = replay(tmp_path)
+        assert db.snapshot('owner', seed) == {'users': 1}
+        assert library.unused() == []
+
+    def test_changed_sql_is_drift(self, tmp_path, schema):
+        """The error names the statement the recording expected next"""
+        record(tmp_path, lambda db: db.query("SELECT name FROM pets WHERE pet_id = ?", [1]))
+
+        _library, db = replay(tmp_path)
+        with pytest.raises(CassetteDrift, match=r"recorded: SELECT name FROM pets WHERE pet_id = \?"):
+            db.query("SELECT name, breed FROM pets WHERE pet_id = ?", [1])
+
+    def test_schema_change_is_drift(self, tmp_path, schema):
+        """Editing the schema dump invalidates the module's recordings"""
+        record(tmp_path, lambda db: db.query("SELECT 1"))
+        schema.write_text('CREATE TABLE users (user_id BIGINT);')
+
+        _library, db = replay(tmp_path)
+        with pytest.raises(CassetteDrift, match="schema changed"):
+            db.query("SELECT 1")
+
+
+OTHER = 'tests/python/test_pets.py::TestPets::test_grooming'
+
+
+class TestSharedFixtureCalls:
+    """Only module/class fixture calls may come from another test's recording"""
+
+    def record_fixture_in_first_test(self, tmp_path):
+        library = CassetteLibrary('record', root=tmp_path)
+        Recording.library = library
+        db = Recording()
+        library.start(NODE)
+        library.enter_shared()
+        db.query("INSERT INTO users (username) VALUES (?)", ['module_owner'])
+        library.leave_shared()
+        db.query("SELECT name FROM pets WHERE pet_id = ?", [1])
+        library.stop()
+        library.start(OTHER)
+        library.stop()
+        library.save()
+
+    def test_fixture_setup_replays_from_the_test_that_recorded_it(self, tmp_path, schema):
+        """A module fixture first needed by a later test finds its recorded calls"""
+        self.record_fixture_in_first_test(tmp_path)
+
+        library = CassetteLibrary('replay', root=tmp_path)
+        Replaying.library = library
+        db = Replaying()
+        library.start(OTHER)
+        library.enter_shared()
+        assert db.query("INSERT INTO users (username) VALUES (?)", ['module_owner']) == QueryResult(1, 7)
+        library.leave_shared()
+
+    def test_test_calls_never_borrow_other_tests_recordings(self, tmp_path, schema):
+        """A test's own call that only another test recorded is drift"""
+        self.record_fixture_in_first_test(tmp_path)
+
+        library = CassetteLibrary('replay', root=tmp_path)
+        Replaying.library = library
+        db = Replaying()
+        library.start(OTHER)
+        with pytest.raises(CassetteDrift, match="is not in"):
+            db.query("SELECT name FROM pets WHERE pet_id = ?", [1])
+        with pytest.raises(CassetteDrift, match="is not in"):
+            db.query("INSERT INTO users (username) VALUES (?)", ['module_owner'])
+
+
+class TestParallelRecording:
+    """Workers recording the same module keep each other's tests"""
+
+    def test_concurrent_saves_merge(self, tmp_path, schema):
+        """Every worker's test survives when they all save at once"""
+        library = CassetteLibrary('record', root=tmp_path)
+        path = library.cassette_path('tests/python/test_pets.py')
+        cassettes = []
+        for worker in range(8):
+            cassette = Cassette(path)
+            cassette.tests[f'test_{worker}'] = [{'op': 'query', 'sql': 'SELECT 1', 'key': '[]'}]
+            cassette.recorded.add(f'test_{worker}')
+            cassettes.append(cassette)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(Cassette.save, cassettes))
+
+        assert sorted(Cassette(path).tests) == [f'test_{worker}' for worker in range(8)]
+        assert not list(path.parent.glob('*.tmp'))
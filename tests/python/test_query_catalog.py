@@ -0,0 +1,60 @@
+"""
+Tests that the benchmarked SQL still matches the app it was copied from
+"""
+
+from benchmarks.query_catalog import QUERIES, catalog_drift, definition_lines
+
+SERVICE = """\
+const CLAIM_SQL = `
+  UPDATE tasks SET claim = ?
+  WHERE completed = false
+  LIMIT ${CHUNK}
+`;
+
+const service = {
+    async listTasks(userId, limit) {
+        const orderBy = 'ORDER BY due_date';
+        return query(`SELECT * FROM tasks WHERE user_id = ? ${orderBy} LIMIT ${limit}`, [userId]);
+    },
+
+    async countTasks() {
+        return query('SELECT COUNT(*) AS n FROM tasks');
+    }
+};
+"""
+
+
+def spec(name, source, sql, excerpt=None):
+    return QUERIES[0]._replace(name=name, source=source, sql=sql, excerpt=excerpt)
+
+
+class TestCatalogDrift:
+    """Catalog entries against their source definitions"""
+
+    def test_catalog_matches_the_app(self):
+        """Every benchmarked statement is still in the function, constant or route it names"""
+        assert catalog_drift() == []
+
+    def test_definitions_end_at_their_closing_line(self):
+        """A method ends at its closing brace, a constant at the end of its literal"""
+        assert definition_lines(SERVICE, 'CLAIM_SQL') == (1, 5)
+        assert definition_lines(SERVICE, 'listTasks') == (8, 11)
+        assert definition_lines(SERVICE, 'missing') is None
+
+    def test_interpolations_match_any_text(self, tmp_path):
+        """Filled-in ${...} parts still match; an edited statement or the wrong method does not"""
+        (tmp_path / 'service.js').write_text(SERVICE)
+        queries = [
+            spec('list', 'service.js:listTasks', "SELECT * FROM tasks WHERE user_id = ? ORDER BY due_date LIMIT 20"),
+            spec('count', 'service.js:countTasks', "SELECT COUNT(*) AS n FROM tasks"),
+            spec('edited', 'service.js:countTasks', "SELECT COUNT(*) AS total FROM tasks"),
+            spec('elsewhere', 'service.js:listTasks', "SELECT COUNT(*) AS n FROM tasks"),
+            spec('claim', 'service.js:CLAIM_SQL', "SELECT task_id FROM tasks WHERE completed = false",
+                 excerpt="WHERE completed = false"),
+            spec('gone', 'service.js:removedTasks', "SELECT 1"),
+        ]
+        assert catalog_drift(tmp_path, queries) == [
+            ('edited', 'its SQL is not in service.js:countTasks'),
+            ('elsewhere', 'its SQL is not in service.js:listTasks'),
+            ('gone', 'removedTasks is not defined in service.js'),
+        ]
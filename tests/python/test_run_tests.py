@@ -0,0 +1,150 @@
+"""
+Tests for the run_tests.py orchestrator: sharding, report merging and suite outcomes
+"""
+
+import json
+import threading
+import xml.etree.ElementTree as ET
+
+from run_tests import Job, coverage_addopts, junit_key, merge_reports, shard_tests, update_durations
+
+PYTEST_REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="3">
+  <testcase classname="tests.python.test_pets.TestPets" name="test_feed" time="2.5"/>
+  <testcase classname="tests.python.test_pets.TestPets" name="test_walk[rain]" time="0.5">
+    <failure message="assert 1 == 2">trace</failure>
+  </testcase>
+  <testcase classname="tests.python.test_pets" name="test_slow" time="9.0"><skipped/></testcase>
+</testsuite></testsuites>
+"""
+
+JEST_RESULTS = {
+    'testResults': [
+        {
+            'name': '/repo/tests/unit/models/pet-model.test.js',
+            'status': 'failed',
+            'assertionResults': [
+                {'ancestorTitles': ['PetModel', 'create'], 'title': 'inserts a pet',
+                 'status': 'passed', 'duration': 12, 'failureMessages': []},
+                {'ancestorTitles': ['PetModel'], 'title': 'rejects bad input',
+                 'status': 'failed', 'duration': 3, 'failureMessages': ['Expected 400']},
+                {'ancestorTitles': [], 'title': 'later', 'status': 'todo', 'duration': None},
+            ],
+        },
+    ],
+}
+
+
+def finished_job(name, reports, returncode=0):
+    job = Job(name, ['true'], reports)
+    job.returncode = returncode
+    return job
+
+
+class TestSharding:
+    """Duration-balanced pytest shards"""
+
+    def test_junit_key_matches_pytest_report_names(self):
+        """Node ids map onto the classname::name pairs in --junit-xml output"""
+        assert junit_key('tests/python/test_pets.py::TestPets::test_walk[rain]') == \
+            'tests.python.test_pets.TestPets::test_walk[rain]'
+        assert junit_key('tests/python/test_pets.py::test_slow') == 'tests.python.test_pets::test_slow'
+
+    def test_longest_tests_are_spread_out(self):
+        """Shard totals stay close even when one test dominates"""
+        ids = [f'tests/python/test_a.py::test_{n}' for n in range(6)]
+        durations = dict(zip(map(junit_key, ids), [10.0, 6.0, 4.0, 3.0, 2.0, 1.0]))
+        shards = shard_tests(ids, durations, 2)
+        assert [sum(durations[junit_key(n)] for n in shard) for shard in shards] == [13.0, 13.0]
+        assert sorted(n for shard in shards for n in shard) == sorted(ids)
+
+    def test_unknown_tests_count_as_the_median(self):
+        """New tests are spread like average ones instead of piling onto one shard"""
+        ids = [f'tests/python/test_a.py::test_{n}' for n in range(4)]
+        durations = {junit_key(ids[0]): 5.0, junit_key(ids[1]): 5.0}
+        shards = shard_tests(ids, durations, 2)
+        assert [len(shard) for shard in shards] == [2, 2]
+
+    def test_shards_keep_collection_order(self):
+        """Tests of one module stay in their original order inside a shard"""
+        ids = [f'tests/python/test_a.py::test_{n}' for n in range(9)]
+        for shard in shard_tests(ids, {}, 3):
+            assert shard == sorted(shard, key=ids.index)
+
+    def test_never_more_shards_than_tests(self):
+        """Empty shards are not started"""
+        assert len(shard_tests(['tests/python/test_a.py::test_1'], {}, 4)) == 1
+
+
+class TestReports:
+    """Durations file and merged JUnit output"""
+
+    def test_durations_come_from_junit_reports(self, tmp_path):
+        """Recorded times replace old ones; skipped tests keep their last real time"""
+        report = tmp_path / 'python-1.xml'
+        report.write_text(PYTEST_REPORT)
+        durations_file = tmp_path / 'durations.json'
+        durations_file.write_text(json.dumps({'tests.python.test_pets::test_slow': 4.0}))
+
+        durations = update_durations([report, tmp_path / 'missing.xml'], durations_file)
+        assert durations == {
+            'tests.python.test_pets.TestPets::test_feed': 2.5,
+            'tests.python.test_pets.TestPets::test_walk[rain]': 0.5,
+            'tests.python.test_pets::test_slow': 4.0,
+        }
+
+    def test_merge_combines_pytest_jest_and_crashed_suites(self, tmp_path):
+        """Every suite lands in one document with recounted totals"""
+        pytest_report = tmp_path / 'python-1.xml'
+        pytest_report.write_text(PYTEST_REPORT)
+        jest_report = tmp_path / 'jest.json'
+        jest_report.write_text(json.dumps(JEST_RESULTS))
+        jobs = [
+            finished_job('python:1/2', [pytest_report]),
+            finished_job('jest', [jest_report], returncode=1),
+            finished_job('cypress', [tmp_path / 'cypress'], returncode=1),
+        ]
+
+        totals = merge_reports(jobs, tmp_path / 'junit.xml')
+        assert totals == {'tests': 7, 'failures': 2, 'errors': 1, 'skipped': 2}
+
+        root = ET.parse(tmp_path / 'junit.xml').getroot()
+        names = [suite.get('name') for suite in root.iter('testsuite')]
+        assert names[0] == 'python:1/2: pytest' and names[2] == 'cypress: cypress'
+        jest_case = root.find(".//testcase[@name='inserts a pet']")
+        assert jest_case.get('classname') == 'PetModel › create' and jest_case.get('time') == '0.012'
+
+
+class TestSuiteOutcomes:
+    """Which skipped suites count as passed"""
+
+    def test_missing_tool_fails_unless_allowed(self, tmp_path):
+        """A requested suite that cannot run fails the run, and is an error in the report"""
+        job = Job('cypress', ['petcare-no-such-tool'], [tmp_path / 'cypress']).run(threading.Lock())
+        assert job.unavailable and not job.passed
+
+        totals = merge_reports([job], tmp_path / 'junit.xml')
+        assert totals['errors'] == 1
+
+        job.required = False  # --allow-missing
+        assert job.passed
+        assert merge_reports([job], tmp_path / 'junit.xml')['tests'] == 0
+
+    def test_nothing_to_run_passes(self):
+        """A suite --changed left without tests is skipped, not failed"""
+        job = Job('jest', ['true'])
+        job.skipped = "no JavaScript changes"
+        assert job.run(threading.Lock()).passed and job.returncode is None
+
+
+class TestCoverageOptions:
+    """pyproject's coverage settings carried into the shards"""
+
+    def test_reads_cov_sources_and_reports_from_addopts(self, tmp_path):
+        """--cov targets become shard options and --cov-report values the combined reports"""
+        pyproject = tmp_path / 'pyproject.toml'
+        pyproject.write_text(
+            '[tool.pytest.ini_options]\n'
+            'addopts = "-q --cov=models --cov=config --cov-report=html:out --cov-report=term-missing"\n'
+        )
+        assert coverage_addopts(pyproject) == (['models', 'config'], ['html:out', 'term-missing'])
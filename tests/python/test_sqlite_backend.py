@@ -0,0 +1,168 @@
+"""
+Tests for the embedded SQLite backend and its MySQL dialect shim
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from config.sqlite_database import SqliteDatabase
+from config.sqlite_dialect import (
+    date_format,
+    mysql_date_add,
+    mysql_timestampdiff,
+    register_functions,
+    translate,
+    translate_script,
+)
+from config.statements import created_tables, split_statements
+from config.test_database import REPO_ROOT
+
+SCHEMA = (REPO_ROOT / 'hkpifgzax132wnez.db').read_text()
+
+
+@pytest.fixture
+def db():
+    database = SqliteDatabase()
+    database.initialize_schema()
+    yield database
+    database.close()
+
+
+def add_user(db, name):
+    return db.query(
+        "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+        [name, f"{name}@example.com", 'hash']
+    ).lastrowid
+
+
+class TestDialect:
+    """MySQL statements rewritten for SQLite"""
+
+    def test_schema_dump_loads(self):
+        """Every table of the dump is created, with its indexes and ON UPDATE triggers"""
+        connection = sqlite3.connect(':memory:')
+        for statement in translate_script(SCHEMA):
+            connection.execute(statement)
+        objects = connection.execute("SELECT type, name FROM sqlite_master").fetchall()
+        tables = [name for kind, name in objects if kind == 'table']
+        assert tables == created_tables(split_statements(SCHEMA))
+        assert ('index', 'tasks_idx_tasks_notification_due') in objects
+        assert ('trigger', 'users_updated_at_on_update') in objects
+
+    def test_literals_and_comments_are_left_alone(self):
+        """Only code is rewritten; MySQL escapes become SQLite quoting"""
+        [sql] = translate("SELECT 'NOW() %s', \"it\\'s\" FROM t /* NOW() */ WHERE a = %s AND b < NOW()")
+        assert sql == "SELECT 'NOW() %s', 'it''s' FROM t   WHERE a = ? AND b < datetime('now', 'localtime')"
+
+    def test_housekeeping_statements(self):
+        """TRUNCATE, FOREIGN_KEY_CHECKS, SHOW TABLES and AUTO_INCREMENT resets"""
+        assert translate("TRUNCATE TABLE `users`") == ('DELETE FROM `users`',)
+        assert translate("SET FOREIGN_KEY_CHECKS = 0") == ('PRAGMA foreign_keys = OFF',)
+        assert translate("SHOW TABLES")[0].startswith('SELECT name AS Tables_in_main FROM sqlite_master')
+        assert translate("ALTER TABLE `users` AUTO_INCREMENT = 1") == ()
+        assert translate("DROP TABLE IF EXISTS `a`, `b`") == ('DROP TABLE IF EXISTS `a`', 'DROP TABLE IF EXISTS `b`')
+
+    def test_upsert_and_insert_ignore(self):
+        """ON DUPLICATE KEY UPDATE becomes ON CONFLICT with excluded.* values"""
+        [sql] = translate(
+            "INSERT IGNORE INTO tag_stats (tag_id, usage_count) VALUES (?, ?) "
+            "ON DUPLICATE KEY UPDATE usage_count = usage_count + VALUES(usage_count)"
+        )
+        assert sql == ("INSERT OR IGNORE INTO tag_stats (tag_id, usage_count) VALUES (?, ?) "
+                       "ON CONFLICT DO UPDATE SET usage_count = usage_count + excluded.usage_count")
+
+    def test_group_concat(self):
+        """DISTINCT, ORDER BY and SEPARATOR behave as in MySQL"""
+        connection = sqlite3.connect(':memory:')
+        register_functions(connection)
+        connection.execute("CREATE TABLE t (g INT, name TEXT)")
+        connection.executemany("INSERT INTO t VALUES (?, ?)", [(1, 'b'), (1, 'a'), (1, 'b'), (1, None), (2, 'c')])
+        [sql] = translate("SELECT g, GROUP_CONCAT(DISTINCT name ORDER BY name DESC SEPARATOR '; ') "
+                          "FROM t GROUP BY g ORDER BY g")
+        assert connection.execute(sql).fetchall() == [(1, 'b; a'), (2, 'c')]
+
+    def test_date_functions(self):
+        """Interval arithmetic, TIMESTAMPDIFF truncation and DATE_FORMAT"""
+        assert mysql_date_add('2024-03-31', -1, 'MONTH') == '2024-02-29'
+        assert mysql_date_add('2024-05-01 09:00:00', 90, 'MINUTE') == '2024-05-01 10:30:00'
+        assert mysql_timestampdiff('MINUTE', '2024-05-01 09:00:00', '2024-05-01 09:15:59') == 15
+        assert mysql_timestampdiff('MONTH', '2024-01-31', '2024-02-29') == 0
+        assert date_format(datetime(2024, 5, 1, 0, 5, 9), '%c/%e/%Y, %l:%i:%S %p') == '5/1/2024, 12:05:09 AM'
+
+
+@pytest.mark.db
+class TestSqliteDatabase:
+    """TestDatabase behaviour on the embedded backend"""
+
+    def test_strict_mode_constraints(self, db):
+        """Bad ENUM values, over-long VARCHARs and orphans are rejected"""
+        user_id = add_user(db, 'owner')
+        for sql, params in [
+            ("INSERT INTO pets (user_id, name, gender) VALUES (?, ?, ?)", [user_id, 'Rex', 'dragon']),
+            ("INSERT INTO pets (user_id, name) VALUES (?, ?)", [user_id, 'x' * 101]),
+            ("INSERT INTO pets (user_id, name) VALUES (?, ?)", [user_id + 1, 'Rex']),
+        ]:
+            with pytest.raises(sqlite3.IntegrityError):
+                db.query(sql, params)
+
+    def test_types_and_case_insensitive_unique(self, db):
+        """Dates and decimals come back typed; UNIQUE ignores case like utf8mb4_0900_ai_ci"""
+        user_id = add_user(db, 'owner')
+        db.query("INSERT INTO pets (user_id, name, weight) VALUES (?, ?, ?)", [user_id, 'Rex', 25.5])
+        pet = db.query_one("SELECT weight, created_at FROM pets")
+        assert str(pet['weight']) == '25.5' and isinstance(pet['created_at'], datetime)
+        with pytest.raises(sqlite3.IntegrityError):
+            add_user(db, 'OWNER')
+
+    def test_on_update_current_timestamp(self, db):
+        """updated_at moves on UPDATE unless the statement sets it"""
+        add_user(db, 'owner')
+        db.query("UPDATE users SET updated_at = '2000-01-01 00:00:00'")
+        assert db.query_one("SELECT updated_at FROM users")['updated_at'].year == 2000
+        db.query("UPDATE users SET bio = 'hi'")
+        assert db.query_one("SELECT updated_at FROM users")['updated_at'].year > 2000
+
+    def test_scopes_and_nested_transactions(self, db):
+        """A test's own START TRANSACTION/ROLLBACK nests inside the fixture scope"""
+        db.begin_scope()
+        add_user(db, 'outer')
+        db.query("START TRANSACTION")
+        add_user(db, 'inner')
+        db.query("ROLLBACK")
+        assert [r['username'] for r in db.query("SELECT username FROM users")] == ['outer']
+        db.rollback_scope()
+        assert db.query_one("SELECT COUNT(*) AS n FROM users")['n'] == 0
+
+    def test_cleanup_and_snapshots(self, db):
+        """Cleanup restarts AUTO_INCREMENT ids; a snapshot restores the seeded rows"""
+        def seed(database):
+            database.bulk_insert('users', ['username', 'email', 'password_hash'],
+                                 [(f'u{n}', f'u{n}@example.com', 'hash') for n in range(5)])
+
+        assert db.snapshot('five', seed) == {'users': 5}
+        db.query("DELETE FROM users WHERE user_id > 2")
+        assert db.snapshot('five', seed) == {'users': 5}
+        assert db.query_one("SELECT COUNT(*) AS n FROM users")['n'] == 5
+
+        db.cleanup_database(full=True)
+        assert add_user(db, 'fresh') == 1
+
+    def test_snapshots_are_created_outside_test_transactions(self, db):
+        """Creating a snapshot inside a scope is refused; restoring one is rolled back"""
+        def seed(database):
+            add_user(database, 'seeded')
+
+        db.begin_scope()
+        with pytest.raises(RuntimeError, match='module-scoped fixture'):
+            db.ensure_snapshot('owner', seed)
+        db.rollback_scope()
+
+        assert db.ensure_snapshot('owner', seed) == {'users': 1}
+        db.cleanup_database(full=True)
+        db.begin_scope()
+        db.restore_snapshot('owner')
+        assert db.query_one("SELECT username FROM users")['username'] == 'seeded'
+        db.rollback_scope()
+        assert db.query_one("SELECT COUNT(*) AS n FROM users")['n'] == 0
@@ -0,0 +1,67 @@
+"""
+Tests for the db/nodb markers and the startup profile
+"""
+
+import os
+import subprocess
+import sys
+
+from config.startup_profile import StartupProfile
+from config.test_database import REPO_ROOT
+
+
+def run_pytest(*args, cwd=REPO_ROOT):
+    env = dict(os.environ, PYTHONPATH=str(REPO_ROOT))
+    return subprocess.run(
+        [sys.executable, '-m', 'pytest', '-q', '-o', 'addopts=', '-p', 'no:cacheprovider', *args],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+
+
+class TestMarkers:
+    """Tests are marked db/nodb from the fixtures they use"""
+
+    def test_pure_tests_are_marked_nodb(self, request):
+        """No database fixture means nodb"""
+        assert request.node.get_closest_marker('nodb') is not None
+
+    def test_nodb_run_never_loads_the_driver(self):
+        """Neither mysql.connector nor dotenv is imported for database-free tests"""
+        result = run_pytest('-m', 'nodb', '--startup-profile', 'tests/python/test_basic.py')
+        assert result.returncode == 0, result.stdout
+        assert 'mysql.connector  not loaded' in result.stdout
+        assert 'dotenv           not loaded' in result.stdout
+
+    def test_nodb_run_of_database_modules_never_loads_the_driver(self):
+        """Modules that connect to MySQL, or use the SQLite backend, import the driver only when connecting"""
+        result = run_pytest('-m', 'nodb', '--startup-profile',
+                            'tests/python/test_database.py', 'tests/python/test_sqlite_backend.py')
+        assert result.returncode == 0, result.stdout
+        assert 'mysql.connector  not loaded' in result.stdout
+
+
+class TestStartupProfile:
+    """Timings and heavy-import attribution"""
+
+    def test_heavy_imports_are_attributed_once(self, monkeypatch):
+        """The first check that sees a module gets it"""
+        monkeypatch.delitem(sys.modules, 'numpy', raising=False)
+        profile = StartupProfile()
+        profile.check_imports('collection')
+        monkeypatch.setitem(sys.modules, 'numpy', object())
+        profile.check_imports('tests/a.py::test_x')
+        profile.check_imports('tests/a.py::test_y')
+        assert profile.loaded['numpy'] == 'tests/a.py::test_x'
+
+    def test_report_lists_modules_and_fixtures(self, tmp_path):
+        """Module imports and fixture setups appear with their call counts"""
+        (tmp_path / 'test_sample.py').write_text(
+            "import pytest\n\n"
+            "@pytest.fixture\ndef slow():\n    import time; time.sleep(0.01)\n\n"
+            "def test_a(slow):\n    pass\n\n"
+            "def test_b(slow):\n    pass\n"
+        )
+        result = run_pytest('-p', 'config.startup_profile', '--startup-profile', '--startup-profile-top', '3', cwd=tmp_path)
+        assert result.returncode == 0, result.stdout
+        assert 'test_sample.py' in result.stdout.split('slowest test module imports:')[1]
+        assert 'slow (2x)' in result.stdout
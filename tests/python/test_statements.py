@@ -0,0 +1,130 @@
+from config.statements import (
+    LRUCache,
+    StatementCompiler,
+    compile_statement,
+    created_tables,
+    split_statements,
+    written_tables,
+)
+
+
+class TestStatementCompiler:
+    """Placeholder translation and statement caching"""
+
+    def test_question_marks_become_pyformat(self):
+        """Test ? placeholders are rewritten for mysql.connector"""
+        stmt = compile_statement("INSERT INTO users (username, email) VALUES (?, ?)")
+        assert stmt.sql == "INSERT INTO users (username, email) VALUES (%s, %s)"
+        assert stmt.param_count == 2
+        assert stmt.returns_rows is False
+
+    def test_literals_and_comments_are_left_alone(self):
+        """Test ? inside strings, identifiers and comments is not a placeholder"""
+        stmt = compile_statement(
+            "SELECT 'why?', `odd?col` FROM t -- really?\nWHERE a = ? /* b = ? */"
+        )
+        assert stmt.sql == "SELECT 'why?', `odd?col` FROM t -- really?\nWHERE a = %s /* b = ? */"
+        assert stmt.param_count == 1
+
+    def test_escaped_quotes_do_not_end_literal(self):
+        """Test backslash and doubled quotes stay inside the literal"""
+        stmt = compile_statement("SELECT 'it''s ?', 'a\\'?' , ?")
+        assert stmt.sql.endswith(", %s")
+        assert stmt.param_count == 1
+
+    def test_row_returning_statements(self):
+        """Test result-set detection beyond plain SELECT"""
+        for sql in ["  select 1", "(SELECT 1)", "/* hint */ SHOW TABLES", "WITH x AS (SELECT 1) SELECT * FROM x"]:
+            assert compile_statement(sql).returns_rows, sql
+        assert compile_statement("UPDATE tasks SET completed = 1").keyword == 'UPDATE'
+
+    def test_compiler_cache_counts_hits(self):
+        """Test repeated statements are served from the cache"""
+        compiler = StatementCompiler(capacity=2)
+        for _ in range(3):
+            compiler.compile("SELECT * FROM pets WHERE pet_id = ?")
+        stats = compiler.stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 2
+
+
+class TestSplitStatements:
+    """Schema script splitting"""
+
+    def test_semicolons_in_literals_and_comments(self):
+        """Test ; inside strings and comments does not end a statement"""
+        script = (
+            "-- header; with a semicolon\n"
+            "CREATE TABLE notes (body TEXT DEFAULT 'a;b');\n"
+            "/* ; */ INSERT INTO notes VALUES ('c;d');\n"
+        )
+        statements = split_statements(script)
+        assert len(statements) == 2
+        assert statements[1].endswith("VALUES ('c;d')")
+
+    def test_delimiter_directive_for_triggers(self):
+        """Test DELIMITER blocks keep trigger bodies intact"""
+        script = (
+            "DELIMITER $$\n"
+            "CREATE TRIGGER trg BEFORE INSERT ON pets FOR EACH ROW BEGIN SET NEW.name = TRIM(NEW.name); END$$\n"
+            "DELIMITER ;\n"
+            "SELECT 1;"
+        )
+        statements = split_statements(script)
+        assert statements == [
+            "CREATE TRIGGER trg BEFORE INSERT ON pets FOR EACH ROW BEGIN SET NEW.name = TRIM(NEW.name); END",
+            "SELECT 1",
+        ]
+
+    def test_created_tables(self):
+        """Test CREATE TABLE names are extracted in order"""
+        statements = split_statements(
+            "-- dump\nCREATE TABLE `users` (id INT);\n"
+            "CREATE TABLE IF NOT EXISTS pets (id INT);\n"
+            "INSERT INTO pets VALUES (1);"
+        )
+        assert created_tables(statements) == ['users', 'pets']
+
+
+class TestWrittenTables:
+    """Write-target detection used for dirty-table cleanup"""
+
+    def test_single_table_writes(self):
+        """Test INSERT/UPDATE/DELETE/TRUNCATE targets are found"""
+        assert written_tables("INSERT INTO users (username) VALUES (?)") == ('users',)
+        assert written_tables("insert ignore into `photo_tags` values (1, 2)") == ('photo_tags',)
+        assert written_tables("UPDATE tasks SET notification_sent = 1 WHERE task_id = ?") == ('tasks',)
+        assert written_tables("DELETE FROM pets WHERE pet_id = ?") == ('pets',)
+        assert written_tables("TRUNCATE TABLE notifications") == ('notifications',)
+
+    def test_reads_and_transaction_control_write_nothing(self):
+        """Test statements that can't change data report no tables"""
+        for sql in ["SELECT * FROM users", "START TRANSACTION", "ROLLBACK", "SET FOREIGN_KEY_CHECKS = 0"]:
+            assert written_tables(sql) == (), sql
+
+    def test_multi_table_update_over_approximates(self):
+        """Test every table in an UPDATE join is treated as written"""
+        sql = "UPDATE tasks t JOIN pets p ON t.pet_id = p.pet_id SET t.completed = 1"
+        assert written_tables(sql) == ('tasks', 'pets')
+
+    def test_unknown_targets(self):
+        """Test DDL and multi-table DELETE fall back to 'any table'"""
+        assert written_tables("CREATE TABLE x (id INT)") is None
+        assert written_tables("DELETE t FROM tasks t JOIN pets p ON t.pet_id = p.pet_id") is None
+
+
+class TestLRUCache:
+    """LRU eviction order"""
+
+    def test_least_recently_used_is_evicted(self):
+        """Test eviction callback receives the coldest entry"""
+        evicted = []
+        cache = LRUCache(2, on_evict=lambda key, value: evicted.append(key))
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        assert evicted == ['b']
+        assert 'a' in cache and 'c' in cache
+        assert cache.stats()['evictions'] == 1
@@ -0,0 +1,156 @@
+"""
+Tests for nested transaction scopes: savepoints, a test's own transaction
+statements, and the db_module/db_class fixtures
+"""
+
+import pytest
+
+from config.sqlite_database import SqliteDatabase
+
+
+@pytest.fixture
+def db():
+    database = SqliteDatabase()
+    database.initialize_schema()
+    yield database
+    database.close()
+
+
+def add_user(db, name):
+    return db.query(
+        "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+        [name, f"{name}@example.com", 'hash']
+    ).lastrowid
+
+
+def usernames(db):
+    return [r['username'] for r in db.query("SELECT username FROM users ORDER BY user_id")]
+
+
+class TestScopes:
+    """begin_scope()/rollback_scope() on the embedded backend"""
+
+    def test_nested_scopes_become_savepoints(self, db):
+        """Test each scope after the first is a SAVEPOINT undone on its own"""
+        assert db.begin_scope() == 1
+        add_user(db, 'module')
+        assert db.begin_scope() == 2
+        add_user(db, 'klass')
+        assert db.begin_scope() == 3
+        add_user(db, 'test')
+
+        db.rollback_scope()
+        assert usernames(db) == ['module', 'klass']
+        db.rollback_scope()
+        assert usernames(db) == ['module']
+        db.rollback_scope()
+        assert usernames(db) == []
+        assert not db.connection.in_transaction
+
+    def test_bare_commit_and_rollback_keep_the_fixture_scope(self, db):
+        """Test a test's own COMMIT is a no-op and its ROLLBACK only undoes the test's work"""
+        db.begin_scope()
+        add_user(db, 'seeded')
+        db.begin_scope()
+        add_user(db, 'committed')
+        db.query("COMMIT")
+        assert db.connection.in_transaction
+        db.query("ROLLBACK")
+        assert usernames(db) == ['seeded']
+
+        add_user(db, 'after')
+        db.rollback_scope()
+        assert usernames(db) == ['seeded']
+        db.rollback_scope()
+        assert usernames(db) == []
+
+    def test_bare_rollback_in_the_outermost_scope(self, db):
+        """Test ROLLBACK under a single scope restarts its transaction instead of ending it"""
+        db.begin_scope()
+        add_user(db, 'gone')
+        db.query("ROLLBACK")
+        assert db.connection.in_transaction
+        add_user(db, 'also_gone')
+        db.rollback_scope()
+        assert usernames(db) == []
+
+    def test_test_transactions_map_onto_savepoints(self, db):
+        """Test START TRANSACTION/COMMIT/ROLLBACK nest, and unclosed ones unwind with the fixture"""
+        db.begin_scope()
+        db.query("START TRANSACTION")
+        add_user(db, 'kept')
+        db.query("COMMIT")
+        db.query("START TRANSACTION")
+        add_user(db, 'undone')
+        db.query("ROLLBACK")
+        assert usernames(db) == ['kept']
+
+        db.query("START TRANSACTION")
+        add_user(db, 'left_open')
+        db.rollback_scope()
+        assert usernames(db) == []
+        assert not db.connection.in_transaction
+
+    def test_lost_savepoint_falls_back_to_a_full_rollback(self, db, capsys):
+        """Test an implicit commit that drops the savepoints unwinds every scope"""
+        db.begin_scope()
+        db.begin_scope()
+        add_user(db, 'committed_early')
+        db.connection.commit()  # what DDL or TRUNCATE does on MySQL
+
+        db.rollback_scope()
+        assert 'was lost to an implicit commit' in capsys.readouterr().out
+        assert usernames(db) == ['committed_early']
+        assert db.begin_scope() == 1
+        db.rollback_scope()
+
+
+@pytest.fixture(scope="module")
+def module_owner(db_module):
+    """A user seeded once for the whole module"""
+    return add_user(db_module, 'scope_module_owner')
+
+
+@pytest.fixture(scope="class")
+def class_pet(db_class, module_owner):
+    """A pet seeded once for TestClassScope"""
+    return db_class.query(
+        "INSERT INTO pets (user_id, name) VALUES (?, ?)", [module_owner, 'ClassPet']
+    ).lastrowid
+
+
+def count(db, sql, params):
+    return db.query_one(f"SELECT COUNT(*) AS n FROM {sql}", params)['n']
+
+
+class TestModuleScope:
+    """Data seeded in db_module survives each test's rollback"""
+
+    @pytest.mark.parametrize('run', [1, 2])
+    def test_module_data_is_shared_and_test_data_is_not(self, module_owner, db_connection, run):
+        """Test both runs see the module's user and never the other run's insert"""
+        db = db_connection
+        assert count(db, "users WHERE user_id = ?", [module_owner]) == 1
+        assert count(db, "users WHERE username = ?", ['scope_per_test']) == 0
+        add_user(db, 'scope_per_test')
+
+
+class TestClassScope:
+    """Data seeded in db_class is visible to the class's tests only"""
+
+    @pytest.mark.parametrize('run', [1, 2])
+    def test_class_data_is_shared(self, module_owner, class_pet, db_connection, run):
+        """Test both runs see the class's pet and roll back their own"""
+        db = db_connection
+        assert count(db, "pets WHERE pet_id = ?", [class_pet]) == 1
+        assert count(db, "pets WHERE name = ?", ['PerTestPet']) == 0
+        db.query("INSERT INTO pets (user_id, name) VALUES (?, ?)", [module_owner, 'PerTestPet'])
+
+
+class TestAfterClassScope:
+    """Runs after TestClassScope has closed its scope"""
+
+    def test_class_data_is_gone(self, module_owner, db_connection):
+        """Test the class's pet was rolled back with its scope, the module's user was not"""
+        assert count(db_connection, "pets WHERE name = ?", ['ClassPet']) == 0
+        assert count(db_connection, "users WHERE user_id = ?", [module_owner]) == 1
@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime, timedelta
+
+np = pytest.importorskip("numpy")
+
+from config.data_factory import DataFactory, CsvSink  # noqa: E402
+from config.validation import load_rules, validate_csv, validator  # noqa: E402
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class TestValidationRules:
+    """Shared validation rules compiled into column validators"""
+
+    def test_report_lists_every_failing_field(self):
+        """Test a row with several bad fields reports each of them, in row order"""
+        report = validator('pets').validate({
+            'name': ['Buddy', 'B', 'Fluffy123'],
+            'species': ['dog', 'cat', 'd0g'],
+            'breed': ['Beagle', 'Siamese', 'Mixed'],
+            'age': np.array([4, 0, 51]),
+            'weight': np.array([11.5, 3.8, 250.0]),
+            'gender': np.array(['male', 'female', 'unknown']),
+        })
+        assert report.valid.tolist() == [True, False, False]
+        assert report.invalid_rows == 2 and report.error_count == 7
+        rows = report.errors()
+        assert [row for row, _errors in rows] == [1, 2]
+        assert [field for field, _message in rows[1][1]] == ['name', 'species', 'age', 'weight', 'gender']
+
+    def test_missing_required_column_fails_every_row(self):
+        """Test leaving out a required column is reported, optional ones are not"""
+        report = validator('tasks', ('due_date',)).validate({
+            'title': ['Walk', 'Feed'],
+            'task_type': ['exercise', 'feeding'],
+        })
+        assert report.counts() == {'priority': 2}
+
+    def test_check_raises_the_model_message(self):
+        """Test check() raises the same message the Node models throw"""
+        rules = load_rules()
+        with pytest.raises(ValueError, match=rules['tasks']['priority']['message']):
+            validator('tasks').check({'title': 'Walk Max', 'priority': 'urgent'})
+        assert validator('tasks').errors({'title': 'Walk Max', 'description': None}) == []
+
+    def test_due_date_window(self):
+        """Test due dates must fall after now and within a year of it"""
+        dates = np.array([NOW + timedelta(hours=1), NOW - timedelta(minutes=1),
+                          NOW + timedelta(days=366)], dtype='datetime64[s]')
+        failures = validator('tasks').validate({'due_date': dates}, now=NOW).failures
+        assert failures['due_date'].tolist() == [1, 2]
+
+    def test_factory_data_is_valid(self):
+        """Test generated pets and tasks satisfy the app's rules"""
+        factory = DataFactory(users=300, seed=5, now=NOW)
+        for table, skip in (('pets', ()), ('tasks', ('due_date',))):
+            for name, _columns, chunk in factory.iter_chunks([table]):
+                assert validator(table, skip).validate(chunk, now=NOW).invalid_rows == 0
+
+    def test_csv_chunks_keep_row_numbers(self, tmp_path):
+        """Test CSV validation treats \\N as NULL and numbers rows across chunks"""
+        DataFactory(users=40, seed=0, now=NOW).write(CsvSink(str(tmp_path)), tables=['users', 'pets'])
+        path = tmp_path / 'pets.csv'
+        lines = path.read_text().splitlines()
+        fields = lines[0].split(',')
+        bad = lines[25].split(',')
+        bad[fields.index('age')] = '\\N'
+        lines[25] = ','.join(bad)
+        path.write_text('\n'.join(lines) + '\n')
+
+        reports = list(validate_csv(path, 'pets', chunk_rows=10))
+        assert len(reports) > 2
+        errors = [entry for report in reports for entry in report.errors()]
+        assert errors == [(24, [('age', load_rules()['pets']['age']['message'])])]
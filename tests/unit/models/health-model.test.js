@@ -0,0 +1,73 @@
+const healthModel = require('../../../models/healthModel');
+const { query } = require('../../../config/database');
+
+jest.mock('../../../config/database');
+
+function missingTable() {
+  const error = new Error("Table 'pets.health_trends' doesn't exist");
+  error.code = 'ER_NO_SUCH_TABLE';
+  return error;
+}
+
+describe('Health Model Tests', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  test('should read the recent records of every pet in one capped query', async () => {
+    query.mockResolvedValue([
+      { health_id: 7, pet_id: 2 },
+      { health_id: 6, pet_id: 1 },
+      { health_id: 5, pet_id: 2 }
+    ]);
+
+    const records = await healthModel.getRecentHealthRecords([1, 2]);
+
+    expect(records).toEqual({
+      1: [{ health_id: 6, pet_id: 1 }],
+      2: [{ health_id: 7, pet_id: 2 }, { health_id: 5, pet_id: 2 }]
+    });
+    expect(query).toHaveBeenCalledTimes(1);
+    expect(query.mock.calls[0][0]).toContain('pet_id IN (?,?)');
+    expect(query.mock.calls[0][0]).toContain('LIMIT 200');
+    expect(query.mock.calls[0][1]).toEqual([1, 2, healthModel.RECENT_RECORD_MONTHS]);
+  });
+
+  test('should read no trends or summaries before the health trends migration', async () => {
+    query.mockRejectedValue(missingTable());
+
+    expect(await healthModel.getHealthTrends([1, 2])).toEqual({});
+    expect(await healthModel.getHealthSummaries([1, 2])).toEqual({});
+    expect(await healthModel.markHealthTrendsStale(1)).toBeNull();
+  });
+
+  test('should still fail on other trend query errors', async () => {
+    query.mockRejectedValue(new Error('Connection lost'));
+
+    await expect(healthModel.getHealthTrends([1])).rejects.toThrow('Connection lost');
+    await expect(healthModel.markHealthTrendsStale(1)).rejects.toThrow('Connection lost');
+  });
+
+  test('should report a committed delete even when marking the trend stale fails', async () => {
+    query
+      .mockResolvedValueOnce([{ health_id: 9, pet_id: 4 }])
+      .mockResolvedValueOnce({ affectedRows: 1 })
+      .mockRejectedValueOnce(new Error('Connection lost'));
+
+    const result = await healthModel.deleteHealthRecord(9, 2);
+
+    expect(result).toEqual({ affectedRows: 1 });
+    expect(query).toHaveBeenLastCalledWith('UPDATE health_trends SET stale = 1 WHERE pet_id = ?', [4]);
+  });
+
+  test('should report a committed update when the trend table is missing', async () => {
+    query
+      .mockResolvedValueOnce([{ health_id: 9, pet_id: 4 }])
+      .mockResolvedValueOnce({ affectedRows: 1 })
+      .mockRejectedValueOnce(missingTable());
+
+    const result = await healthModel.updateHealthRecord(9, { diet: 'Kibble' }, 2);
+
+    expect(result).toEqual({ affectedRows: 1 });
+  });
+});
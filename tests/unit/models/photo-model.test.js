@@ -32,4 +32,72 @@ describe('Photo Model Tests', () => {
     const result = await photoModel.createPhoto(photoData);
     expect(result).toBe(1);
   });
+
+  test('should keep the stored favorite count in step when toggling', async () => {
+    queryOne
+      .mockResolvedValueOnce(null)
+      .mockResolvedValueOnce({ favorite_count: 4 });
+    query.mockResolvedValue({ affectedRows: 1 });
+
+    const result = await photoModel.toggleFavorite(5, 2);
+
+    expect(result).toEqual({ action: 'added', favorite_count: 4 });
+    expect(query).toHaveBeenCalledWith(
+      'UPDATE photos SET favorite_count = favorite_count + 1 WHERE photo_id = ?',
+      [5]
+    );
+    expect(queryOne).toHaveBeenLastCalledWith('SELECT favorite_count FROM photos WHERE photo_id = ?', [5]);
+  });
+
+  test('should not touch tag counters when a tag removal is refused', async () => {
+    query.mockResolvedValue({ affectedRows: 0 });
+
+    const removed = await photoModel.removeTagFromPhoto(5, 7, 3);
+
+    expect(removed).toBe(false);
+    expect(query).toHaveBeenCalledTimes(1);
+  });
+
+  test('should round-trip keyset cursors only for the same sort', () => {
+    const cursor = photoModel.encodeCursor('newest', ['2024-05-01 10:00:00', 42]);
+
+    expect(cursor).toMatch(/^[A-Za-z0-9_-]+$/);
+    expect(photoModel.decodeCursor(cursor, 'newest')).toEqual(['2024-05-01 10:00:00', 42]);
+    expect(photoModel.decodeCursor(cursor, 'popular')).toBeNull();
+    expect(photoModel.decodeCursor('not a cursor', 'newest')).toBeNull();
+  });
+
+  test('should build keyset conditions that place NULL dates last when descending', () => {
+    const keys = [
+      { expr: 'p.created_at', dir: 'DESC', nullable: true },
+      { expr: 'p.photo_id', dir: 'DESC' }
+    ];
+
+    expect(photoModel.keysetCondition(keys, ['2024-05-01 10:00:00', 42])).toEqual({
+      sql: '(((p.created_at < ? OR p.created_at IS NULL)) OR (p.created_at = ? AND p.photo_id < ?))',
+      params: ['2024-05-01 10:00:00', '2024-05-01 10:00:00', 42]
+    });
+    expect(photoModel.keysetCondition(keys, [null, 42])).toEqual({
+      sql: '((p.created_at IS NULL AND p.photo_id < ?))',
+      params: [42]
+    });
+  });
+
+  test('should get a keyset page and a cursor for the next one', async () => {
+    query
+      .mockResolvedValueOnce([
+        { k0: '2024-05-02 09:00:00', k1: 7 },
+        { k0: '2024-05-01 10:00:00', k1: 5 },
+        { k0: '2024-04-30 08:00:00', k1: 3 }
+      ])
+      .mockResolvedValueOnce([{ photo_id: 7 }, { photo_id: 5 }])
+      .mockResolvedValueOnce([{ photo_id: 5 }]);
+
+    const result = await photoModel.getPublicPhotosKeyset(null, 2, { current_user_id: 1 });
+
+    expect(result.photos).toEqual([{ photo_id: 7, is_favorited: 0 }, { photo_id: 5, is_favorited: 1 }]);
+    expect(photoModel.decodeCursor(result.nextCursor, 'newest')).toEqual(['2024-05-01 10:00:00', 5]);
+    expect(query.mock.calls[0][0]).toContain('LIMIT 3');
+    expect(query.mock.calls[1][1]).toEqual([7, 5]);
+  });
 });
\ No newline at end of file
@@ -0,0 +1,69 @@
+const notificationService = require('../../../services/notificationService');
+const notificationModel = require('../../../models/notificationModel');
+const { query } = require('../../../config/database');
+
+jest.mock('../../../config/database', () => ({
+  query: jest.fn()
+}));
+jest.mock('../../../models/notificationModel');
+
+describe('Notification Service sweeps', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  describe('checkDueTasks', () => {
+    test('should notify each claimed chunk with one INSERT and one UPDATE', async () => {
+      query
+        .mockResolvedValueOnce({ affectedRows: 2 })
+        .mockResolvedValueOnce([{ task_id: '4' }, { task_id: '9' }])
+        .mockResolvedValueOnce({ affectedRows: 2 })
+        .mockResolvedValueOnce({ affectedRows: 2 })
+        .mockResolvedValueOnce({ affectedRows: 0 });
+
+      const notified = await notificationService.checkDueTasks();
+
+      expect(notified).toBe(2);
+      expect(query).toHaveBeenCalledTimes(5);
+      const claim = query.mock.calls[0][1][0];
+      expect(query.mock.calls[0][0]).toContain('SET notification_claim = ?');
+      expect(query.mock.calls[2][0]).toContain('INSERT INTO notifications');
+      expect(query.mock.calls[2][1].slice(1)).toEqual([4, 9, claim]);
+      expect(query.mock.calls[3][0]).toContain('WHERE task_id IN (?, ?)');
+      expect(query.mock.calls[3][1]).toEqual([4, 9, claim]);
+      expect(notificationModel.createNotification).not.toHaveBeenCalled();
+    });
+
+    test('should report the tasks notified before a failure', async () => {
+      query
+        .mockResolvedValueOnce({ affectedRows: 1 })
+        .mockResolvedValueOnce([{ task_id: 4 }])
+        .mockResolvedValueOnce({ affectedRows: 1 })
+        .mockResolvedValueOnce({ affectedRows: 1 })
+        .mockRejectedValueOnce(new Error('Lock wait timeout'));
+
+      await expect(notificationService.checkDueTasks()).resolves.toBe(1);
+    });
+  });
+
+  describe('checkTomorrowTasks', () => {
+    test('should write every user digest in one batched insert', async () => {
+      query.mockResolvedValueOnce([
+        { user_id: '1', title: 'Feed', pet_name: 'Rex', due_date: '2024-05-02 08:00:00' },
+        { user_id: '2', title: 'Walk', pet_name: 'Bo', due_date: '2024-05-02 09:00:00' },
+        { user_id: '1', title: 'Brush', pet_name: 'Rex', due_date: '2024-05-02 10:00:00' }
+      ]);
+      notificationModel.createNotifications.mockResolvedValue({ affectedRows: 2 });
+
+      const count = await notificationService.checkTomorrowTasks();
+
+      expect(count).toBe(3);
+      expect(notificationModel.createNotifications).toHaveBeenCalledTimes(1);
+      const digests = notificationModel.createNotifications.mock.calls[0][0];
+      expect(digests.map(digest => [digest.userId, digest.title])).toEqual([
+        [1, '📋 Daily Task Digest (2 tasks)'],
+        [2, '📋 Daily Task Digest (1 tasks)']
+      ]);
+    });
+  });
+});